@@ -90,6 +90,9 @@ TOOL_FILES=(
     ops/_grar_parse.py
     ops/_grar_routes.py
     ops/_grar_render.py
+    # Compiled route-tree + inhibit simulator: the sharded-route equivalence
+    # proof (_grar_routes) and explain_route --simulate.
+    ops/_grar_simulate.py
     ops/explain_route.py
     ops/validate_config.py
     ops/analyze_rule_pack_gaps.py
@@ -187,6 +190,29 @@ TOOL_FILES=(
     # Imported by state_reconcile / rule_pack_diff / silencer_drift_check.
     # Stdlib-only by design; safe to bundle without extra deps.
     _lib_compat.py
+    # Per-phase timing spans behind `da-tools --profile` / DA_TOOLS_PROFILE.
+    # Imported by _lib_io + _lib_prometheus + describe_tenant, so every
+    # image tool needs it. Stdlib-only; safe to bundle.
+    _lib_profile.py
+    # Shared disk-cache directory + atomic entry writes. Imported by
+    # _lib_rulepack_index + _lib_dependency_index (below). Stdlib-only.
+    _lib_cache.py
+    # Compiled rule-pack index: one parse per pack content, cached on disk.
+    # Imported by runtime_audit / silencer_drift_check / rule_pack_diff /
+    # ops/_observed_map_lib.py. Needs PyYAML (already in the image).
+    _lib_rulepack_index.py
+    # Persisted conf.d reverse-dependency index (tenant/key → files, refs).
+    # Imported by offboard_tenant / deprecate_rule. Needs PyYAML (already in
+    # the image); imports _lib_confd + _lib_rulepack_index (above).
+    _lib_dependency_index.py
+    # Streaming Prometheus text-exposition parser. Imported by
+    # ops/discover_instance_mappings.py + dx/run_chaos_soak.py.
+    # Stdlib-only; safe to bundle.
+    _lib_exposition.py
+    # Dependency-free metrics registry + /metrics handler. Imported by
+    # ops/_federation_revocation_reconciler.py, ops/da_assembler.py and
+    # ops/maintenance_scheduler.py. Stdlib-only; safe to bundle.
+    _lib_metrics.py
     _lib_prometheus.py
     _lib_io.py
     # v2.10.0 (da-tools ROI r5) — minimal CRD YAML serializer shared by
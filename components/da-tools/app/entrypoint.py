@@ -3,6 +3,7 @@
 import importlib.util
 import os
 import sys
+import time
 
 
 def _build_help_text(lang):
@@ -21,7 +22,7 @@ def _build_help_text(lang):
 為平台工程師和 SRE 設計，無需克隆完整倉庫即可驗證整合。
 
 用法:
-    da-tools <command> [options]
+    da-tools [--profile[=MODE]] <command> [options]
 
 命令 (Prometheus API — 可攜式):
     check-alert       查詢租戶的告警觸發狀態
@@ -98,9 +99,18 @@ def _build_help_text(lang):
                       可選 strict-PromQL 相容性檢查 (anti-vendor-lock-in)。
                       子命令: import / allowlist
 
+命令 (常駐 worker — 省去重複啟動成本):
+    serve             預熱直譯器 (PyYAML + 共用 lib + --preload 的 YAML) 並在
+                      Unix socket 上接收命令；設定 DA_TOOLS_SOCKET 後，
+                      da-tools 會轉交給它執行 (連不上時照常在本行程執行)
+
 全域環境變數:
     PROMETHEUS_URL    預設 Prometheus 端點 (--prometheus 的後備)
-    DA_LANG           設定 CLI 語言 (zh/en，優先於 LC_ALL/LANG)"""
+    DA_LANG           設定 CLI 語言 (zh/en，優先於 LC_ALL/LANG)
+    DA_TOOLS_PROFILE  效能剖析模式 spans / cprofile / sample (同 --profile=MODE；輸出至 stderr)
+    DA_TOOLS_PROFILE_PUSHGATEWAY  剖析時將各階段耗時推送至此 Pushgateway
+    DA_TOOLS_PROFILE_OUT          cprofile 模式下另存 pstats 檔案的路徑
+    DA_TOOLS_SOCKET   常駐 worker 的 Unix socket 路徑 (見 serve)"""
     else:
         return """da-tools — Dynamic Alerting CLI Toolkit
 
@@ -109,7 +119,7 @@ Designed for Platform Engineers and SREs to validate integrations
 without cloning the full repository.
 
 Usage:
-    da-tools <command> [options]
+    da-tools [--profile[=MODE]] <command> [options]
 
 Commands (Prometheus API — portable):
     check-alert       Query alert firing status for a tenant
@@ -188,9 +198,19 @@ Commands (Parser — PromRule parser, v2.8.0):
                       optional strict-PromQL portability check
                       (anti-vendor-lock-in). Subcommands: import / allowlist
 
+Commands (Resident worker — skip repeated startup):
+    serve             Keep a warm interpreter (PyYAML + shared libs + --preload
+                      YAML trees) listening on a Unix socket; with
+                      DA_TOOLS_SOCKET set, da-tools hands commands to it
+                      (falls back to running in-process when unreachable)
+
 Global environment variables:
     PROMETHEUS_URL    Default Prometheus endpoint (fallback for --prometheus)
-    DA_LANG           Set CLI language (zh/en, takes precedence over LC_ALL/LANG)"""
+    DA_LANG           Set CLI language (zh/en, takes precedence over LC_ALL/LANG)
+    DA_TOOLS_PROFILE  Profile mode spans / cprofile / sample (same as --profile=MODE; report on stderr)
+    DA_TOOLS_PROFILE_PUSHGATEWAY  Push per-phase timings to this Pushgateway when profiling
+    DA_TOOLS_PROFILE_OUT          cprofile mode: also dump pstats to this path
+    DA_TOOLS_SOCKET   Unix socket of a resident worker (see serve)"""
 
 
 def detect_cli_lang():
@@ -475,8 +495,221 @@ def inject_prometheus_env(args):
     return args
 
 
-def run_tool(script_name, args):
-    """Load and execute a tool script by rewriting sys.argv."""
+# ── Profiling (--profile / DA_TOOLS_PROFILE) ───────────────────────
+#
+# Answers "which phase of this CronJob is slow" without editing the tool:
+#   spans     per-phase wall-time table from the shared libs' span() calls
+#             (_lib_profile: io.* / prometheus.* / describe.*) — cheapest
+#   cprofile  deterministic cProfile, top functions by cumulative time,
+#             plus the span table
+#   sample    stdlib wall-clock stack sampler on the tool's thread — low
+#             overhead, shows time blocked in I/O too — plus the span table
+# Every report goes to stderr so `--json` stdout stays parseable. The span
+# table comes from _lib_profile, which this file must NOT import (zero-
+# import contract, see _configure_std_utf8): the tool imports it through
+# the shared libs, and we reach it via sys.modules after the run.
+PROFILE_ENV = "DA_TOOLS_PROFILE"
+PROFILE_PUSHGATEWAY_ENV = "DA_TOOLS_PROFILE_PUSHGATEWAY"
+PROFILE_OUT_ENV = "DA_TOOLS_PROFILE_OUT"
+PROFILE_MODES = ("spans", "cprofile", "sample")
+_PROFILE_OFF_VALUES = ("", "0", "off", "false", "no")
+_PROFILE_TOP_N = 25
+_SAMPLE_INTERVAL_S = 0.005
+
+
+def _normalize_profile_mode(value):
+    """Map a --profile / DA_TOOLS_PROFILE value to a mode, None (off), or ''.
+
+    ``1`` / ``true`` / ``on`` are accepted as "spans" so a plain boolean env
+    switch works. Returns '' for an unrecognised value (caller reports it).
+    """
+    val = value.strip().lower()
+    if val in _PROFILE_OFF_VALUES:
+        return None
+    if val in ("1", "true", "on", "yes"):
+        return "spans"
+    return val if val in PROFILE_MODES else ""
+
+
+def _split_profile_flag(argv):
+    """Strip leading ``--profile[=MODE]`` tokens; return (mode, remaining).
+
+    Only tokens BEFORE the command are dispatcher flags — anything after it
+    belongs to the tool's own argparse and is left untouched. Without the
+    flag, DA_TOOLS_PROFILE decides (CronJob manifests set env, not argv).
+    An unknown mode exits 2 (caller error) from the flag but only warns
+    from the env.
+    """
+    mode = None
+    flagged = False
+    rest = list(argv)
+    while rest and (rest[0] == "--profile" or rest[0].startswith("--profile=")):
+        token = rest.pop(0)
+        raw = token.partition("=")[2] if "=" in token else "spans"
+        mode, flagged = _normalize_profile_mode(raw), True
+        if mode == "":
+            break
+    modes = ", ".join(PROFILE_MODES)
+    if not flagged:
+        mode = _normalize_profile_mode(os.environ.get(PROFILE_ENV, ""))
+        if mode == "":
+            # A typo in a CronJob env must not take the job down with it.
+            print(_t(f"警告: 忽略未知的 {PROFILE_ENV} 值 (可用: {modes})",
+                     f"WARN: ignoring unknown {PROFILE_ENV} value "
+                     f"(choose from: {modes})"), file=sys.stderr)
+            mode = None
+    elif mode == "":
+        print(_t(f"錯誤: 未知的剖析模式 (可用: {modes})",
+                 f"Error: Unknown profile mode (choose from: {modes})"),
+              file=sys.stderr)
+        sys.exit(2)
+    return mode, rest
+
+
+class _StackSampler:
+    """Wall-clock stack sampler for one thread (stdlib only).
+
+    A daemon thread snapshots the target thread's frame stack every
+    ``interval_s`` via ``sys._current_frames()``. Unlike cProfile it adds
+    no per-call overhead and counts time spent blocked (socket reads, file
+    I/O) against the Python frame that is waiting — which is exactly the
+    "Prometheus I/O or computation?" question.
+    """
+
+    def __init__(self, interval_s=_SAMPLE_INTERVAL_S, target_ident=None):
+        import collections
+        import threading
+
+        self.interval_s = interval_s
+        self.samples = 0
+        self.self_counts = collections.Counter()
+        self.inclusive_counts = collections.Counter()
+        self._target = target_ident or threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="da-tools-profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self.sample_once()
+
+    def sample_once(self):
+        frame = sys._current_frames().get(self._target)
+        if frame is None:
+            return
+        self.samples += 1
+        seen = set()
+        leaf = True
+        while frame is not None:
+            code = frame.f_code
+            key = (f"{os.path.basename(code.co_filename)}:"
+                   f"{code.co_firstlineno}({code.co_name})")
+            if leaf:
+                self.self_counts[key] += 1
+                leaf = False
+            if key not in seen:  # recursion counts once per sample
+                seen.add(key)
+                self.inclusive_counts[key] += 1
+            frame = frame.f_back
+
+    def render(self, stream, top=_PROFILE_TOP_N):
+        print(f"[profile] sampler: {self.samples} samples "
+              f"@ {self.interval_s * 1000:.0f}ms", file=stream)
+        if not self.samples:
+            return
+        for title, counts in (("self", self.self_counts),
+                              ("inclusive", self.inclusive_counts)):
+            print(f"[profile] top {title}:", file=stream)
+            for key, n in counts.most_common(top):
+                print(f"[profile]   {100.0 * n / self.samples:5.1f}%  {key}",
+                      file=stream)
+
+
+def _report_spans(label, wall_s, stream):
+    """Print the _lib_profile span table and push it if a gateway is set."""
+    lib = sys.modules.get("_lib_profile")
+    if lib is None:
+        print("[profile] no shared-lib spans (tool did not load _lib_profile)",
+              file=stream)
+        return
+    lib.render_summary(wall_s, stream=stream)
+    gateway = os.environ.get(PROFILE_PUSHGATEWAY_ENV, "").strip()
+    if gateway:
+        lib.push_metrics(gateway, label, wall_s)
+
+
+def _run_profiled(mode, label, fn):
+    """Run ``fn()`` under profiling *mode*; report on stderr even on exit."""
+    # Imported here, not at module top: the dispatcher's own import time is
+    # paid by every `da-tools <cmd>` call, profiled or not (pstats alone
+    # pulls in dataclasses + inspect, ~30ms).
+    import cProfile
+    import io
+    import pstats
+
+    # The tool imports _lib_profile AFTER this point, which reads the env at
+    # import; a lib already loaded in this process (tests) is switched on
+    # directly and cleared so the table covers this run only. The env is
+    # put back afterwards so a long-lived process (serve, tests) does not
+    # profile every later command.
+    prev_env = os.environ.get(PROFILE_ENV)
+    os.environ[PROFILE_ENV] = mode
+    lib = sys.modules.get("_lib_profile")
+    if lib is not None:
+        lib.enable(True)
+        lib.reset()
+
+    profiler = sampler = None
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+    elif mode == "sample":
+        sampler = _StackSampler()
+        sampler.start()
+    t0 = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.runcall(fn)
+        else:
+            fn()
+    finally:
+        wall_s = time.perf_counter() - t0
+        if sampler is not None:
+            sampler.stop()
+        stream = sys.stderr
+        print(f"[profile] {label}: mode={mode} wall={wall_s * 1000:.1f}ms",
+              file=stream)
+        if profiler is not None:
+            buf = io.StringIO()
+            stats = pstats.Stats(profiler, stream=buf)
+            stats.sort_stats("cumulative").print_stats(_PROFILE_TOP_N)
+            stream.write(buf.getvalue())
+            out_path = os.environ.get(PROFILE_OUT_ENV, "").strip()
+            if out_path:
+                stats.dump_stats(out_path)
+                print(f"[profile] pstats written to {out_path}", file=stream)
+        if sampler is not None:
+            sampler.render(stream)
+        _report_spans(label, wall_s, stream)
+        if prev_env is None:
+            os.environ.pop(PROFILE_ENV, None)
+        else:
+            os.environ[PROFILE_ENV] = prev_env
+
+
+def run_tool(script_name, args, profile=None, command=None):
+    """Load and execute a tool script by rewriting sys.argv.
+
+    ``profile`` (a PROFILE_MODES value) wraps the run in _run_profiled;
+    ``command`` is the user-facing subcommand used to label the report and
+    the Pushgateway grouping key (defaults to the script stem).
+    """
     script_path, searched = _resolve_script_path(script_name)
 
     if script_path is None:
@@ -493,7 +726,11 @@ def run_tool(script_name, args):
     # Load and execute the script as __main__
     spec = importlib.util.spec_from_file_location("__main__", script_path)
     module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    if profile:
+        label = command or os.path.splitext(script_name)[0]
+        _run_profiled(profile, label, lambda: spec.loader.exec_module(module))
+    else:
+        spec.loader.exec_module(module)
 
 
 def _print_version(tools_dir=None):
@@ -540,18 +777,453 @@ def _configure_std_utf8():
                 pass
 
 
-def main():
+# ── Resident worker (da-tools serve / DA_TOOLS_SOCKET) ────────────
+#
+# A GitOps pipeline calls da-tools 30+ times per PR and each call pays
+# interpreter start + PyYAML + shared-lib imports before the tool does any
+# work. `da-tools serve --socket PATH` pays that once: it imports the heavy
+# modules, optionally parses --preload YAML trees (rule packs, conf.d), and
+# then waits on a Unix socket. A client (`da-tools <cmd>` with
+# DA_TOOLS_SOCKET=PATH) sends argv + cwd + environ and passes its OWN stdin/
+# stdout/stderr file descriptors (SCM_RIGHTS); the worker forks a child that
+# dup2()s them onto 0/1/2 and runs the normal dispatcher. Output therefore
+# streams straight to the caller's terminal/pipes, and the child's exit code
+# is relayed back as the client's exit code.
+#
+# fork-per-request is the point, not an implementation detail: every run
+# gets a copy-on-write snapshot of the warm process, so tool globals,
+# sys.argv / sys.path edits, os.chdir and module-level caches cannot leak
+# between invocations — exactly the isolation a fresh interpreter gave.
+# The worker loop is single-threaded (fork from a threaded process is
+# unsafe). POSIX-only; when the socket is unset, missing or unreachable the
+# client silently runs in-process, so a pipeline works with or without it.
+RESIDENT_SOCKET_ENV = "DA_TOOLS_SOCKET"
+_RESIDENT_PROTOCOL = 1
+_RESIDENT_MAX_REQUEST = 8 << 20
+_RESIDENT_PRELOAD_MODULES = (
+    "argparse", "json", "yaml", "urllib.request",
+    "_lib_compat", "_lib_exitcodes", "_lib_constants", "_lib_confd",
+    "_lib_validation", "_lib_profile", "_lib_io", "_lib_prometheus",
+    "_lib_python",
+)
+
+
+def _recv_exactly(sock, n):
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return buf
+
+
+def _forward_to_resident(argv):
+    """Run *argv* on the resident worker; return its exit code.
+
+    Returns None when there is no usable worker (env unset, non-POSIX,
+    socket absent or refusing) — the caller then runs in-process. Once the
+    request is handed over, a lost connection is NOT retried locally: the
+    tool may already have acted (created silences, opened PRs), and running
+    it twice is worse than failing loudly.
+    """
+    path = os.environ.get(RESIDENT_SOCKET_ENV, "").strip()
+    if not path or (argv and argv[0] == "serve"):
+        return None
+    import json
+    import socket
+    import struct
+    if not hasattr(socket, "AF_UNIX") or not hasattr(socket, "send_fds"):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    with sock:
+        payload = json.dumps({
+            "v": _RESIDENT_PROTOCOL, "argv": argv,
+            "cwd": os.getcwd(), "env": dict(os.environ),
+        }).encode("utf-8")
+        data = struct.pack("!I", len(payload)) + payload
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        try:
+            sent = socket.send_fds(sock, [data], [0, 1, 2])
+            sock.sendall(data[sent:])
+        except OSError:
+            return None  # e.g. a closed stdio fd: nothing ran yet
+        try:
+            reply = _recv_exactly(sock, 4)
+        except KeyboardInterrupt:
+            return 130  # closing the socket makes the worker kill the child
+        if reply is None:
+            print(_t("錯誤: 常駐 worker 在執行中斷線",
+                     "Error: resident worker closed the connection mid-run"),
+                  file=sys.stderr)
+            return 2
+        return struct.unpack("!i", reply)[0]
+
+
+def _install_yaml_preload(docs):
+    """Serve ``yaml.safe_load`` hits from *docs* (source text → parsed doc).
+
+    Keyed by content, not path: an edited file simply misses and is parsed
+    as usual, so there is no staleness to manage. Every hit returns a
+    ``deepcopy`` — callers own (and may mutate) what they load, and copying
+    a parsed rule pack is ~100x cheaper than PyYAML's pure-Python parse.
+    Streams are read, looked up, and rewound on a miss so the real parser
+    (and its error marks naming the file) sees them unchanged.
+    """
+    import copy
+    import io
+    import yaml
+
+    original = getattr(yaml.safe_load, "__wrapped__", yaml.safe_load)
+    miss = object()
+
+    def safe_load(stream):
+        if isinstance(stream, str):
+            doc = docs.get(stream, miss)
+            return original(stream) if doc is miss else copy.deepcopy(doc)
+        if isinstance(stream, io.TextIOBase) and stream.seekable():
+            pos = stream.tell()
+            doc = docs.get(stream.read(), miss)
+            if doc is not miss:
+                return copy.deepcopy(doc)
+            stream.seek(pos)
+        return original(stream)
+
+    safe_load.__wrapped__ = original
+    yaml.safe_load = safe_load
+
+
+def _preload_yaml_trees(dirs):
+    """Parse every *.yaml / *.yml under *dirs*; return {text: doc}."""
+    import yaml
+    from pathlib import Path
+
+    docs = {}
+    for root in dirs:
+        for path in sorted(Path(root).rglob("*")):
+            if path.suffix not in (".yaml", ".yml") or not path.is_file():
+                continue
+            try:
+                text = path.read_text(encoding="utf-8")
+                docs[text] = yaml.safe_load(text)
+            except (OSError, UnicodeDecodeError, yaml.YAMLError):
+                continue  # the tool reports its own parse errors
+    return docs
+
+
+def _preload_modules():
+    """Import the heavy modules every tool needs; return how many loaded."""
+    repo_root = _find_repo_root(TOOLS_DIR)
+    if repo_root:  # local dev: the shared libs live in scripts/tools/
+        lib_dir = os.path.join(repo_root, "scripts", "tools")
+        if lib_dir not in sys.path:
+            sys.path.append(lib_dir)
+    loaded = 0
+    for name in _RESIDENT_PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+            loaded += 1
+        except ImportError:
+            pass
+    return loaded
+
+
+def _exit_code_of(exc):
+    """Map a SystemExit to a process exit code, as the interpreter would."""
+    code = exc.code
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _resident_child(request, fds):
+    """Forked child: adopt the client's stdio/cwd/env and dispatch. Never returns."""
+    global _LANG
+    import signal
+    import traceback
+
+    code = 1
+    try:
+        for target, fd in zip((0, 1, 2), fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        _LANG = detect_cli_lang()
+        sys.argv = ["da-tools"] + list(request["argv"])
+        try:
+            _dispatch(list(request["argv"]))
+            code = 0
+        except SystemExit as exc:
+            code = _exit_code_of(exc)
+        except KeyboardInterrupt:
+            code = 130
+        except BaseException:  # noqa: BLE001 — mirror the interpreter's crash path
+            traceback.print_exc()
+            code = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+        os._exit(code & 0xFF)
+
+
+def _peer_uid(conn):
+    """Connecting process's uid (Linux SO_PEERCRED), or None if unknown."""
+    import socket
+    import struct
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                            struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+def _read_request(conn):
+    """Read one request; return (request_dict, fds) or None if malformed."""
+    import json
+    import socket
+    import struct
+
+    conn.settimeout(10)
+    data, fds, _flags, _addr = socket.recv_fds(conn, 65536, 3)
+    if len(fds) != 3 or len(data) < 4:
+        for fd in fds:
+            os.close(fd)
+        return None
+    size = struct.unpack("!I", data[:4])[0]
+    if size > _RESIDENT_MAX_REQUEST:
+        for fd in fds:
+            os.close(fd)
+        return None
+    body = data[4:]
+    if len(body) < size:
+        rest = _recv_exactly(conn, size - len(body))
+        body += rest or b""
+    try:
+        request = json.loads(body[:size].decode("utf-8"))
+    except ValueError:
+        request = None
+    if (not isinstance(request, dict) or request.get("v") != _RESIDENT_PROTOCOL
+            or not isinstance(request.get("argv"), list)):
+        for fd in fds:
+            os.close(fd)
+        return None
+    return request, fds
+
+
+def serve(argv):
+    """`da-tools serve`: run the resident worker until signalled or idle."""
+    import argparse
+    import selectors
+    import signal
+    import socket
+    import struct
+
+    parser = argparse.ArgumentParser(
+        prog="da-tools serve",
+        description=_t(
+            "常駐 worker：預熱直譯器並在 Unix socket 上執行 da-tools 命令。",
+            "Resident worker: keep a warm interpreter and run da-tools "
+            "commands received on a Unix socket."),
+    )
+    parser.add_argument(
+        "--socket", default=os.environ.get(RESIDENT_SOCKET_ENV) or None,
+        help=_t(f"socket 路徑 (預設 ${RESIDENT_SOCKET_ENV})",
+                f"socket path (default: ${RESIDENT_SOCKET_ENV})"))
+    parser.add_argument(
+        "--preload", action="append", default=[], metavar="DIR",
+        help=_t("預先解析此目錄下的 YAML (可重複；如 rule-packs/、conf.d/)",
+                "pre-parse the YAML under DIR (repeatable; e.g. rule-packs/, conf.d/)"))
+    parser.add_argument(
+        "--max-workers", type=int, default=os.cpu_count() or 2,
+        help=_t("同時執行的命令上限 (預設 CPU 數)",
+                "max concurrently running commands (default: CPU count)"))
+    parser.add_argument(
+        "--idle-timeout", type=float, default=0.0,
+        help=_t("閒置多少秒後自動結束 (0 = 不結束)",
+                "exit after this many idle seconds (0 = never)"))
+    args = parser.parse_args(argv)
+
+    if not args.socket:
+        parser.error(_t(f"需要 --socket 或 ${RESIDENT_SOCKET_ENV}",
+                        f"--socket or ${RESIDENT_SOCKET_ENV} is required"))
+    if not hasattr(socket, "AF_UNIX") or not hasattr(socket, "send_fds") \
+            or not hasattr(os, "fork"):
+        print(_t("錯誤: serve 需要支援 Unix socket 與 fork 的 POSIX 平台",
+                 "Error: serve needs a POSIX platform (Unix sockets + fork)"),
+              file=sys.stderr)
+        sys.exit(2)
+    if args.max_workers < 1:
+        parser.error("--max-workers must be >= 1")
+
+    path = args.socket
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)  # stale socket from a crashed worker
+        else:
+            print(_t(f"錯誤: {path} 已有 worker 在服務",
+                     f"Error: a worker is already serving on {path}"),
+                  file=sys.stderr)
+            sys.exit(2)
+        finally:
+            probe.close()
+
+    t0 = time.perf_counter()
+    modules = _preload_modules()
+    docs = _preload_yaml_trees(args.preload)
+    if docs:
+        _install_yaml_preload(docs)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # socket file 0600: same-user clients only
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(64)
+    listener.setblocking(False)
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+    print(f"[serve] ready on {path}: {modules} modules, {len(docs)} YAML "
+          f"docs preloaded in {(time.perf_counter() - t0) * 1000:.0f}ms",
+          file=sys.stderr, flush=True)
+
+    sel = selectors.DefaultSelector()
+    children = {}  # pid → client connection
+    listening = False
+    last_activity = time.monotonic()
+    try:
+        while not stopping:
+            want_listen = len(children) < args.max_workers
+            if want_listen != listening:
+                if want_listen:
+                    sel.register(listener, selectors.EVENT_READ)
+                else:
+                    sel.unregister(listener)
+                listening = want_listen
+            for key, _ in sel.select(timeout=0.05):
+                if key.fileobj is listener:
+                    try:
+                        conn, _addr = listener.accept()
+                    except BlockingIOError:
+                        continue
+                    last_activity = time.monotonic()
+                    conn.setblocking(True)
+                    uid = _peer_uid(conn)
+                    parsed = None
+                    if uid is None or uid == os.getuid():
+                        try:
+                            parsed = _read_request(conn)
+                        except (OSError, struct.error):
+                            parsed = None
+                    if parsed is None:
+                        conn.close()
+                        continue
+                    request, fds = parsed
+                    for stream in (sys.stdout, sys.stderr):
+                        stream.flush()
+                    pid = os.fork()
+                    if pid == 0:
+                        sel.close()
+                        listener.close()
+                        conn.close()
+                        for other in children.values():
+                            other.close()
+                        _resident_child(request, fds)
+                    for fd in fds:
+                        os.close(fd)
+                    conn.setblocking(False)
+                    children[pid] = conn
+                    sel.register(conn, selectors.EVENT_READ, pid)
+                else:
+                    # A client connection became readable: the only thing a
+                    # client ever sends after the request is EOF (it exited
+                    # or was interrupted) — stop its child.
+                    try:
+                        gone = key.fileobj.recv(1) == b""
+                    except BlockingIOError:
+                        gone = False
+                    except OSError:
+                        gone = True
+                    if gone:
+                        try:
+                            os.kill(key.data, signal.SIGTERM)
+                        except ProcessLookupError:
+                            pass
+            while children:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+                if pid == 0:
+                    break
+                conn = children.pop(pid, None)
+                if conn is None:
+                    continue
+                code = os.waitstatus_to_exitcode(status)
+                if code < 0:
+                    code = 128 - code  # killed by signal N → 128+N
+                sel.unregister(conn)
+                try:
+                    conn.setblocking(True)
+                    conn.sendall(struct.pack("!i", code))
+                except OSError:
+                    pass
+                conn.close()
+                last_activity = time.monotonic()
+            if (args.idle_timeout and not children
+                    and time.monotonic() - last_activity >= args.idle_timeout):
+                print("[serve] idle timeout reached; exiting", file=sys.stderr)
+                break
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        sel.close()
+        listener.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    sys.exit(0)
+
+
+def _dispatch(argv):
+    """Route ``argv`` (without the program name) to its tool."""
     _configure_std_utf8()
-    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help", "help"):
+    profile, argv = _split_profile_flag(argv)
+    if not argv or argv[0] in ("-h", "--help", "help"):
         print_usage()
 
-    command = sys.argv[1]
-    args = sys.argv[2:]
+    command = argv[0]
+    args = argv[1:]
 
     if command == "--version":
         _print_version()
 
-    # Note: -h/--help/help is fully handled by the guard at the top of main()
+    if command == "serve":
+        serve(args)
+
+    # Note: -h/--help/help is fully handled by the guard at the top of _dispatch()
     # (print_usage exits there), so no second help check is needed here.
 
     if command not in COMMAND_MAP:
@@ -568,7 +1240,14 @@ def main():
     if command in PROMETHEUS_COMMANDS:
         args = inject_prometheus_env(args)
 
-    run_tool(COMMAND_MAP[command], args)
+    run_tool(COMMAND_MAP[command], args, profile=profile, command=command)
+
+
+def main():
+    code = _forward_to_resident(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+    _dispatch(sys.argv[1:])
 
 
 if __name__ == "__main__":
@@ -3,8 +3,9 @@
 
 A small stdlib HTTP service that wires the portal's recipe form to the
 would-fire eval core (`_recipe_preview`): `POST /preview` answers "firing /
-inactive / error" for ONE recipe + a scenario value, by going through the SAME
-compiler + `promtool` the platform uses — never re-implementing eval.
+inactive / error" for ONE recipe + a scenario value, by evaluating the SAME
+compiled rules the platform deploys (in-process by default, `promtool` with
+PREVIEW_ENGINE=promtool) — never re-implementing recipe semantics.
 
 Security model — this service is a PEP (policy enforcement point); it does NOT
 decide tenant access itself. It forwards the caller's identity to tenant-api's
@@ -44,8 +45,12 @@ for _cand in (
 ):
     if _cand and os.path.isdir(_cand):
         sys.path.insert(0, _cand)
+        # The shared root libs (_lib_metrics, …) sit one level up: ./core in
+        # the image, scripts/tools in the repo.
+        sys.path.insert(1, os.path.dirname(os.path.abspath(_cand)))
         break
 import _recipe_preview as core  # noqa: E402
+from _lib_metrics import MetricsRegistry, write_metrics  # noqa: E402
 
 # ── config (env) ─────────────────────────────────────────────────────────
 TENANT_API_URL = os.environ.get("PREVIEW_TENANT_API_URL", "http://tenant-api.tenant-api.svc.cluster.local:8080").rstrip("/")
@@ -60,6 +65,11 @@ DEV_BYPASS_EMAIL = os.environ.get("PREVIEW_DEV_BYPASS_EMAIL", "dev@local")
 DEV_BYPASS_GROUPS = os.environ.get("PREVIEW_DEV_BYPASS_GROUPS", "demo-admins")
 MAX_BODY_BYTES = int(os.environ.get("PREVIEW_MAX_BODY_BYTES", str(64 * 1024)))
 REQUEST_TIMEOUT = float(os.environ.get("PREVIEW_REQUEST_TIMEOUT", "60"))
+# `POST /preview/batch` item cap. A batch holds ONE eval slot (it costs ~one
+# promtool run when its shapes are cached) but is charged one rate-limit hit per
+# item, so the default matches RATE_LIMIT_PER_MIN: a full batch spends a minute's
+# budget. Keep it well under MAX_BODY_BYTES / recipe size.
+MAX_BATCH_ITEMS = int(os.environ.get("PREVIEW_MAX_BATCH_ITEMS", "30"))
 # Audience-bound projected SA token (aud=tenant-api) mounted by the Helm chart at
 # /var/run/secrets/tokens/tenant-api-token (#962 b2). Sent as a Bearer to
 # tenant-api's machine-identity AUDIT only. Unset (e.g. try-local, no K8s) → no
@@ -136,7 +146,8 @@ class RateLimiter:
         self._hits = defaultdict(deque)
         self._lock = threading.Lock()
 
-    def allow(self, key, now):
+    def allow(self, key, now, cost=1):
+        """Spend *cost* hits of *key*'s budget, all or nothing."""
         if self._per_min <= 0:
             return True
         with self._lock:
@@ -151,9 +162,9 @@ class RateLimiter:
             dq = self._hits[key]
             while dq and dq[0] < cutoff:
                 dq.popleft()
-            if len(dq) >= self._per_min:
+            if len(dq) + cost > self._per_min:
                 return False
-            dq.append(now)
+            dq.extend([now] * cost)
             return True
 
 
@@ -280,6 +291,19 @@ def authorize_tenant(headers, tenant):
         return False
 
 
+# ── metrics (GET /metrics) ───────────────────────────────────────────────
+# Route + status only — never tenant (unbounded, and an identity-adjacent
+# label on a scrape target outside the PEP).
+METRICS = MetricsRegistry()
+_requests = METRICS.counter(
+    "recipe_preview_requests_total", "Preview requests by route and HTTP status.",
+    ["route", "code"])
+_latency = METRICS.histogram(
+    "recipe_preview_request_duration_seconds",
+    "Preview request latency by route (authz + queue + eval).", ["route"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+
+
 # ── request logic (testable seam: inject authorizer / evaluator) ─────────
 def handle_preview(body, headers, *, authorizer=authorize_tenant,
                    evaluator=core.preview_recipe, now=None):
@@ -329,7 +353,62 @@ def handle_preview(body, headers, *, authorizer=authorize_tenant,
         _eval_slots.release()
 
 
-# ── HTTP layer (thin wrapper over handle_preview) ────────────────────────
+def handle_preview_batch(body, headers, *, authorizer=authorize_tenant,
+                         evaluator=core.preview_batch, now=None):
+    """`POST /preview/batch` logic → (http_status:int, response:dict).
+
+    Body: `{tenant, items: [{recipe, scenario}, ...]}` — ONE tenant per batch
+    (a portal form sweeping a slider previews one tenant), so the PEP runs once
+    and the same validate → identity → authorize → rate-limit → bounded-eval
+    order as `handle_preview` applies to the batch as a whole — except that the
+    rate limiter is charged one hit PER ITEM (all or nothing), so batching is
+    not a way around the per-tenant budget. A malformed item
+    rejects the whole batch (400, with its index) rather than returning a
+    partial answer the form would have to reconcile. Response:
+    `{results: [<§4 contract dict>, ...]}` in item order.
+    """
+    now = time.monotonic() if now is None else now
+    if not isinstance(body, dict):
+        return 400, {"error": "request body must be a JSON object"}
+    tenant = body.get("tenant")
+    items = body.get("items")
+    if not isinstance(tenant, str) or not tenant:
+        return 400, {"error": "`tenant` (string) is required"}
+    if len(tenant) > 253:
+        return 400, {"error": "`tenant` is too long"}
+    if not isinstance(items, list) or not items:
+        return 400, {"error": "`items` (non-empty array) is required"}
+    if len(items) > MAX_BATCH_ITEMS:
+        return 400, {"error": f"`items` exceeds the batch limit of {MAX_BATCH_ITEMS}"}
+    work = []
+    for n, item in enumerate(items):
+        if not isinstance(item, dict):
+            return 400, {"error": f"items[{n}] must be an object"}
+        recipe = item.get("recipe")
+        # get-with-default, NOT `or {}` — same falsy-non-dict trap as /preview.
+        scenario = item.get("scenario", {})
+        if not isinstance(recipe, dict) or not recipe:
+            return 400, {"error": f"items[{n}].recipe (object) is required"}
+        if not isinstance(scenario, dict):
+            return 400, {"error": f"items[{n}].scenario must be an object"}
+        work.append((recipe, tenant, scenario))
+
+    hdrs = _apply_dev_bypass(headers)
+    if not hdrs.get("X-Forwarded-Email"):
+        return 401, {"error": "missing identity: X-Forwarded-Email required"}
+    if not authorizer(hdrs, tenant):
+        return 403, {"error": f"not authorized to preview tenant {tenant!r}"}
+    if not _rate.allow(tenant, now, cost=len(work)):
+        return 429, {"error": "rate limit exceeded for this tenant"}
+    if not _eval_slots.acquire(timeout=QUEUE_TIMEOUT):
+        return 503, {"error": "preview is busy; retry shortly"}
+    try:
+        return 200, {"results": evaluator(work)}
+    finally:
+        _eval_slots.release()
+
+
+# ── HTTP layer (thin wrapper over the handle_* functions) ────────────────
 def parse_content_length(raw_header):
     """Validate a Content-Length header BEFORE reading the body.
 
@@ -365,14 +444,23 @@ class _Handler(BaseHTTPRequestHandler):
         self.wfile.write(payload)
 
     def do_GET(self):
-        if self.path.split("?", 1)[0] == "/healthz":
-            self._send(200, {"status": "ok", "promtool": _PROMTOOL_VERSION,
-                             "git_sha": _GIT_SHA})
+        route = self.path.split("?", 1)[0]
+        if route == "/healthz":
+            self._send(200, {"status": "ok", "engine": core._ENGINE,
+                             "promtool": _PROMTOOL_VERSION, "git_sha": _GIT_SHA})
+            return
+        if route == "/metrics":
+            write_metrics(self, METRICS)
             return
         self._send(404, {"error": "not found"})
 
     def do_POST(self):
-        if self.path.split("?", 1)[0] != "/preview":
+        route = self.path.split("?", 1)[0]
+        if route == "/preview":
+            handler = handle_preview
+        elif route == "/preview/batch":
+            handler = handle_preview_batch
+        else:
             self._send(404, {"error": "not found"})
             return
         # recipes are tiny; validate Content-Length (reject non-numeric, negative,
@@ -387,8 +475,9 @@ class _Handler(BaseHTTPRequestHandler):
         except (ValueError, UnicodeDecodeError):
             self._send(400, {"error": "request body must be valid JSON"})
             return
+        started = time.perf_counter()
         try:
-            status, resp = handle_preview(body, self.headers)
+            status, resp = handler(body, self.headers)
         except Exception:  # never leak a traceback to the client; fail safe
             # Prefix the server-side trace with request context so a 500 is actionable.
             # tenant + path ONLY — never the body (carries the recipe) or the identity
@@ -403,6 +492,8 @@ class _Handler(BaseHTTPRequestHandler):
             except Exception:
                 pass
             status, resp = 500, {"error": "internal error"}
+        _latency.labels(route).observe(time.perf_counter() - started)
+        _requests.labels(route, str(status)).inc()
         self._send(status, resp)
 
     def log_message(self, fmt, *args):  # quieter, structured-ish access log
@@ -436,10 +527,10 @@ def main():
     # verdict contract is version-bound (baseline re-verified on 3.13.1).
     sys.stderr.write(
         f"recipe-preview listening on {LISTEN_HOST}:{LISTEN_PORT} "
-        f"(promtool: {_PROMTOOL_VERSION}, git-sha: {_GIT_SHA}, "
+        f"(engine: {core._ENGINE}, promtool: {_PROMTOOL_VERSION}, git-sha: {_GIT_SHA}, "
         f"tenant-api: {TENANT_API_URL}, "
         f"dev-bypass: {DEV_BYPASS}, max-concurrency: {MAX_CONCURRENCY}, "
-        f"rate/min: {RATE_LIMIT_PER_MIN})\n"
+        f"rate/min: {RATE_LIMIT_PER_MIN}, batch-items: {MAX_BATCH_ITEMS})\n"
     )
     ThreadingHTTPServer((LISTEN_HOST, LISTEN_PORT), _Handler).serve_forever()
 
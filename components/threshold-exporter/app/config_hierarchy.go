@@ -155,7 +155,12 @@ func scanDirHierarchicalWithMetrics(rootPath string, priorMtimes map[string]file
 	}
 	var decls []tenantDecl
 
-	walkErr := filepath.WalkDir(absRoot, func(path string, d fs.DirEntry, werr error) error {
+	// A root that is itself a symlink (assemble_config_dir --swap flips one
+	// per generation) must still be walked: WalkDir Lstat's its root and
+	// would report the link as a leaf. A trailing separator makes the OS
+	// resolve it, while every path handed to the callback stays under the
+	// link — so hash keys survive the flip and only real edits reload.
+	walkErr := filepath.WalkDir(absRoot+string(filepath.Separator), func(path string, d fs.DirEntry, werr error) error {
 		if werr != nil {
 			// Tolerate individual unreadable entries (e.g. permissions on a
 			// junk dir). Log and continue — matches Python's rglob behavior
@@ -168,7 +173,7 @@ func scanDirHierarchicalWithMetrics(rootPath string, priorMtimes map[string]file
 		if d.IsDir() {
 			// Prune hidden dirs. Never prune the root itself even if rootPath
 			// happens to start with '.' (e.g. `./conf.d` → absRoot is clean).
-			if path != absRoot && strings.HasPrefix(name, ".") {
+			if filepath.Clean(path) != absRoot && strings.HasPrefix(name, ".") {
 				return fs.SkipDir
 			}
 			return nil
@@ -414,6 +414,56 @@ func TestScanDirHierarchical_K8sSymlinkLayout(t *testing.T) {
 	}
 }
 
+// TestScanDirHierarchical_SymlinkedRoot covers the layout
+// `assemble_config_dir.py --swap` produces: the config dir is a symlink
+// to the current generation, flipped atomically per assembly. The scan
+// must walk through the root link (WalkDir alone treats it as a leaf)
+// and key every hash by the link path, so a flip to a generation with
+// identical content reads as "nothing changed" rather than N new files.
+func TestScanDirHierarchical_SymlinkedRoot(t *testing.T) {
+	if runtime.GOOS == "windows" {
+		t.Skip("symlink creation requires Windows Developer Mode; covered on Linux CI")
+	}
+	tmp := t.TempDir()
+	for _, gen := range []string{".gen-1", ".gen-2"} {
+		writeFile(t, filepath.Join(tmp, gen, "_defaults.yaml"), "defaults:\n  cpu: 80\n")
+		writeFile(t, filepath.Join(tmp, gen, "tenant-a.yaml"), "tenants:\n  tenant-a:\n    cpu: '90'\n")
+	}
+	root := filepath.Join(tmp, "config-dir")
+	if err := os.Symlink(".gen-1", root); err != nil {
+		t.Fatalf("symlink root: %v", err)
+	}
+
+	tenants, _, before, _, _, err := scanDirHierarchical(root, nil)
+	if err != nil {
+		t.Fatalf("scan gen-1: %v", err)
+	}
+	if _, ok := tenants["tenant-a"]; !ok {
+		t.Fatalf("tenant-a missing; symlinked root was not walked")
+	}
+
+	// Flip the way the assembler does: new link beside, rename over.
+	next := filepath.Join(tmp, ".config-dir.tmp")
+	if err := os.Symlink(".gen-2", next); err != nil {
+		t.Fatalf("symlink next: %v", err)
+	}
+	if err := os.Rename(next, root); err != nil {
+		t.Fatalf("flip: %v", err)
+	}
+	_, _, after, _, _, err := scanDirHierarchical(root, nil)
+	if err != nil {
+		t.Fatalf("scan gen-2: %v", err)
+	}
+	if !reflect.DeepEqual(before, after) {
+		t.Errorf("hashes moved across an identical-content flip:\n before=%v\n after=%v", before, after)
+	}
+	for path := range after {
+		if !strings.HasPrefix(path, root+string(filepath.Separator)) {
+			t.Errorf("hash key %q is not under the root link %q", path, root)
+		}
+	}
+}
+
 // TestScanDirHierarchical_MixedValidInvalid (A-8d, planning §12.2) locks
 // the "poison pill isolation" invariant: a malformed YAML file in the
 // scan tree must not block discovery / hashing of sibling valid files.
@@ -0,0 +1,66 @@
+"""On-disk cache plumbing shared by the da-tools content caches.
+
+``_lib_rulepack_index``, ``_lib_dependency_index`` and
+``dx/custom_alerts/cache`` each persist JSON under
+``$XDG_CACHE_HOME/da-tools/<name>``. This module is the part they share:
+
+  - :func:`tool_cache_dir` — where a cache lives: ``$<ENV>`` if set, else
+    ``$XDG_CACHE_HOME/da-tools/<name>`` (``~/.cache/...``), plus a version
+    subdirectory so a schema bump never reads old entries; ``<ENV>=off``
+    (``0`` / ``none`` / ``false`` / ``no``) disables the disk layer.
+  - :func:`write_text_atomic` — publish one entry through a same-directory
+    temp file and ``os.replace``, so a concurrent reader sees the old entry,
+    no entry, or the whole new one — never a torn file.
+
+Disk failures are swallowed here (``write_text_atomic`` reports them as
+``False``): a cache can make a tool faster, never wrong and never failing.
+Stdlib-only.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import Optional
+
+#: Env-override values that disable a disk cache.
+OFF_VALUES = ("off", "0", "none", "false", "no")
+
+
+def tool_cache_dir(env_var: str, name: str, version: str) -> Optional[str]:
+    """``<base>/<version>`` for cache *name*, or None when *env_var* is ``off``.
+
+    *base* is ``$<env_var>`` when set, else ``$XDG_CACHE_HOME/da-tools/<name>``.
+    """
+    override = os.environ.get(env_var, "").strip()
+    if override.lower() in OFF_VALUES:
+        return None
+    if override:
+        base = override
+    else:
+        xdg = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache")
+        base = os.path.join(xdg, "da-tools", name)
+    return os.path.join(base, version)
+
+
+def write_text_atomic(path: str, text: str) -> bool:
+    """Atomically replace *path* with *text* (UTF-8, LF, ``0o600``).
+
+    Creates the parent directory (``0o700``) as needed. Returns False, leaving
+    any previous entry in place, when the write fails.
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(path)[:12]}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as fh:
+                fh.write(text)
+            os.replace(tmp, path)
+        except OSError:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        return False
+    return True
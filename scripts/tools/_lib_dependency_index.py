@@ -0,0 +1,433 @@
+"""Reverse-dependency index for a conf.d/ — "who depends on this?" without a rescan.
+
+offboard_tenant's pre-check and deprecate_rule's Step 2 each re-read and
+``yaml.safe_load`` every file in the config dir to answer one question
+("which files mention tenant X" / "which files carry key K"), and
+deprecate_rule did it twice per metric. PyYAML's pure-Python loader is the
+whole cost of those tools; between two runs almost nothing has changed.
+
+:func:`load_index` returns a :class:`DependencyIndex` built from one compact
+record per config file:
+
+  - ``tenants``  — tenant → its config keys (the key → tenants/files side)
+  - ``defaults`` — keys under ``defaults:``
+  - ``refs``     — tenant → what it points at: ``_profile``,
+                   ``_routing_profile``, its ``_routing`` receiver, the
+                   ``_custom_alerts`` recipe names, silence/maintenance keys
+  - ``mappings`` / ``domains`` — tenant → ``instance_tenant_mapping``
+                   instances / ``domain_policies`` that list it
+  - ``defines``  — ``profiles:`` / ``routing_profiles:`` names defined here
+  - ``tokens``   — a keyed blake2b digest of every name-like token in the
+                   file's keys and scalars (the cross-reference lookup)
+
+Records are keyed by content hash and refreshed incrementally: a file whose
+(size, mtime_ns) matches its record is not read at all, one whose bytes hash
+to the recorded sha256 is not parsed, and only the rest go through YAML. An
+mtime inside the racy window (the last ``_RACY_WINDOW_NS``) is never trusted,
+so a same-size rewrite within one mtime tick is still re-hashed.
+
+The index persists as one JSON file per config dir under
+``$DA_DEPENDENCY_INDEX_CACHE`` (else ``$XDG_CACHE_HOME/da-tools/
+dependency-index``); ``DA_DEPENDENCY_INDEX_CACHE=off`` keeps it in-process
+only. Scalars include webhook URLs and credentials, so the file never holds
+their text: tokens are stored as digests under a random per-index key and
+:meth:`DependencyIndex.mentions` digests the query the same way, and a
+record whose file did not parse (PyYAML's message quotes the offending
+line) stays in-process. Directory and atomic writes come from ``_lib_cache``;
+as with ``_lib_rulepack_index``, a disk failure degrades to a rebuild.
+
+A file that does not parse gets a record carrying its ``error`` and one whose
+shape the record cannot describe (non-mapping document or ``tenants:``,
+non-string keys) is ``opaque``; every lookup returns both kinds as
+candidates, so the caller re-reads them and reports or fails exactly as its
+own full scan did.
+
+The scan is flat (the tools it serves read conf.d flat) and says so via
+``warn_nested`` (#1339).
+
+Bump ``INDEX_VERSION`` whenever the record shape or an extraction rule
+changes.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - shipped image always has PyYAML
+    yaml = None  # type: ignore
+
+from _lib_cache import tool_cache_dir, write_text_atomic
+from _lib_confd import CONFIG_SUFFIXES, warn_nested
+
+#: Record schema version (cache subdirectory name).
+INDEX_VERSION = 2
+
+#: Cache directory override; ``off`` / ``0`` / ``none`` disables the disk cache.
+CACHE_ENV = "DA_DEPENDENCY_INDEX_CACHE"
+
+# An mtime this close to "now" may still be followed by a same-size write in
+# the same tick; such a stat match is not trusted (cf. git's racy-clean rule).
+_RACY_WINDOW_NS = 2_000_000_000
+
+# A name-like run. Tenant names allow "." too, so a run is indexed both whole
+# (edge dots stripped) and split on "." — "db-a.yaml" finds db-a, "db.a" finds
+# db.a, and a sentence-final "db-a." finds db-a.
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_.-]+")
+
+# Tenant keys that say "this tenant is silenced / in maintenance".
+_SILENCE_KEYS = ("_silent_mode", "_state_maintenance")
+
+# Bytes per token digest; a collision only adds a candidate file.
+_TOKEN_DIGEST_SIZE = 8
+
+_HAS_CSAFE_LOADER = yaml is not None and hasattr(yaml, "CSafeLoader")
+
+# In-process layer: absolute config dir → (token key, {filename: record}).
+_MEMO: dict[str, tuple[bytes, dict[str, dict]]] = {}
+
+
+# ─── Extraction ───────────────────────────────────────────────────────
+
+
+def _tokens_of(value: str, out: set[str]) -> None:
+    for run in _TOKEN_RE.findall(value):
+        run = run.strip(".")
+        if run:
+            out.add(run)
+            if "." in run:
+                out.update(p for p in run.split(".") if p)
+
+
+def _token_digest(token: str, key: bytes) -> str:
+    return hashlib.blake2b(token.encode("utf-8"), key=key,
+                           digest_size=_TOKEN_DIGEST_SIZE).hexdigest()
+
+
+def _walk_tokens(node: Any, out: set[str]) -> None:
+    if isinstance(node, dict):
+        for k, v in node.items():
+            _walk_tokens(k, out)
+            _walk_tokens(v, out)
+    elif isinstance(node, list):
+        for v in node:
+            _walk_tokens(v, out)
+    elif isinstance(node, str):
+        _tokens_of(node, out)
+    elif node is not None and not isinstance(node, bool):
+        _tokens_of(str(node), out)
+
+
+def _tenant_refs(config: dict) -> dict[str, list[str]]:
+    refs: dict[str, list[str]] = {}
+    for key, kind in (("_profile", "profile"), ("_routing_profile", "routing_profile")):
+        if isinstance(config.get(key), str):
+            refs[kind] = [config[key]]
+    routing = config.get("_routing")
+    if isinstance(routing, dict):
+        receiver = routing.get("receiver")
+        rtype = receiver.get("type") if isinstance(receiver, dict) else None
+        refs["routing"] = [str(rtype or "custom")]
+    alerts = config.get("_custom_alerts")
+    if isinstance(alerts, list):
+        names = [str(a.get("name")) for a in alerts
+                 if isinstance(a, dict) and a.get("name") is not None]
+        if names:
+            refs["recipes"] = names
+    silences = [k for k in _SILENCE_KEYS if k in config]
+    if silences:
+        refs["silences"] = silences
+    return refs
+
+
+def _extract(doc: Any, key: bytes) -> dict:
+    """One file's record (everything but the stat/hash fields); *key* keys the token digests."""
+    rec: dict = {"tenants": {}, "defaults": [], "refs": {}, "mappings": {},
+                 "domains": {}, "defines": {}, "tokens": [], "opaque": False}
+    if doc is None:
+        return rec
+    if not isinstance(doc, dict):
+        rec["opaque"] = True
+        return rec
+    tokens: set[str] = set()
+    _walk_tokens(doc, tokens)
+    rec["tokens"] = sorted({_token_digest(t, key) for t in tokens})
+
+    defaults = doc.get("defaults", {})
+    if isinstance(defaults, dict) and all(isinstance(k, str) for k in defaults):
+        rec["defaults"] = list(defaults)
+    elif defaults:
+        rec["opaque"] = True
+
+    tenants = doc.get("tenants", {})
+    if not isinstance(tenants, dict):
+        rec["opaque"] = True
+        tenants = {}
+    for name, config in tenants.items():
+        if not isinstance(name, str):
+            rec["opaque"] = True
+            continue
+        if not isinstance(config, dict):
+            rec["tenants"][name] = []
+            continue
+        if not all(isinstance(k, str) for k in config):
+            rec["opaque"] = True
+        rec["tenants"][name] = [str(k) for k in config]
+        refs = _tenant_refs(config)
+        if refs:
+            rec["refs"][name] = refs
+
+    mapping = doc.get("instance_tenant_mapping")
+    if isinstance(mapping, dict):
+        for instance, entries in mapping.items():
+            for entry in entries if isinstance(entries, list) else []:
+                if isinstance(entry, dict) and isinstance(entry.get("tenant"), str):
+                    rec["mappings"].setdefault(entry["tenant"], []).append(str(instance))
+    policies = doc.get("domain_policies")
+    if isinstance(policies, dict):
+        for domain, policy in policies.items():
+            members = policy.get("tenants") if isinstance(policy, dict) else None
+            for tenant in members if isinstance(members, list) else []:
+                if isinstance(tenant, str):
+                    rec["domains"].setdefault(tenant, []).append(str(domain))
+    for section in ("profiles", "routing_profiles"):
+        defined = doc.get(section)
+        if isinstance(defined, dict):
+            rec["defines"][section] = [str(k) for k in defined]
+    return rec
+
+
+def _parse(raw: bytes, key: bytes) -> dict:
+    """Parse via libyaml when available; the error text is always PyYAML's."""
+    try:
+        text = raw.decode("utf-8")
+        if _HAS_CSAFE_LOADER:
+            try:
+                return _extract(yaml.load(text, Loader=yaml.CSafeLoader), key)
+            except yaml.YAMLError:
+                pass
+        doc = yaml.safe_load(text)
+    except (UnicodeDecodeError, yaml.YAMLError) as exc:
+        return {"error": str(exc)}
+    return _extract(doc, key)
+
+
+# ─── Index ────────────────────────────────────────────────────────────
+
+
+@dataclass
+class DependencyIndex:
+    """Reverse-dependency records for one flat config dir."""
+
+    config_dir: str
+    files: dict[str, dict]
+    #: Files (re)parsed by the refresh that produced this index.
+    parsed: list[str] = field(default_factory=list)
+    #: blake2b key of the ``tokens`` digests.
+    token_key: bytes = field(default=b"", repr=False)
+    _token_sets: dict[str, frozenset] = field(default_factory=dict, repr=False)
+
+    def _unknown(self) -> list[str]:
+        return [n for n, r in self.files.items() if "error" in r or r.get("opaque")]
+
+    def errors(self) -> dict[str, str]:
+        """filename → parse error, for files that did not load."""
+        return {n: r["error"] for n, r in sorted(self.files.items()) if "error" in r}
+
+    def mentions(self, token: str) -> list[str]:
+        """Sorted files whose keys or scalars contain *token* as a name."""
+        digest = _token_digest(token, self.token_key)
+        hits = []
+        for name, rec in self.files.items():
+            if "error" in rec:
+                continue
+            tokens = self._token_sets.get(name)
+            if tokens is None:
+                tokens = self._token_sets[name] = frozenset(rec["tokens"])
+            if digest in tokens:
+                hits.append(name)
+        return sorted(hits)
+
+    def defining_files(self, tenant: str) -> list[str]:
+        """Sorted files that configure *tenant* under ``tenants:``."""
+        return sorted(n for n, r in self.files.items() if tenant in r.get("tenants", ()))
+
+    def files_with_key(self, fragment: str) -> list[str]:
+        """Sorted files with a defaults/tenant key containing *fragment*.
+
+        Unparseable and opaque files are always included: the caller's own
+        per-file logic decides about them, as it did under a full scan.
+        """
+        hits = set(self._unknown())
+        for name, rec in self.files.items():
+            if any(fragment in k for k in rec.get("defaults", ())) or any(
+                    fragment in k for keys in rec.get("tenants", {}).values()
+                    for k in keys):
+                hits.add(name)
+        return sorted(hits)
+
+    def tenant_dependencies(self, tenant: str) -> list[tuple[str, str, str]]:
+        """(file, kind, detail) for everything *tenant* points at or is listed in.
+
+        A profile reference names the file(s) defining that profile.
+        """
+        definers: dict[tuple[str, str], list[str]] = {}
+        for name, rec in sorted(self.files.items()):
+            for section, names in rec.get("defines", {}).items():
+                for profile in names:
+                    definers.setdefault((section, profile), []).append(name)
+        deps: list[tuple[str, str, str]] = []
+        for name, rec in sorted(self.files.items()):
+            for kind, values in rec.get("refs", {}).get(tenant, {}).items():
+                section = {"profile": "profiles",
+                           "routing_profile": "routing_profiles"}.get(kind)
+                for value in values:
+                    where = definers.get((section, value)) if section else None
+                    deps.append((name, kind,
+                                 f"{value} ({', '.join(where)})" if where else value))
+            for instance in rec.get("mappings", {}).get(tenant, ()):
+                deps.append((name, "instance_mapping", instance))
+            for domain in rec.get("domains", {}).get(tenant, ()):
+                deps.append((name, "domain_policy", domain))
+        return deps
+
+    def users_of(self, kind: str, value: str) -> list[str]:
+        """Sorted tenants whose ``refs[kind]`` contains *value*."""
+        return sorted({t for rec in self.files.values()
+                       for t, refs in rec.get("refs", {}).items()
+                       if value in refs.get(kind, ())})
+
+
+def cache_dir() -> Optional[str]:
+    """Versioned on-disk cache directory, or None when disabled."""
+    return tool_cache_dir(CACHE_ENV, "dependency-index", f"v{INDEX_VERSION}")
+
+
+def _index_path(config_dir: str) -> Optional[str]:
+    d = cache_dir()
+    if d is None:
+        return None
+    key = hashlib.sha256(config_dir.encode("utf-8")).hexdigest()[:24]
+    return os.path.join(d, f"{key}.json")
+
+
+def _disk_read(config_dir: str) -> tuple[bytes, dict[str, dict]]:
+    """(token key, records); ``(b"", {})`` when there is no usable index."""
+    path = _index_path(config_dir)
+    if path is None:
+        return b"", {}
+    try:
+        with open(path, encoding="utf-8") as fh:
+            payload = json.load(fh)
+        if (payload.get("version") != INDEX_VERSION
+                or payload.get("config_dir") != config_dir):
+            return b"", {}
+        key = bytes.fromhex(payload["token_key"])
+        files = payload["files"]
+        return (key, files) if key and isinstance(files, dict) else (b"", {})
+    except (OSError, ValueError, AttributeError, KeyError, TypeError):
+        return b"", {}
+
+
+def _disk_write(config_dir: str, key: bytes, files: dict[str, dict]) -> None:
+    path = _index_path(config_dir)
+    if path is None:
+        return
+    write_text_atomic(path, json.dumps(
+        {"version": INDEX_VERSION, "config_dir": config_dir, "token_key": key.hex(),
+         "files": {n: r for n, r in files.items() if "error" not in r}},
+        ensure_ascii=False, separators=(",", ":")))
+
+
+def clear_memo() -> None:
+    """Drop the in-process layer (tests; long-lived processes)."""
+    _MEMO.clear()
+
+
+def load_index(config_dir: Any, *, tool: str | None = None) -> DependencyIndex:
+    """The index for *config_dir*, refreshed against what is on disk now.
+
+    Flat scan of non-hidden ``*.yaml`` / ``*.yml``; nested files are named
+    on stderr via ``warn_nested`` (pass *tool* for the message).
+    """
+    if yaml is None:
+        raise RuntimeError("pyyaml required")
+    root = os.path.abspath(os.fspath(config_dir))
+    warn_nested(root, tool=tool)
+    key, previous = _MEMO.get(root) or _disk_read(root)
+    if not key:
+        key, previous = os.urandom(16), {}
+    racy_after = time.time_ns() - _RACY_WINDOW_NS
+
+    files: dict[str, dict] = {}
+    parsed: list[str] = []
+    changed = False
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        entries = []
+    for entry in entries:
+        name = entry.name
+        if name.startswith(".") or not name.endswith(CONFIG_SUFFIXES):
+            continue
+        try:
+            if not entry.is_file():
+                continue
+            st = entry.stat()
+        except OSError:
+            continue
+        old = previous.get(name)
+        if (old is not None and old.get("size") == st.st_size
+                and old.get("mtime_ns") == st.st_mtime_ns
+                and st.st_mtime_ns < racy_after):
+            files[name] = old
+            continue
+        try:
+            with open(entry.path, "rb") as fh:
+                raw = fh.read()
+        except OSError as exc:
+            rec = {"error": str(exc)}
+            files[name] = rec
+            changed = True
+            continue
+        sha = hashlib.sha256(raw).hexdigest()
+        if old is not None and old.get("sha256") == sha:
+            rec = dict(old)
+        else:
+            rec = _parse(raw, key)
+            parsed.append(name)
+        rec.update(sha256=sha, size=st.st_size, mtime_ns=st.st_mtime_ns)
+        # A racy stat is recorded as unknown, so the next run re-hashes.
+        if st.st_mtime_ns >= racy_after:
+            rec["mtime_ns"] = None
+        files[name] = rec
+        changed = changed or rec != old
+    changed = changed or set(files) != set(previous)
+
+    _MEMO[root] = (key, files)
+    if changed:
+        _disk_write(root, key, files)
+    return DependencyIndex(config_dir=root, files=files, parsed=sorted(parsed),
+                           token_key=key)
+
+
+def threshold_key_alerts(paths: Iterable[Any]) -> dict[str, list[str]]:
+    """threshold key → sorted alert names referencing ``tenant:alert_threshold:<key>``.
+
+    Built from ``_lib_rulepack_index`` (content-keyed, so repeat calls do not
+    re-parse the packs).
+    """
+    from _lib_rulepack_index import compile_pack
+
+    alerts: dict[str, set[str]] = {}
+    for path in paths:
+        for rule in compile_pack(path).alerts():
+            for key in rule.threshold_keys:
+                alerts.setdefault(key, set()).add(str(rule.name))
+    return {k: sorted(v) for k, v in sorted(alerts.items())}
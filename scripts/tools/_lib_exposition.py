@@ -0,0 +1,260 @@
+"""Streaming Prometheus text-exposition parser for da-tools probes.
+
+Stdlib-only (same bundling contract as _lib_compat / _lib_profile): probes
+that scrape an exporter's ``/metrics`` must not pull in yaml / requests.
+
+Parses the text format (0.0.4, plus the OpenMetrics bits a text scrape can
+carry: ``# EOF``, exemplars after ``#``) ONE LINE AT A TIME from a str,
+bytes, a binary file / HTTP response, or any iterable of lines, yielding
+:class:`Sample` tuples — the body is never held in memory, so a ~500k-line
+database exporter scrape costs one line of buffer plus whatever the caller
+keeps::
+
+    from _lib_exposition import ExpositionReader
+
+    with urllib.request.urlopen(req) as resp:
+        reader = ExpositionReader(resp, keep_labels={"datname"})
+        for name, labels, value, ts in reader:
+            ...
+        reader.types["pg_up"]        # "gauge", from # TYPE
+
+Spec handling: label values unescape ``\\\\`` / ``\\"`` / ``\\n``, HELP text
+``\\\\`` / ``\\n``; values accept ``NaN`` / ``+Inf`` / ``-Inf``; the optional
+timestamp is integer milliseconds; a trailing comma in a label set is fine.
+A malformed line is counted in :attr:`ExpositionReader.malformed` and
+skipped, or raises :class:`ExpositionError` with ``strict=True``.
+
+Pushdown, cheapest first:
+  * ``names``        — sample names to keep; other lines are dropped after
+                       the name is read, before their label block is parsed.
+  * ``label_filter`` — ``{label: value}`` equality a sample must satisfy
+                       (a missing label is ``""``, as in PromQL).
+  * ``keep_labels``  — label names to retain in ``Sample.labels``; the rest
+                       are parsed (to find the end of the block) but never
+                       stored.
+``intern_labels=True`` interns metric and label names, so a caller that
+retains many samples shares one string per distinct name.
+"""
+from __future__ import annotations
+
+import io
+import re
+import sys
+from typing import Any, Iterable, Iterator, NamedTuple, Optional, Union
+
+#: Metric types accepted in ``# TYPE`` (text format + OpenMetrics).
+METRIC_TYPES = frozenset({
+    "counter", "gauge", "histogram", "summary", "untyped",
+    "unknown", "info", "stateset", "gaugehistogram",
+})
+
+# Sample-name suffixes that belong to the family declared by # TYPE.
+_FAMILY_SUFFIXES = {
+    "histogram": ("_bucket", "_sum", "_count", "_created"),
+    "gaugehistogram": ("_bucket", "_gsum", "_gcount"),
+    "summary": ("_sum", "_count", "_created"),
+    "counter": ("_total", "_created"),
+    "info": ("_info",),
+}
+
+_NAME_RE = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*")
+# Adjacent character classes are disjoint, so a match never depends on
+# backtracking and the possessive form (3.11+) matches exactly what the greedy
+# one does — it just skips recording backtrack points, ~40% of the per-line
+# cost. mypy.ini declares 3.10, where `*+` is an error, so the greedy form is
+# the fallback there.
+_P = "+" if sys.version_info >= (3, 11) else ""
+_PAIR = (r'[ \t]*{p}{n}[a-zA-Z_][a-zA-Z0-9_]*{p}{c}[ \t]*{p}=[ \t]*{p}'
+         r'"{n}[^"\\\n]*{p}(?:\\.[^"\\\n]*{p})*{p}{c}"[ \t]*{p}')
+_PAIR_NC = _PAIR.format(n="(?:", c=")", p=_P)
+# name, label block, rest. A malformed label block does not match the
+# optional group, so `rest` then starts with "{".
+_SAMPLE_RE = re.compile(
+    rf"([a-zA-Z_:][a-zA-Z0-9_:]*{_P})[ \t]*{_P}"
+    rf"(?:\{{((?:{_PAIR_NC},)*{_P}(?:{_PAIR_NC})?{_P})\}})?{_P}"
+    rf"[ \t]*{_P}(.*)")
+_LABEL_PAIR_RE = re.compile(_PAIR.format(n="(", c=")", p=_P))
+_LABEL_ESCAPE_RE = re.compile(r"\\(.)")
+_LABEL_ESCAPES = {"n": "\n", "\\": "\\", '"': '"'}
+_HELP_ESCAPES = {"n": "\n", "\\": "\\"}
+
+Source = Union[str, bytes, bytearray, Iterable[Union[str, bytes]]]
+
+
+class ExpositionError(ValueError):
+    """A malformed exposition line (``strict=True`` only)."""
+
+    def __init__(self, lineno: int, reason: str, line: str):
+        super().__init__(f"line {lineno}: {reason}: {line[:120]!r}")
+        self.lineno = lineno
+        self.reason = reason
+
+
+class Sample(NamedTuple):
+    """One exposition sample. ``timestamp`` is milliseconds or None."""
+    name: str
+    labels: dict[str, str]
+    value: float
+    timestamp: Optional[int]
+
+
+def _unescape(text: str, table: dict[str, str]) -> str:
+    if "\\" not in text:
+        return text
+    # Unknown escapes are kept verbatim, as the reference parser does.
+    return _LABEL_ESCAPE_RE.sub(lambda m: table.get(m.group(1), m.group(0)), text)
+
+
+def _iter_lines(source: Source) -> Iterator[str]:
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    elif isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(bytes(source))
+    for line in source:
+        if isinstance(line, (bytes, bytearray)):
+            line = line.decode("utf-8", errors="replace")
+        yield line
+
+
+class ExpositionReader:
+    """Iterate the samples of one exposition body; see the module docstring.
+
+    Metadata is collected as the stream is consumed: :attr:`help` and
+    :attr:`types` map family name → HELP text / TYPE, and :attr:`lines` /
+    :attr:`samples` / :attr:`malformed` count what was read, kept and
+    skipped. Iterate once.
+    """
+
+    def __init__(
+        self,
+        source: Source,
+        *,
+        names: Optional[Iterable[str]] = None,
+        label_filter: Optional[dict[str, str]] = None,
+        keep_labels: Optional[Iterable[str]] = None,
+        intern_labels: bool = False,
+        strict: bool = False,
+    ):
+        self._source = source
+        self._names = None if names is None else frozenset(names)
+        self._filter = dict(label_filter or {})
+        self._keep = None if keep_labels is None else frozenset(keep_labels)
+        self._intern = intern_labels
+        self._strict = strict
+        self.help: dict[str, str] = {}
+        self.types: dict[str, str] = {}
+        self.lines = 0
+        self.samples = 0
+        self.malformed = 0
+
+    def family_of(self, name: str) -> str:
+        """The # TYPE family a sample name belongs to (``x_bucket`` → ``x``
+        for a histogram ``x``); the name itself when no family claims it."""
+        if name in self.types:
+            return name
+        family = name.rsplit("_", 1)[0]
+        mtype = self.types.get(family)
+        if mtype and name[len(family):] in _FAMILY_SUFFIXES.get(mtype, ()):
+            return family
+        return name
+
+    def _bad(self, lineno: int, reason: str, line: str) -> None:
+        if self._strict:
+            raise ExpositionError(lineno, reason, line)
+        self.malformed += 1
+
+    def _comment(self, lineno: int, line: str) -> bool:
+        """Handle a ``#`` line; False once ``# EOF`` is reached."""
+        parts = line[1:].strip().split(None, 2)
+        if not parts:
+            return True
+        if parts[0] == "EOF":
+            return False
+        if parts[0] not in ("HELP", "TYPE"):
+            return True
+        if len(parts) < 2:
+            self._bad(lineno, f"{parts[0]} without a metric name", line)
+            return True
+        name = sys.intern(parts[1]) if self._intern else parts[1]
+        text = parts[2].strip() if len(parts) > 2 else ""
+        if parts[0] == "HELP":
+            self.help[name] = _unescape(text, _HELP_ESCAPES)
+        elif text.lower() in METRIC_TYPES:
+            self.types[name] = text.lower()
+        else:
+            self._bad(lineno, f"unknown metric type {text!r}", line)
+        return True
+
+    def __iter__(self) -> Iterator[Sample]:
+        names, flt, keep, intern = self._names, self._filter, self._keep, self._intern
+        sample_match = _SAMPLE_RE.match
+        pairs = _LABEL_PAIR_RE.findall
+        make = tuple.__new__  # Sample(...) minus the Python-level __new__
+        # Labels the filter reads must be parsed even when not kept.
+        parse_only = None if keep is None else keep | frozenset(flt)
+        lineno = kept = 0
+        try:
+            for lineno, line in enumerate(_iter_lines(self._source), 1):
+                line = line.strip()
+                if not line:
+                    continue
+                if line[0] == "#":
+                    if not self._comment(lineno, line):
+                        return
+                    continue
+
+                if names is not None:
+                    m = _NAME_RE.match(line)
+                    if m is not None and m.group() not in names:
+                        continue
+                m = sample_match(line)
+                if m is None:
+                    self._bad(lineno, "no metric name", line)
+                    continue
+                name, block, rest = m.groups()
+                if rest[:1] == "{":
+                    self._bad(lineno, "malformed label set", line)
+                    continue
+
+                if block:
+                    found = pairs(block)
+                    if parse_only is not None:
+                        found = [kv for kv in found if kv[0] in parse_only]
+                    if "\\" in block:
+                        found = [(k, _unescape(v, _LABEL_ESCAPES)) for k, v in found]
+                    if intern:
+                        found = [(sys.intern(k), v) for k, v in found]
+                    labels = dict(found)
+                else:
+                    labels = {}
+                if flt:
+                    if any(labels.get(k, "") != v for k, v in flt.items()):
+                        continue
+                    if keep is not None:
+                        labels = {k: v for k, v in labels.items() if k in keep}
+
+                fields = rest.split()
+                if len(fields) > 1 and "#" in fields:  # OpenMetrics exemplar
+                    fields = fields[:fields.index("#")]
+                try:
+                    # float() also takes "1_000"; the exposition format does not.
+                    if not 1 <= len(fields) <= 2 or "_" in fields[0]:
+                        raise ValueError
+                    value = float(fields[0])
+                    ts = int(fields[1]) if len(fields) == 2 else None
+                except ValueError:
+                    self._bad(lineno, "bad value / timestamp", line)
+                    continue
+
+                kept += 1
+                yield make(Sample, (sys.intern(name) if intern else name,
+                                    labels, value, ts))
+        finally:
+            self.lines += lineno
+            self.samples += kept
+
+
+def iter_samples(source: Source, **kwargs: Any) -> Iterator[Sample]:
+    """Shorthand for ``iter(ExpositionReader(source, **kwargs))`` when the
+    HELP / TYPE metadata is not needed."""
+    return iter(ExpositionReader(source, **kwargs))
@@ -10,12 +10,13 @@ import json
 import os
 import sys
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 import yaml
 
 from _lib_confd import warn_nested
 from _lib_constants import ONBOARD_HINTS_FILENAME
+from _lib_profile import span
 
 
 def load_yaml_file(path: Optional[str], default: Any = None) -> Any:
@@ -31,7 +32,7 @@ def load_yaml_file(path: Optional[str], default: Any = None) -> Any:
     """
     if not path or not Path(path).is_file():
         return default
-    with open(path, encoding="utf-8") as f:
+    with span("io.load_yaml"), open(path, encoding="utf-8") as f:
         data = yaml.safe_load(f)
     return data if data is not None else default
 
@@ -114,17 +115,18 @@ def load_tenant_configs(config_dir: str) -> dict[str, dict[str, Any]]:
     every one of this helper's callers at once.
     """
     configs: dict[str, dict[str, Any]] = {}
-    for fname, fpath in iter_yaml_files(config_dir):
-        raw = load_yaml_file(fpath, default={})
-        if not isinstance(raw, dict):
-            continue
-        if "tenants" in raw and isinstance(raw.get("tenants"), dict):
-            for t_name, t_data in raw["tenants"].items():
-                if isinstance(t_data, dict):
-                    configs[t_name] = t_data
-        else:
-            tenant = fname.rsplit(".", 1)[0]
-            configs[tenant] = raw
+    with span("io.load_tenant_configs"):
+        for fname, fpath in iter_yaml_files(config_dir):
+            raw = load_yaml_file(fpath, default={})
+            if not isinstance(raw, dict):
+                continue
+            if "tenants" in raw and isinstance(raw.get("tenants"), dict):
+                for t_name, t_data in raw["tenants"].items():
+                    if isinstance(t_data, dict):
+                        configs[t_name] = t_data
+            else:
+                tenant = fname.rsplit(".", 1)[0]
+                configs[tenant] = raw
     return configs
 
 
@@ -162,6 +164,20 @@ def write_text_secure(path: str, content: str) -> None:
     target.chmod(0o600)
 
 
+def write_lines_secure(path: str, chunks: Iterable[str]) -> None:
+    """Stream *chunks* to *path* — :func:`write_text_secure` for outputs too
+    large to hold as one string (UTF-8, LF endings, ``0o600``).
+
+    The result is byte-identical to ``write_text_secure(path, "".join(chunks))``;
+    only the peak memory differs. The mode is set before the first write, so
+    a partially written file is never world-readable.
+    """
+    with open(path, "w", encoding="utf-8", newline="\n") as fh:
+        Path(path).chmod(0o600)
+        for chunk in chunks:
+            fh.write(chunk)
+
+
 def write_json_secure(
     path: str,
     data: Any,
@@ -0,0 +1,227 @@
+"""Per-phase timing spans for da-tools CLI tools.
+
+Stdlib-only (same bundling contract as _lib_compat / _lib_exitcodes): the
+shared libs import this module, so it must not pull in yaml / requests.
+
+A *span* is a named wall-clock interval. Shared helpers wrap their
+expensive phases in one::
+
+    from _lib_profile import span
+
+    with span("io.load_yaml"):
+        data = yaml.safe_load(f)
+
+Spans are recorded only when profiling is switched on — by the da-tools
+dispatcher's ``--profile`` flag / ``DA_TOOLS_PROFILE`` env (which also
+prints the report), or in-process via :func:`enable` by a caller that then
+reads :func:`snapshot` itself. Switched off (the default), :func:`span`
+returns a shared no-op context manager, so an instrumented hot loop pays one
+function call and one global read per iteration, no allocation and no clock
+read. Importing this module is equally cheap: urllib is only imported by
+:func:`push_metrics` (``_lib_io`` imports us, and must not get slower).
+
+Aggregation is per span NAME (call count, total, max), not a call tree:
+nested spans each count their own wall time, so an outer span's total
+includes its children's. Name phases ``<area>.<phase>`` (``io.*``,
+``prometheus.*``, ``describe.*``) so the summary groups visually.
+
+The dispatcher (components/da-tools/app/entrypoint.py) is contractually
+zero-import from ``_lib_*``; it reaches this module through ``sys.modules``
+after the tool has run and calls :func:`render_summary` /
+:func:`push_metrics`. A tool that never imported a shared lib simply gets
+no span table.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from typing import Any, Optional, TextIO
+
+#: Env switch read at import time. Any non-empty value other than ``0`` /
+#: ``off`` enables span recording; the dispatcher sets it to the profile
+#: mode (``spans`` / ``cprofile`` / ``sample``) before running the tool.
+PROFILE_ENV = "DA_TOOLS_PROFILE"
+
+#: Optional Pushgateway base URL for the per-phase metrics.
+PUSHGATEWAY_ENV = "DA_TOOLS_PROFILE_PUSHGATEWAY"
+
+#: Pushgateway job name (grouping key adds ``command``).
+PUSH_JOB = "da-tools-profile"
+
+
+def _env_enabled() -> bool:
+    val = os.environ.get(PROFILE_ENV, "").strip().lower()
+    return val not in ("", "0", "off", "false", "no")
+
+
+_ENABLED: bool = _env_enabled()
+
+# name → [calls, total_s, max_s]; worker threads (fan-out queries) record
+# spans concurrently, so every read-modify-write goes through _LOCK.
+_SPANS: dict[str, list[float]] = {}
+_LOCK = threading.Lock()
+
+
+class _Span:
+    """Recording span; one instance per ``with`` block."""
+
+    __slots__ = ("name", "_t0")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._t0 = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self._t0
+        with _LOCK:
+            rec = _SPANS.get(self.name)
+            if rec is None:
+                _SPANS[self.name] = [1, elapsed, elapsed]
+            else:
+                rec[0] += 1
+                rec[1] += elapsed
+                if elapsed > rec[2]:
+                    rec[2] = elapsed
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str) -> Any:
+    """Return a context manager timing *name* (no-op when profiling is off).
+
+    Exceptions propagate unchanged; the interval is still recorded, so a
+    phase that fails slowly is visible in the summary.
+    """
+    if not _ENABLED:
+        return _NOOP
+    return _Span(name)
+
+
+def is_enabled() -> bool:
+    """True when spans are being recorded."""
+    return _ENABLED
+
+
+def enable(on: bool = True) -> None:
+    """Switch span recording on/off in-process (tests, library callers)."""
+    global _ENABLED
+    _ENABLED = on
+
+
+def reset() -> None:
+    """Drop every recorded span."""
+    with _LOCK:
+        _SPANS.clear()
+
+
+def snapshot() -> dict[str, dict[str, float]]:
+    """Return ``{name: {"calls", "total_s", "max_s"}}`` for recorded spans."""
+    with _LOCK:
+        return {
+            name: {"calls": int(rec[0]), "total_s": rec[1], "max_s": rec[2]}
+            for name, rec in _SPANS.items()
+        }
+
+
+def render_summary(wall_s: Optional[float] = None,
+                   stream: Optional[TextIO] = None) -> None:
+    """Print the per-phase timing table (sorted by total, descending).
+
+    Written to stderr by default so a tool's ``--json`` stdout stays
+    machine-readable under ``--profile``.
+    """
+    out = stream if stream is not None else sys.stderr
+    spans = sorted(snapshot().items(), key=lambda kv: -kv[1]["total_s"])
+    if not spans:
+        print("[profile] no spans recorded", file=out)
+        return
+    width = max(len("span"), *(len(name) for name, _ in spans))
+    print(f"[profile] {'span':<{width}}  {'calls':>7}  {'total_ms':>10}  "
+          f"{'max_ms':>9}  {'%wall':>6}", file=out)
+    for name, rec in spans:
+        pct = (f"{100.0 * rec['total_s'] / wall_s:5.1f}%"
+               if wall_s else "     -")
+        print(f"[profile] {name:<{width}}  {rec['calls']:>7}  "
+              f"{rec['total_s'] * 1000:>10.1f}  {rec['max_s'] * 1000:>9.1f}  "
+              f"{pct:>6}", file=out)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_metrics(wall_s: float, now_ts: Optional[float] = None) -> str:
+    """Render recorded spans as Prometheus text exposition.
+
+    Metrics (all gauges — each push replaces the previous run's values, the
+    same per-run semantics as ``maintenance_scheduler.push_metrics``):
+      - da_tools_profile_span_seconds{span}       total wall time per span
+      - da_tools_profile_span_calls{span}         call count per span
+      - da_tools_profile_run_duration_seconds     wall time of the command
+      - da_tools_profile_last_run_timestamp_seconds
+    """
+    now_ts = time.time() if now_ts is None else now_ts
+    spans = sorted(snapshot().items())
+    lines = ["# TYPE da_tools_profile_span_seconds gauge"]
+    lines += [f'da_tools_profile_span_seconds{{span="{_escape_label(n)}"}} '
+              f'{r["total_s"]:.6f}' for n, r in spans]
+    lines.append("# TYPE da_tools_profile_span_calls gauge")
+    lines += [f'da_tools_profile_span_calls{{span="{_escape_label(n)}"}} '
+              f'{r["calls"]}' for n, r in spans]
+    lines += [
+        "# TYPE da_tools_profile_run_duration_seconds gauge",
+        f"da_tools_profile_run_duration_seconds {wall_s:.6f}",
+        "# TYPE da_tools_profile_last_run_timestamp_seconds gauge",
+        f"da_tools_profile_last_run_timestamp_seconds {now_ts:.3f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def push_metrics(pushgateway_url: str, command: str, wall_s: float) -> bool:
+    """Push :func:`render_metrics` to a Pushgateway; return True on success.
+
+    Grouping key is ``job="da-tools-profile", command=<command>`` so each
+    CronJob's command keeps its own series. Non-fatal like
+    ``maintenance_scheduler.push_metrics``: an observability failure must
+    not fail the command being observed.
+    """
+    import urllib.error
+    import urllib.parse
+    import urllib.request
+
+    base = pushgateway_url.rstrip("/")
+    if urllib.parse.urlparse(base).scheme not in ("http", "https"):
+        print(f"  WARN: refusing to push profile metrics to {base!r} "
+              f"(http/https only)", file=sys.stderr)
+        return False
+    url = (f"{base}/metrics/job/{PUSH_JOB}/command/"
+           f"{urllib.parse.quote(command, safe='')}")
+    body = render_metrics(wall_s).encode("utf-8")
+    try:
+        req = urllib.request.Request(url, method="POST")  # nosec B310  #scheme checked above; operator-supplied Pushgateway
+        req.add_header("Content-Type", "text/plain")
+        with urllib.request.urlopen(req, data=body, timeout=5) as resp:  # nosec B310  #see Request line above
+            resp.read()
+        print(f"  Pushed profile metrics to {base}", file=sys.stderr)
+        return True
+    except (urllib.error.URLError, ValueError, OSError) as e:
+        print(f"  WARN: failed to push profile metrics to Pushgateway: {e}",
+              file=sys.stderr)
+        return False
@@ -5,14 +5,17 @@ Import via _lib_python.py facade for backward compatibility.
 """
 from __future__ import annotations
 
+import codecs
 import json
+import re
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from _lib_constants import _ALLOWED_SCHEMES
+from _lib_profile import span
 
 
 def _validate_url_scheme(url: str) -> Optional[str]:
@@ -58,7 +61,8 @@ def http_get_json(
         if headers:
             for k, v in headers.items():
                 req.add_header(k, v)
-        with urllib.request.urlopen(req, timeout=timeout) as resp:  # nosec B310
+        with span("prometheus.http_get"), \
+                urllib.request.urlopen(req, timeout=timeout) as resp:  # nosec B310
             body = resp.read().decode("utf-8")
             data = json.loads(body) if body else {}
             return data, None
@@ -67,6 +71,96 @@ def http_get_json(
         return None, str(exc)
 
 
+_STREAM_CHUNK = 1 << 16
+_STREAM_PREAMBLE_MAX = 1 << 20  # bytes kept whole while looking for the key
+_JSON_WS = re.compile(r"[ \t\n\r,]*")
+
+
+def iter_json_array(
+    url: str,
+    key: str,
+    *,
+    timeout: int = 30,
+    headers: Optional[dict[str, str]] = None,
+) -> Iterator[Any]:
+    """HTTP GET and yield the items of the JSON array under *key*, one at a time.
+
+    For responses too large to hold as one parsed document (e.g. a 60k-target
+    ``/api/v1/targets``): the body is read in 64 KiB chunks and each array
+    item is decoded as soon as it is complete, so memory stays bounded by one
+    chunk plus one item. *key* is the first object key of that name anywhere
+    in the document — a quoted key cannot occur inside a JSON string, so the
+    match is structural.
+
+    Raises:
+        ValueError: disallowed scheme, malformed JSON, a Prometheus
+            ``"status": "error"`` body, or *key* absent / not an array.
+        OSError: network failure (``urllib.error.URLError`` included).
+    """
+    scheme_err = _validate_url_scheme(url)
+    if scheme_err:
+        raise ValueError(scheme_err)
+    req = urllib.request.Request(url)  # nosec B310
+    if headers:
+        for k, v in headers.items():
+            req.add_header(k, v)
+    key_re = re.compile(r'"' + re.escape(key) + r'"\s*:\s*')
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    with span("prometheus.http_stream"), \
+            urllib.request.urlopen(req, timeout=timeout) as resp:  # nosec B310  #scheme validated above
+        buf, pos, eof = "", 0, False
+
+        def fill() -> None:
+            nonlocal buf, pos, eof
+            chunk = resp.read(_STREAM_CHUNK)
+            eof = not chunk
+            buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+            pos = 0
+
+        while True:
+            match = key_re.search(buf, pos)
+            if match and match.end() < len(buf):
+                pos = match.end()
+                break
+            if eof:
+                try:
+                    doc = json.loads(buf)
+                except ValueError:
+                    doc = None
+                if isinstance(doc, dict) and doc.get("status") == "error":
+                    raise ValueError(doc.get("error", "Unknown Prometheus error"))
+                raise ValueError(f"No {key!r} array in response")
+            if len(buf) > _STREAM_PREAMBLE_MAX:
+                # a long preamble: keep only a tail that can hold a split key
+                pos = len(buf) - len(key) - 64
+            fill()
+        if buf[pos] != "[":
+            raise ValueError(f"{key!r} is not an array")
+        pos += 1
+        while True:
+            pos = _JSON_WS.match(buf, pos).end()
+            if pos >= len(buf):
+                if eof:
+                    raise ValueError(f"Truncated {key!r} array")
+                fill()
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            if end == len(buf) and not eof:
+                fill()  # a bare number may continue in the next chunk
+                continue
+            pos = end
+            yield item
+
+
 def http_post_json(
     url: str,
     payload: Any = None,
@@ -102,7 +196,8 @@ def http_post_json(
         data = None
         if payload is not None:
             data = json.dumps(payload).encode("utf-8")
-        with urllib.request.urlopen(req, data=data, timeout=timeout) as resp:  # nosec B310  #scheme validated by _validate_url_scheme upstream
+        with span("prometheus.http_post"), \
+                urllib.request.urlopen(req, data=data, timeout=timeout) as resp:  # nosec B310  #scheme validated by _validate_url_scheme upstream
             body = resp.read().decode("utf-8")
             return (json.loads(body) if body else {}), None
     except urllib.error.HTTPError as exc:
@@ -155,7 +250,8 @@ def http_request_with_retry(
             data = None
             if payload is not None:
                 data = json.dumps(payload).encode("utf-8")
-            with urllib.request.urlopen(req, data=data, timeout=timeout) as resp:  # nosec B310  #scheme validated by _validate_url_scheme upstream
+            with span("prometheus.http_retry"), \
+                    urllib.request.urlopen(req, data=data, timeout=timeout) as resp:  # nosec B310  #scheme validated by _validate_url_scheme upstream
                 body = resp.read().decode("utf-8")
                 return json.loads(body) if body else {}
         except urllib.error.HTTPError as exc:
@@ -207,7 +303,8 @@ def probe_health(
         if scheme_err:
             return None, scheme_err
         req = urllib.request.Request(url)  # nosec B310
-        with urllib.request.urlopen(req, timeout=timeout) as resp:  # nosec B310  #scheme validated by _validate_url_scheme upstream
+        with span("prometheus.probe"), \
+                urllib.request.urlopen(req, timeout=timeout) as resp:  # nosec B310  #scheme validated by _validate_url_scheme upstream
             return resp.read().decode("utf-8", errors="replace"), None
     except (urllib.error.URLError, ValueError, OSError) as exc:
         return None, str(exc)
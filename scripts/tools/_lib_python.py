@@ -7,60 +7,92 @@ Direct imports from sub-modules are preferred for new code:
   from _lib_io import write_text_secure
   from _lib_validation import parse_duration_seconds
   from _lib_prometheus import query_prometheus_instant
+
+Re-exports resolve LAZILY (PEP 562 module ``__getattr__``): importing the
+facade loads no sub-module, and ``from _lib_python import detect_cli_lang``
+loads only _lib_validation — not PyYAML (_lib_io) or urllib/http.client
+(_lib_prometheus), which together were ~2/3 of a tool's import time. The
+first access binds the symbol into this module's globals, so later lookups
+are plain attribute reads and ``monkeypatch.setattr(_lib_python, ...)``
+behaves exactly as it did with eager re-exports.
 """
 from __future__ import annotations
 
+import importlib
+
 # Import-time stdout hardening (cp950-class consoles): chain-import so any
 # tool importing this facade is protected before argparse.parse_args() can
 # print --help. Gate: tests/shared/test_console_encoding_resilience.py
 import _lib_compat  # noqa: F401  (import-time side effect; see _lib_compat)
 
-# Re-export all public symbols for backward compatibility
-from _lib_constants import (  # noqa: F401
-    VALID_RESERVED_KEYS,
-    VALID_RESERVED_PREFIXES,
-    GUARDRAILS,
-    PLATFORM_DEFAULTS,
-    RECEIVER_TYPES,
-    RECEIVER_URL_FIELDS,
-    JOB_DB_MAP,
-    METRIC_PREFIX_DB_MAP,
-    ONBOARD_HINTS_FILENAME,
-    DOCS_SITE_BASE,
-    DOCS_INSTALL_URL,
-    _ALLOWED_SCHEMES,
-)
+# Public symbol → providing sub-module. Keep in sync with the sub-modules'
+# public surface (gate: tests/shared/test_lib_python.py).
+_EXPORTS: dict[str, tuple[str, ...]] = {
+    "_lib_constants": (
+        "VALID_RESERVED_KEYS",
+        "VALID_RESERVED_PREFIXES",
+        "GUARDRAILS",
+        "PLATFORM_DEFAULTS",
+        "RECEIVER_TYPES",
+        "RECEIVER_URL_FIELDS",
+        "JOB_DB_MAP",
+        "METRIC_PREFIX_DB_MAP",
+        "ONBOARD_HINTS_FILENAME",
+        "DOCS_SITE_BASE",
+        "DOCS_INSTALL_URL",
+        "_ALLOWED_SCHEMES",
+    ),
+    "_lib_io": (
+        "load_yaml_file",
+        "iter_yaml_files",
+        "load_tenant_configs",
+        "write_text_secure",
+        "write_lines_secure",
+        "write_json_secure",
+        "write_onboard_hints",
+        "read_onboard_hints",
+        "format_json_report",
+        "add_config_dir_arg",
+        "add_json_arg",
+        "add_ci_arg",
+        "add_prometheus_arg",
+    ),
+    "_lib_validation": (
+        "parse_duration_seconds",
+        "format_duration",
+        "is_disabled",
+        "validate_and_clamp",
+        "detect_cli_lang",
+        "i18n_text",
+    ),
+    "_lib_prometheus": (
+        "_validate_url_scheme",
+        "http_get_json",
+        "http_post_json",
+        "iter_json_array",
+        "http_request_with_retry",
+        "probe_health",
+        "query_prometheus_instant",
+        "query_prometheus_range",
+    ),
+}
+
+_SOURCE: dict[str, str] = {
+    name: module for module, names in _EXPORTS.items() for name in names
+}
+
+# Underscore names stay out of ``*`` imports, as with the eager facade.
+__all__ = sorted(n for n in _SOURCE if not n.startswith("_"))
+
 
-from _lib_io import (  # noqa: F401
-    load_yaml_file,
-    iter_yaml_files,
-    load_tenant_configs,
-    write_text_secure,
-    write_json_secure,
-    write_onboard_hints,
-    read_onboard_hints,
-    format_json_report,
-    add_config_dir_arg,
-    add_json_arg,
-    add_ci_arg,
-    add_prometheus_arg,
-)
+def __getattr__(name: str) -> object:
+    module = _SOURCE.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
 
-from _lib_validation import (  # noqa: F401
-    parse_duration_seconds,
-    format_duration,
-    is_disabled,
-    validate_and_clamp,
-    detect_cli_lang,
-    i18n_text,
-)
 
-from _lib_prometheus import (  # noqa: F401
-    _validate_url_scheme,
-    http_get_json,
-    http_post_json,
-    http_request_with_retry,
-    probe_health,
-    query_prometheus_instant,
-    query_prometheus_range,
-)
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_SOURCE))
@@ -0,0 +1,302 @@
+"""Compiled rule-pack index — parse each rule pack once, reuse it everywhere.
+
+runtime_audit, silencer_drift_check, rule_pack_diff, the observed-map tooling
+(ops/_observed_map_lib.py) and lint/_rule_tree each used to ``yaml.safe_load``
+every ``rule-packs/rule-pack-*.yaml`` on their own, and the observed-map
+drift-guard did it three times per run (build_map + all_threshold_keys +
+alert_referenced_keys). PyYAML's pure-Python loader is the dominant cost of
+those tools; the packs change a few times a month.
+
+:func:`compile_pack` reads a pack's bytes, hashes them, and returns a
+:class:`CompiledPack`:
+
+  - ``doc``    — the parsed document (a fresh object per call; mutate freely)
+  - ``rules``  — one :class:`CompiledRule` per ``alert:`` / ``record:`` rule:
+                 group, kind, name, label set, expr, expr fingerprint, the
+                 ``tenant:alert_threshold:<key>`` keys it references, observed
+                 ``tenant:*`` series candidates, per-key comparison direction
+                 and the numeric-scaling flag (the #719 extractor's inputs)
+  - ``text_threshold_keys`` — threshold keys referenced ANYWHERE in the file
+                 text (comments and recording rules included; coverage uses it)
+
+The compiled payload is JSON, cached in-process and on disk under
+``<cache dir>/v<INDEX_VERSION>/<sha256>.json``. The key is the CONTENT hash,
+so an edited pack is simply a cache miss — there is no invalidation step and
+no mtime trust. A warm hit is a file read plus ``json.loads`` (~1 ms for the
+whole shipped set) instead of a YAML parse (~100 ms).
+
+Cache dir: ``$DA_RULEPACK_INDEX_CACHE``, else ``$XDG_CACHE_HOME/da-tools/
+rulepack-index`` (``~/.cache/...``). ``DA_RULEPACK_INDEX_CACHE=off`` disables
+the disk layer (directory and atomic writes: ``_lib_cache``). Every disk
+failure (read-only HOME in a container, a torn or foreign file) degrades to a
+re-parse.
+
+Error contract: parse errors are NOT cached and propagate exactly as the
+callers' own ``yaml.safe_load`` did — ``OSError`` / ``UnicodeDecodeError`` /
+``yaml.YAMLError`` — so each consumer keeps its own exit-code mapping. A
+document that does not survive a JSON round trip unchanged (YAML dates,
+non-string keys) is served from a fresh parse every time rather than cached
+in a lossy form.
+
+Bump ``INDEX_VERSION`` whenever the compiled shape or any extraction rule
+(the regexes below, :func:`direction_before`) changes: old entries then sit
+in a sibling directory and are never read.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - shipped image always has PyYAML
+    yaml = None  # type: ignore
+
+from _lib_cache import tool_cache_dir, write_text_atomic
+
+#: Compiled-payload schema version (cache subdirectory name).
+INDEX_VERSION = 1
+
+#: Cache directory override; ``off`` / ``0`` / ``none`` disables the disk cache.
+CACHE_ENV = "DA_RULEPACK_INDEX_CACHE"
+
+# A threshold reference: tenant:alert_threshold:<key> or
+# tenant_version:alert_threshold:<key> (ADR-024 version-aware packs).
+THRESHOLD_RE = re.compile(r"tenant(?:_version)?:alert_threshold:([A-Za-z0-9_]+)")
+# An observed recording rule: tenant:NAME:AGG or tenant_version:NAME:AGG.
+# The colon convention naturally excludes tenant_metadata_info / user_state_filter
+# (underscore, no colon) — part of the #719 R3 denylist.
+OBSERVED_RE = re.compile(r"tenant(?:_version)?:[A-Za-z0-9_:]+")
+# Numeric scaling adjacent to an operand (e.g. "* 100", "/ 1024", "* (100)").
+# The metadata join "* on(tenant) group_left(...) tenant_metadata_info" is NOT
+# numeric, so it is not matched here. The optional "(" covers parenthesised
+# scalars like "* (100)".
+SCALING_RE = re.compile(r"[*/]\s*\(?\s*[0-9]")
+
+# sha256 → compiled payload as JSON text. Text, not objects: every caller gets
+# its own freshly-decoded ``doc`` and none can corrupt another's view.
+_MEMO: dict[str, str] = {}
+
+
+def direction_before(expr: str, key: str) -> Optional[str]:
+    """Comparison operator (``>``/``<``) in the window before the threshold token.
+
+    Scans backwards from the ``tenant:alert_threshold:<key>`` occurrence; skips
+    ``=`` so ``>=`` / ``<=`` resolve to ``>`` / ``<``. The ``unless ... == 1``
+    maintenance filter appears AFTER the comparison, so it is not picked up.
+
+    The token is matched with a trailing word-boundary so ``key="cpu"`` does NOT
+    match the ``cpu_critical`` token (a bare ``str.find`` would land on the
+    prefix-sharing sibling when both appear in one composite expr and read the
+    wrong operator — latent across the 14 ``<key>``/``<key>_critical`` pairs).
+    """
+    pat = re.compile(
+        r"tenant(?:_version)?:alert_threshold:" + re.escape(key) + r"(?![A-Za-z0-9_])"
+    )
+    m = pat.search(expr)
+    if m is None:
+        return None
+    window = expr[max(0, m.start() - 100):m.start()]
+    for ch in reversed(window):
+        if ch in "<>":
+            return ch
+    return None
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """One ``alert:`` / ``record:`` rule, pre-digested."""
+
+    group: Optional[str]          # raw group ``name`` (None if absent)
+    kind: str                     # "alert" | "record"
+    name: Any                     # raw ``alert:`` / ``record:`` value
+    labels: dict                  # str(k) → str(v); {} when absent/non-mapping
+    expr: str
+    fingerprint: str              # sha256(expr.strip())[:16]
+    threshold_keys: tuple         # sorted, unique
+    observed: tuple               # sorted tenant:* candidates (no alert_threshold)
+    directions: dict              # threshold key → ">" | "<" | None
+    scaled: bool
+
+    @property
+    def is_alert(self) -> bool:
+        return self.kind == "alert"
+
+
+@dataclass(frozen=True)
+class CompiledPack:
+    """A rule pack's parsed document plus its compiled rule index."""
+
+    path: str
+    sha256: str
+    doc: Any
+    rules: tuple
+    text_threshold_keys: frozenset
+
+    def alerts(self) -> list:
+        return [r for r in self.rules if r.kind == "alert"]
+
+    def recording_rules(self) -> list:
+        return [r for r in self.rules if r.kind == "record"]
+
+
+# ─── Compilation ──────────────────────────────────────────────────────
+
+
+def _compile_rule(group: Optional[str], rule: dict) -> Optional[dict]:
+    if "alert" in rule:
+        kind = "alert"
+    elif "record" in rule:
+        kind = "record"
+    else:
+        return None
+    expr = rule.get("expr", "") or ""
+    if not isinstance(expr, str):
+        expr = str(expr)
+    labels = rule.get("labels") or {}
+    if not isinstance(labels, dict):
+        labels = {}
+    keys = sorted(set(THRESHOLD_RE.findall(expr)))
+    observed = sorted({
+        m for m in OBSERVED_RE.findall(expr)
+        if "alert_threshold" not in m  # exclude tenant[_version]:alert_threshold:*
+    })
+    return {
+        "group": group,
+        "kind": kind,
+        "name": rule[kind],
+        "labels": {str(k): str(v) for k, v in labels.items()},
+        "expr": expr,
+        "fingerprint": hashlib.sha256(expr.strip().encode("utf-8")).hexdigest()[:16],
+        "threshold_keys": keys,
+        "observed": observed,
+        "directions": {k: direction_before(expr, k) for k in keys},
+        "scaled": bool(SCALING_RE.search(expr)),
+    }
+
+
+def _compile(doc: Any, text: str) -> dict:
+    rules: list[dict] = []
+    groups = doc.get("groups") if isinstance(doc, dict) else None
+    # A non-list ``groups:`` compiles to no rules; the document is still
+    # returned as-is so consumers that fail loud on it (runtime_audit,
+    # rule_pack_diff) keep doing so.
+    for group in groups if isinstance(groups, list) else []:
+        if not isinstance(group, dict):
+            continue
+        gname = group.get("name")
+        group_rules = group.get("rules")
+        for rule in group_rules if isinstance(group_rules, list) else []:
+            if isinstance(rule, dict):
+                compiled = _compile_rule(gname, rule)
+                if compiled is not None:
+                    rules.append(compiled)
+    return {
+        "version": INDEX_VERSION,
+        "doc": doc,
+        "rules": rules,
+        "text_threshold_keys": sorted(set(THRESHOLD_RE.findall(text))),
+    }
+
+
+def _materialize(path: str, sha: str, payload: dict) -> CompiledPack:
+    rules = tuple(
+        CompiledRule(
+            group=r["group"], kind=r["kind"], name=r["name"], labels=r["labels"],
+            expr=r["expr"], fingerprint=r["fingerprint"],
+            threshold_keys=tuple(r["threshold_keys"]),
+            observed=tuple(r["observed"]), directions=r["directions"],
+            scaled=r["scaled"],
+        )
+        for r in payload["rules"]
+    )
+    return CompiledPack(path=str(path), sha256=sha, doc=payload["doc"],
+                        rules=rules,
+                        text_threshold_keys=frozenset(payload["text_threshold_keys"]))
+
+
+# ─── Cache ────────────────────────────────────────────────────────────
+
+
+def cache_dir() -> Optional[str]:
+    """Versioned on-disk cache directory, or None when disabled."""
+    return tool_cache_dir(CACHE_ENV, "rulepack-index", f"v{INDEX_VERSION}")
+
+
+def _encode(payload: dict) -> Optional[str]:
+    """JSON text for *payload*, or None if its doc would not round-trip."""
+    try:
+        text = json.dumps(payload, ensure_ascii=False, allow_nan=False)
+    except (TypeError, ValueError):
+        return None
+    if json.loads(text)["doc"] != payload["doc"]:
+        return None  # e.g. int keys stringified — would change the doc
+    return text
+
+
+def _disk_read(sha: str) -> Optional[str]:
+    d = cache_dir()
+    if d is None:
+        return None
+    try:
+        with open(os.path.join(d, f"{sha}.json"), encoding="utf-8") as fh:
+            text = fh.read()
+        if json.loads(text).get("version") != INDEX_VERSION:
+            return None
+    except (OSError, ValueError, AttributeError):
+        return None
+    return text
+
+
+def _disk_write(sha: str, text: str) -> None:
+    d = cache_dir()
+    if d is not None:
+        write_text_atomic(os.path.join(d, f"{sha}.json"), text)
+
+
+def clear_memo() -> None:
+    """Drop the in-process layer (tests; long-lived processes)."""
+    _MEMO.clear()
+
+
+# ─── Public API ───────────────────────────────────────────────────────
+
+
+def compile_pack(path: Any) -> CompiledPack:
+    """Return the compiled index for one rule-pack file.
+
+    Raises ``OSError`` / ``UnicodeDecodeError`` / ``yaml.YAMLError`` exactly
+    where a direct ``yaml.safe_load`` of the file would; see module docstring.
+    """
+    if yaml is None:
+        raise RuntimeError("pyyaml required")
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    sha = hashlib.sha256(raw).hexdigest()
+    text = _MEMO.get(sha)
+    if text is None:
+        text = _disk_read(sha)
+        if text is not None:
+            _MEMO[sha] = text
+    if text is not None:
+        return _materialize(path, sha, json.loads(text))
+
+    source = raw.decode("utf-8")
+    payload = _compile(yaml.safe_load(source), source)
+    text = _encode(payload)
+    if text is None:
+        return _materialize(path, sha, payload)
+    _MEMO[sha] = text
+    _disk_write(sha, text)
+    # Decode our own text so the returned doc is independent of the payload
+    # used for encoding (same guarantee as a cache hit).
+    return _materialize(path, sha, json.loads(text))
+
+
+def load_index(paths: Iterable[Any]) -> list[CompiledPack]:
+    """:func:`compile_pack` over *paths*, in order (first error propagates)."""
+    return [compile_pack(p) for p in paths]
@@ -0,0 +1,1144 @@
+#!/usr/bin/env python3
+"""_promql_eval.py — embedded evaluator for the custom-alert PromQL subset.
+
+The would-fire preview (`_recipe_preview`) used to answer every question by
+spawning `promtool` twice. This module evaluates the SAME rule groups
+`compile_custom_alerts.build_pack` emits, in-process, over the SAME promtool
+unit-test input (`input_series` / `alert_rule_test`) — so recipe semantics stay
+with the compiler (no second copy of "what a rate recipe means") and promtool
+stays the oracle: tests replay the promtool goldens under
+tests/dx/fixtures/custom_alerts_promtool/ through this evaluator and, where
+promtool is installed, cross-check preview verdicts against it.
+
+Supported subset — exactly what custom_alerts/recipes.py emits:
+  - selectors with =, !=, =~, !~ matchers; range selectors `[d]`
+  - sum / min / max / count with by(...) / without(...)
+  - rate, increase, count_over_time, predict_linear, histogram_quantile,
+    clamp_min, label_replace, vector
+  - arithmetic and comparison operators (vector/vector with on/ignoring and
+    group_left/group_right, vector/scalar, `bool`), and / or / unless
+  - recording-rule chaining (`labels:` included) and alerting rules with
+    `for:`, `labels:` / `annotations:` templates using `$labels.x`, `$value`
+    and `printf "%.Nf"`
+
+Anything else (offset, @, subqueries, other functions, `keep_firing_for`,
+Go template constructs beyond the above) raises `Unsupported`; the caller then
+falls back to promtool. `EvalError` is a runtime error Prometheus would raise
+too (many-to-many matching, duplicate label sets).
+
+Semantics follow Prometheus 3 as promtool runs it: samples load at
+`k * interval`; every group is evaluated at every `evaluation_interval` tick
+from t=0, in file order; instant selectors look back 5m, ranges are left-open
+`(t-d, t]`; a recorded series that vanishes is stale-marked, so an instant
+selector over a record sees exactly the record's latest evaluation. Rules are
+evaluated lazily per (rule, tick) and memoized — a forecast's 8h lookback
+costs one base-record evaluation per tick, not one per alert tick.
+"""
+import bisect
+import math
+import re
+from decimal import Decimal
+from functools import lru_cache
+
+LOOKBACK_MS = 5 * 60 * 1000
+
+_DUR_RE = re.compile(r"^(?:\d+(?:ms|[smhdwy]))+$")
+_DUR_TOKEN_RE = re.compile(r"(\d+)(ms|[smhdwy])")
+_DUR_UNIT_MS = {"ms": 1, "s": 1000, "m": 60_000, "h": 3_600_000,
+                "d": 86_400_000, "w": 604_800_000, "y": 31_536_000_000}
+
+
+class Unsupported(Exception):
+    """The input is outside the embedded subset — evaluate it with promtool."""
+
+
+class EvalError(Exception):
+    """A PromQL evaluation error Prometheus itself would report."""
+
+
+def parse_duration(text):
+    """Prometheus duration (`5m`, `1h30m`, `28800s`) → integer milliseconds."""
+    s = str(text).strip()
+    if not _DUR_RE.match(s):
+        raise Unsupported(f"not a duration: {text!r}")
+    return sum(int(n) * _DUR_UNIT_MS[u] for n, u in _DUR_TOKEN_RE.findall(s))
+
+
+# ── lexer ────────────────────────────────────────────────────────────────
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+|\#[^\n]*)
+  | (?P<str>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`[^`]*`)
+  | (?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<id>[a-zA-Z_:][a-zA-Z0-9_:]*)
+  | (?P<op>=~|!~|==|!=|<=|>=|[-+*/%^<>=,(){}@])
+""", re.VERBOSE)
+
+_ESCAPES = {"a": "\a", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t",
+            "v": "\v", "\\": "\\", "'": "'", '"': '"'}
+
+
+def _unquote(tok):
+    """Go `strconv.Unquote` for a PromQL string literal."""
+    quote, body = tok[0], tok[1:-1]
+    if quote == "`":
+        return body
+    out, i = [], 0
+    while i < len(body):
+        c = body[i]
+        if c != "\\":
+            out.append(c)
+            i += 1
+            continue
+        e = body[i + 1]
+        if e in _ESCAPES:
+            out.append(_ESCAPES[e])
+            i += 2
+        elif e == "x":
+            out.append(chr(int(body[i + 2:i + 4], 16)))
+            i += 4
+        elif e in "uU":
+            n = 4 if e == "u" else 8
+            out.append(chr(int(body[i + 2:i + 2 + n], 16)))
+            i += 2 + n
+        elif e in "01234567":
+            out.append(chr(int(body[i + 1:i + 4], 8)))
+            i += 4
+        else:
+            raise Unsupported(f"unknown escape \\{e} in {tok}")
+    return "".join(out)
+
+
+def _tokens(text):
+    out, pos = [], 0
+    while pos < len(text):
+        if text[pos] == "[":
+            end = text.find("]", pos)
+            if end < 0:
+                raise Unsupported("unclosed '['")
+            inner = text[pos + 1:end].strip()
+            if ":" in inner:
+                raise Unsupported("subqueries are not supported")
+            out.append(("range", parse_duration(inner)))
+            pos = end + 1
+            continue
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            raise Unsupported(f"unexpected character {text[pos]!r} at {pos}")
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == "ws":
+            continue
+        out.append((kind, m.group(kind)))
+    out.append(("eof", None))
+    return out
+
+
+# ── AST ──────────────────────────────────────────────────────────────────
+
+class Num:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Str:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Selector:
+    __slots__ = ("name", "matchers", "range_ms")
+
+    def __init__(self, name, matchers, range_ms=None):
+        self.name = name
+        self.matchers = matchers        # ((label, op, value, regex|None), ...)
+        self.range_ms = range_ms
+
+
+class Call:
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+
+
+class Agg:
+    __slots__ = ("op", "grouping", "without", "expr")
+
+    def __init__(self, op, grouping, without, expr):
+        self.op = op
+        self.grouping = grouping
+        self.without = without
+        self.expr = expr
+
+
+class Neg:
+    __slots__ = ("expr",)
+
+    def __init__(self, expr):
+        self.expr = expr
+
+
+class Binary:
+    __slots__ = ("op", "lhs", "rhs", "bool", "on", "labels", "card", "include")
+
+    def __init__(self, op, lhs, rhs, bool_, on, labels, card, include):
+        self.op = op
+        self.lhs = lhs
+        self.rhs = rhs
+        self.bool = bool_
+        self.on = on                    # True: on(...), False: ignoring(...)/none
+        self.labels = labels
+        self.card = card                # "one-to-one" | "many-to-one" | "one-to-many"
+        self.include = include
+
+
+_PREC = {"or": 1, "and": 2, "unless": 2,
+         "==": 3, "!=": 3, "<": 3, "<=": 3, ">": 3, ">=": 3,
+         "+": 4, "-": 4, "*": 5, "/": 5, "%": 5, "^": 6}
+_SET_OPS = frozenset({"and", "or", "unless"})
+_CMP_OPS = frozenset({"==", "!=", "<", "<=", ">", ">="})
+_AGG_OPS = frozenset({"sum", "min", "max", "count"})
+_UNSUPPORTED_AGG = frozenset({"avg", "group", "stddev", "stdvar", "topk", "bottomk",
+                              "quantile", "count_values", "limitk", "limit_ratio"})
+# function → argument kinds ("v" instant vector, "m" range vector, "s" scalar, "t" string)
+_FUNCS = {"rate": "m", "increase": "m", "count_over_time": "m",
+          "predict_linear": "ms", "histogram_quantile": "sv", "clamp_min": "vs",
+          "label_replace": "vtttt", "vector": "s"}
+
+
+class _Parser:
+    def __init__(self, text):
+        self.toks = _tokens(text)
+        self.i = 0
+
+    def peek(self, k=0):
+        return self.toks[self.i + k]
+
+    def take(self):
+        tok = self.toks[self.i]
+        self.i += 1
+        return tok
+
+    def expect(self, value):
+        kind, v = self.take()
+        if v != value:
+            raise Unsupported(f"expected {value!r}, got {v!r}")
+
+    def _binop(self):
+        kind, v = self.peek()
+        if kind == "op" and v in _PREC:
+            return v
+        if kind == "id" and v in _SET_OPS:
+            return v
+        if kind == "id" and v.lower() == "atan2":
+            raise Unsupported("atan2 is not supported")
+        return None
+
+    def label_list(self):
+        self.expect("(")
+        names = []
+        while self.peek()[1] != ")":
+            kind, v = self.take()
+            if kind != "id":
+                raise Unsupported(f"expected a label name, got {v!r}")
+            names.append(v)
+            if self.peek()[1] == ",":
+                self.take()
+        self.take()
+        return tuple(names)
+
+    def expr(self, min_prec=1):
+        lhs = self.unary()
+        while True:
+            op = self._binop()
+            if op is None or _PREC[op] < min_prec:
+                return lhs
+            self.take()
+            bool_, on, labels, card, include = False, False, (), "one-to-one", ()
+            if self.peek() == ("id", "bool"):
+                self.take()
+                bool_ = True
+            if self.peek()[0] == "id" and self.peek()[1] in ("on", "ignoring"):
+                on = self.take()[1] == "on"
+                labels = self.label_list()
+            if self.peek()[0] == "id" and self.peek()[1] in ("group_left", "group_right"):
+                card = "many-to-one" if self.take()[1] == "group_left" else "one-to-many"
+                if self.peek()[1] == "(":
+                    include = self.label_list()
+            if op in _SET_OPS:
+                card = "many-to-many"
+            rhs = self.expr(_PREC[op] if op == "^" else _PREC[op] + 1)
+            lhs = Binary(op, lhs, rhs, bool_, on, labels, card, include)
+
+    def unary(self):
+        kind, v = self.peek()
+        if kind == "op" and v in "+-":
+            self.take()
+            inner = self.expr(_PREC["*"])
+            return inner if v == "+" else Neg(inner)
+        return self.postfix(self.primary())
+
+    def postfix(self, node):
+        kind, v = self.peek()
+        if kind == "range":
+            if not isinstance(node, Selector) or node.range_ms is not None:
+                raise Unsupported("subqueries are not supported")
+            self.take()
+            node = Selector(node.name, node.matchers, v)
+            kind, v = self.peek()
+        if (kind == "id" and v == "offset") or (kind == "op" and v == "@"):
+            raise Unsupported(f"`{v}` modifiers are not supported")
+        return node
+
+    def primary(self):
+        kind, v = self.take()
+        if kind == "num":
+            return Num(float(v))
+        if kind == "str":
+            return Str(_unquote(v))
+        if kind == "op" and v == "(":
+            node = self.expr()
+            self.expect(")")
+            return node
+        if kind == "op" and v == "{":
+            raise Unsupported("selectors without a metric name are not supported")
+        if kind != "id":
+            raise Unsupported(f"unexpected token {v!r}")
+        low = v.lower()
+        if low in ("inf", "nan") and self.peek()[1] not in ("(", "{"):
+            return Num(float(low))
+        if low in _AGG_OPS or low in _UNSUPPORTED_AGG:
+            if self.peek()[1] in ("(", "by", "without"):
+                return self.aggregation(low)
+        if self.peek()[1] == "(":
+            return self.call(v)
+        matchers = self.matchers() if self.peek()[1] == "{" else ()
+        return Selector(v, matchers)
+
+    def aggregation(self, op):
+        if op in _UNSUPPORTED_AGG:
+            raise Unsupported(f"aggregation {op!r} is not supported")
+        grouping, without = None, False
+        if self.peek()[1] in ("by", "without"):
+            without = self.take()[1] == "without"
+            grouping = self.label_list()
+        self.expect("(")
+        inner = self.expr()
+        self.expect(")")
+        if self.peek()[1] in ("by", "without"):
+            without = self.take()[1] == "without"
+            grouping = self.label_list()
+        return Agg(op, grouping or (), without, inner)
+
+    def call(self, name):
+        if name not in _FUNCS:
+            raise Unsupported(f"function {name!r} is not supported")
+        self.expect("(")
+        args = []
+        while self.peek()[1] != ")":
+            args.append(self.expr())
+            if self.peek()[1] == ",":
+                self.take()
+        self.take()
+        if len(args) != len(_FUNCS[name]):
+            raise Unsupported(f"{name}() takes {len(_FUNCS[name])} arguments")
+        return Call(name, tuple(args))
+
+    def matchers(self):
+        self.expect("{")
+        out = []
+        while self.peek()[1] != "}":
+            kind, label = self.take()
+            if kind != "id":
+                raise Unsupported(f"expected a label name, got {label!r}")
+            _k, op = self.take()
+            if op not in ("=", "!=", "=~", "!~"):
+                raise Unsupported(f"bad matcher operator {op!r}")
+            kind, raw = self.take()
+            if kind != "str":
+                raise Unsupported(f"matcher value must be a string, got {raw!r}")
+            value = _unquote(raw)
+            rx = _anchored(value) if op in ("=~", "!~") else None
+            out.append((label, op, value, rx))
+            if self.peek()[1] == ",":
+                self.take()
+        self.take()
+        return tuple(out)
+
+
+@lru_cache(maxsize=None)
+def _anchored(pattern):
+    # Prometheus anchors label regexes as ^(?s:...)$.
+    return re.compile(f"(?s:{pattern})")
+
+
+@lru_cache(maxsize=4096)
+def parse(text):
+    """PromQL text → AST. Raises `Unsupported` outside the subset."""
+    p = _Parser(text)
+    node = p.expr()
+    if p.peek()[0] != "eof":
+        raise Unsupported(f"unexpected trailing input {p.peek()[1]!r}")
+    return node
+
+
+# ── label sets ───────────────────────────────────────────────────────────
+# A label set is a tuple of (name, value) pairs sorted by name: hashable and
+# canonical, so it doubles as the series identity.
+
+def _get(lbls, name):
+    for k, v in lbls:
+        if k == name:
+            return v
+    return ""
+
+
+def _without(lbls, names):
+    return tuple(p for p in lbls if p[0] not in names)
+
+
+def _keep(lbls, names):
+    return tuple(p for p in lbls if p[0] in names)
+
+
+def _set(lbls, name, value):
+    """Set (or, for an empty value, delete) one label — labels.Builder.Set."""
+    rest = [p for p in lbls if p[0] != name]
+    if value != "":
+        rest.append((name, value))
+    return tuple(sorted(rest))
+
+
+def _drop_name(lbls):
+    return _without(lbls, ("__name__",))
+
+
+def _matches(lbls, matchers):
+    for label, op, value, rx in matchers:
+        got = _get(lbls, label)
+        if op == "=":
+            ok = got == value
+        elif op == "!=":
+            ok = got != value
+        elif op == "=~":
+            ok = rx.fullmatch(got) is not None
+        else:
+            ok = rx.fullmatch(got) is None
+        if not ok:
+            return False
+    return True
+
+
+def _signature(lbls, node):
+    if node.on:
+        return tuple(_get(lbls, n) for n in node.labels)
+    return _without(lbls, ("__name__",) + tuple(node.labels))
+
+
+# ── float helpers (Prometheus / Go semantics) ─────────────────────────────
+
+def _kahan_inc(inc, total, c):
+    t = total + inc
+    if math.isinf(t):
+        c = 0.0
+    elif abs(total) >= abs(inc):
+        c += (total - t) + inc
+    else:
+        c += (inc - t) + total
+    return t, c
+
+
+def _kahan_sum(values):
+    """`_kahan_inc` over a sequence, compensation folded in at the end."""
+    total = c = 0.0
+    for inc in values:
+        t = total + inc
+        if t in (math.inf, -math.inf):
+            c = 0.0
+        elif abs(total) >= abs(inc):
+            c += (total - t) + inc
+        else:
+            c += (inc - t) + total
+        total = t
+    return total + c
+
+
+def _arith(op, a, b):
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    if op == "/":
+        if b == 0:
+            if a == 0 or math.isnan(a):
+                return math.nan
+            return math.copysign(math.inf, a) * math.copysign(1.0, b)
+        return a / b
+    if op == "%":
+        return math.fmod(a, b) if b != 0 else math.nan
+    try:
+        return math.pow(a, b)
+    except (OverflowError, ValueError):
+        return math.inf if abs(a) > 1 else math.nan
+
+
+def _compare(op, a, b):
+    if op == "==":
+        return a == b
+    if op == "!=":
+        return a != b
+    if op == "<":
+        return a < b
+    if op == "<=":
+        return a <= b
+    if op == ">":
+        return a > b
+    return a >= b
+
+
+def _extrapolated_rate(times, values, t, range_ms, is_rate):
+    """promql.extrapolatedRate for counters (rate / increase)."""
+    if len(values) < 2:
+        return None
+    first_t, last_t = times[0], times[-1]
+    result = values[-1] - values[0]
+    last = 0.0
+    for v in values:
+        if v < last:
+            result += last
+        last = v
+    to_start = (first_t - (t - range_ms)) / 1000
+    to_end = (t - last_t) / 1000
+    sampled = (last_t - first_t) / 1000
+    avg = sampled / (len(values) - 1)
+    threshold = avg * 1.1
+    if to_start >= threshold:
+        to_start = avg / 2
+    if result > 0 and values[0] >= 0:
+        to_zero = sampled * (values[0] / result)
+        if to_zero < to_start:
+            to_start = to_zero
+    if to_end >= threshold:
+        to_end = avg / 2
+    factor = (sampled + to_start + to_end) / sampled
+    if is_rate:
+        factor /= range_ms / 1000
+    return result * factor
+
+
+def _predict_linear(times, values, t, duration):
+    if len(values) < 2:
+        return None
+    init = values[0]
+    if all(v == init for v in values):
+        return math.nan if math.isinf(init) else init
+    # promql.linearRegression: four Kahan sums, x in seconds relative to t.
+    xs = [(ts - t) / 1000 for ts in times]
+    n = float(len(values))
+    sum_x = _kahan_sum(xs)
+    sum_y = _kahan_sum(values)
+    sum_xy = _kahan_sum([x * v for x, v in zip(xs, values)])
+    sum_x2 = _kahan_sum([x * x for x in xs])
+    cov = sum_xy - sum_x * sum_y / n
+    var = sum_x2 - sum_x * sum_x / n
+    slope = _arith("/", cov, var)
+    intercept = sum_y / n - slope * sum_x / n
+    return slope * duration + intercept
+
+
+def _almost_equal(a, b, eps):
+    if a == b:
+        return True
+    min_normal = 2.2250738585072014e-308
+    abs_sum, diff = abs(a) + abs(b), abs(a - b)
+    if a == 0 or b == 0 or abs_sum < min_normal:
+        return diff < eps * min_normal
+    return diff / min(abs_sum, 1.7976931348623157e308) < eps
+
+
+def _bucket_quantile(q, buckets):
+    """promql.BucketQuantile over [(upper_bound, count), ...]."""
+    if math.isnan(q):
+        return math.nan
+    if q < 0:
+        return -math.inf
+    if q > 1:
+        return math.inf
+    buckets = sorted(buckets)
+    if not buckets or not math.isinf(buckets[-1][0]):
+        return math.nan
+    merged = []
+    for ub, count in buckets:
+        if merged and merged[-1][0] == ub:
+            merged[-1][1] += count
+        else:
+            merged.append([ub, count])
+    prev = merged[0][1]
+    for b in merged[1:]:
+        if b[1] == prev:
+            continue
+        if _almost_equal(prev, b[1], 1e-12) or b[1] < prev:
+            b[1] = prev
+            continue
+        prev = b[1]
+    if len(merged) < 2:
+        return math.nan
+    observations = merged[-1][1]
+    if observations == 0:
+        return math.nan
+    rank = q * observations
+    b = next((i for i in range(len(merged) - 1) if merged[i][1] >= rank), len(merged) - 1)
+    if b == len(merged) - 1:
+        return merged[-2][0]
+    if b == 0 and merged[0][0] <= 0:
+        return merged[0][0]
+    start, end, count = 0.0, merged[b][0], merged[b][1]
+    if b > 0:
+        start = merged[b - 1][0]
+        count -= merged[b - 1][1]
+        rank -= merged[b - 1][1]
+    return start + (end - start) * (rank / count)
+
+
+_REPL_RE = re.compile(r"\$(?:\{([A-Za-z0-9_]*)\}|([A-Za-z0-9_]+)|(\$))")
+
+
+def _expand(template, match):
+    """Go Regexp.ExpandString: $1, ${1}, $name, ${name}, $$."""
+    def sub(m):
+        if m.group(3):
+            return "$"
+        name = m.group(1) if m.group(1) is not None else m.group(2)
+        try:
+            return match.group(int(name) if name.isdigit() else name) or ""
+        except IndexError:
+            return ""
+    return _REPL_RE.sub(sub, template)
+
+
+# ── Go template subset for alert labels / annotations ─────────────────────
+
+_TMPL_RE = re.compile(r"\{\{(.*?)\}\}", re.DOTALL)
+_LABEL_REF_RE = re.compile(r"^\$labels\.([A-Za-z_][A-Za-z0-9_]*)$")
+_PRINTF_RE = re.compile(r'^(?:\$value\s*\|\s*printf\s+"(%[^"]*)"|printf\s+"(%[^"]*)"\s+\$value)$')
+_FMT_RE = re.compile(r"^%(?:\.(\d+))?([fe])$")
+
+
+def _go_float(f):
+    """fmt's %v for a float64 (strconv 'g', shortest)."""
+    if math.isnan(f):
+        return "NaN"
+    if math.isinf(f):
+        return "+Inf" if f > 0 else "-Inf"
+    if f == 0:
+        return "-0" if math.copysign(1.0, f) < 0 else "0"
+    sign, digits, exp = Decimal(repr(f)).normalize().as_tuple()
+    ds = "".join(map(str, digits))
+    nd, dp = len(ds), len(ds) + exp
+    neg = "-" if sign else ""
+    x = dp - 1
+    if x < -4 or x >= 6:                # strconv 'g', shortest: eprec is 6
+        mant = ds[0] + ("." + ds[1:] if nd > 1 else "")
+        return f"{neg}{mant}e{'-' if x < 0 else '+'}{abs(x):02d}"
+    if dp <= 0:
+        return f"{neg}0.{'0' * -dp}{ds}"
+    if dp >= nd:
+        return f"{neg}{ds}{'0' * (dp - nd)}"
+    return f"{neg}{ds[:dp]}.{ds[dp:]}"
+
+
+def _printf(fmt, f):
+    m = _FMT_RE.match(fmt)
+    if not m:
+        raise Unsupported(f"printf format {fmt!r} is not supported")
+    if math.isnan(f):
+        return "NaN"
+    if math.isinf(f):
+        return "+Inf" if f > 0 else "-Inf"
+    prec = int(m.group(1)) if m.group(1) is not None else 6
+    if m.group(2) == "f":
+        return format(f, f".{prec}f")
+    return format(f, f".{prec}e")
+
+
+def expand_template(text, labels, value):
+    """Expand the alert-template subset the compiler emits."""
+    def sub(m):
+        body = m.group(1).strip()
+        ref = _LABEL_REF_RE.match(body)
+        if ref:
+            return labels.get(ref.group(1), "")
+        if body == "$value":
+            return _go_float(value)
+        pf = _PRINTF_RE.match(body)
+        if pf:
+            return _printf(pf.group(1) or pf.group(2), value)
+        raise Unsupported(f"template action {{{{ {body} }}}} is not supported")
+    return _TMPL_RE.sub(sub, text) if "{{" in text else text
+
+
+# ── promtool unit-test input ─────────────────────────────────────────────
+
+_ITEM_RE = re.compile(
+    r"^(?:_(?:x(?P<bn>\d+))?"
+    r"|(?P<v>[-+]?(?:[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?|[Ii]nf|NaN)|stale)"
+    r"(?:(?P<d>[-+](?:[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?|[Ii]nf))?x(?P<n>\d+))?)$")
+_STALE = object()
+_OMIT = object()
+
+
+def parse_values(text):
+    """promtool `values:` notation → [float | _STALE | _OMIT, ...]."""
+    out = []
+    for item in str(text).split():
+        m = _ITEM_RE.match(item)
+        if not m:
+            raise Unsupported(f"series value {item!r} is not supported")
+        if m.group("v") is None:
+            out.extend([_OMIT] * (int(m.group("bn")) if m.group("bn") else 1))
+            continue
+        if m.group("v") == "stale":
+            if m.group("n") is not None:
+                raise Unsupported(f"series value {item!r} is not supported")
+            out.append(_STALE)
+            continue
+        v = float(m.group("v"))
+        if m.group("n") is None:
+            out.append(v)
+        elif m.group("d") is None:
+            out.extend([v] * (int(m.group("n")) + 1))
+        else:
+            d = float(m.group("d"))
+            out.append(v)
+            for _ in range(int(m.group("n"))):
+                v += d
+                out.append(v)
+    return out
+
+
+def parse_series(text):
+    """`metric{k="v", ...}` → label set (with __name__)."""
+    node = parse(text)
+    if not isinstance(node, Selector) or node.range_ms is not None or any(
+            op != "=" for _l, op, _v, _r in node.matchers):
+        raise Unsupported(f"input series {text!r} is not a plain series")
+    return tuple(sorted({"__name__": node.name,
+                         **{l: v for l, _op, v, _r in node.matchers if v != ""}}.items()))
+
+
+class _Series:
+    __slots__ = ("labels", "times", "values")
+
+    def __init__(self, labels, times, values):
+        self.labels = labels
+        self.times = times
+        self.values = values            # float, or None for a stale marker
+
+
+# ── rule simulator ───────────────────────────────────────────────────────
+
+class RuleSimulator:
+    """Evaluate compiled rule groups over promtool-style input series.
+
+    `groups` is the `groups` list of a rule file (e.g. `build_pack(...)
+    ["groups"]`); `input_series` the promtool `input_series` list; both
+    intervals are Prometheus durations.
+    """
+
+    def __init__(self, groups, input_series, interval="1m", evaluation_interval="1m"):
+        self.step = parse_duration(evaluation_interval)
+        sample_step = parse_duration(interval)
+        if self.step <= 0 or sample_step <= 0:
+            raise Unsupported("intervals must be positive")
+        self.series = {}
+        for item in input_series:
+            lbls = parse_series(item["series"])
+            times, values = [], []
+            for k, v in enumerate(parse_values(item.get("values", ""))):
+                if v is _OMIT:
+                    continue
+                times.append(k * sample_step)
+                values.append(None if v is _STALE else v)
+            self.series.setdefault(_get(lbls, "__name__"), []).append(
+                _Series(lbls, times, values))
+        self.rules = []
+        self.records = {}
+        self.alerts = {}
+        for g in groups:
+            if g.get("limit") or g.get("query_offset"):
+                raise Unsupported(f"group {g.get('name')!r}: limit / query_offset")
+            for rule in g.get("rules") or ():
+                if rule.get("keep_firing_for"):
+                    raise Unsupported("keep_firing_for is not supported")
+                pos = len(self.rules)
+                self.rules.append((rule, parse(str(rule["expr"]))))
+                if "record" in rule:
+                    self.records.setdefault(rule["record"], []).append(pos)
+                else:
+                    self.alerts.setdefault(rule["alert"], []).append(pos)
+        self._outputs = {}
+        self._alert_memo = {}
+        self._selected = {}
+        self._histories = {}
+
+    # ── expression evaluation ──
+
+    def _eval(self, node, t, pos):
+        if isinstance(node, Num):
+            return node.value
+        if isinstance(node, Str):
+            return node.value
+        if isinstance(node, Selector):
+            if node.range_ms is not None:
+                raise Unsupported("a range vector is only valid as a function argument")
+            return self._instant(node, t, pos)
+        if isinstance(node, Binary):
+            return self._binary(node, t, pos)
+        if isinstance(node, Agg):
+            return self._aggregate(node, self._vector(node.expr, t, pos))
+        if isinstance(node, Call):
+            return self._call(node, t, pos)
+        if isinstance(node, Neg):
+            v = self._eval(node.expr, t, pos)
+            if isinstance(v, float):
+                return -v
+            return [(_drop_name(l), -x) for l, x in v]
+        raise Unsupported(f"unsupported node {type(node).__name__}")
+
+    def _vector(self, node, t, pos):
+        v = self._eval(node, t, pos)
+        if not isinstance(v, list):
+            raise Unsupported("expected an instant vector")
+        return v
+
+    def _scalar(self, node, t, pos):
+        v = self._eval(node, t, pos)
+        if not isinstance(v, float):
+            raise Unsupported("expected a scalar")
+        return v
+
+    def _raw(self, node):
+        hit = self._selected.get(node)
+        if hit is None:
+            hit = [s for s in self.series.get(node.name, ())
+                   if _matches(s.labels, node.matchers)]
+            self._selected[node] = hit
+        return hit
+
+    def _visible_ticks(self, t, pos, ri, since):
+        """Ticks in (since, t] at which rule `ri` has already run, seen from
+        rule `pos` evaluating at tick `t`."""
+        if ri >= pos:
+            raise Unsupported("a rule reads a series recorded by itself or a later rule")
+        first = since // self.step + 1 if since >= 0 else 0
+        return range(first * self.step, t + 1, self.step)
+
+    def _instant(self, node, t, pos):
+        out = []
+        for s in self._raw(node):
+            i = bisect.bisect_right(s.times, t) - 1
+            if i >= 0 and s.times[i] > t - LOOKBACK_MS and s.values[i] is not None:
+                out.append((s.labels, s.values[i]))
+        for ri in self.records.get(node.name, ()):
+            ticks = self._visible_ticks(t, pos, ri, t - LOOKBACK_MS)
+            if len(ticks):
+                out.extend((l, v) for l, v in self._output(ri, ticks[-1])
+                           if _matches(l, node.matchers))
+        return out
+
+    def _matrix(self, node, t, pos):
+        if not isinstance(node, Selector) or node.range_ms is None:
+            raise Unsupported("expected a range vector selector")
+        since = t - node.range_ms
+        out = []
+        for s in self._raw(node):
+            lo = bisect.bisect_right(s.times, since)
+            hi = bisect.bisect_right(s.times, t)
+            pts = [(ts, v) for ts, v in zip(s.times[lo:hi], s.values[lo:hi]) if v is not None]
+            if pts:
+                out.append((s.labels, [p[0] for p in pts], [p[1] for p in pts]))
+        for ri in self.records.get(node.name, ()):
+            ticks = self._visible_ticks(t, pos, ri, since)
+            if not len(ticks):
+                continue
+            for l, (ts, vs) in self._history(ri, node, ticks[-1]).items():
+                lo = bisect.bisect_right(ts, since)
+                hi = bisect.bisect_right(ts, t)
+                if hi > lo:
+                    out.append((l, ts[lo:hi], vs[lo:hi]))
+        return out
+
+    def _history(self, ri, node, upto):
+        """Rule `ri`'s recorded samples matching `node` from tick 0 through
+        `upto`: {labels: (ticks, values)}. Built once and extended, so a long
+        range over a record costs one pass, not one pass per evaluation tick."""
+        hist = self._histories.get((ri, node))
+        if hist is None:
+            hist = self._histories[(ri, node)] = [-self.step, {}]
+        for tick in range(hist[0] + self.step, upto + 1, self.step):
+            for l, v in self._output(ri, tick):
+                if _matches(l, node.matchers):
+                    row = hist[1].setdefault(l, ([], []))
+                    row[0].append(tick)
+                    row[1].append(v)
+        hist[0] = max(hist[0], upto)
+        return hist[1]
+
+    def _call(self, node, t, pos):
+        f, args = node.func, node.args
+        if f in ("rate", "increase"):
+            rng = args[0].range_ms if isinstance(args[0], Selector) else None
+            out = []
+            for l, ts, vs in self._matrix(args[0], t, pos):
+                r = _extrapolated_rate(ts, vs, t, rng, f == "rate")
+                if r is not None:
+                    out.append((_drop_name(l), r))
+            return out
+        if f == "count_over_time":
+            return [(_drop_name(l), float(len(vs))) for l, _ts, vs in self._matrix(args[0], t, pos)]
+        if f == "predict_linear":
+            duration = self._scalar(args[1], t, pos)
+            out = []
+            for l, ts, vs in self._matrix(args[0], t, pos):
+                r = _predict_linear(ts, vs, t, duration)
+                if r is not None:
+                    out.append((_drop_name(l), r))
+            return out
+        if f == "histogram_quantile":
+            q = self._scalar(args[0], t, pos)
+            groups = {}
+            for l, v in self._vector(args[1], t, pos):
+                try:
+                    ub = float(_get(l, "le"))
+                except ValueError:
+                    continue
+                groups.setdefault(_without(l, ("__name__", "le")), []).append((ub, v))
+            return [(l, _bucket_quantile(q, b)) for l, b in groups.items()]
+        if f == "clamp_min":
+            lo = self._scalar(args[1], t, pos)
+            return [(_drop_name(l), math.nan if math.isnan(v) or math.isnan(lo) else max(v, lo))
+                    for l, v in self._vector(args[0], t, pos)]
+        if f == "label_replace":
+            vec = self._vector(args[0], t, pos)
+            dst, repl, src, regex = (self._eval(a, t, pos) for a in args[1:])
+            if not all(isinstance(a, str) for a in (dst, repl, src, regex)):
+                raise Unsupported("label_replace() takes string arguments")
+            rx = _anchored(regex)
+            out, seen = [], set()
+            for l, v in vec:
+                m = rx.fullmatch(_get(l, src))
+                if m:
+                    l = _set(l, dst, _expand(repl, m))
+                if l in seen:
+                    raise EvalError("vector cannot contain metrics with the same labelset")
+                seen.add(l)
+                out.append((l, v))
+            return out
+        return [((), self._scalar(args[0], t, pos))]          # vector(s)
+
+    def _aggregate(self, node, vec):
+        groups = {}
+        for l, v in vec:
+            key = (_without(l, ("__name__",) + node.grouping) if node.without
+                   else _keep(l, node.grouping))
+            acc = groups.get(key)
+            if node.op == "count":
+                groups[key] = (acc or 0.0) + 1.0
+            elif node.op == "sum":
+                groups[key] = (v, 0.0) if acc is None else _kahan_inc(v, *acc)
+            elif node.op == "max":
+                groups[key] = v if acc is None or acc < v or math.isnan(acc) else acc
+            else:
+                groups[key] = v if acc is None or acc > v or math.isnan(acc) else acc
+        if node.op == "sum":
+            return [(k, s + c if math.isfinite(c) else s) for k, (s, c) in groups.items()]
+        return list(groups.items())
+
+    def _binary(self, node, t, pos):
+        op = node.op
+        lhs = self._eval(node.lhs, t, pos)
+        rhs = self._eval(node.rhs, t, pos)
+        if isinstance(lhs, str) or isinstance(rhs, str):
+            raise Unsupported("binary operators take numbers or vectors")
+        if op in _SET_OPS:
+            if not (isinstance(lhs, list) and isinstance(rhs, list)):
+                raise Unsupported(f"`{op}` needs vectors on both sides")
+            rsigs = {_signature(l, node) for l, _v in rhs}
+            if op == "and":
+                return [(l, v) for l, v in lhs if _signature(l, node) in rsigs]
+            if op == "unless":
+                return [(l, v) for l, v in lhs if _signature(l, node) not in rsigs]
+            lsigs = {_signature(l, node) for l, _v in lhs}
+            return lhs + [(l, v) for l, v in rhs if _signature(l, node) not in lsigs]
+        if isinstance(lhs, float) and isinstance(rhs, float):
+            if op in _CMP_OPS:
+                if not node.bool:
+                    raise Unsupported("comparisons between scalars must use bool")
+                return 1.0 if _compare(op, lhs, rhs) else 0.0
+            return _arith(op, lhs, rhs)
+        if isinstance(rhs, float) or isinstance(lhs, float):
+            swap = isinstance(lhs, float)
+            vec, k = (rhs, lhs) if swap else (lhs, rhs)
+            out = []
+            for l, v in vec:
+                a, b = (k, v) if swap else (v, k)
+                if op in _CMP_OPS:
+                    hit = _compare(op, a, b)
+                    if node.bool:
+                        out.append((_drop_name(l), 1.0 if hit else 0.0))
+                    elif hit:
+                        out.append((l, v))
+                else:
+                    out.append((_drop_name(l), _arith(op, a, b)))
+            return out
+        return self._vector_binop(node, lhs, rhs)
+
+    def _vector_binop(self, node, lhs, rhs):
+        op = node.op
+        swapped = node.card == "one-to-many"
+        many, one = (rhs, lhs) if swapped else (lhs, rhs)
+        ones = {}
+        for l, v in one:
+            sig = _signature(l, node)
+            if sig in ones:
+                side = "left" if swapped else "right"
+                raise EvalError(f"found duplicate series for the match group on the "
+                                f"{side} hand-side of the operation; many-to-many "
+                                f"matching not allowed")
+            ones[sig] = (l, v)
+        out, matched = [], {}
+        for ml, mv in many:
+            sig = _signature(ml, node)
+            hit = ones.get(sig)
+            if hit is None:
+                continue
+            ol, ov = hit
+            ll, lv, rl, rv = (ol, ov, ml, mv) if swapped else (ml, mv, ol, ov)
+            if op in _CMP_OPS:
+                keep = _compare(op, lv, rv)
+                if node.bool:
+                    value, keep = (1.0 if keep else 0.0), True
+                else:
+                    value = lv
+                if not keep:
+                    continue
+            else:
+                value = _arith(op, lv, rv)
+            metric = ll if not swapped else rl
+            if op not in _CMP_OPS or node.bool:
+                metric = _drop_name(metric)
+            if node.card == "one-to-one":
+                metric = (_keep(metric, node.labels) if node.on
+                          else _without(metric, node.labels))
+            for name in node.include:
+                metric = _set(metric, name, _get(ol, name))
+            if node.card == "one-to-one":
+                if sig in matched:
+                    raise EvalError("multiple matches for labels: many-to-one matching "
+                                    "must be explicit (group_left/group_right)")
+                matched[sig] = None
+            else:
+                seen = matched.setdefault(sig, set())
+                if metric in seen:
+                    raise EvalError("multiple matches for labels: grouping labels must "
+                                    "ensure uniqueness")
+                seen.add(metric)
+            out.append((metric, value))
+        return out
+
+    # ── rules ──
+
+    def _output(self, ri, tick):
+        """Recording rule `ri`'s samples at `tick` (memoized)."""
+        key = (ri, tick)
+        hit = self._outputs.get(key)
+        if hit is None:
+            rule, node = self.rules[ri]
+            v = self._eval(node, tick, ri)
+            vec = [((), v)] if isinstance(v, float) else v
+            if not isinstance(vec, list):
+                raise Unsupported("a recording rule must return a vector or scalar")
+            extra = [(k, str(x)) for k, x in (rule.get("labels") or {}).items()]
+            hit, seen = [], set()
+            for l, x in vec:
+                l = _set(l, "__name__", rule["record"])
+                for k, lv in extra:
+                    l = _set(l, k, lv)
+                if l in seen:
+                    raise EvalError(f"{rule['record']}: vector contains metrics with the "
+                                    f"same labelset after applying rule labels")
+                seen.add(l)
+                hit.append((l, x))
+            self._outputs[key] = hit
+        return hit
+
+    def _active(self, ai, tick):
+        """Alert rule `ai`'s active instances at `tick`: {labels: (annotations, value)}."""
+        key = (ai, tick)
+        hit = self._alert_memo.get(key)
+        if hit is None:
+            rule, node = self.rules[ai]
+            vec = self._eval(node, tick, ai)
+            if not isinstance(vec, list):
+                raise Unsupported("an alerting rule must return a vector")
+            hit = {}
+            for l, v in vec:
+                tmpl = dict(l)
+                lbls = _drop_name(l)
+                for k, x in (rule.get("labels") or {}).items():
+                    lbls = _set(lbls, k, expand_template(str(x), tmpl, v))
+                if lbls in hit:
+                    raise EvalError(f"{rule['alert']}: vector contains metrics with the "
+                                    f"same labelset after applying alert labels")
+                ann = {k: expand_template(str(x), tmpl, v)
+                       for k, x in (rule.get("annotations") or {}).items()}
+                hit[lbls] = (ann, v)
+            self._alert_memo[key] = hit
+        return hit
+
+    def firing(self, alertname, eval_time):
+        """Alerts named `alertname` in state firing at `eval_time` (a duration):
+        [{"labels", "annotations", "value"}], promtool's view — the state after
+        the last evaluation tick at or before `eval_time`."""
+        tick = parse_duration(eval_time) // self.step * self.step
+        out = []
+        for ai in self.alerts.get(alertname, ()):
+            rule = self.rules[ai][0]
+            hold = parse_duration(rule.get("for") or "0s")
+            if tick - hold < 0:
+                continue
+            alive = self._active(ai, tick)
+            names = set(alive)
+            earliest = (tick - hold) // self.step * self.step
+            k = tick - self.step
+            while names and k >= earliest:
+                names &= self._active(ai, k).keys()
+                k -= self.step
+            for lbls in sorted(names):
+                ann, v = alive[lbls]
+                out.append({"labels": dict(lbls), "annotations": ann, "value": v})
+        return out
+
+
+def run_alert_tests(groups, test_group, evaluation_interval="1m"):
+    """Evaluate one promtool test group's `alert_rule_test` entries.
+
+    Returns [(alertname, eval_time, firing_alerts), ...] in file order, each
+    alert shaped like promtool's `exp_alerts` entry (labels without
+    `alertname`, annotations) plus its `value`.
+    """
+    if test_group.get("external_labels") or test_group.get("external_url"):
+        raise Unsupported("external_labels / external_url are not supported")
+    sim = RuleSimulator(groups, test_group.get("input_series") or (),
+                        interval=test_group.get("interval") or evaluation_interval,
+                        evaluation_interval=evaluation_interval)
+    return [(t["alertname"], t["eval_time"], sim.firing(t["alertname"], t["eval_time"]))
+            for t in test_group.get("alert_rule_test") or ()]
@@ -2,52 +2,85 @@
 """_recipe_preview.py — recipe would-fire preview core (#657 P2).
 
 Given ONE ADR-024 custom-alert recipe + a scenario value, answer "would it
-fire?" by going through the SAME authoritative engine the platform uses —
-`compile_custom_alerts.build_pack` + `promtool` — never re-implementing eval
+fire?" against the SAME rules the platform deploys — the output of
+`compile_custom_alerts.build_pack` — never re-implementing recipe semantics
 (the two-eval-homes rule; see docs/design/recipe-would-fire-preview.md).
 
-MVP scope: `threshold` (ops >, >=, <, <=, ==; a flat constant series at the
-scenario value) and `absence` (the metric is simply NOT emitted → it is absent
-over the window). Both are faithfully reproducible with a hand-built synthetic
-series. The remaining recipes fall back to `supported: false` because a flat /
-absent series can't stand in for them:
-  - rate / ratio / forecast / p99_latency — time-dependent; need a populated
-    lookback or slope the preview can't fake yet (deferred to a later pass);
+Scope: `threshold` (ops >, >=, <, <=, ==; a flat constant series at the
+scenario value), `absence` (the metric is simply NOT emitted → it is absent
+over the window), and the time-dependent `rate` / `ratio` / `p99_latency` /
+`forecast`, each fed a synthetic series whose computed value is exactly the
+scenario value (a counter growing at `value`/s, a histogram whose quantile
+lands on `value`, a gauge at `value` trending `trend`/h). Still refused with
+`supported: false`:
+  - slo_burn_rate — a multi-window burn needs a whole error-budget history,
+    not one value;
   - `selectors_re` (regex label filters) — we can't synthesize a value
     guaranteed to match an arbitrary regex, so a preview could silently report
     a false "inactive". Refusing is honest; lying is not.
 
+Engines (§5.4, `PREVIEW_ENGINE`): `embedded` (default) evaluates the compiled
+rule groups in-process with `_promql_eval` over the same promtool test group
+— no subprocess, milliseconds per preview. A rule outside the evaluator's
+subset (`Unsupported`) falls back to promtool when it is installed.
+`promtool` forces the subprocess path below, which is also the oracle the
+evaluator is tested against (tests/dx/test_promql_eval.py).
+
 Eval mechanism (§5.2): `promtool test rules` is an ASSERT tool, so we run an
 INVERTED assert (synthetic input + `exp_alerts: []`): returncode 0 → nothing
 fired (inactive); returncode != 0 → it fired. A compile error must NOT be
 mislabeled as firing, so we gate with `build_pack` exception handling +
 `promtool check rules` (syntax) BEFORE the inverted-assert (§5.2 layering).
+
+Batch mode (`preview_batch`): a portal form sweeping a slider asks about the
+SAME recipe shape at many values. Each item still passes the same gates, but
+the compiled + syntax-checked rule groups are cached per recipe shape
+(`shape.shape_signature` + severity, see `_compile_key`), the groups of every
+distinct shape in the batch are merged into ONE pack, and every item becomes
+one named test group in ONE `promtool test rules` file — so a warm N-item
+sweep costs one promtool spawn instead of 2N. Temp dirs come from a small
+pool of reusable workspaces instead of a mkdtemp/rmtree per request.
 """
+import atexit
+import json
+import math
 import os
+import queue
 import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
 
 import yaml
 
 _THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, _THIS_DIR)
+import _promql_eval as pe  # noqa: E402
 import compile_custom_alerts as cc  # noqa: E402
 from custom_alerts import shape  # noqa: E402
 
 # `threshold` covers >, >=, <, <=, == (all value-crossing, flat series). `absence`
 # is presence-based — fires where a DECLARING tenant's metric had no sample over
-# the window — so a "don't emit the metric" series reproduces it exactly. The
-# remaining (rate/ratio/forecast/p99_latency) stay deferred (need a populated
-# lookback). Per-type gating (§7): an unsupported type returns supported:false
-# WITHOUT a compile, so it is never mislabeled firing/error.
-# Per-type branches (here + build_preview_test + the validation gates + reason
-# rendering) are deliberately NOT a registry abstraction — revisit only when a
-# 3rd recipe type is actually scheduled (2026-07 ROI review).
-SUPPORTED_RECIPES_MVP = frozenset({"threshold", "absence"})
+# the window — so a "don't emit the metric" series reproduces it exactly. rate /
+# ratio / p99_latency / forecast get a populated lookback whose computed value is
+# the scenario value (build_test_group). slo_burn_rate stays deferred. Per-type
+# gating (§7): an unsupported type returns supported:false WITHOUT a compile, so
+# it is never mislabeled firing/error.
+# Per-type branches (build_test_group + the validation gates + reason rendering)
+# are deliberately NOT a registry abstraction: each type's series is a few lines
+# and reads best next to its siblings.
+SUPPORTED_RECIPES_MVP = frozenset({"threshold", "absence", "rate", "ratio",
+                                   "p99_latency", "forecast"})
+# value-crossing types: the scenario value is required and numeric.
+_VALUE_RECIPES = SUPPORTED_RECIPES_MVP - {"absence"}
+# counter-backed types: the scenario value is a per-second rate, so it can't be
+# negative (a decreasing counter is a reset, not a negative rate).
+_RATE_RECIPES = frozenset({"rate", "ratio"})
 
 # `for:` is enum-bounded (shape.ALLOWED_FOR). Map to minutes to size the
 # synthetic series + pick an eval_time PAST the pending window.
@@ -75,22 +108,42 @@ _NS_PER_MIN = 60_000_000_000
 _MAX_WINDOW_MIN = 1440  # 24h
 
 
-def _window_minutes(window):
-    """Prometheus duration (compound + sub-second ok) → whole minutes (ceil; min 1).
-    INTEGER arithmetic throughout. None on a malformed / non-positive / absurdly
-    large (> _MAX_WINDOW_MIN) window — the preview can't synthesize a series that
-    long, and a recipe with such a window still deploys (the preview just abstains)."""
-    w = str(window or "").strip()
+def _duration_minutes(duration):
+    """Prometheus duration (compound + sub-second ok) → whole minutes (ceil; min 1),
+    or None when malformed / non-positive. INTEGER arithmetic throughout."""
+    w = str(duration or "").strip()
     if not _DUR_FULL_RE.match(w):
         return None
     ns = sum(int(n) * _DUR_UNIT_NS[u] for n, u in _DUR_TOKEN_RE.findall(w))
     if ns <= 0:
         return None
-    minutes = -(-ns // _NS_PER_MIN)   # integer ceil-div: no float → no overflow
-    return minutes if minutes <= _MAX_WINDOW_MIN else None
+    return -(-ns // _NS_PER_MIN)   # integer ceil-div: no float → no overflow
+
+
+def _window_minutes(window):
+    """`_duration_minutes`, also None on an absurdly large (> _MAX_WINDOW_MIN)
+    window — the preview can't synthesize a series that long, and a recipe with
+    such a window still deploys (the preview just abstains)."""
+    minutes = _duration_minutes(window)
+    return minutes if minutes is not None and minutes <= _MAX_WINDOW_MIN else None
+
+
+def _forecast_lookback_minutes(horizon):
+    """The compiler's forecast lookback, max(2·horizon, 1h), in minutes. `horizon`
+    is enum-bounded (shape.ALLOWED_HORIZON, checked by recipe_id) — at most 96h."""
+    return max(2 * _duration_minutes(horizon), 60)
+
 
 _PROMTOOL = shutil.which("promtool")
 
+# `embedded` (default): _promql_eval in-process; `promtool`: subprocess only.
+_ENGINE = os.environ.get("PREVIEW_ENGINE", "embedded")
+# time-dependent series are sampled every 15s (the platform scrape interval the
+# goldens use), so a rate window as short as 30s still sees two samples.
+_RATE_SAMPLES_PER_MIN = 4
+if _ENGINE not in ("embedded", "promtool"):
+    raise ValueError(f"PREVIEW_ENGINE must be 'embedded' or 'promtool', got {_ENGINE!r}")
+
 _TIMEOUT = 60
 
 
@@ -107,8 +160,18 @@ def _labels(d):
     ) + "}"
 
 
-def build_preview_test(recipe, tenant, value, slug):
-    """Build a promtool test (YAML str) for a supported recipe — inverted assert.
+def _num(x):
+    """A float as a promtool series-grammar number (shortest round-trip form)."""
+    return repr(float(x))
+
+
+def _ramp(start, step, n):
+    """promtool `start+stepxn` / `start-stepxn`: n+1 samples, `step` apart."""
+    return f"{_num(start)}{'-' if step < 0 else '+'}{_num(abs(step))}x{n}"
+
+
+def build_test_group(recipe, tenant, value, slug, group_name=None, trend=None):
+    """Build ONE promtool test group (dict) for a supported recipe — inverted assert.
 
     POLYMORPHIC by recipe type (a flat series can't fake every shape):
       - threshold (>, >=, <, <=, ==): the observed metric @ the scenario `value`
@@ -120,7 +183,17 @@ def build_preview_test(recipe, tenant, value, slug):
         count by(tenant)(count_over_time(metric[window]) > 0)`, so an absent
         metric leaves the `unless` arm empty → the declaring tenant fires (the
         absence.yaml firing case). `value` is unused. eval past `window` + `for:`.
-    Returns (yaml_text, severity, mode, threshold_value).
+      - rate: a counter growing `value`/s, sampled every 15s — rate() over the
+        window is exactly `value`. ratio: the same numerator over a denominator
+        growing 1/s. p99_latency: a histogram whose observations all land in the
+        `+Inf` bucket above an empty `le="<value>"` bucket, so any quantile is
+        exactly `value`. eval past `window` + `for:`.
+      - forecast: the gauge (ratio mode: avail over a constant capacity of 1) is
+        a line reaching `value` at eval time with slope `trend` per hour, so
+        predict_linear reads value + trend·horizon. eval past the compiler's
+        lookback (max(2·horizon, 1h)) + `for:`.
+    `group_name` labels the group so a batched run can attribute a failure to it.
+    Returns (test_group, severity, mode, threshold_value).
     """
     rtype = recipe.get("recipe")
     thr_value, severity = shape.parse_threshold(recipe["threshold"])
@@ -151,6 +224,10 @@ def build_preview_test(recipe, tenant, value, slug):
         }
         return {"series": f"tenant_metadata_info{_labels(md_labels)}", "values": f"1x{n}"}
 
+    selectors = {str(k): v for k, v in (recipe.get("selectors") or {}).items()}
+    metric_labels = {"tenant": tenant, **selectors}
+    interval = "1m"
+
     if rtype == "absence":
         # eval must clear BOTH the absence detection window AND `for:`. The metric
         # is INTENTIONALLY absent (no series), so count_over_time(metric[window])
@@ -163,19 +240,78 @@ def build_preview_test(recipe, tenant, value, slug):
             {"series": f"user_threshold{_labels(ut_labels)}", "values": f"{thr_value}x{n}"},
             _md(n),
         ]
+    elif rtype in ("rate", "ratio", "p99_latency"):
+        # counter-backed: the window must be fully populated at every tick of the
+        # `for:` hold, so eval past window + for. 15s samples (see
+        # _RATE_SAMPLES_PER_MIN); every series shares the selector labels because
+        # the compiler applies `sel` to the denominator / `_bucket` series too.
+        spm = _RATE_SAMPLES_PER_MIN
+        eval_min = _window_minutes(recipe["window"]) + for_min + 5
+        n = (eval_min + 5) * spm
+        interval = f"{60 // spm}s"
+        per_sample = 60 / spm
+        metric = recipe["metric"]
+        if rtype == "p99_latency":
+            input_series = [
+                {"series": f"{metric}_bucket{_labels({**metric_labels, 'le': _num(value)})}",
+                 "values": f"0x{n}"},
+                {"series": f"{metric}_bucket{_labels({**metric_labels, 'le': '+Inf'})}",
+                 "values": _ramp(0, per_sample, n)},
+            ]
+        else:
+            input_series = [{"series": f"{metric}{_labels(metric_labels)}",
+                             "values": _ramp(0, float(value) * per_sample, n)}]
+            if rtype == "ratio":
+                input_series.append({
+                    "series": f"{recipe['denominator_metric']}{_labels(metric_labels)}",
+                    "values": _ramp(0, per_sample, n)})
+        input_series += [
+            {"series": f"user_threshold{_labels(ut_labels)}", "values": f"{thr_value}x{n}"},
+            _md(n),
+        ]
+    elif rtype == "forecast":
+        # a line through `value` at eval time: predict_linear over the recorded
+        # base is exact, and count_over_time(base[lookback]) clears the compiler's
+        # cold-start gate because the whole lookback is populated.
+        eval_min = _forecast_lookback_minutes(recipe["horizon"]) + for_min + 5
+        n = eval_min + 5
+        step = float(trend or 0) / 60
+        input_series = [{"series": f"{recipe['metric']}{_labels(metric_labels)}",
+                         "values": _ramp(float(value) - step * eval_min, step, n)}]
+        if recipe.get("capacity_metric"):
+            input_series.append({
+                "series": f"{recipe['capacity_metric']}{_labels(metric_labels)}",
+                "values": f"1x{n}"})
+        input_series += [
+            {"series": f"user_threshold{_labels(ut_labels)}", "values": f"{thr_value}x{n}"},
+            _md(n),
+        ]
     else:
         # threshold / == : a flat constant series at the scenario value, held long
         # enough to clear `for:`.
         eval_min = for_min + 5
         n = for_min + 10
-        selectors = {str(k): v for k, v in (recipe.get("selectors") or {}).items()}
-        metric_labels = {"tenant": tenant, **selectors}
         input_series = [
             {"series": f"{recipe['metric']}{_labels(metric_labels)}", "values": f"{value}x{n}"},
             {"series": f"user_threshold{_labels(ut_labels)}", "values": f"{thr_value}x{n}"},
             _md(n),
         ]
 
+    group = {
+        "interval": interval,
+        "input_series": input_series,
+        "alert_rule_test": [{
+            "eval_time": f"{eval_min}m",
+            "alertname": f"Custom_{slug}",
+            "exp_alerts": [],
+        }],
+    }
+    if group_name is not None:
+        group = {"name": group_name, **group}
+    return group, severity, mode, thr_value
+
+
+def _render_test_file(groups):
     # Build the promtool test as a data structure and let yaml.safe_dump handle the
     # OUTER YAML quoting — NOT a hand-assembled string. The series CONTENT is still
     # produced by _labels/_escape_value so each `{k="v"}` matches the compiled rule's
@@ -189,18 +325,20 @@ def build_preview_test(recipe, tenant, value, slug):
     doc_obj = {
         "rule_files": ["rule-pack-custom-alerts.yaml"],
         "evaluation_interval": "1m",
-        "tests": [{
-            "interval": "1m",
-            "input_series": input_series,
-            "alert_rule_test": [{
-                "eval_time": f"{eval_min}m",
-                "alertname": f"Custom_{slug}",
-                "exp_alerts": [],
-            }],
-        }],
+        "tests": list(groups),
     }
-    doc = yaml.safe_dump(doc_obj, sort_keys=False, allow_unicode=True)
-    return doc, severity, mode, thr_value
+    return yaml.safe_dump(doc_obj, sort_keys=False, allow_unicode=True)
+
+
+def build_preview_test(recipe, tenant, value, slug, trend=None):
+    """Build a promtool test (YAML str) for a supported recipe — inverted assert.
+
+    One-group form of `build_test_group` (see there for the per-type series).
+    Returns (yaml_text, severity, mode, threshold_value).
+    """
+    group, severity, mode, thr_value = build_test_group(recipe, tenant, value, slug,
+                                                        trend=trend)
+    return _render_test_file([group]), severity, mode, thr_value
 
 
 def _err(reason, alertname=None):
@@ -230,13 +368,61 @@ def classify_promtool_result(returncode, output):
     return "error"
 
 
-def preview_recipe(recipe, tenant, scenario):
-    """Would-fire preview for ONE recipe. Returns the §4 contract dict:
-    {alertname, supported, states:[{severity, mode, state, reason}], warnings}.
-
-    state ∈ firing | inactive | error. Per-type gating: unsupported recipe
-    types return supported:false (no compile). promtool absent → supported:true
-    with a warning and no states (cannot evaluate locally).
+# A batched run names every test group; promtool prefixes each failure of a
+# named group with `name: <group>,` (ahead of `alertname:`), which is what lets
+# one run answer many previews. Group names are ours (`preview-<index>`).
+_GROUP_NAME_RE = re.compile(r"^\s*name: (preview-\d+),\s*$", re.MULTILINE)
+_FAILURE_BLOCK_RE = re.compile(
+    r"\s*name: preview-\d+,\s+alertname: [^\n]*?, time: [^\n]*?,\s*"
+    r"exp:\[\],\s*got:\[.*\]\s*(?:FAILED:\s*)?",
+    re.DOTALL,
+)
+_PREAMBLE_LINE_RE = re.compile(r"^\s*(?:Unit Testing:.*|FAILED:)?\s*$")
+
+
+def classify_batch_result(returncode, output, names):
+    """Map a batched `promtool test rules` run (one named group per preview)
+    to {group name: state}, or None when the output can't be attributed.
+
+    promtool keeps going after a failing group and reports each one as a
+    `FAILED:` block carrying the group's `name:`, so one run answers every
+    group. Attribution is STRICT: every block must be exactly the inverted-
+    assert mismatch signature for one of OUR groups, and nothing else may be in
+    the output. Anything unexpected (an unnamed error, a foreign name, an
+    output-format change in a new promtool) returns None and the caller re-runs
+    each group alone — slower, never a guessed verdict.
+
+      rc == 0                              → every group inactive
+      rc != 0, no FAILED:                  → every group error (file/infra)
+      rc != 0, only well-formed blocks     → named groups firing, rest inactive
+      rc != 0, anything else               → None (re-run individually)
+    """
+    if returncode == 0:
+        return {n: "inactive" for n in names}
+    if "FAILED:" not in output:
+        return {n: "error" for n in names}
+    marks = list(_GROUP_NAME_RE.finditer(output))
+    if not marks:
+        return None
+    preamble = output[:marks[0].start()]
+    if not all(_PREAMBLE_LINE_RE.match(line) for line in preamble.splitlines()):
+        return None
+    states = {n: "inactive" for n in names}
+    for k, m in enumerate(marks):
+        end = marks[k + 1].start() if k + 1 < len(marks) else len(output)
+        if m.group(1) not in states or not _FAILURE_BLOCK_RE.fullmatch(output[m.start():end]):
+            return None
+        states[m.group(1)] = "firing"
+    return states
+
+
+def _gate(recipe, tenant, scenario):
+    """Everything `preview_recipe` checks BEFORE evaluating.
+
+    Returns (early_result, slug, value): `early_result` is the final answer
+    (supported:false / state:error / promtool-absent under the promtool engine)
+    or None when the recipe is ready to evaluate. Shared by the single and batch paths so both refuse
+    exactly the same inputs with exactly the same reasons.
     """
     rtype = recipe.get("recipe")
     if rtype not in SUPPORTED_RECIPES_MVP:
@@ -248,7 +434,7 @@ def preview_recipe(recipe, tenant, scenario):
                 f"would-fire preview for recipe type {rtype!r} is coming soon "
                 f"(P3); supported now: {sorted(SUPPORTED_RECIPES_MVP)}"
             ],
-        }
+        }, None, None
 
     # selectors_re (regex label filters) gate: we hand-build a flat synthetic
     # series and can't synthesize a value guaranteed to match an arbitrary
@@ -264,7 +450,7 @@ def preview_recipe(recipe, tenant, scenario):
                 "would-fire preview does not yet support regex selectors "
                 "(`selectors_re`); only exact `selectors` can be previewed"
             ],
-        }
+        }, None, None
 
     # Compute the slug via the compiler's OWN function (zero cross-language
     # drift, §5.3). A structurally invalid recipe (RecipeError) OR one missing a
@@ -275,27 +461,46 @@ def preview_recipe(recipe, tenant, scenario):
     try:
         slug = shape.recipe_id(recipe)
     except shape.RecipeError as exc:
-        return _err(str(exc))
+        return _err(str(exc)), None, None
     except KeyError as exc:
-        return _err(f"recipe is missing required field {exc}")
+        return _err(f"recipe is missing required field {exc}"), None, None
 
     # Validate the request BEFORE the promtool-availability check, so bad input
     # is reported as an error regardless of whether we can evaluate locally
     # (the "Python Tests" CI job has no promtool on PATH).
     value = (scenario or {}).get("value")
-    # threshold is value-crossing → the scenario value is required and must be a
-    # bare number (promtool's series grammar reads "1+2" / "5.." as a slope/range
-    # → a wrong verdict). absence is presence-based: it needs no value (the metric
+    # value-crossing types → the scenario value is required and must be a bare
+    # number (promtool's series grammar reads "1+2" / "5.." as a slope/range →
+    # a wrong verdict). absence is presence-based: it needs no value (the metric
     # is simply not emitted), so don't demand one.
-    if rtype == "threshold":
+    if rtype in _VALUE_RECIPES:
         if value is None:
-            return _err("scenario.value is required for a threshold preview",
-                        alertname=f"Custom_{slug}")
+            return _err(f"scenario.value is required for a {rtype} preview",
+                        alertname=f"Custom_{slug}"), slug, value
         try:
-            float(value)
+            number = float(value)
         except (TypeError, ValueError):
             return _err(f"scenario.value must be numeric, got {value!r}",
-                        alertname=f"Custom_{slug}")
+                        alertname=f"Custom_{slug}"), slug, value
+        # the time-dependent types BUILD their series from the value (a slope, a
+        # bucket bound) — a NaN / Inf slope is not a scenario, and a counter can't
+        # run backwards.
+        if rtype != "threshold" and not math.isfinite(number):
+            return _err(f"scenario.value must be finite for a {rtype} preview, "
+                        f"got {value!r}", alertname=f"Custom_{slug}"), slug, value
+        if rtype in _RATE_RECIPES and number < 0:
+            return _err(f"scenario.value is a per-second rate for a {rtype} preview "
+                        f"and can't be negative, got {value!r}",
+                        alertname=f"Custom_{slug}"), slug, value
+    if rtype == "forecast":
+        trend = (scenario or {}).get("trend", 0)
+        try:
+            ok = math.isfinite(float(trend))
+        except (TypeError, ValueError):
+            ok = False
+        if not ok:
+            return _err(f"scenario.trend (change per hour) must be a finite number, "
+                        f"got {trend!r}", alertname=f"Custom_{slug}"), slug, value
     # `for:` is enum-bounded by shape.ALLOWED_FOR, but the preview must also be
     # able to SIZE the synthetic series from it. If the two ever drift (a new
     # ALLOWED_FOR value unmapped in _FOR_MINUTES), fail closed to error rather
@@ -305,90 +510,410 @@ def preview_recipe(recipe, tenant, scenario):
     if _for not in _FOR_MINUTES:
         return _err(f"preview cannot size the series for for-window {_for!r} "
                     f"(sync _FOR_MINUTES with shape.ALLOWED_FOR)",
-                    alertname=f"Custom_{slug}")
+                    alertname=f"Custom_{slug}"), slug, value
     # absence sizes its eval_time from `window` (a Go duration, NOT enum-bounded).
     # If it can't be parsed, fail closed to error — never guess a window → wrong
     # eval_time → a real firing misread as inactive (same class as the for guard).
-    if rtype == "absence" and _window_minutes(recipe.get("window")) is None:
-        return _err(f"preview cannot size the absence window "
+    # rate / ratio / p99_latency populate the window the same way.
+    windowed = rtype in ("absence", "rate", "ratio", "p99_latency")
+    if windowed and _window_minutes(recipe.get("window")) is None:
+        return _err(f"preview cannot size the {rtype} window "
                     f"{recipe.get('window')!r} (expected a Prometheus duration "
                     f"like 10m / 1h30m / 500ms)",
-                    alertname=f"Custom_{slug}")
+                    alertname=f"Custom_{slug}"), slug, value
 
-    if _PROMTOOL is None:
+    if _ENGINE == "promtool" and _PROMTOOL is None:
         return {"alertname": f"Custom_{slug}", "supported": True, "states": [],
-                "warnings": ["promtool not available — cannot evaluate locally"]}
+                "warnings": ["promtool not available — cannot evaluate locally"]}, slug, value
+    return None, slug, value
+
+
+# ── reusable workspaces ──────────────────────────────────────────────────
+
+class _WorkspacePool:
+    """At most `size` temp dirs, created on demand and reused across previews.
+
+    A workspace is emptied (not deleted) on release, so the steady state does
+    no mkdtemp/rmtree. Acquiring past `size` blocks until one is released —
+    callers are already bounded (app.py's eval slots), so this never queues
+    more than the service admits. A workspace that cannot be emptied is
+    dropped and a fresh one created next time.
+    """
 
-    work = Path(tempfile.mkdtemp(prefix="recipe-preview-"))
+    def __init__(self, size):
+        self._size = max(1, size)
+        self._free = queue.LifoQueue()
+        self._alive = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def workspace(self):
+        try:
+            work = self._free.get_nowait()
+        except queue.Empty:
+            work = None
+            with self._lock:
+                if len(self._alive) < self._size:
+                    work = Path(tempfile.mkdtemp(prefix="recipe-preview-"))
+                    self._alive.append(work)
+            if work is None:
+                work = self._free.get()
+        try:
+            yield work
+        finally:
+            try:
+                for child in work.iterdir():
+                    if child.is_dir() and not child.is_symlink():
+                        shutil.rmtree(child)
+                    else:
+                        child.unlink()
+                self._free.put(work)
+            except OSError:
+                with self._lock:
+                    self._alive.remove(work)
+                shutil.rmtree(work, ignore_errors=True)
+
+    def close(self):
+        with self._lock:
+            for work in self._alive:
+                shutil.rmtree(work, ignore_errors=True)
+            self._alive.clear()
+
+
+_WORKSPACES = _WorkspacePool(int(os.environ.get("PREVIEW_WORKSPACE_POOL", "4")))
+atexit.register(_WORKSPACES.close)
+
+
+# ── compiled-rule cache ──────────────────────────────────────────────────
+
+# key → compiled `groups`, or an error reason string. Bounded LRU.
+_COMPILED = OrderedDict()
+_COMPILED_MAX = 256
+_compiled_lock = threading.Lock()
+
+
+def _compile_key(recipe, tenant):
+    """Cache key for a recipe's compiled + promtool-checked rule groups.
+
+    The rules themselves are a function of `shape.shape_signature` plus the
+    threshold's SEVERITY (one `:<severity>:core` rule per severity) — the
+    threshold VALUE rides the data plane, so a threshold-slider sweep is one
+    compile. The key also carries the rest of the recipe and the tenant:
+    `build_pack` validates those (name, mode, tenant id), and a cache hit must
+    not skip a rejection a cold compile would have made.
+    """
+    _value, severity = shape.parse_threshold(recipe["threshold"])
+    rest = {k: v for k, v in recipe.items() if k != "threshold"}
+    return (shape.shape_signature(recipe), severity, tenant,
+            json.dumps(rest, sort_keys=True, default=str))
+
+
+def _compiled_groups(recipe, tenant, work, check=True):
+    """Compiled (+ syntax-checked) rule groups for one recipe → (groups, error).
+
+    Compile errors and a clean `promtool check rules` are deterministic for a
+    key and are cached; a failing check is NOT (an OOM-killed promtool must not
+    pin a recipe to state:error). promtool OSError / TimeoutExpired propagate
+    to the caller's fail-closed handlers. `check=False` (the embedded engine,
+    which parses every expression itself) skips promtool and caches separately.
+    """
     try:
-        confd = work / "conf.d"
-        confd.mkdir()
-        (confd / f"{tenant}.yaml").write_text(
-            yaml.safe_dump({"tenants": {tenant: {"_custom_alerts": [recipe]}}},
-                           sort_keys=False, allow_unicode=True),
-            encoding="utf-8", newline="\n",
+        key = (_compile_key(recipe, tenant), check)
+    except shape.RecipeError as exc:
+        return None, f"recipe failed to compile: {exc}"
+    with _compiled_lock:
+        hit = _COMPILED.get(key)
+        if hit is not None:
+            _COMPILED.move_to_end(key)
+    if hit is not None:
+        return (None, hit) if isinstance(hit, str) else (hit, None)
+
+    scratch = work / "compile"
+    shutil.rmtree(scratch, ignore_errors=True)
+    confd = scratch / "conf.d"
+    confd.mkdir(parents=True)
+    (confd / f"{tenant}.yaml").write_text(
+        yaml.safe_dump({"tenants": {tenant: {"_custom_alerts": [recipe]}}},
+                       sort_keys=False, allow_unicode=True),
+        encoding="utf-8", newline="\n",
+    )
+    # ── compile (errors → state:error, never mislabeled firing) ──
+    try:
+        groups = cc.build_pack(confd)["groups"]
+        entry, result = groups, (groups, None)
+    except Exception as exc:  # RecipeError / CustomAlertConfigError / loader errors
+        reason = f"recipe failed to compile: {exc}"
+        entry, result = reason, (None, reason)
+    if check and result[0] is not None:
+        pack_path = scratch / "rule-pack-custom-alerts.yaml"
+        pack_path.write_text(cc._render(groups), encoding="utf-8", newline="\n")
+        chk = subprocess.run(
+            [_PROMTOOL, "check", "rules", pack_path.name],
+            cwd=scratch, capture_output=True, text=True, timeout=_TIMEOUT,
         )
+        if chk.returncode != 0:
+            return None, (f"compiled rule failed promtool check: "
+                          f"{(chk.stderr or chk.stdout).strip()[:300]}")
+    with _compiled_lock:
+        _COMPILED[key] = entry
+        while len(_COMPILED) > _COMPILED_MAX:
+            _COMPILED.popitem(last=False)
+    return result
+
+
+def _merge_groups(group_lists):
+    """Union the rule groups of several compiled recipes into one pack.
+
+    Rules are deduplicated by content: the silent sentinel and the rules of a
+    shape shared by several items appear once. Distinct shapes never collide
+    on a rule name (recipe_id is injective over shape_signature, #1008 F3).
+    """
+    merged = OrderedDict()
+    seen = set()
+    for groups in group_lists:
+        for g in groups:
+            tgt = merged.setdefault(g["name"], {**{k: v for k, v in g.items() if k != "rules"},
+                                                "rules": []})
+            for rule in g["rules"]:
+                ident = (g["name"], json.dumps(rule, sort_keys=True, default=str))
+                if ident not in seen:
+                    seen.add(ident)
+                    tgt["rules"].append(rule)
+    return list(merged.values())
+
+
+def _write_pack(work, groups):
+    (work / "rule-pack-custom-alerts.yaml").write_text(
+        cc._render(groups), encoding="utf-8", newline="\n")
+
+
+def _run_test_file(work, test_doc):
+    (work / "preview_test.yaml").write_text(test_doc, encoding="utf-8", newline="\n")
+    res = subprocess.run(
+        [_PROMTOOL, "test", "rules", "preview_test.yaml"],
+        cwd=work, capture_output=True, text=True, timeout=_TIMEOUT,
+    )
+    return res.returncode, (res.stdout or "") + (res.stderr or "")
+
+
+def _promtool_failure(exc):
+    """The state:error reason for a promtool run that did not complete."""
+    if isinstance(exc, subprocess.TimeoutExpired):
+        return f"promtool timed out (>{_TIMEOUT}s)"
+    return f"promtool eval failed: {exc}"
+
+
+def _observed(recipe, value, trend):
+    """What the synthetic series makes the compiled rule compare, in words."""
+    rtype = recipe.get("recipe")
+    if rtype == "rate":
+        return f"rate {value}/s"
+    if rtype == "ratio":
+        return f"ratio {value}"
+    if rtype == "p99_latency":
+        return f"quantile {recipe.get('quantile', '0.99')} latency {value}s"
+    if rtype == "forecast":
+        predicted = float(value) + float(trend or 0) * _duration_minutes(recipe["horizon"]) / 60
+        if recipe.get("capacity_metric"):
+            predicted = max(predicted, 0.0)     # the compiler's clamp_min(…, 0)
+        return f"forecast {predicted:g} in {recipe['horizon']}"
+    return f"value {value}"
+
+
+def _verdict(recipe, slug, value, state, rc, out, severity, mode, thr_value, trend=None):
+    """Render a classified promtool / embedded state as the §4 contract dict."""
+    rtype = recipe.get("recipe")
+    if state == "error":
+        return _err(f"promtool eval error (rc={rc}): "
+                    f"{out.strip()[:300] or 'no output'}", alertname=f"Custom_{slug}")
+    if rtype == "absence":
+        win = recipe.get("window")
+        reason = (f"{recipe['metric']} absent over {win} → would fire ({severity})"
+                  if state == "firing"
+                  else "simulated absence did not fire — verify the recipe "
+                       "compiles to an absence alert for this tenant")
+    elif (rtype == "forecast" and state == "inactive" and recipe.get("capacity_metric")
+          and float(value) >= shape._FORECAST_CURRENT_BAND):
+        # ratio mode only alerts while the headroom is ALREADY below the band
+        # (recipes._forecast_records) — say so rather than blame the threshold.
+        reason = (f"current headroom {value} is not below the forecast band "
+                  f"{shape._FORECAST_CURRENT_BAND} — suppressed whatever the trend")
+    else:
+        op = recipe.get("op", ">")
+        verb = "==" if op == "==" else op
+        seen = _observed(recipe, value, trend)
+        reason = (f"{seen} {verb} threshold {thr_value}" if state == "firing"
+                  else f"{seen} does not cross threshold {thr_value} ({op})")
+    return {
+        "alertname": f"Custom_{slug}",
+        "supported": True,
+        "states": [{
+            "severity": severity,
+            "mode": str(mode) if mode else "page",
+            "state": state,
+            "reason": reason,
+        }],
+        "warnings": [],
+    }
 
-        # ── compile (errors → state:error, never mislabeled firing) ──
+
+def _preview_embedded(recipe, tenant, value, slug, trend):
+    """Evaluate one preview with `_promql_eval` → the §4 dict, or None when the
+    compiled rules fall outside the evaluator's subset and promtool can answer
+    instead. The test group is exactly the one promtool would run."""
+    alertname = f"Custom_{slug}"
+    with _WORKSPACES.workspace() as work:
         try:
-            pack = cc.build_pack(confd)
-        except Exception as exc:  # RecipeError / CustomAlertConfigError / loader errors
-            return _err(f"recipe failed to compile: {exc}", alertname=f"Custom_{slug}")
+            groups, error = _compiled_groups(recipe, tenant, work, check=False)
+        except OSError as exc:
+            return _err(f"preview workspace failed: {exc}", alertname=alertname)
+    if error:
+        return _err(error, alertname=alertname)
+    group, severity, mode, thr_value = build_test_group(recipe, tenant, value, slug,
+                                                        trend=trend)
+    try:
+        [(_name, _at, alerts)] = pe.run_alert_tests(groups, group)
+    except pe.EvalError as exc:
+        return _err(f"rule evaluation failed: {exc}", alertname=alertname)
+    except pe.Unsupported as exc:
+        if _PROMTOOL is not None:
+            return None
+        return _err(f"embedded evaluator cannot run this rule ({exc}) and promtool "
+                    f"is not available", alertname=alertname)
+    state = "firing" if alerts else "inactive"
+    return _verdict(recipe, slug, value, state, 0, "", severity, mode, thr_value,
+                    trend=trend)
 
-        pack_path = work / "rule-pack-custom-alerts.yaml"
 
-        # ── render → syntax gate → inverted-assert. Every failure here is
+def preview_recipe(recipe, tenant, scenario):
+    """Would-fire preview for ONE recipe. Returns the §4 contract dict:
+    {alertname, supported, states:[{severity, mode, state, reason}], warnings}.
+
+    state ∈ firing | inactive | error. Per-type gating: unsupported recipe
+    types return supported:false (no compile). Under the promtool engine,
+    promtool absent → supported:true with a warning and no states (cannot
+    evaluate locally).
+    """
+    early, slug, value = _gate(recipe, tenant, scenario)
+    if early is not None:
+        return early
+    trend = (scenario or {}).get("trend")
+    if _ENGINE == "embedded":
+        result = _preview_embedded(recipe, tenant, value, slug, trend)
+        if result is not None:
+            return result
+    alertname = f"Custom_{slug}"
+    with _WORKSPACES.workspace() as work:
+        # ── compile → syntax gate → inverted-assert. Every failure here is
         # fail-closed to state:error rather than ever mislabel an infra / IO /
         # timeout failure as firing (§5.2 layering). `except OSError` catches
         # promtool vanishing after the `which` probe or an unwritable temp dir,
         # so the {state:error} contract holds even then. ──
         try:
-            pack_path.write_text(cc._render(pack["groups"]), encoding="utf-8", newline="\n")
-            chk = subprocess.run(
-                [_PROMTOOL, "check", "rules", pack_path.name],
-                cwd=work, capture_output=True, text=True, timeout=_TIMEOUT,
-            )
-            if chk.returncode != 0:
-                return _err(f"compiled rule failed promtool check: "
-                            f"{(chk.stderr or chk.stdout).strip()[:300]}",
-                            alertname=f"Custom_{slug}")
-            test_doc, severity, mode, thr_value = build_preview_test(recipe, tenant, value, slug)
-            (work / "preview_test.yaml").write_text(test_doc, encoding="utf-8", newline="\n")
-            res = subprocess.run(
-                [_PROMTOOL, "test", "rules", "preview_test.yaml"],
-                cwd=work, capture_output=True, text=True, timeout=_TIMEOUT,
-            )
-        except subprocess.TimeoutExpired:
-            return _err(f"promtool timed out (>{_TIMEOUT}s)", alertname=f"Custom_{slug}")
-        except OSError as exc:
-            return _err(f"promtool eval failed: {exc}", alertname=f"Custom_{slug}")
-
-        out = (res.stdout or "") + (res.stderr or "")
-        state = classify_promtool_result(res.returncode, out)
-        if state == "error":
-            return _err(f"promtool eval error (rc={res.returncode}): "
-                        f"{out.strip()[:300] or 'no output'}", alertname=f"Custom_{slug}")
-        if rtype == "absence":
-            win = recipe.get("window")
-            reason = (f"{recipe['metric']} absent over {win} → would fire ({severity})"
-                      if state == "firing"
-                      else "simulated absence did not fire — verify the recipe "
-                           "compiles to an absence alert for this tenant")
+            groups, error = _compiled_groups(recipe, tenant, work)
+            if error:
+                return _err(error, alertname=alertname)
+            _write_pack(work, groups)
+            test_doc, severity, mode, thr_value = build_preview_test(recipe, tenant, value,
+                                                                     slug, trend=trend)
+            rc, out = _run_test_file(work, test_doc)
+        except (subprocess.TimeoutExpired, OSError) as exc:
+            return _err(_promtool_failure(exc), alertname=alertname)
+        state = classify_promtool_result(rc, out)
+        return _verdict(recipe, slug, value, state, rc, out, severity, mode, thr_value,
+                        trend=trend)
+
+
+# Values that promtool's series grammar reads as ONE plain sample. Anything
+# else (`1e3`, `NaN`, ...) is still previewed, but in a run of its own, so a
+# series-parse failure can only ever be attributed to the item that caused it.
+_PLAIN_NUMBER_RE = re.compile(r"^-?[0-9]+(?:\.[0-9]+)?$")
+
+
+def preview_batch(items):
+    """Would-fire previews for many (recipe, tenant, scenario) items.
+
+    Returns one §4 contract dict per item, in order — each exactly what
+    `preview_recipe` would return for it. Items are gated individually; the
+    survivors are compiled once per distinct `_compile_key`, merged into one
+    pack, and evaluated as named groups of ONE `promtool test rules` file
+    (`classify_batch_result`). If that output can't be attributed strictly,
+    or an item's values are not plain numbers, those items are re-run one
+    group per file against the same pack.
+
+    The embedded engine needs none of that — no process to amortize — so each
+    item is simply `preview_recipe` (the compile cache still dedupes shapes).
+    """
+    items = list(items)
+    if _ENGINE == "embedded":
+        return [preview_recipe(*item) for item in items]
+    results = [None] * len(items)
+    ready = []
+    for i, (recipe, tenant, scenario) in enumerate(items):
+        early, slug, value = _gate(recipe, tenant, scenario)
+        if early is not None:
+            results[i] = early
         else:
-            op = recipe.get("op", ">")
-            verb = "==" if op == "==" else op
-            reason = (f"value {value} {verb} threshold {thr_value}" if state == "firing"
-                      else f"value {value} does not cross threshold {thr_value} ({op})")
-        return {
-            "alertname": f"Custom_{slug}",
-            "supported": True,
-            "states": [{
-                "severity": severity,
-                "mode": str(mode) if mode else "page",
-                "state": state,
-                "reason": reason,
-            }],
-            "warnings": [],
-        }
-    finally:
-        shutil.rmtree(work, ignore_errors=True)
+            ready.append((i, recipe, tenant, value, slug))
+    if not ready:
+        return results
+
+    with _WORKSPACES.workspace() as work:
+        runnable, packs = [], []
+        for i, recipe, tenant, value, slug in ready:
+            try:
+                groups, error = _compiled_groups(recipe, tenant, work)
+            except (subprocess.TimeoutExpired, OSError) as exc:
+                groups, error = None, _promtool_failure(exc)
+            if error:
+                results[i] = _err(error, alertname=f"Custom_{slug}")
+                continue
+            packs.append(groups)
+            trend = (items[i][2] or {}).get("trend")
+            group, severity, mode, thr_value = build_test_group(
+                recipe, tenant, value, slug, group_name=f"preview-{i}", trend=trend)
+            runnable.append({"i": i, "recipe": recipe, "slug": slug, "value": value,
+                             "trend": trend, "group": group, "severity": severity,
+                             "mode": mode, "thr_value": thr_value})
+        if not runnable:
+            return results
+
+        def finish(e, state, rc, out):
+            results[e["i"]] = _verdict(e["recipe"], e["slug"], e["value"], state, rc, out,
+                                       e["severity"], e["mode"], e["thr_value"],
+                                       trend=e["trend"])
+
+        def fail(entries, exc):
+            for e in entries:
+                results[e["i"]] = _err(_promtool_failure(exc), alertname=f"Custom_{e['slug']}")
+
+        batched, alone = [], []
+        for e in runnable:
+            plain = [e["thr_value"]]
+            if e["recipe"].get("recipe") != "absence":
+                plain.append(e["value"])
+            ok = all(_PLAIN_NUMBER_RE.match(str(v)) for v in plain)
+            (batched if ok and len(runnable) > 1 else alone).append(e)
+        try:
+            _write_pack(work, _merge_groups(packs))
+            if batched:
+                rc, out = _run_test_file(work, _render_test_file(e["group"] for e in batched))
+                states = classify_batch_result(rc, out, [e["group"]["name"] for e in batched])
+                # Unattributable output, or a whole-file error: re-run each group
+                # alone so every item gets exactly the single-preview answer.
+                if states is None or "error" in states.values():
+                    alone += batched
+                else:
+                    for e in batched:
+                        finish(e, states[e["group"]["name"]], rc, out)
+        except (subprocess.TimeoutExpired, OSError) as exc:
+            fail(runnable, exc)
+            return results
+        for e in alone:
+            try:
+                rc, out = _run_test_file(work, _render_test_file([e["group"]]))
+            except (subprocess.TimeoutExpired, OSError) as exc:
+                fail([e], exc)
+                continue
+            finish(e, classify_promtool_result(rc, out), rc, out)
+    return results
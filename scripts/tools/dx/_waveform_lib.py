@@ -37,6 +37,15 @@ mechanical probes (full-depth dips generated despite ``dips_back: false``,
 absence despite ``agent_keeps_reporting: true``) are tagged ``probe`` —
 reported but never gating the verdict. Companion series are ``companion``.
 
+Storage: gap-free sample series are ``array('d')`` (8 bytes/sample instead of
+a boxed float + list slot); a series with dropout gaps is a ``list`` with
+``None`` at each gap. Every stage performs the same float operations in the
+same order as the scalar helpers (``_noise_sample`` / ``_gauss01`` /
+``round(cum, 6)``), so the array path is bitwise identical to them. NumPy is
+deliberately not used: its vectorised log/cos/round kernels are not
+bit-compatible with ``math`` / ``round`` and would break the determinism
+contract above.
+
 Materializations:
   (a) promtool fixture fragment — ``values:`` notation, one token per
       sample, ``_`` for gaps. Reference only, NOT the catch-rate
@@ -46,12 +55,18 @@ Materializations:
   (b) Prometheus import text lines ``metric{labels} value ts_ms`` with
       absolute millisecond timestamps — the catch-rate authority; jitter
       applies here.
+
+  Both are also available as chunk streams (``stream_promtool`` /
+  ``stream_vm``, one chunk per series) so callers can write 100k-series
+  packs straight to disk; ``materialize_*`` is ``"".join`` of the stream.
 """
 from __future__ import annotations
 
 import math
 import random
 import re
+from array import array
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass, field
 from typing import Any, Optional
 
@@ -125,6 +140,13 @@ def _fmt(v: float) -> str:
     return s
 
 
+def _fmt_many(values: Sequence[float]) -> list[str]:
+    """``[_fmt(v) for v in values]`` without the per-sample call (materialization
+    hot path; same formatting, same "-0" → "0" fold)."""
+    return ["0" if t in ("", "-0") else t
+            for t in [f.rstrip("0").rstrip(".") for f in map("{:.6f}".format, values)]]
+
+
 def _fmt_labels(labels: dict) -> str:
     """Render a label dict as a Prometheus label set, keys sorted for determinism."""
     if not labels:
@@ -364,7 +386,7 @@ class Series:
     """One output series with per-series provenance metadata."""
     metric: str
     labels: dict
-    samples: list  # list[Optional[float]] — None == gap (dropout)
+    samples: Sequence  # array('d') when gap-free; list[Optional[float]], None == gap (dropout)
     variant: str
     expects: str   # must_detect | informational | probe | companion
     signature_index: int
@@ -474,9 +496,25 @@ def _base_waveform(sig: dict) -> tuple[list[float], tuple[int, int]]:
     return values, (fault_start, fault_end)
 
 
-def _apply_noise(values: list[float], rng: random.Random, wobble: float,
-                 noise_kind: str) -> list[float]:
-    return [v + _noise_sample(rng, wobble, noise_kind) for v in values]
+def _apply_noise(values: Sequence[float], rng: random.Random, wobble: float,
+                 noise_kind: str) -> array:
+    """``v + _noise_sample(rng, wobble, noise_kind)`` per sample, with the
+    helper inlined (same draws, same float ops in the same order → bitwise
+    identical; the per-sample call overhead was the synthesis hot spot)."""
+    if wobble <= 0:
+        return array("d", [v + 0.0 for v in values])
+    rand = rng.random
+    if noise_kind == "uniform":
+        lo, span = -wobble, wobble - -wobble     # random.uniform: a + (b - a) * random()
+        return array("d", [v + (lo + span * rand()) for v in values])
+    sqrt, log, cos, two_pi = math.sqrt, math.log, math.cos, 2.0 * math.pi
+    sigma, neg = wobble / GAUSS_SIGMA_DIV, -wobble
+    out = array("d", values)
+    for i, v in enumerate(out):
+        u1 = 1.0 - rand()
+        raw = sqrt(-2.0 * log(u1)) * cos(two_pi * rand()) * sigma
+        out[i] = v + (neg if raw < neg else wobble if raw > wobble else raw)
+    return out
 
 
 def _apply_declared_dips(values: list[float], fw: tuple[int, int],
@@ -502,10 +540,9 @@ def _apply_declared_dips(values: list[float], fw: tuple[int, int],
         note = (f"oscillation: declared dip depth {depth} overshoots normal_level "
                 f"{normal} (raw dip {raw_dip}) → clamped to normal_level; "
                 f"check dip_detail.depth units")
-    out = list(values)
-    for i in range(fw[0], fw[1] + 1):
-        if (i - fw[0]) > 0 and (i - fw[0]) % period_steps == 0:
-            out[i] = dip_value
+    out = array("d", values)
+    for i in range(fw[0] + period_steps, fw[1] + 1, period_steps):
+        out[i] = dip_value
     return out, note
 
 
@@ -517,10 +554,9 @@ def _apply_probe_dips(values: list[float], fw: tuple[int, int], sig: dict) -> li
     Interior fault-window samples only (never the first) — keeps the fault onset
     a clean fault_level so onset/for-duration coverage isn't biased."""
     normal = float(sig["normal_level"])
-    out = list(values)
-    for i in range(fw[0], fw[1] + 1):
-        if (i - fw[0]) > 0 and (i - fw[0]) % PROBE_DIP_PERIOD_STEPS == 0:
-            out[i] = normal
+    out = array("d", values)
+    for i in range(fw[0] + PROBE_DIP_PERIOD_STEPS, fw[1] + 1, PROBE_DIP_PERIOD_STEPS):
+        out[i] = normal
     return out
 
 
@@ -529,25 +565,25 @@ def _apply_flapping(values: list[float], fw: tuple[int, int], sig: dict) -> list
     the fault window (realistic boolean perturbation replacing analog noise)."""
     normal = float(sig["normal_level"])
     fault = float(sig["fault_level"])
-    out = list(values)
+    out = array("d", values)
     for i in range(fw[0], fw[1] + 1):
         out[i] = fault if (i - fw[0]) % 2 == 0 else normal
     return out
 
 
-def _integrate_counter(rates: list[float]) -> tuple[list[float], int]:
+def _integrate_counter(rates: Sequence[float]) -> tuple[array, int]:
     """counter semantics: levels are per-second RATES → cumulative monotone
     samples. Negative instantaneous rates (noise/dip artifacts) clamp to 0.
     Returns (samples, clamp_count)."""
     cum = 0.0
-    out: list[float] = []
+    out = array("d", rates)
     clamped = 0
-    for r in rates:
+    for i, r in enumerate(out):
         if r < 0:
             r = 0.0
             clamped += 1
         cum += r * STEP
-        out.append(round(cum, 6))
+        out[i] = round(cum, 6)
     return out, clamped
 
 
@@ -560,10 +596,12 @@ def _dropout_indices(pattern: Any, length: int) -> set[int]:
     return {i for i in pattern if 0 <= i < length}
 
 
-def _apply_time_axis(samples: list, time_axis: dict) -> tuple[list, int, bool]:
+def _apply_time_axis(samples: Sequence[float],
+                     time_axis: dict) -> tuple[Sequence, int, bool]:
     """Apply dropout (None gaps) + staleness_tail truncation.
-    Returns (samples, gap_count, truncated)."""
-    out = list(samples)
+    Returns (samples, gap_count, truncated); samples stay ``array('d')`` unless
+    dropout introduced gaps (then a list with ``None`` at each gap)."""
+    out = samples
     truncated = False
     tail = time_axis.get("staleness_tail")
     if tail:
@@ -580,8 +618,12 @@ def _apply_time_axis(samples: list, time_axis: dict) -> tuple[list, int, bool]:
         out = out[:len(out) - cut]
         truncated = True
     drops = _dropout_indices(time_axis.get("dropout_pattern"), len(out))
-    for i in drops:
-        out[i] = None
+    if drops:
+        out = list(out)
+        for i in drops:
+            out[i] = None
+    elif not isinstance(out, array):
+        out = array("d", out)
     return out, len(drops), truncated
 
 
@@ -674,7 +716,7 @@ def synthesize_pack(pack: dict, seed: int = DEFAULT_SEED,
                 min_v = float(sig["min_value"])
                 clamped_n = sum(1 for v in values if v < min_v)
                 if clamped_n:
-                    values = [max(min_v, v) for v in values]
+                    values = array("d", [max(min_v, v) for v in values])
                     notes.append(
                         f"gauge: {clamped_n} sample(s) below min_value={min_v} "
                         f"clamped up (physical lower-bound guard)")
@@ -710,17 +752,21 @@ def synthesize_pack(pack: dict, seed: int = DEFAULT_SEED,
                     # numerator fires, NaN otherwise) — integrate to a
                     # cumulative ramp instead, mirroring _integrate_counter.
                     cum = 0.0
-                    comp_samples: list[Optional[float]] = []
+                    comp_samples: Sequence = []
                     for s in samples:
                         if s is None:
                             comp_samples.append(None)
                             continue
                         cum += comp_level * STEP
                         comp_samples.append(round(cum, 6))
+                    if isinstance(samples, array):
+                        comp_samples = array("d", comp_samples)
                     comp_notes.append(
                         "counter: companion level treated as a per-second rate, "
                         "integrated to a cumulative ramp (avoids rate()==0 → "
                         "ratio divide-by-zero)")
+                elif isinstance(samples, array):
+                    comp_samples = array("d", [comp_level]) * len(samples)
                 else:
                     comp_samples = [None if s is None else comp_level for s in samples]
                 out.append(Series(
@@ -744,7 +790,7 @@ def synthesize_pack(pack: dict, seed: int = DEFAULT_SEED,
 
 # ── Materializations ─────────────────────────────────────────────────
 
-def materialize_promtool(series_list: list[Series]) -> str:
+def stream_promtool(series_list: Sequence[Series]) -> Iterator[str]:
     """Materialization (a): promtool fixture fragment (``values:`` notation,
     ``_`` == gap). Reference only — divergence-explanation input, NOT the
     catch-rate authority (that is (b)/VM).
@@ -756,57 +802,86 @@ def materialize_promtool(series_list: list[Series]) -> str:
     MetricsQL engine difference instead of a data-fidelity artifact of this
     tool. So any series carrying jitter_s > 0 is masked to all-gap here
     (reference-only, no fabricated agreement); it can only be judged via
-    materialization (b) / vmalert-replay."""
-    lines = [
-        "# waveform materialization (a) — promtool fixture fragment",
-        "# role: Prometheus-behaviour REFERENCE only; catch-rate authority is materialization (b)/VM",
-        f"# step: {STEP}s, origin: index 0 == T0 ({T0} epoch seconds)",
-    ]
-    lines.append(f"interval: {STEP}s")
-    lines.append("input_series:")
+    materialization (b) / vmalert-replay.
+
+    Yields the header, then one newline-terminated chunk per series."""
+    yield (
+        "# waveform materialization (a) — promtool fixture fragment\n"
+        "# role: Prometheus-behaviour REFERENCE only; catch-rate authority is materialization (b)/VM\n"
+        f"# step: {STEP}s, origin: index 0 == T0 ({T0} epoch seconds)\n"
+        f"interval: {STEP}s\n"
+        "input_series:\n")
     for s in series_list:
-        lines.append(f"  - series: '{s.metric}{_fmt_labels(s.labels)}'")
+        head = f"  - series: '{s.metric}{_fmt_labels(s.labels)}'\n"
         if s.jitter_s > 0:
-            lines.append(
+            head += (
                 f"    # ⚠️ jitter_s={_fmt(s.jitter_s)}：promtool values: 記法無 "
                 "per-sample timestamp、結構上表達不了 jitter，此 series 全 gap"
-                "（不可對帳）；只能在物化 (b)（vm import / vmalert-replay）判定")
-            tokens = " ".join("_" for _ in s.samples)
+                "（不可對帳）；只能在物化 (b)（vm import / vmalert-replay）判定\n")
+            tokens = " ".join(["_"] * len(s.samples))
         else:
-            tokens = " ".join("_" if v is None else _fmt(v) for v in s.samples)
-        lines.append(f"    values: '{tokens}'")
-    return "\n".join(lines) + "\n"
+            tokens = " ".join(_fmt_many(s.samples) if isinstance(s.samples, array)
+                              else ["_" if v is None else _fmt(v) for v in s.samples])
+        yield f"{head}    values: '{tokens}'\n"
 
 
-def materialize_vm(series_list: list[Series]) -> str:
+def materialize_promtool(series_list: Sequence[Series]) -> str:
+    """Materialization (a) as one string — see ``stream_promtool``."""
+    return "".join(stream_promtool(series_list))
+
+
+def stream_vm(series_list: Sequence[Series]) -> Iterator[str]:
     """Materialization (b): Prometheus import text lines
     ``metric{labels} value ts_ms`` with absolute millisecond timestamps —
     the catch-rate authority. Jitter (when declared) applies here, drawn from
-    the per-series seeded stream; gaps are simply absent lines."""
-    lines = [
-        "# waveform materialization (b) — Prometheus import lines (absolute ts, ms)",
-        "# role: catch-rate authority (feeds VM / vmalert-replay)",
-        f"# step: {STEP}s, T0: {T0} epoch seconds",
-    ]
+    the per-series seeded stream; gaps are simply absent lines.
+
+    Yields the header, then one newline-terminated chunk per series (a
+    gap-only series yields nothing)."""
+    yield ("# waveform materialization (b) — Prometheus import lines (absolute ts, ms)\n"
+           "# role: catch-rate authority (feeds VM / vmalert-replay)\n"
+           f"# step: {STEP}s, T0: {T0} epoch seconds\n")
     for s in series_list:
-        rng = random.Random(f"{s.rng_key}|jitter")
-        label_str = _fmt_labels(s.labels)
-        last_ts_ms = -1
-        for idx, v in enumerate(s.samples):
-            offset = rng.uniform(-s.jitter_s, s.jitter_s) if s.jitter_s > 0 else 0.0
-            if v is None:
-                continue
-            ts_ms = int(round((T0 + idx * STEP + offset) * 1000))
-            # Defense-in-depth monotonicity guard: schema caps jitter_s below
-            # STEP/2 so jitter can never reorder samples, but a direct-lib caller
-            # or a future STEP change must never emit out-of-order timestamps —
-            # a non-monotone counter series reads as a phantom rate() reset and
-            # silently corrupts the catch-rate authority.
-            if ts_ms <= last_ts_ms:
-                ts_ms = last_ts_ms + 1
-            last_ts_ms = ts_ms
-            lines.append(f"{s.metric}{label_str} {_fmt(v)} {ts_ms}")
-    return "\n".join(lines) + "\n"
+        prefix = f"{s.metric}{_fmt_labels(s.labels)} "
+        present = [i for i, v in enumerate(s.samples) if v is not None]
+        values = _fmt_many([s.samples[i] for i in present])
+        if s.jitter_s > 0:
+            stamps = _jittered_ts_ms(s)
+        else:
+            # T0/STEP are integers, so int(round((T0 + idx*STEP) * 1000)) is
+            # exactly this and strictly increasing — no draws, no guard needed.
+            base_ms, step_ms = T0 * 1000, STEP * 1000
+            stamps = [base_ms + i * step_ms for i in present]
+        if present:
+            yield "".join([f"{prefix}{v} {ts}\n" for v, ts in zip(values, stamps)])
+
+
+def _jittered_ts_ms(s: Series) -> list[int]:
+    """Jittered ms timestamps of the non-gap samples of *s*. One draw per
+    sample index (gaps included), so the stream is independent of dropout."""
+    uniform = random.Random(f"{s.rng_key}|jitter").uniform
+    stamps = []
+    last_ts_ms = -1
+    for idx, v in enumerate(s.samples):
+        offset = uniform(-s.jitter_s, s.jitter_s)
+        if v is None:
+            continue
+        ts_ms = int(round((T0 + idx * STEP + offset) * 1000))
+        # Defense-in-depth monotonicity guard: schema caps jitter_s below
+        # STEP/2 so jitter can never reorder samples, but a direct-lib caller
+        # or a future STEP change must never emit out-of-order timestamps —
+        # a non-monotone counter series reads as a phantom rate() reset and
+        # silently corrupts the catch-rate authority.
+        if ts_ms <= last_ts_ms:
+            ts_ms = last_ts_ms + 1
+        last_ts_ms = ts_ms
+        stamps.append(ts_ms)
+    return stamps
+
+
+def materialize_vm(series_list: Sequence[Series]) -> str:
+    """Materialization (b) as one string — see ``stream_vm``."""
+    return "".join(stream_vm(series_list))
 
 
 def build_metadata(pack: dict, series_list: list[Series], seed: int, fanout: int) -> dict:
@@ -844,7 +919,7 @@ def build_metadata(pack: dict, series_list: list[Series], seed: int, fanout: int
                 "fault_class": s.fault_class,
                 "source": s.source,
                 "sample_count": len(s.samples),
-                "gap_count": sum(1 for v in s.samples if v is None),
+                "gap_count": s.samples.count(None),
                 "truncated": s.truncated,
                 "jitter_s": s.jitter_s,
                 # 可偵測故障窗（秒、相對窗起點；PR-3 temporal-match 血緣——語義見
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""Fleet-scale benchmark suite for the Python tooling (describe_tenant, blast_radius, routes, validate, policy, route resolve).
+
+Usage:
+    python3 scripts/tools/dx/bench_python_tools.py                       # 100 + 1000 tenants
+    python3 scripts/tools/dx/bench_python_tools.py --sizes 100,1000,10000 --count 3
+    python3 scripts/tools/dx/bench_python_tools.py --cases describe_tenant,generate_routes
+    python3 scripts/tools/dx/bench_python_tools.py -o .build/bench-python.txt
+    make bench-python ARGS="--sizes 10000"
+
+Why this exists
+---------------
+The Go side has had nightly trend gating since #60 / ADR-032, but the
+Python tools that run on every PR (describe_tenant → blast_radius, the
+routing generator, validate_config, policy_engine) had no harness at all.
+A quadratic loop in any of them only showed up when a 4k-tenant customer
+complained. This suite times each tool's core *function* (not its CLI —
+argparse and JSON rendering are not what regresses) against deterministic
+fleet-scale fixtures.
+
+Fixtures
+--------
+Two fixtures per size, both seeded (``--seed``, default 42) so every night
+measures byte-identical input:
+
+  - ``synthetic-v2`` (``generate_tenant_fixture.generate_synthetic_v2``) —
+    hierarchical, Zipf-sized tenants; feeds the tools that walk the
+    ADR-016/017 tree (describe_tenant, blast_radius, policy_engine).
+  - ``flat`` (``generate_tenant_fixture.generate_flat``) — the routing
+    generator and ``validate_config --check schema`` are flat readers
+    (#1339), so a hierarchical tree would measure an empty directory.
+
+Fixtures are cached under ``--fixture-dir`` keyed by (layout, size, seed);
+10k tenants take ~20s to write and are reused across runs.
+
+Cold vs warm
+------------
+Every (case, size) sample runs in a FRESH child interpreter:
+
+  - ``_Cold`` — the first call in that process: module-level caches
+    (``_grar_validate._PLATFORM_IDENTITY_CACHE``, ``lru_cache``s, PyYAML's
+    resolver tables) are empty. The OS page cache is NOT dropped — that
+    needs root — so "cold" means process-cold, not disk-cold.
+  - ``_Warm`` — the mean of ``--warm-iters`` further calls in the same
+    process.
+
+Peak RSS is the child's ``ru_maxrss`` after all its calls, so it is per
+case and not polluted by the driver or by other cases.
+
+Output format
+-------------
+Go ``testing`` bench text — the exact lines ``analyze_bench_history``
+(``_BENCH_RE`` / ``_CPU_RE``) parses, so appending this output to
+``bench-baseline.txt`` puts the Python tools under the same nightly
+trend watchdog::
+
+    cpu: AMD EPYC 7763 64-Core Processor
+    BenchmarkPyDescribeTenantAll_1000_Cold-4     1   812345678 ns/op   154321 peak-rss-KB
+    BenchmarkPyDescribeTenantAll_1000_Warm-4     3   401234567 ns/op   160012 peak-rss-KB
+
+Names are ``BenchmarkPy<Case>_<size>_<Cold|Warm>``; the ``Py`` prefix keeps
+them from ever colliding with a Go benchmark name.
+
+Exit codes: 0 ok, 1 a case crashed (its rows are omitted, stderr says why),
+2 bad arguments.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+_THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _THIS_DIR)  # Docker flat layout
+sys.path.insert(0, os.path.join(_THIS_DIR, ".."))  # Repo subdir layout
+# ops/ holds four of the five tools under test; the flat Docker layout has
+# them beside this file already, so the insert is a no-op there.
+sys.path.insert(0, os.path.join(_THIS_DIR, "..", "ops"))
+from _lib_compat import try_utf8_stdout  # noqa: E402
+from _lib_exitcodes import EXIT_OK, EXIT_VIOLATION  # noqa: E402
+
+DEFAULT_SIZES = (100, 1000)
+DEFAULT_SEED = 42
+
+# Per-child wall-clock ceiling. 10k tenants × 6 calls of describe --all is
+# the slowest combination (~4 min on a 2-vCPU runner); anything beyond
+# 15 min is a hang, not a measurement.
+CHILD_TIMEOUT_S = 900
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def fixture_paths(fixture_dir: Path, size: int, seed: int) -> dict[str, Path]:
+    """Return the {layout: conf.d path} pair for one fixture size."""
+    base = fixture_dir / f"seed{seed}"
+    return {
+        "synthetic-v2": base / f"synthetic-v2-{size}" / "conf.d",
+        "flat": base / f"flat-{size}" / "conf.d",
+    }
+
+
+def ensure_fixtures(fixture_dir: Path, size: int, seed: int) -> dict[str, Path]:
+    """Generate (or reuse) the deterministic fixtures for *size* tenants.
+
+    A fixture is reused only when its completion marker exists — a run that
+    was killed half-way through writing 10k files must not be benchmarked
+    as if it were whole.
+    """
+    import generate_tenant_fixture as gtf
+
+    paths = fixture_paths(fixture_dir, size, seed)
+    builders = {
+        "synthetic-v2": gtf.generate_synthetic_v2,
+        "flat": gtf.generate_flat,
+    }
+    for layout, conf_d in paths.items():
+        marker = conf_d.parent / ".complete"
+        if marker.is_file():
+            continue
+        if conf_d.exists():
+            import shutil
+            shutil.rmtree(conf_d)
+        # The generator narrates to stdout; keep that out of the bench stream.
+        with contextlib.redirect_stdout(io.StringIO()):
+            builders[layout](size, conf_d, True, seed)
+        marker.write_text(f"{layout} {size} {seed}\n", encoding="utf-8", newline="\n")
+    return paths
+
+
+# ---------------------------------------------------------------------------
+# Cases — each returns a zero-arg callable; setup outside it is NOT timed
+# ---------------------------------------------------------------------------
+
+def _describe_all(conf_d: Path) -> dict[str, dict]:
+    """`describe_tenant --all` minus JSON rendering."""
+    import describe_tenant
+
+    scanner = describe_tenant.ConfDScanner(conf_d)
+    return {tid: scanner.source_info(tid) for tid in sorted(scanner.tenants)}
+
+
+def _case_describe_tenant(fx: dict[str, Path]) -> Callable[[], object]:
+    conf_d = fx["synthetic-v2"]
+    return lambda: _describe_all(conf_d)
+
+
+def _mutate_for_pr(base: dict[str, dict]) -> dict[str, dict]:
+    """Deterministic "PR side": every 20th tenant gets a tier-A routing change
+    and every 7th a threshold bump — roughly the mix a fleet-wide defaults
+    edit produces."""
+    import copy
+    import describe_tenant
+
+    pr = copy.deepcopy(base)
+    for i, tid in enumerate(sorted(pr)):
+        eff = pr[tid]["effective_config"]
+        touched = False
+        if i % 20 == 0:
+            eff.setdefault("_routing", {})["group_wait"] = "45s"
+            touched = True
+        if i % 7 == 0:
+            eff["_bench_threshold"] = str(1000 + i)
+            touched = True
+        if touched:
+            pr[tid]["merged_hash"] = describe_tenant._canonical_hash(eff)
+    return pr
+
+
+def _case_blast_radius(fx: dict[str, Path]) -> Callable[[], object]:
+    import blast_radius
+
+    base = _describe_all(fx["synthetic-v2"])
+    pr = _mutate_for_pr(base)
+
+    def run() -> object:
+        report = blast_radius.compute_blast_radius(base, pr)
+        return blast_radius.generate_pr_comment(report)
+    return run
+
+
+def _case_generate_routes(fx: dict[str, Path]) -> Callable[[], object]:
+    import generate_alertmanager_routes as gen
+
+    conf_d = str(fx["flat"])
+
+    def run() -> object:
+        # Schema / policy warnings go to stderr from inside the loader; they
+        # are part of the work being timed but not part of the bench stream.
+        with contextlib.redirect_stderr(io.StringIO()):
+            routing, dedup, _sw, enforced, _meta = gen.load_tenant_configs(conf_d)
+            routes, receivers, _rw = gen.generate_routes(
+                routing, enforced_routing=enforced)
+            inhibits, _dw = gen.generate_inhibit_rules(dedup)
+        return routes, receivers, inhibits
+    return run
+
+
+def _case_validate_config(fx: dict[str, Path]) -> Callable[[], object]:
+    import validate_config
+
+    conf_d = str(fx["flat"])
+
+    def run() -> object:
+        with contextlib.redirect_stderr(io.StringIO()):
+            return (validate_config.check_yaml_syntax(conf_d),
+                    validate_config.check_schema(conf_d))
+    return run
+
+
+def _bench_policies() -> list:
+    """A fixed rule set exercising every operator family once."""
+    from policy_engine import PolicyRule
+
+    return [
+        PolicyRule(name="routing-required", description="", target="_routing",
+                   operator="required", severity="warning"),
+        PolicyRule(name="no-silent-all", description="", target="_silent_mode",
+                   operator="not_equals", value="all"),
+        PolicyRule(name="group-wait-floor", description="",
+                   target="_routing.group_wait", operator="gte", value="10s"),
+        PolicyRule(name="tier-enum", description="", target="_metadata.tier",
+                   operator="one_of", value=["gold", "silver", "bronze"]),
+        PolicyRule(name="receiver-type", description="",
+                   target="_routing.receiver.type", operator="matches",
+                   value="^(webhook|slack|email|teams|pagerduty)$",
+                   when={"target": "_routing", "operator": "required"}),
+    ]
+
+
+def _case_policy_engine(fx: dict[str, Path]) -> Callable[[], object]:
+    import policy_engine
+
+    rules = _bench_policies()
+    configs = {tid: info["effective_config"]
+               for tid, info in _describe_all(fx["synthetic-v2"]).items()}
+    return lambda: policy_engine.evaluate_policies(rules, configs)
+
+
+def _case_route_resolve(fx: dict[str, Path]) -> Callable[[], object]:
+    import generate_alertmanager_routes as gen
+    from _grar_simulate import simulate_alerts
+
+    with contextlib.redirect_stderr(io.StringIO()):
+        routing, dedup, _sw, enforced, _meta = gen.load_tenant_configs(str(fx["flat"]))
+        routes, receivers, _rw = gen.generate_routes(routing, enforced_routing=enforced)
+        inhibits, _dw = gen.generate_inhibit_rules(dedup)
+    config = gen.merge_into_base(gen.load_base_config(None), routes, receivers, inhibits)
+    # One critical + one warning per tenant: every route is resolved and every
+    # severity-dedup rule has a live source.
+    alerts = [{"tenant": t, "alertname": "BenchAlert", "metric_group": "cpu",
+               "severity": sev}
+              for t in sorted(routing) for sev in ("critical", "warning")]
+    return lambda: simulate_alerts(config, alerts)
+
+
+# case key → (bench name stem, factory). Order is the output order.
+CASES: dict[str, tuple[str, Callable[[dict[str, Path]], Callable[[], object]]]] = {
+    "describe_tenant": ("DescribeTenantAll", _case_describe_tenant),
+    "blast_radius": ("BlastRadius", _case_blast_radius),
+    "generate_routes": ("GenerateRoutes", _case_generate_routes),
+    "validate_config": ("ValidateConfig", _case_validate_config),
+    "policy_engine": ("PolicyEngine", _case_policy_engine),
+    "route_resolve": ("RouteResolve", _case_route_resolve),
+}
+
+
+# ---------------------------------------------------------------------------
+# Child — one (case, size) sample in a fresh interpreter
+# ---------------------------------------------------------------------------
+
+def peak_rss_kb() -> int:
+    """This process's peak RSS in KiB (0 where ``resource`` is unavailable)."""
+    try:
+        import resource
+    except ImportError:  # Windows dev hosts
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure(run: Callable[[], object], warm_iters: int) -> dict[str, object]:
+    """Time one cold call then *warm_iters* warm calls of *run*."""
+    t0 = time.perf_counter_ns()
+    run()
+    cold_ns = time.perf_counter_ns() - t0
+
+    warm_total = 0
+    for _ in range(warm_iters):
+        t0 = time.perf_counter_ns()
+        run()
+        warm_total += time.perf_counter_ns() - t0
+    return {
+        "cold_ns": cold_ns,
+        "warm_ns": warm_total / warm_iters if warm_iters else 0.0,
+        "warm_iters": warm_iters,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def _child_main(case: str, fixtures_json: str, warm_iters: int) -> int:
+    fx = {k: Path(v) for k, v in json.loads(fixtures_json).items()}
+    run = CASES[case][1](fx)
+    print(json.dumps(measure(run, warm_iters)))
+    return EXIT_OK
+
+
+def run_sample(case: str, fx: dict[str, Path], warm_iters: int) -> dict[str, object]:
+    """Spawn a fresh interpreter for one sample and return its measurement."""
+    cmd = [
+        sys.executable, os.path.abspath(__file__),
+        "--_child", case,
+        "--_fixtures", json.dumps({k: str(v) for k, v in fx.items()}),
+        "--warm-iters", str(warm_iters),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True,
+                          encoding="utf-8", timeout=CHILD_TIMEOUT_S)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1]
+                           if proc.stderr.strip() else f"exit {proc.returncode}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+def cpu_model() -> str:
+    """Best-effort CPU model string for the ``cpu:`` header line.
+
+    analyze_bench_history stratifies the trend watchdog by this string
+    (#1396), so it must match what ``go test`` prints on the same host —
+    both read ``model name`` from /proc/cpuinfo on Linux.
+    """
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine() or "unknown"
+
+
+def header_lines() -> list[str]:
+    """Go-bench suite header, so the file stands alone or appended."""
+    return [
+        f"goos: {sys.platform}",
+        f"goarch: {platform.machine().lower()}",
+        f"pkg: scripts/tools (python {platform.python_version()})",
+        f"cpu: {cpu_model()}",
+    ]
+
+
+def bench_lines(stem: str, size: int, sample: dict[str, object], procs: int) -> list[str]:
+    """Render one sample as its _Cold and _Warm bench rows."""
+    rss = sample["peak_rss_kb"]
+    rows = [f"BenchmarkPy{stem}_{size}_Cold-{procs}\t1\t{sample['cold_ns']} ns/op\t{rss} peak-rss-KB"]
+    if sample["warm_iters"]:
+        rows.append(
+            f"BenchmarkPy{stem}_{size}_Warm-{procs}\t{sample['warm_iters']}\t"
+            f"{int(sample['warm_ns'])} ns/op\t{rss} peak-rss-KB")
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _parse_sizes(raw: str) -> list[int]:
+    try:
+        sizes = [int(s) for s in raw.split(",") if s.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"--sizes expects comma-separated integers, got {raw!r}")
+    if not sizes or any(n <= 0 for n in sizes):
+        raise argparse.ArgumentTypeError(f"--sizes must be positive integers, got {raw!r}")
+    return sizes
+
+
+def _parse_cases(raw: str) -> list[str]:
+    cases = [c.strip() for c in raw.split(",") if c.strip()]
+    unknown = [c for c in cases if c not in CASES]
+    if unknown or not cases:
+        raise argparse.ArgumentTypeError(
+            f"unknown case(s) {unknown}; valid: {', '.join(CASES)}")
+    return cases
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Python tools' core functions on deterministic "
+                    "N-tenant fixtures; emits Go bench text for analyze_bench_history.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--sizes", type=_parse_sizes,
+                        default=list(DEFAULT_SIZES),
+                        help="Comma-separated tenant counts (default: 100,1000)")
+    parser.add_argument("--cases", type=_parse_cases, default=list(CASES),
+                        help=f"Comma-separated cases (default: all — {','.join(CASES)})")
+    parser.add_argument("--count", type=int, default=1,
+                        help="Fresh-process samples per (case, size), like go test -count (default: 1)")
+    parser.add_argument("--warm-iters", type=int, default=3,
+                        help="Warm calls per sample after the cold call (default: 3; 0 = cold only)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED,
+                        help=f"Fixture RNG seed (default: {DEFAULT_SEED})")
+    parser.add_argument("--fixture-dir", default=None,
+                        help="Fixture cache directory (default: <tmp>/da-bench-python-fixtures)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Write bench text here instead of stdout")
+    # Internal: child-process entry. Hidden from --help.
+    parser.add_argument("--_child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--_fixtures", default=None, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    try_utf8_stdout()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.count < 1 or args.warm_iters < 0:
+        parser.error("--count must be >= 1 and --warm-iters >= 0")
+
+    if args._child:
+        if args._child not in CASES or not args._fixtures:
+            parser.error("internal --_child invocation is malformed")
+        return _child_main(args._child, args._fixtures, args.warm_iters)
+
+    fixture_dir = Path(args.fixture_dir) if args.fixture_dir else \
+        Path(tempfile.gettempdir()) / "da-bench-python-fixtures"
+    procs = os.cpu_count() or 1
+
+    lines = header_lines()
+    failed = False
+    for size in args.sizes:
+        print(f"[bench-python] fixtures: {size} tenants (seed {args.seed})", file=sys.stderr)
+        fx = ensure_fixtures(fixture_dir, size, args.seed)
+        for case in args.cases:
+            stem = CASES[case][0]
+            for _ in range(args.count):
+                try:
+                    sample = run_sample(case, fx, args.warm_iters)
+                except (RuntimeError, subprocess.TimeoutExpired, ValueError) as exc:
+                    print(f"[bench-python] {case} @ {size}: FAILED — {exc}", file=sys.stderr)
+                    failed = True
+                    break
+                lines.extend(bench_lines(stem, size, sample, procs))
+
+    text = "\n".join(lines) + "\n"
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text, encoding="utf-8", newline="\n")
+        print(f"[bench-python] wrote {args.output}", file=sys.stderr)
+    else:
+        sys.stdout.write(text)
+    return EXIT_VIOLATION if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
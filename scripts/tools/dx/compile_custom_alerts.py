@@ -17,6 +17,12 @@ the tree the committed pack is compiled from since S3b. The source MUST be the
 conf.d the exporter serves, or recipe_id will not match emit. The docs example
 tree (`rule-packs/recipes/examples/conf.d/`) stays reachable via `--config-dir`.
 
+Recompiles are incremental: per-file `_custom_alerts` extracts, per-shape
+emitted rules and per-rule YAML are served from a content-addressed cache
+(custom_alerts/cache.py; `DA_CUSTOM_ALERTS_CACHE=off` disables the disk layer),
+so only changed files are re-parsed and only changed shapes re-emitted. The
+output is byte-identical to an uncached compile.
+
 `--check` regenerates in memory and SEMANTICALLY compares against the committed
 pack (via check_rulepack_sync), so a stale / hand-edited pack is a hard failure.
 
@@ -50,6 +56,7 @@ except Exception:  # pragma: no cover
 
 # import the compiler package (scripts/tools/dx/custom_alerts/)
 sys.path.insert(0, _THIS_DIR)
+from custom_alerts import cache as _cache  # noqa: E402
 from custom_alerts import loader as _loader  # noqa: E402
 from custom_alerts import recipes as _recipes  # noqa: E402
 from custom_alerts import shape as _shape  # noqa: E402
@@ -173,7 +180,8 @@ def build_pack(config_dir: Path,
     alerts: List[dict] = []
     info: List[dict] = []
     for shape in shapes:
-        rec, alr = _recipes.emit_shape(shape)
+        rec, alr = _cache.cached("emit", _cache.digest(shape),
+                                 lambda: [list(r) for r in _recipes.emit_shape(shape)])
         recording.extend(rec)
         alerts.extend(alr)
         # D1 (ADR-024 §8): a static lifecycle-info series per shape, so SRE can join
@@ -233,12 +241,42 @@ def _render(groups: List[dict]) -> str:
         "# Rule count = SHAPE count (vectorized, not per-tenant; ADR-024 §2b).\n"
         "# ============================================================\n"
     )
-    body = yaml.dump(
-        {"groups": groups},
+    return header + "groups:\n" + "".join(_render_group(g) for g in groups)
+
+
+def _dump(doc) -> str:
+    return yaml.dump(
+        doc,
         Dumper=_BlockDumper,
         sort_keys=False, default_flow_style=False, allow_unicode=True, width=10_000,
     )
-    return header + body
+
+
+_GROUPS_PREFIX = "groups:\n"
+_RULE_PREFIX = "groups:\n- rules:\n"
+_RULES_STUB = "  - 0\n"
+
+
+def _render_rule(rule: dict) -> str:
+    """One rule's lines exactly as the whole-pack dump writes them (the nesting
+    depth is the same in a one-rule pack), cached per rule content."""
+    def produce() -> str:
+        return _dump({"groups": [{"rules": [rule]}]})[len(_RULE_PREFIX):]
+    return _cache.cached("yaml", _cache.digest(rule), produce)
+
+
+def _render_group(group: dict) -> str:
+    """A group's lines of the `groups:` sequence. Dumped as a head (every key
+    with a placeholder `rules`) plus the per-rule fragments, so a recompile
+    only dumps the rules that changed — instead of PyYAML re-serialising the
+    whole pack."""
+    rules = group.get("rules")
+    if not rules or not isinstance(rules, list) or list(group)[-1] != "rules":
+        return _dump({"groups": [group]})[len(_GROUPS_PREFIX):]
+    head = _dump({"groups": [{**group, "rules": [0]}]})
+    if not head.endswith(_RULES_STUB):  # pragma: no cover — defensive
+        return _dump({"groups": [group]})[len(_GROUPS_PREFIX):]
+    return head[len(_GROUPS_PREFIX):-len(_RULES_STUB)] + "".join(_render_rule(r) for r in rules)
 
 
 def main() -> int:
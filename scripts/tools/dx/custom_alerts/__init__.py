@@ -11,4 +11,6 @@ Modules:
   recipes — the 7 core recipe PromQL emitters
             (threshold/rate/ratio/absence/p99/forecast/slo_burn_rate)
   loader  — conf.d tree walk + _custom_alerts inheritance + per-tenant cap count
+  cache   — content-addressed compile cache (per-file extracts, per-shape emitted
+            rules, per-rule YAML) for incremental recompiles
 """
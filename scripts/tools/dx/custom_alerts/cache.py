@@ -0,0 +1,171 @@
+"""Content-addressed compile cache — incremental custom-alerts compiles.
+
+A full compile YAML-parses every conf.d file, emits every shape and dumps the
+whole pack; on a large tree the two PyYAML passes are nearly all of it, and
+CI / pre-commit / recipe-preview recompile trees that changed by a file or
+two. Three layers, each keyed by a hash of its INPUT so an edit is simply a
+miss (no invalidation step, no mtime trust):
+
+  - ``defaults`` / ``tenants`` — sha256(file bytes) → the ``_custom_alerts``
+               extract of one conf.d file (a ``_defaults.yaml`` list, or the
+               [tenant, own list] pairs of a tenant file)
+  - ``emit``  — digest(shape dict) → ``emit_shape``'s (recording, alerts)
+  - ``yaml``  — digest(rule dict) → the rule's block-YAML lines, exactly as
+               the pack dump writes them
+
+Entries are JSON, held in a bounded in-process LRU and on disk under
+``<cache dir>/v<CACHE_VERSION>-<fingerprint>/<layer>/<key>.json``. The
+fingerprint hashes the compiler's own sources (this package +
+compile_custom_alerts.py) and the PyYAML version, so editing a recipe
+emitter can never serve a stale rule. A hit is returned as a fresh object
+(``json.loads``), never shared with the cache; a value that does not survive
+a JSON round trip unchanged (YAML dates, NaN) is recomputed every time
+rather than cached lossily. The result is byte-identical to an uncached
+compile — tests/dx/test_custom_alerts_cache.py pins that.
+
+Cache dir: ``$DA_CUSTOM_ALERTS_CACHE``, else ``$XDG_CACHE_HOME/da-tools/
+custom-alerts`` (``~/.cache/...``); ``DA_CUSTOM_ALERTS_CACHE=off`` disables
+the disk layer (directory and atomic writes: ``_lib_cache``). Every disk
+failure degrades to a recompute.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import yaml
+
+# _lib_cache lives in scripts/tools/ (./core in the recipe-preview image).
+_TOOLS_DIR = str(Path(__file__).resolve().parents[2])
+if _TOOLS_DIR not in sys.path:
+    sys.path.append(_TOOLS_DIR)
+from _lib_cache import tool_cache_dir, write_text_atomic  # noqa: E402
+
+#: Entry schema version (part of the cache subdirectory name).
+CACHE_VERSION = 1
+
+#: Cache directory override; ``off`` / ``0`` / ``none`` disables the disk cache.
+CACHE_ENV = "DA_CUSTOM_ALERTS_CACHE"
+
+# In-process layer. Bounded: recipe-preview is long-lived and sees an
+# open-ended stream of recipes.
+_MEMO_MAX = 16384
+_memo: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+_memo_lock = threading.Lock()
+_fingerprint: Optional[str] = None
+
+
+def fingerprint() -> str:
+    """Hash of the compiler sources + PyYAML version (cache namespace)."""
+    global _fingerprint
+    if _fingerprint is None:
+        here = Path(__file__).resolve().parent
+        sources = sorted(here.glob("*.py")) + [here.parent / "compile_custom_alerts.py"]
+        h = hashlib.sha256(f"v{CACHE_VERSION} yaml {yaml.__version__}".encode())
+        for src in sources:
+            try:
+                h.update(src.name.encode() + b"\0" + src.read_bytes())
+            except OSError:
+                h.update(src.name.encode() + b"\0missing")
+        _fingerprint = h.hexdigest()
+    return _fingerprint
+
+
+def cache_dir() -> Optional[str]:
+    """Versioned on-disk cache directory, or None when disabled."""
+    return tool_cache_dir(CACHE_ENV, "custom-alerts",
+                          f"v{CACHE_VERSION}-{fingerprint()[:16]}")
+
+
+def _encode(value: Any, **kw: Any) -> Optional[str]:
+    """JSON text for *value*, or None if it would not round-trip unchanged
+    (tuples, non-str keys, dates, NaN) — such a value is never cached, and
+    never keyed, so two inputs that dump differently cannot share a key."""
+    try:
+        text = json.dumps(value, ensure_ascii=False, allow_nan=False, **kw)
+    except (TypeError, ValueError):
+        return None
+    return text if json.loads(text) == value else None
+
+
+def digest(value: Any) -> Optional[str]:
+    """Order-sensitive content key for a JSON-able value; None if it is not."""
+    text = _encode(value, separators=(",", ":"))
+    return None if text is None else hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _disk_path(layer: str, key: str) -> Optional[str]:
+    d = cache_dir()
+    return None if d is None else os.path.join(d, layer, f"{key}.json")
+
+
+def _read(layer: str, key: str) -> Optional[str]:
+    with _memo_lock:
+        text = _memo.get((layer, key))
+        if text is not None:
+            _memo.move_to_end((layer, key))
+            return text
+    path = _disk_path(layer, key)
+    if path is None:
+        return None
+    try:
+        with open(path, encoding="utf-8") as fh:
+            text = fh.read()
+        json.loads(text)
+    except (OSError, ValueError):
+        return None
+    _remember(layer, key, text)
+    return text
+
+
+def _remember(layer: str, key: str, text: str) -> None:
+    with _memo_lock:
+        _memo[(layer, key)] = text
+        while len(_memo) > _MEMO_MAX:
+            _memo.popitem(last=False)
+
+
+def _write(layer: str, key: str, text: str) -> None:
+    _remember(layer, key, text)
+    path = _disk_path(layer, key)
+    if path is not None:
+        write_text_atomic(path, text)
+
+
+def lookup(layer: str, key: Optional[str]) -> Optional[Any]:
+    """The cached value for *key* (a fresh object), or None on a miss."""
+    if key is None:
+        return None
+    text = _read(layer, key)
+    return None if text is None else json.loads(text)
+
+
+def store(layer: str, key: Optional[str], value: Any) -> Any:
+    """Cache *value* under *key* if it round-trips through JSON; returns an
+    object independent of the cached copy."""
+    text = None if key is None else _encode(value)
+    if text is None:
+        return value
+    _write(layer, key, text)
+    return json.loads(text)
+
+
+def cached(layer: str, key: Optional[str], produce: Callable[[], Any]) -> Any:
+    """``lookup`` or, on a miss, ``store(produce())``. A None key (input not
+    JSON-able) always produces."""
+    hit = lookup(layer, key)
+    if hit is not None:
+        return hit
+    return store(layer, key, produce())
+
+
+def clear_memo() -> None:
+    """Drop the in-process layer (tests; long-lived processes)."""
+    with _memo_lock:
+        _memo.clear()
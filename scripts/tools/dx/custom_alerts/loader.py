@@ -12,9 +12,14 @@ auto-scopes because only declaring tenants will have a `user_threshold{recipe_id
 series (emitted by the exporter in S3). The tree walk here exists for validation
 (name/severity uniqueness, cap counting) and to compute each shape's severity
 union (which per-severity branches to emit).
+
+Each conf.d file's `_custom_alerts` extract is served from the content-addressed
+compile cache (cache.py) when the file's bytes are unchanged, so a recompile
+only YAML-parses the files that changed.
 """
 from __future__ import annotations
 
+import hashlib
 import os
 from collections import defaultdict
 from pathlib import Path
@@ -22,6 +27,7 @@ from typing import Dict, List, Tuple
 
 import yaml
 
+from . import cache as _cache
 from . import shape as _shape
 
 
@@ -40,8 +46,30 @@ class CustomAlertConfigError(ValueError):
 MAX_CUSTOM_RECIPES_DEFAULT = 20
 
 
-def _load_yaml(path: Path) -> dict:
-    return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+def _read_conf(path: Path, layer: str):
+    """(key, cached extract | None, parsed doc | None) for one conf.d file.
+
+    A cache hit never parses. On a miss the doc is decoded as `read_text` would
+    (UTF-8, universal newlines) and raises what the parse raises, so the
+    callers' quarantine handling is unchanged; the caller extracts and
+    `_cache.store`s under `key`.
+    """
+    raw = path.read_bytes()
+    key = hashlib.sha256(raw).hexdigest()
+    hit = _cache.lookup(layer, key)
+    if hit is not None:
+        return key, hit, None
+    text = raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    return key, None, yaml.safe_load(text) or {}
+
+
+def _tenant_alerts(data: dict) -> List[list]:
+    """[tenant, own `_custom_alerts`] pairs of a tenant file, in file order."""
+    tenants = data.get("tenants") or {}
+    if not isinstance(tenants, dict):
+        return []
+    return [[tenant, cfg.get("_custom_alerts") or []]
+            for tenant, cfg in tenants.items() if isinstance(cfg, dict)]
 
 
 def _file_skip(origin: str, exc: Exception) -> dict:
@@ -62,13 +90,14 @@ def _dir_defaults_alerts(config_dir: Path, file_errors: List[dict]) -> Dict[Path
         if "_defaults.yaml" in files:
             p = Path(root) / "_defaults.yaml"
             try:
-                data = _load_yaml(p)
+                key, alerts, data = _read_conf(p, "defaults")
             except Exception as exc:  # noqa: BLE001 — malformed file quarantined, not fatal
                 file_errors.append(_file_skip(str(p.relative_to(config_dir)), exc))
                 continue
-            alerts = data.get("_custom_alerts") or []
+            if alerts is None:
+                alerts = _cache.store("defaults", key, list(data.get("_custom_alerts") or []))
             if alerts:
-                out[Path(root).resolve()] = list(alerts)
+                out[Path(root).resolve()] = alerts
     return out
 
 
@@ -113,19 +142,17 @@ def collect_instances(config_dir: Path) -> Tuple[List[Tuple[str, dict, str, bool
         if path.name == "_defaults.yaml":
             continue
         try:
-            data = _load_yaml(path)
+            key, entries, data = _read_conf(path, "tenants")
         except Exception as exc:  # noqa: BLE001 — malformed file quarantined, not fatal
             file_errors.append(_file_skip(str(path.relative_to(config_dir)), exc))
             continue
-        tenants = data.get("tenants") or {}
-        if not isinstance(tenants, dict):
+        if entries is None:
+            entries = _cache.store("tenants", key, _tenant_alerts(data))
+        if not entries:
             continue
         inherited = _inherited_for(path.parent, config_dir, dir_alerts)
-        for tenant, cfg in tenants.items():
-            if not isinstance(cfg, dict):
-                continue
-            own = cfg.get("_custom_alerts") or []
-            rel = path.relative_to(config_dir)
+        rel = path.relative_to(config_dir)
+        for tenant, own in entries:
             for inst in inherited:
                 triples.append((tenant, inst, f"{rel} (inherited _defaults.yaml)", False))
             for inst in own:
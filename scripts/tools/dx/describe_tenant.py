@@ -30,6 +30,7 @@ sys.path.insert(0, str(_THIS_DIR))
 sys.path.insert(0, os.path.join(str(_THIS_DIR), ".."))
 from _lib_compat import try_utf8_stdout  # noqa: E402
 from _lib_exitcodes import EXIT_CALLER_ERROR  # noqa: E402
+from _lib_profile import span  # noqa: E402
 
 try:
     import yaml
@@ -95,7 +96,8 @@ def _load_yaml(path: Path) -> dict:
     with open(path, "r", encoding="utf-8") as f:
         content = f.read()
     if yaml:
-        return yaml.safe_load(content) or {}
+        with span("io.load_yaml"):
+            return yaml.safe_load(content) or {}
     # Minimal fallback — only works for simple flat YAML
     raise RuntimeError(f"PyYAML is required for describe-tenant. Install: pip install pyyaml")
 
@@ -132,8 +134,10 @@ class ConfDScanner:
         # Set when the compiler resolver raised — output is degraded to the
         # deep_merge (REPLACE) fallback for `_custom_alerts`; callers can detect it.
         self.custom_alerts_resolution_error: str | None = None
-        self._scan()
-        self._resolve_custom_alerts()
+        with span("describe.scan"):
+            self._scan()
+        with span("describe.custom_alerts"):
+            self._resolve_custom_alerts()
 
     def _resolve_custom_alerts(self) -> None:
         """Build the per-tenant `_custom_alerts` UNION resolution via the compiler's
@@ -274,9 +278,11 @@ class ConfDScanner:
             raise KeyError(f"Tenant '{tenant_id}' not found")
 
         chain = self.defaults_chain[tenant_id]
-        effective = self.effective_config(tenant_id)
-        source_h = _file_hash(self.tenant_files[tenant_id])
-        merged_h = _canonical_hash(effective)
+        with span("describe.merge"):
+            effective = self.effective_config(tenant_id)
+        with span("describe.hash"):
+            source_h = _file_hash(self.tenant_files[tenant_id])
+            merged_h = _canonical_hash(effective)
 
         return {
             "tenant_id": tenant_id,
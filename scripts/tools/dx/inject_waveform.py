@@ -354,21 +354,28 @@ def attribute_alerts(records: list[dict], alerts: list[dict]) -> list[dict]:
     開火但歸因不明」（indeterminate），**不得**因 signature 找不到對應 alert 而
     逕判 0% catch（假 FN）。出路＝人工驗證；或（僅供歸因診斷）暫時把
     ``waveform_signature`` 加入該規則的 ``by()``/``on()`` 子句——修改後規則 ≠
-    生產規則，其結果只用於歸因、不得回寫 catch-rate。"""
+    生產規則，其結果只用於歸因、不得回寫 catch-rate。
+
+    複雜度 O(records + alerts)：records 先依 identity 三元組建 dict 索引（非 fanout
+    紀錄 series 位以 None 入鍵），每筆 alert 只查自己的鍵與 ``series=None`` 鍵；
+    topology 比對用的 (key, value) 對在建索引時每筆紀錄算一次。"""
+    index: dict[tuple, list[tuple[dict, tuple]]] = {}
+    for rec in records:
+        topology = tuple((k, v) for k, v in rec["labels"].items()
+                         if k not in RESERVED_LABEL_KEYS)
+        key = (str(rec["signature_index"]), rec["variant"], rec["series"])
+        index.setdefault(key, []).append((rec, topology))
     unattributed = []
     for a in alerts:
         lb = a["labels"]
+        sig, variant = lb.get("waveform_signature"), lb.get("waveform_variant")
+        candidates = index.get((sig, variant, None), [])
+        series = lb.get("series")
+        if series is not None:
+            candidates = candidates + index.get((sig, variant, series), [])
         matched = False
-        for rec in records:
-            if lb.get("waveform_signature") != str(rec["signature_index"]):
-                continue
-            if lb.get("waveform_variant") != rec["variant"]:
-                continue
-            if rec["series"] is not None and lb.get("series") != rec["series"]:
-                continue
-            sig_labels = {k: v for k, v in rec["labels"].items()
-                          if k not in RESERVED_LABEL_KEYS}
-            if any(lb.get(k) != v for k, v in sig_labels.items()):
+        for rec, topology in candidates:
+            if any(lb.get(k) != v for k, v in topology):
                 continue  # topology sanity：identity 合但 topology 矛盾 → 不歸因
             rec["alerts"].append(a)
             rec["fired"] = True
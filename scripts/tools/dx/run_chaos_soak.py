@@ -90,6 +90,7 @@ sys.path.insert(0, str(_THIS_DIR))
 sys.path.insert(0, os.path.join(str(_THIS_DIR), ".."))
 from _lib_compat import try_utf8_stdout  # noqa: E402
 from _lib_exitcodes import EXIT_OK, EXIT_CALLER_ERROR  # noqa: E402
+from _lib_exposition import iter_samples  # noqa: E402
 
 # Metrics we extract from /metrics (Prometheus text format).
 # Adding new ones here automatically extends the timeseries CSV.
@@ -137,24 +138,12 @@ def parse_metrics(text: str) -> dict[str, float]:
     (`<metric_name>{label=...} <value>`) are ignored — we want the
     process-level singletons, not per-tenant breakdowns.
     """
-    out: dict[str, float] = {}
-    for line in text.splitlines():
-        if not line or line.startswith("#"):
-            continue
+    return {
+        name: value
+        for name, labels, value, _ts in iter_samples(text, names=TRACKED_METRICS)
         # Skip labeled samples — we only want the unlabeled process metrics
-        if "{" in line:
-            continue
-        parts = line.split()
-        if len(parts) < 2:
-            continue
-        name, value = parts[0], parts[1]
-        if name not in TRACKED_METRICS:
-            continue
-        try:
-            out[name] = float(value)
-        except ValueError:
-            continue
-    return out
+        if not labels
+    }
 
 
 def fetch_metrics(target_url: str, timeout_sec: float = 5.0) -> dict[str, float] | None:
@@ -44,7 +44,7 @@ sys.path.insert(0, _THIS_DIR)  # Docker flat layout
 sys.path.insert(0, os.path.join(_THIS_DIR, ".."))  # Repo subdir layout
 import _waveform_lib as wf  # noqa: E402
 from _lib_exitcodes import EXIT_OK, EXIT_VIOLATION, EXIT_CALLER_ERROR  # noqa: E402
-from _lib_python import write_text_secure  # noqa: E402
+from _lib_python import write_lines_secure  # noqa: E402
 
 try:
     from _lib_compat import try_utf8_stdout  # noqa: E402
@@ -74,20 +74,23 @@ def _validate_one(pack: dict, schema: dict, jsonschema_mod, allow_selftest: bool
 
 
 def _compile_one(pack: dict, out_dir: str, seed: int, fanout: int) -> list[str]:
-    """Materialize one validated pack. Returns the written file paths."""
+    """Materialize one validated pack. Returns the written file paths.
+
+    Both materializations stream to disk one series chunk at a time, so a
+    high-fanout pack never holds the whole import text in memory."""
     series = wf.synthesize_pack(pack, seed=seed, fanout=fanout)
     pack_id = pack["pack"]["id"]
     written = []
     targets = {
-        f"{pack_id}.promtool.yaml": wf.materialize_promtool(series),
-        f"{pack_id}.vm.txt": wf.materialize_vm(series),
-        f"{pack_id}.metadata.json": json.dumps(
+        f"{pack_id}.promtool.yaml": wf.stream_promtool(series),
+        f"{pack_id}.vm.txt": wf.stream_vm(series),
+        f"{pack_id}.metadata.json": [json.dumps(
             wf.build_metadata(pack, series, seed=seed, fanout=fanout),
-            indent=2, ensure_ascii=False, sort_keys=True) + "\n",
+            indent=2, ensure_ascii=False, sort_keys=True) + "\n"],
     }
-    for name, content in targets.items():
+    for name, chunks in targets.items():
         path = os.path.join(out_dir, name)
-        write_text_secure(path, content)
+        write_lines_secure(path, chunks)
         written.append(path)
     return written
 
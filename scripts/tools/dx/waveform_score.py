@@ -75,6 +75,7 @@ import argparse
 import json
 import os
 import sys
+from collections.abc import Iterable
 from pathlib import Path
 
 import yaml
@@ -378,7 +379,8 @@ def _mark_flapping(entry: dict, alert: dict, step_s: float | None) -> None:
 
 def score_case(rec: dict, fault_window, span_s: int, unattributed_nonempty: bool,
                tol: dict, *, hold_start_s: float | None = None,
-               step_s: float | None = None) -> dict:
+               step_s: float | None = None,
+               resolved: dict | None = None) -> dict:
     """單一 must_detect case 的 temporal-match 判定（carve-out 由 caller 先攔）。
 
     回傳 case dict：status ∈ {hit, fn, indeterminate} + hits 明細（含每筆生效
@@ -390,7 +392,10 @@ def score_case(rec: dict, fault_window, span_s: int, unattributed_nonempty: bool
         帶 hold_start_s（來自 metadata；absence / 舊報告 = None → 永不標記）。
       * flapping_suspected（G-3）：firing_sample_count 明顯少於 [fire, last_fire]
         連續應有的樣本數（fire→resolve→fire 斷續震盪）——resolve 不計分，窗內任一
-        fire 即 hit，此旗標補揭震盪。需 caller 帶 step_s（每報告 window.step_s）。"""
+        fire 即 hit，此旗標補揭震盪。需 caller 帶 step_s（每報告 window.step_s）。
+
+    resolved：caller 跨 case 共用的 ``(alertname, severity) → tolerance_for()``
+    結果快取（容差解析只依這兩個鍵；萬筆 alert 只解析一次 per alert-class）。"""
     case = {
         "signature_index": rec["signature_index"],
         "fault_class": rec["fault_class"],
@@ -412,9 +417,14 @@ def score_case(rec: dict, fault_window, span_s: int, unattributed_nonempty: bool
     start = fault_window[0]
     end = fault_window[1] if fault_window[1] is not None else span_s
     case["effective_window_s"] = [start, end]
+    if resolved is None:
+        resolved = {}
     for a in rec.get("alerts") or []:
         severity = (a.get("labels") or {}).get("severity")
-        tol_s, source = tolerance_for(a["alertname"], severity, tol)
+        tkey = (a["alertname"], severity)
+        if tkey not in resolved:
+            resolved[tkey] = tolerance_for(a["alertname"], severity, tol)
+        tol_s, source = resolved[tkey]
         entry = {
             "alertname": a["alertname"],
             "fire_offset_s": a["fire_offset_s"],
@@ -467,10 +477,14 @@ def _percentiles(values: list[int]) -> dict:
     return {"p50": rank(0.5), "p90": rank(0.9), "max": v[-1]}
 
 
-def score(reports: list[tuple[str, dict]], tol: dict, *,
+def score(reports: Iterable[tuple[str, dict]], tol: dict, *,
           tolerances_path: str | None = None, schema_path: str | None = None) -> dict:
     """全量計分 → score 報告 dict（verdict 由 caller 讀 summary 判 exit）。
 
+    reports 只走一遍（可傳 generator）：每份報告計完 case 即釋放，常駐記憶體
+    = 單份報告 + 累積的 case / unattributed 明細（O(cases)），N 份大報告的
+    campaign 不必同時載入全部。
+
     守恆（no-silent-caps，D8.4）：任何 case 不得靜默蒸發——違反丟 ScoreToolBug。"""
     cases: list[dict] = []
     carved: list[dict] = []
@@ -482,8 +496,20 @@ def score(reports: list[tuple[str, dict]], tol: dict, *,
     unattributed_all: list[dict] = []       # 全部（無論是否 drain）
     unattributed_ignored: list[dict] = []   # 被 allowlist drain 掉的 + 對應 entry
     unattributed_effective: list[dict] = []  # 剩下、仍觸發遮蔽的
+    resolved: dict[tuple, tuple[float, str]] = {}
+    warnings: list[str] = []
+    seen_pack_seed: dict[tuple, str] = {}
 
     for path, report in reports:
+        # FIX-10：不同檔名但同 (pack_id, seed) 的多份報告 = 同一注入重複入分母
+        # （膨脹風險）——只警示不擋（可能是刻意重跑，但必須顯性）。
+        pkey = (report.get("pack_id"), report.get("seed"))
+        if pkey in seen_pack_seed and seen_pack_seed[pkey] != path:
+            warnings.append(
+                f"重複 pack 輸入：{path} 與 {seen_pack_seed[pkey]} 同 (pack_id, "
+                f"seed)={pkey}——同一注入的 case 會重複膨脹分母；確認非誤傳")
+        else:
+            seen_pack_seed.setdefault(pkey, path)
         win_idx = _metadata_window_index(report, path)
         span_s = report["window"]["span_s"]
         step_s = report["window"].get("step_s")   # G-3 flapping：每報告 step
@@ -542,7 +568,8 @@ def score(reports: list[tuple[str, dict]], tol: dict, *,
                 continue
             minfo = win_idx[mkey]
             case = score_case(rec, minfo["window"], span_s, bool(eff_this), tol,
-                              hold_start_s=minfo["hold_start_s"], step_s=step_s)
+                              hold_start_s=minfo["hold_start_s"], step_s=step_s,
+                              resolved=resolved)
             case["report"] = path
             case["pack_id"] = report.get("pack_id")
             cases.append(case)
@@ -582,18 +609,6 @@ def score(reports: list[tuple[str, dict]], tol: dict, *,
         verdict = "PASS"
         verdict_reason = "FN == 0 且 indeterminate == 0（injected-set 內）"
 
-    # FIX-10：不同檔名但同 (pack_id, seed) 的多份報告 = 同一注入重複入分母
-    # （膨脹風險）——只警示不擋（可能是刻意重跑，但必須顯性）。
-    warnings: list[str] = []
-    seen_pack_seed: dict[tuple, str] = {}
-    for path, report in reports:
-        pkey = (report.get("pack_id"), report.get("seed"))
-        if pkey in seen_pack_seed and seen_pack_seed[pkey] != path:
-            warnings.append(
-                f"重複 pack 輸入：{path} 與 {seen_pack_seed[pkey]} 同 (pack_id, "
-                f"seed)={pkey}——同一注入的 case 會重複膨脹分母；確認非誤傳")
-        else:
-            seen_pack_seed.setdefault(pkey, path)
     # G-2/G-3 揭露計數（不改 verdict）：early-onset 過敏 hit / 疑似 flapping hit。
     early_onset_fires = sum(1 for c in cases for h in c["hits"]
                             if h.get("early_onset_fire"))
@@ -838,7 +853,8 @@ def main() -> int:
         return EXIT_CALLER_ERROR
 
     try:
-        reports = [(p, load_report(p)) for p in args.reports]
+        # generator：逐份載入、計完即釋放（O(cases) 常駐，見 score docstring）
+        reports = ((p, load_report(p)) for p in args.reports)
         result = score(reports, tol, tolerances_path=args.tolerances,
                        schema_path=args.schema)
     except (ScoreInputError, ScoreToolBug) as exc:
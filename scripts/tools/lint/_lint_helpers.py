@@ -45,6 +45,22 @@ BUILD_EXEMPT = frozenset({
     # plus the guard a flat reader calls so a hierarchical tree can never
     # look empty. Library, not CLI.
     "_lib_confd.py",
+    # Per-phase timing spans behind `da-tools --profile`. Library, not CLI.
+    "_lib_profile.py",
+    # On-disk cache directory + atomic writes shared by the content caches
+    # below and dx/custom_alerts. Library, not CLI.
+    "_lib_cache.py",
+    # Compiled rule-pack index (content-keyed parse cache shared by
+    # runtime_audit / silencer_drift_check / observed-map). Library, not CLI.
+    "_lib_rulepack_index.py",
+    # Persisted conf.d reverse-dependency index behind offboard_tenant /
+    # deprecate_rule. Library, not CLI.
+    "_lib_dependency_index.py",
+    # Streaming Prometheus text-exposition parser (/metrics probes).
+    # Library, not CLI.
+    "_lib_exposition.py",
+    # Metrics registry + /metrics handler for the daemons. Library, not CLI.
+    "_lib_metrics.py",
     # v2.8.0 PR-3a — generate_alertmanager_routes.py split into 5 helpers.
     # These are library modules consumed by the main file via re-export,
     # not CLI commands themselves.
@@ -53,6 +69,9 @@ BUILD_EXEMPT = frozenset({
     "_grar_parse.py",
     "_grar_routes.py",
     "_grar_render.py",
+    # Route-tree + inhibit simulator (sharded-route proof, explain_route
+    # --simulate). Library, not CLI.
+    "_grar_simulate.py",
     "metric-dictionary.yaml",
     "generate_tenant_mapping_rules.py",
     # v2.8.0 Phase B Track A A5: ship-but-not-public CLI design tradeoff.
@@ -37,8 +37,11 @@ import yaml
 # module is imported by test suites whose conftest has already added the same
 # directory, and `check_rulepack_sync` below inserts one more on its own.
 _THIS_DIR = str(Path(__file__).resolve().parent)
-if _THIS_DIR not in sys.path:
-    sys.path.insert(0, _THIS_DIR)
+for _p in (_THIS_DIR, str(Path(_THIS_DIR).parent)):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+from _lib_rulepack_index import compile_pack  # noqa: E402
 
 
 def _find_repo_root() -> str:
@@ -187,7 +190,9 @@ def _generated_pack_names() -> frozenset:
         if not (stem and stem.startswith(_RULE_PACK_PREFIX)):
             continue
         try:
-            doc = yaml.safe_load(path.read_text(encoding="utf-8"))
+            # Same parse as the ops consumers, via the content-keyed index
+            # cache; the shape test below still reads the raw document.
+            doc = compile_pack(path).doc
         except (yaml.YAMLError, UnicodeDecodeError, OSError):
             continue
         # ⛔ Test for the KEY, not for a truthy value. `rule-pack-custom-alerts`
@@ -48,6 +48,12 @@ ALLOWED_TOOLS_ROOT = {
     "_lib_versions.py",    # platform / da-tools version SSOT readers for doc generators
     "_lib_yaml.py",        # v2.10.0 ROI r5 W2: minimal CRD YAML serializer (operator_generate + migrate_to_operator)
     "_lib_confd.py",       # #1339: single answer to "what is in a conf.d/" (recursive read + flat-reader guard)
+    "_lib_profile.py",     # per-phase timing spans behind `da-tools --profile` (stdlib-only)
+    "_lib_cache.py",       # shared disk-cache dir + atomic JSON publish (the three content caches)
+    "_lib_rulepack_index.py",  # compiled rule-pack index + content-keyed parse cache
+    "_lib_dependency_index.py",  # persisted conf.d reverse-dependency index (offboard / deprecate)
+    "_lib_exposition.py",  # streaming Prometheus text-exposition parser (stdlib-only)
+    "_lib_metrics.py",     # dependency-free metrics registry + /metrics handler (stdlib-only)
     "metric-dictionary.yaml",
     "validate_all.py",
     "vendor_download.sh",
@@ -60,6 +60,7 @@ from pathlib import Path as _P
 # legacy Windows console. scripts/tools is one level up from ops/.
 sys.path.insert(0, str(_P(__file__).resolve().parents[1]))
 import _lib_compat  # noqa: E402,F401  (import-time side effect; see _lib_compat)
+from _lib_metrics import MetricsRegistry, serve_metrics  # noqa: E402
 
 # ── pure domain logic (unit-tested without a cluster) ──────────────────────────
 
@@ -516,16 +517,69 @@ def build_rejected_query(lookback_s: int, settle_s: int) -> str:
     )
 
 
-# ── metrics exposition (dependency-free Prometheus text format) ────────────────
+# ── metrics exposition (shared _lib_metrics registry) ──────────────────────────
+
+# Metrics attribute → (series name, type, HELP), in exposition order.
+_METRIC_SERIES = {
+    "tamper_suspected": (
+        "federation_revocation_tamper_suspected", "gauge",
+        "Suspected un-revokes (logged-live token absent from the live set)."),
+    "last_reconcile_ts": (
+        "federation_revocation_last_reconcile_timestamp_seconds", "gauge",
+        "Unix time of the last SUCCESSFUL reconcile."),
+    "events_checked": (
+        "federation_revocation_events_checked", "gauge",
+        "Revocation events reconciled in the last run."),
+    "events_dropped": (
+        "federation_revocation_events_dropped", "gauge",
+        "Event-filtered log rows that failed to parse last run (schema-drift signal; coverage is degraded while non-zero)."),
+    "reconcile_errors_total": (
+        "federation_revocation_reconcile_errors_total", "counter",
+        "Reconcile passes that failed (fail-closed; no all-clear emitted)."),
+    "gateway_load_errors": (
+        "federation_gateway_revocation_load_errors", "gauge",
+        "Gateway revoked-set read failures seen in the window (fail-open signal)."),
+    "channel_up": (
+        "federation_revocation_channel_up", "gauge",
+        "Evidence channel liveness: 1 = the tenant-api heartbeat canary was seen in the window, 0 = the evidence path is severed (an empty channel would otherwise be indistinguishable from 'no revocations happened')."),
+    "heartbeats_seen": (
+        "federation_revocation_heartbeats_seen", "gauge",
+        "Canary heartbeat rows in the window (debug / chaos verification; channel_up is the alerting signal)."),
+    "live_set_rejected_lines": (
+        "federation_revocation_live_set_rejected_lines", "gauge",
+        "Contract-violating lines in the mounted revoked.txt. Non-zero means the gateway is refusing to load the current revoked set, so revocations made since are NOT being enforced (#1235)."),
+    "gateway_reload_rejected": (
+        "federation_gateway_revoked_set_reload_rejected", "gauge",
+        "Gateway reload-refusal warnings in the window, read back off the gateway's own log stream (enforcement-plane self-report; #1235)."),
+    "gateway_revoked_set_missing": (
+        "federation_gateway_revoked_set_missing", "gauge",
+        "Gateway reports the revoked-set file is ABSENT, so it is enforcing an EMPTY set and honouring every revoked token until its TTL. Unlike the two staleness gauges, this is the enforcement plane being open, not frozen (#1236)."),
+}
+
 
 class Metrics:
     """Holds the reconciler's gauges/counters and renders the exposition text.
 
+    Every public attribute is a write-through view of one registry series
+    (declared in ``_METRIC_SERIES``), so reconcile_once keeps plain
+    assignment while the scrape path reuses the registry's cached rendering.
     Counters are monotonic within a process lifetime; ``up`` and the process's
     own liveness come free from the Prometheus scrape of this Deployment.
     """
 
     def __init__(self) -> None:
+        self._registry = MetricsRegistry()
+        self._series = {
+            attr: (self._registry.counter if kind == "counter" else self._registry.gauge)(name, help_)
+            for attr, (name, kind, help_) in _METRIC_SERIES.items()
+        }
+        # Wall time of each reconcile pass (queries + live-set read), failed
+        # passes included — a slow VictoriaLogs shows here before it times out.
+        self.reconcile_duration = self._registry.histogram(
+            "federation_revocation_reconcile_duration_seconds",
+            "Wall time of one reconcile pass, failed passes included.",
+            buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+        )
         self.tamper_suspected = 0            # gauge: current suspected un-revokes
         self.last_reconcile_ts = 0.0         # gauge: unix ts of last SUCCESSFUL reconcile
         self.events_checked = 0              # gauge: events considered last run
@@ -572,43 +626,21 @@ class Metrics:
         # #1236 nothing at the ENFORCEMENT end said it at all.
         self.gateway_revoked_set_missing = 0  # gauge: gateway "file is absent" warns in window
 
+    def __setattr__(self, attr: str, value) -> None:
+        series = self.__dict__.get("_series", {}).get(attr)
+        if series is not None:
+            if series.kind == "counter":
+                series.inc(value - series.value)
+            else:
+                series.set(value)
+        object.__setattr__(self, attr, value)
+
+    @property
+    def registry(self) -> MetricsRegistry:
+        return self._registry
+
     def render(self) -> str:
-        lines = [
-            "# HELP federation_revocation_tamper_suspected Suspected un-revokes (logged-live token absent from the live set).",
-            "# TYPE federation_revocation_tamper_suspected gauge",
-            f"federation_revocation_tamper_suspected {self.tamper_suspected}",
-            "# HELP federation_revocation_last_reconcile_timestamp_seconds Unix time of the last SUCCESSFUL reconcile.",
-            "# TYPE federation_revocation_last_reconcile_timestamp_seconds gauge",
-            f"federation_revocation_last_reconcile_timestamp_seconds {self.last_reconcile_ts:.0f}",
-            "# HELP federation_revocation_events_checked Revocation events reconciled in the last run.",
-            "# TYPE federation_revocation_events_checked gauge",
-            f"federation_revocation_events_checked {self.events_checked}",
-            "# HELP federation_revocation_events_dropped Event-filtered log rows that failed to parse last run (schema-drift signal; coverage is degraded while non-zero).",
-            "# TYPE federation_revocation_events_dropped gauge",
-            f"federation_revocation_events_dropped {self.events_dropped}",
-            "# HELP federation_revocation_reconcile_errors_total Reconcile passes that failed (fail-closed; no all-clear emitted).",
-            "# TYPE federation_revocation_reconcile_errors_total counter",
-            f"federation_revocation_reconcile_errors_total {self.reconcile_errors_total}",
-            "# HELP federation_gateway_revocation_load_errors Gateway revoked-set read failures seen in the window (fail-open signal).",
-            "# TYPE federation_gateway_revocation_load_errors gauge",
-            f"federation_gateway_revocation_load_errors {self.gateway_load_errors}",
-            "# HELP federation_revocation_channel_up Evidence channel liveness: 1 = the tenant-api heartbeat canary was seen in the window, 0 = the evidence path is severed (an empty channel would otherwise be indistinguishable from 'no revocations happened').",
-            "# TYPE federation_revocation_channel_up gauge",
-            f"federation_revocation_channel_up {self.channel_up}",
-            "# HELP federation_revocation_heartbeats_seen Canary heartbeat rows in the window (debug / chaos verification; channel_up is the alerting signal).",
-            "# TYPE federation_revocation_heartbeats_seen gauge",
-            f"federation_revocation_heartbeats_seen {self.heartbeats_seen}",
-            "# HELP federation_revocation_live_set_rejected_lines Contract-violating lines in the mounted revoked.txt. Non-zero means the gateway is refusing to load the current revoked set, so revocations made since are NOT being enforced (#1235).",
-            "# TYPE federation_revocation_live_set_rejected_lines gauge",
-            f"federation_revocation_live_set_rejected_lines {self.live_set_rejected_lines}",
-            "# HELP federation_gateway_revoked_set_reload_rejected Gateway reload-refusal warnings in the window, read back off the gateway's own log stream (enforcement-plane self-report; #1235).",
-            "# TYPE federation_gateway_revoked_set_reload_rejected gauge",
-            f"federation_gateway_revoked_set_reload_rejected {self.gateway_reload_rejected}",
-            "# HELP federation_gateway_revoked_set_missing Gateway reports the revoked-set file is ABSENT, so it is enforcing an EMPTY set and honouring every revoked token until its TTL. Unlike the two staleness gauges, this is the enforcement plane being open, not frozen (#1236).",
-            "# TYPE federation_gateway_revoked_set_missing gauge",
-            f"federation_gateway_revoked_set_missing {self.gateway_revoked_set_missing}",
-        ]
-        return "\n".join(lines) + "\n"
+        return self._registry.render()
 
 
 # ── I/O (thin; exercised via integration, not unit tests) ──────────────────────
@@ -764,32 +796,12 @@ class Config:
 
 
 def _serve_forever(cfg: Config, metrics: Metrics, clock=time.time) -> None:
-    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-
-    class _Handler(BaseHTTPRequestHandler):
-        def do_GET(self):  # noqa: N802
-            if self.path.rstrip("/") in ("/metrics", ""):
-                payload = metrics.render().encode("utf-8")
-                self.send_response(200)
-                self.send_header("Content-Type", "text/plain; version=0.0.4")
-                self.send_header("Content-Length", str(len(payload)))
-                self.end_headers()
-                self.wfile.write(payload)
-            else:
-                self.send_response(404)
-                self.end_headers()
-
-        def log_message(self, *_args):  # silence per-request logging
-            pass
-
-    httpd = ThreadingHTTPServer(("", cfg.metrics_port), _Handler)
-    import threading
-
-    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    serve_metrics(metrics.registry, cfg.metrics_port)
     print(f"federation-revocation-reconciler: /metrics on :{cfg.metrics_port}, "
           f"interval {cfg.interval_s}s", file=sys.stderr, flush=True)
     while True:
-        reconcile_once(cfg, metrics, clock())
+        with metrics.reconcile_duration.time():
+            reconcile_once(cfg, metrics, clock())
         time.sleep(cfg.interval_s)
 
 
@@ -8,6 +8,7 @@ Functions:
   Output rendering:
     render_output(...)           → fragment YAML (route + receivers + inhibit_rules)
     load_base_config(path)       → base AM YAML or _DEFAULT_BASE_CONFIG fallback
+    merge_into_base(...)         → base config + generated routes/receivers/inhibits
     assemble_configmap(...)      → full K8s ConfigMap YAML for GitOps PR
 
   ConfigMap operations (--apply mode, K8s cluster deploy):
@@ -34,7 +35,7 @@ sys.path.insert(0, os.path.join(_THIS_DIR, '..'))  # Repo subdir layout
 
 from _grar_routes import (  # noqa: E402
     _build_custom_alert_routes, _build_watchdog_route, _build_synthetic_probe_route,
-    _build_sentinel_sinkhole_route)
+    _build_sentinel_sinkhole_route, _split_tenant_alternation)
 from _grar_validate import (  # noqa: E402
     assert_watchdog_inhibit_immunity,
     assert_platform_alerts_not_tenant_silenceable,
@@ -76,16 +77,28 @@ def _main_tenant_route_tenants(routes: list[dict]) -> list[str]:
     exact leak the isolation subtree exists to prevent), and an override route
     only applies to a specific alertname/metric_group outside this subtree.
 
+    The sharded route tree (--route-mode sharded) is covered too: shard parents
+    (matcher-only, no receiver) are descended into, and a shared route —
+    ``tenant=~"a|b"`` with a ``tenant-shared-*`` receiver — counts for every
+    tenant it lists (their ``tenant-<t>`` receivers are still emitted).
+
     Returns sorted, de-duplicated tenant names.
     """
     tenants = set()
     for route in routes or []:
         receiver = route.get("receiver")
+        if receiver is None and route.get("routes"):
+            tenants.update(_main_tenant_route_tenants(route["routes"]))
+            continue
         for matcher in route.get("matchers", []) or []:
             m = re.match(r'^tenant="(.+)"$', matcher)
             if m and receiver == f"tenant-{m.group(1)}":
                 tenants.add(m.group(1))
                 break
+            m = re.match(r'^tenant=~"(.+)"$', matcher)
+            if m and str(receiver).startswith("tenant-shared-"):
+                tenants.update(_split_tenant_alternation(m.group(1)))
+                break
     return sorted(tenants)
 
 
@@ -224,6 +237,36 @@ def load_base_config(path: str | None) -> dict:
     return data
 
 
+def merge_into_base(base: dict, routes: list[dict], receivers: list[dict],
+                    inhibit_rules: list[dict] | None) -> dict:
+    """Merge generated routes / receivers / inhibit_rules into a base
+    Alertmanager config dict (the alertmanager.yml assemble_configmap renders).
+
+    Routes replace base route.routes (platform-static routes injected first),
+    receivers append deduplicated by name, inhibit_rules append. The inhibit
+    guards are the caller's job.
+    """
+    merged = dict(base)
+
+    # S7/S8 (#741): ensure the Custom Alerts isolation route + firehose receiver
+    # are present and FIRST, regardless of what generate_routes produced.
+    routes, receivers = _inject_custom_alert_isolation(routes, receivers)
+
+    # Merge routes into base route
+    merged_route = dict(merged.get("route", {}))
+    merged_route["routes"] = routes
+    merged["route"] = merged_route
+
+    # Merge receivers: keep base receivers, append tenant receivers
+    base_names = {r["name"] for r in merged.get("receivers", [])}
+    tenant_receivers = [r for r in receivers if r["name"] not in base_names]
+    merged["receivers"] = list(merged.get("receivers", [])) + tenant_receivers
+
+    # Merge inhibit_rules: keep base rules, append tenant rules
+    merged["inhibit_rules"] = list(merged.get("inhibit_rules", [])) + list(inhibit_rules or [])
+    return merged
+
+
 def assemble_configmap(base: dict, routes: list[dict], receivers: list[dict], inhibit_rules: list[dict],
                        namespace: str = "monitoring", configmap_name: str = "alertmanager-config",
                        strict: bool = False) -> str:
@@ -250,24 +293,7 @@ def assemble_configmap(base: dict, routes: list[dict], receivers: list[dict], in
     Returns:
         Complete Kubernetes ConfigMap YAML string (apiVersion, kind, metadata, data.alertmanager.yml).
     """
-    merged = dict(base)
-
-    # S7/S8 (#741): ensure the Custom Alerts isolation route + firehose receiver
-    # are present and FIRST, regardless of what generate_routes produced.
-    routes, receivers = _inject_custom_alert_isolation(routes, receivers)
-
-    # Merge routes into base route
-    merged_route = dict(merged.get("route", {}))
-    merged_route["routes"] = routes
-    merged["route"] = merged_route
-
-    # Merge receivers: keep base receivers, append tenant receivers
-    base_names = {r["name"] for r in merged.get("receivers", [])}
-    tenant_receivers = [r for r in receivers if r["name"] not in base_names]
-    merged["receivers"] = list(merged.get("receivers", [])) + tenant_receivers
-
-    # Merge inhibit_rules: keep base rules, append tenant rules
-    merged["inhibit_rules"] = list(merged.get("inhibit_rules", [])) + list(inhibit_rules or [])
+    merged = merge_into_base(base, routes, receivers, inhibit_rules)
 
     # ADR-025 D1: fail-closed if any inhibit rule (base or generated) would
     # suppress the always-firing Watchdog heartbeat — it must always egress.
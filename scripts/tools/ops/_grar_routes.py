@@ -15,14 +15,23 @@ Functions:
     _build_enforced_routes
 
   Main route generation:
-    _build_tenant_routes / generate_routes
+    _build_tenant_routes / generate_routes (flat | sharded tree)
+
+  Sharded route tree:
+    _tenant_alternation / _split_tenant_alternation
+    _tenant_route_blocks / _build_sharded_tenant_routes
 
   Severity-dedup inhibit rules:
-    _build_inhibit_rules / generate_inhibit_rules
+    _build_inhibit_rules / _build_consolidated_inhibit_rules
+    generate_inhibit_rules (per-tenant | consolidated emission)
 """
 from __future__ import annotations
 
+import hashlib
+import json
+import math
 import os
+import re
 import sys
 
 _THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -35,7 +44,11 @@ from _grar_merge import (  # noqa: E402
     _substitute_tenant,
     build_receiver_config,
 )
-from _grar_validate import validate_receiver_domains  # noqa: E402
+from _grar_simulate import assert_routes_equivalent  # noqa: E402
+from _grar_validate import (  # noqa: E402
+    assert_inhibit_rules_equivalent,
+    validate_receiver_domains,
+)
 
 
 # ============================================================
@@ -350,6 +363,30 @@ def _build_enforced_routes(enforced_routing: dict, routing_configs: dict[str, di
     return routes, receivers, warnings
 
 
+# ============================================================
+# Tenant-set regex matchers (sharded routes, consolidated inhibits)
+# ============================================================
+
+# Tenant names that can be placed in a `tenant=~"a|b"` / `tenant!~"a|b"`
+# matcher without backslash escapes (Alertmanager's matcher-string unquoting
+# and RE2 would each need their own); `.` is spelled `[.]` instead.
+_REGEX_SAFE_TENANT_RE = re.compile(r"^[A-Za-z0-9_.:-]+$")
+
+
+def _tenant_alternation(tenants: list[str]) -> str:
+    """Exact-match regex alternation for *tenants* (sorted, `.` as `[.]`).
+
+    Alertmanager anchors regex matchers, so the result matches those tenant
+    names and nothing else. Callers check _REGEX_SAFE_TENANT_RE first.
+    """
+    return "|".join(t.replace(".", "[.]") for t in sorted(tenants))
+
+
+def _split_tenant_alternation(value: str) -> list[str]:
+    """Inverse of _tenant_alternation."""
+    return [t.replace("[.]", ".") for t in value.split("|")]
+
+
 # ============================================================
 # Main Route Generation (Tenant routing + inhibit rules)
 # ============================================================
@@ -613,7 +650,138 @@ def _build_sentinel_sinkhole_route() -> tuple[list[dict], list[dict]]:
     return [route], [{"name": "sentinel-sinkhole"}]
 
 
-def generate_routes(routing_configs: dict[str, dict], allowed_domains: list[str] | None = None, enforced_routing: dict | None = None) -> tuple[list[dict], list[dict], list[str]]:
+#: Route tree emission modes (``--route-mode``).
+ROUTE_MODES = ("flat", "sharded")
+
+# Keys a collapsed route copies from its tenants' main routes; equal values
+# for these (plus the receiver config) are what makes two tenants collapsible.
+_SHARED_ROUTE_KEYS = ("group_by", "group_wait", "group_interval", "repeat_interval")
+
+
+def _tenant_route_blocks(routes: list[dict]) -> list[tuple[str, list[dict]]]:
+    """Split _build_tenant_routes output into per-tenant blocks, in order.
+
+    Every tenant route (override sub-routes, then the main route) pins its
+    tenant with a leading `tenant="<name>"` matcher, and a tenant's routes are
+    contiguous — so one pass groups them without re-reading the configs.
+    """
+    blocks: list[tuple[str, list[dict]]] = []
+    for route in routes:
+        tenant = route["matchers"][0][len('tenant="'):-1]
+        if blocks and blocks[-1][0] == tenant:
+            blocks[-1][1].append(route)
+        else:
+            blocks.append((tenant, [route]))
+    return blocks
+
+
+def _build_sharded_tenant_routes(routes: list[dict], receivers: list[dict],
+                                 shard_size: int | None = None,
+                                 ) -> tuple[list[dict], list[dict], dict[str, str], list[str]]:
+    """Rebuild flat tenant routes as a balanced two-level tree.
+
+    Two steps, both on the output of _build_tenant_routes:
+
+      1. Collapse: tenants WITHOUT overrides whose receiver config, group_by
+         and timing are identical share one `tenant=~"a|b|..."` route and one
+         ``tenant-shared-<digest>`` receiver. The per-tenant ``tenant-<name>``
+         receivers are still emitted — the custom-alert subtree (#1092) points
+         its children at them.
+
+         This is a VISIBLE change for collapsed tenants: notifications (and
+         any template reading ``.Receiver``) name ``tenant-shared-<digest>``
+         instead of ``tenant-<name>``. The digest is taken over the shared
+         receiver config + timing only, so it is stable while the member set
+         changes and moves only when that config does.
+      2. Shard: the remaining per-tenant blocks are cut, in tenant-name order,
+         into ~sqrt(N) shards of near-equal size. A shard is a matcher-only
+         parent `tenant=~"<its tenants>"` with the blocks as children, so an
+         alert walks ~2*sqrt(N) routes instead of N.
+
+    Shard matchers list their tenants exactly rather than a name prefix: in
+    Alertmanager a matching parent with no matching child handles the alert
+    itself, so a prefix shard would capture alerts of an unconfigured tenant
+    that the flat tree lets fall through to the root receiver. Listing the
+    tenants guarantees the block's main route (matcher `tenant="<name>"` only)
+    matches whatever the shard matched. Every route keeps `continue: false`,
+    and tenant routes never overlap across tenants, so order across blocks is
+    free while order within a block (overrides first) is preserved.
+
+    Tenants whose names are not regex-safe stay flat after the shards.
+
+    Returns:
+        (routes, receivers, renamed, warnings) — receivers is *receivers* plus
+        the shared receivers of step 1; renamed maps each collapsed tenant's
+        ``tenant-<name>`` receiver to its shared receiver, for
+        assert_routes_equivalent.
+    """
+    warnings: list[str] = []
+    recv_by_name = {r["name"]: r for r in receivers}
+    blocks = _tenant_route_blocks(routes)
+
+    collapsible: dict[str, list[tuple[str, dict]]] = {}
+    singles: list[tuple[str, list[dict]]] = []
+    flat: list[dict] = []
+    for tenant, block in blocks:
+        if not _REGEX_SAFE_TENANT_RE.match(tenant):
+            flat.extend(block)
+            continue
+        main = block[-1]
+        if len(block) > 1:
+            singles.append((tenant, block))
+            continue
+        recv_cfg = {k: v for k, v in recv_by_name[main["receiver"]].items() if k != "name"}
+        key = json.dumps([recv_cfg, [main.get(k) for k in _SHARED_ROUTE_KEYS]],
+                         sort_keys=True, default=str)
+        collapsible.setdefault(key, []).append((tenant, main))
+
+    shared_routes: list[dict] = []
+    shared_receivers: list[dict] = []
+    renamed: dict[str, str] = {}
+    for key, members in collapsible.items():
+        if len(members) == 1:
+            singles.append((members[0][0], [members[0][1]]))
+            continue
+        name = f"tenant-shared-{hashlib.sha256(key.encode()).hexdigest()[:12]}"
+        main = members[0][1]
+        route = {
+            "matchers": [f'tenant=~"{_tenant_alternation([t for t, _ in members])}"'],
+            "receiver": name,
+        }
+        route.update({k: main[k] for k in _SHARED_ROUTE_KEYS if k in main})
+        shared_routes.append(route)
+        renamed.update((m["receiver"], name) for _t, m in members)
+        receiver = {"name": name}
+        receiver.update({k: v for k, v in recv_by_name[main["receiver"]].items()
+                         if k != "name"})
+        shared_receivers.append(receiver)
+    shared_routes.sort(key=lambda r: r["matchers"][0])
+
+    singles.sort(key=lambda b: b[0])
+    shards: list[dict] = []
+    if singles:
+        size = shard_size or max(1, math.isqrt(len(singles) - 1) + 1)
+        count = math.ceil(len(singles) / size)
+        for k in range(count):
+            chunk = singles[k * len(singles) // count:(k + 1) * len(singles) // count]
+            shards.append({
+                "matchers": [f'tenant=~"{_tenant_alternation([t for t, _ in chunk])}"'],
+                "continue": False,
+                "routes": [r for _, block in chunk for r in block],
+            })
+
+    collapsed = sum(len(m) for m in collapsible.values() if len(m) > 1)
+    warnings.append(
+        f"  INFO: route tree sharded: {len(blocks)} tenant(s) -> "
+        f"{len(shared_routes)} shared route(s) for {collapsed} tenant(s) + "
+        f"{len(shards)} shard(s) for {len(singles)} tenant(s)"
+        + (f" + {len(blocks) - collapsed - len(singles)} flat (non-regex-safe name)"
+           if flat else ""))
+    return shared_routes + shards + flat, receivers + shared_receivers, renamed, warnings
+
+
+def generate_routes(routing_configs: dict[str, dict], allowed_domains: list[str] | None = None, enforced_routing: dict | None = None,
+                    route_mode: str = "flat") -> tuple[list[dict], list[dict], list[str]]:
     """Generate Alertmanager route tree + receivers from routing configs.
 
     Delegates to _build_enforced_routes() and _build_tenant_routes() to produce
@@ -627,10 +795,24 @@ def generate_routes(routing_configs: dict[str, dict], allowed_domains: list[str]
       - v1.10.0: {{tenant}} placeholder expansion
       - Domain policy enforcement (webhook URL allowlist validation)
 
+    Route modes:
+      "flat" (default): one top-level route per tenant (plus its override
+        sub-routes). Alertmanager walks the list linearly for every alert.
+      "sharded": the tenant routes are rebuilt as a two-level tree with
+        shared routes for identically-configured tenants
+        (_build_sharded_tenant_routes), then proven to deliver every tenant /
+        override label set exactly as the flat tree does, to the same
+        receiver name except where a tenant was collapsed into a
+        ``tenant-shared-*`` receiver (assert_routes_equivalent; ValueError
+        otherwise). Enforced routes stay
+        top-level in both modes — their optional extra matchers mean a shard
+        could match without any child matching.
+
     Args:
         routing_configs: {tenant_name: routing_config_dict} resolved from defaults
         allowed_domains: optional list of fnmatch domain patterns for webhook URL validation
         enforced_routing: optional platform-wide routing rule (NOC fallback)
+        route_mode: one of ROUTE_MODES.
 
     Returns:
         (routes_list, receivers_list, warnings_list) where:
@@ -638,6 +820,9 @@ def generate_routes(routing_configs: dict[str, dict], allowed_domains: list[str]
         - receivers_list: Alertmanager receiver dicts with webhook/email/etc. configs
         - warnings_list: validation warnings (domain check, schema, etc.)
     """
+    if route_mode not in ROUTE_MODES:
+        raise ValueError(f"unknown route mode {route_mode!r} (expected one of {ROUTE_MODES})")
+
     routes = []
     receivers = []
     all_warnings = []
@@ -652,9 +837,19 @@ def generate_routes(routing_configs: dict[str, dict], allowed_domains: list[str]
     # Tenant routes（在 enforced route 之後）
     t_routes, t_receivers, t_warnings = _build_tenant_routes(
         routing_configs, allowed_domains)
+    all_warnings.extend(t_warnings)
+
+    if route_mode == "sharded" and t_routes:
+        s_routes, s_receivers, renamed, s_warnings = _build_sharded_tenant_routes(
+            t_routes, t_receivers)
+        assert_routes_equivalent(routes + t_routes, receivers + t_receivers,
+                                 routes + s_routes, receivers + s_receivers,
+                                 renamed=renamed)
+        t_routes, t_receivers = s_routes, s_receivers
+        all_warnings.extend(s_warnings)
+
     routes.extend(t_routes)
     receivers.extend(t_receivers)
-    all_warnings.extend(t_warnings)
 
     return routes, receivers, all_warnings
 
@@ -693,8 +888,44 @@ def _build_inhibit_rules(tenant: str) -> dict:
     }
 
 
-def generate_inhibit_rules(dedup_configs: dict[str, str]) -> tuple[list[dict], list[str]]:
-    """Generate per-tenant severity dedup inhibit rules.
+#: Severity-dedup inhibit emission modes (``--inhibit-mode``).
+INHIBIT_MODES = ("per-tenant", "consolidated")
+
+def _build_consolidated_inhibit_rules(enabled: list[str]) -> list[dict]:
+    """Build the single fleet-wide severity dedup inhibit rule.
+
+    Same source/target shape as _build_inhibit_rules, with the per-tenant
+    `tenant="<name>"` pin replaced by one `tenant=~"<enabled tenants>"`
+    alternation on both sides and `tenant` in `equal:` — a critical alert
+    only inhibits a warning of its OWN tenant and metric_group, and only for
+    the tenants that would each have had a per-tenant rule. The alternation
+    also gates `tenant` for the #1132 invariant.
+
+    Args:
+        enabled: tenants with severity dedup on (regex-safe names).
+
+    Returns:
+        list with one inhibit_rule dict.
+    """
+    pin = f'tenant=~"{_tenant_alternation(enabled)}"'
+    return [{
+        "source_matchers": [
+            'severity="critical"',
+            'metric_group=~".+"',
+            pin,
+        ],
+        "target_matchers": [
+            'severity="warning"',
+            'metric_group=~".+"',
+            pin,
+        ],
+        "equal": ["tenant", "metric_group"],
+    }]
+
+
+def generate_inhibit_rules(dedup_configs: dict[str, str],
+                           mode: str = "per-tenant") -> tuple[list[dict], list[str]]:
+    """Generate severity dedup inhibit rules.
 
     Iterates over all tenants and builds inhibit rules for those with
     severity deduplication enabled (default). Tenants with _severity_dedup: "disable"
@@ -705,24 +936,57 @@ def generate_inhibit_rules(dedup_configs: dict[str, str]) -> tuple[list[dict], l
       fires for the same metric_group. This reduces alert fatigue while
       preserving critical visibility. Implemented via Alertmanager inhibit_rules.
 
+    Emission modes:
+      "per-tenant" (default): one rule per dedup-enabled tenant. Alertmanager
+        checks every incoming alert against every rule, so at fleet scale the
+        inhibit set dominates both evaluation cost and rendered config size.
+      "consolidated": one rule keyed on `equal: [tenant, metric_group]`, with
+        both sides pinned to the dedup-enabled tenants by one regex
+        alternation. The result is proven equivalent to the per-tenant form,
+        including for alerts whose tenant label names no configured tenant
+        (assert_inhibit_rules_equivalent; ValueError otherwise). Falls back
+        to per-tenant, with a WARN, when an enabled tenant name is not
+        regex-safe.
+
     Args:
         dedup_configs: {tenant_name: "enable"|"disable"} for all tenants.
+        mode: one of INHIBIT_MODES.
 
     Returns:
         (inhibit_rules_list, warnings_list) where:
         - inhibit_rules_list: list of dicts ready for alertmanager.yml
         - warnings_list: INFO messages for each tenant (e.g., dedup disabled)
     """
+    if mode not in INHIBIT_MODES:
+        raise ValueError(f"unknown inhibit mode {mode!r} (expected one of {INHIBIT_MODES})")
+
     rules = []
     all_warnings = []
+    enabled = []
 
     for tenant in sorted(dedup_configs.keys()):
-        mode = dedup_configs[tenant]
-        if mode == "disable":
+        mode_val = dedup_configs[tenant]
+        if mode_val == "disable":
             all_warnings.append(f"  INFO: {tenant}: severity_dedup disabled, skipping inhibit rule")
             continue
 
         rule = _build_inhibit_rules(tenant)
         rules.append(rule)
-
-    return rules, all_warnings
+        enabled.append(tenant)
+
+    if mode == "per-tenant" or not rules:
+        return rules, all_warnings
+
+    unsafe = [t for t in enabled if not _REGEX_SAFE_TENANT_RE.match(t)]
+    if unsafe:
+        all_warnings.append(
+            f"  WARN: consolidated inhibit mode needs regex-safe tenant names; "
+            f"{', '.join(unsafe)} not, emitting per-tenant inhibit rules")
+        return rules, all_warnings
+
+    consolidated = _build_consolidated_inhibit_rules(enabled)
+    assert_inhibit_rules_equivalent(rules, consolidated, dedup_configs.keys())
+    all_warnings.append(
+        f"  INFO: severity_dedup consolidated: {len(rules)} per-tenant inhibit "
+        f"rule(s) -> {len(consolidated)}")
+    return consolidated, all_warnings
@@ -0,0 +1,374 @@
+"""Compiled Alertmanager route-tree + inhibit engine (routing simulator).
+
+Answers "which receiver gets this alert, and is it inhibited" for many label
+sets at once, against a generated or rendered Alertmanager config. Every
+matcher string is parsed and its regex compiled ONCE (_grar_validate.
+_compile_matcher, the evaluator the inhibit guards use), and each route level
+indexes its children by their most selective equality matcher, so resolving an alert
+against a flat N-tenant tree tries O(1) routes per level instead of N.
+
+Semantics follow Alertmanager's dispatcher:
+  - the root route matches every alert;
+  - children are tried in order, a matching child is descended into, and the
+    walk stops at the first match unless that child sets `continue: true`;
+  - a matching route whose children all miss handles the alert itself;
+  - receiver / group_by / group_wait / group_interval / repeat_interval are
+    inherited downwards;
+  - an alert is inhibited when some inhibit rule's target matches it and a
+    source alert in the same batch matches with equal `equal:` labels
+    (missing == ""); an alert matching both sides is not inhibited by source
+    alerts that also match the target (Alertmanager's two-sided exclusion).
+
+Functions / classes:
+  RouteTree(root)                    → .resolve(labels) / .resolve_many(alerts)
+  InhibitIndex(rules)                → .inhibitors(alerts)
+  simulate_alerts(config, alerts)    → per-alert receivers + inhibition
+  load_alertmanager_config(path)     → alertmanager.yml or its ConfigMap
+  load_alerts(path)                  → label sets from a YAML/JSON alerts file
+  find_route_equivalence_gaps / assert_routes_equivalent
+                                     → sharded vs flat route tree delivery proof
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+import yaml
+
+_THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _THIS_DIR)  # Docker flat layout
+sys.path.insert(0, os.path.join(_THIS_DIR, '..'))  # Repo subdir layout
+
+from _grar_validate import _compile_matcher, _inhibit_side_matchers  # noqa: E402
+
+#: Route settings a child inherits from its parent when it does not set them.
+INHERITED_ROUTE_KEYS = ("receiver", "group_by", "group_wait", "group_interval",
+                        "repeat_interval")
+
+
+def _compile_matchers(matchers: list[str], where: str) -> list:
+    """Compile a matcher list strictly: Alertmanager rejects a config with an
+    unparseable matcher or regex, so the simulator does too (ValueError)."""
+    out = []
+    for m in matchers:
+        compiled = _compile_matcher(m) if isinstance(m, str) else None
+        if compiled is None or (compiled.op in ("=~", "!~") and compiled.regex is None):
+            raise ValueError(f"{where}: invalid matcher {m!r}")
+        out.append(compiled)
+    return out
+
+
+def _route_matcher_strings(route: dict) -> list[str]:
+    """A route's matchers, legacy `match` / `match_re` maps included."""
+    out = list(route.get("matchers") or [])
+    for key, op in (("match", "="), ("match_re", "=~")):
+        legacy = route.get(key)
+        if isinstance(legacy, dict):
+            out.extend(f'{k}{op}"{v}"' for k, v in legacy.items())
+    return out
+
+
+def _equality_index(items: list[list]) -> tuple[dict[str, dict[str, list[int]]], list[int]]:
+    """Index positions of compiled matcher lists by their most selective
+    equality matcher — the `label="value"` pair fewest items share, so a
+    per-tenant rule set keyed on `severity="critical", ..., tenant=<name>` is
+    bucketed by tenant, not severity: (label → value → [positions],
+    positions without any equality matcher)."""
+    counts: dict[tuple[str, str], int] = {}
+    for matchers in items:
+        for m in matchers:
+            if m.op == "=":
+                counts[(m.name, m.value)] = counts.get((m.name, m.value), 0) + 1
+    index: dict[str, dict[str, list[int]]] = {}
+    unindexed: list[int] = []
+    for pos, matchers in enumerate(items):
+        eqs = [m for m in matchers if m.op == "="]
+        if not eqs:
+            unindexed.append(pos)
+            continue
+        eq = min(eqs, key=lambda m: counts[(m.name, m.value)])
+        index.setdefault(eq.name, {}).setdefault(eq.value, []).append(pos)
+    return index, unindexed
+
+
+def _indexed_candidates(index: dict[str, dict[str, list[int]]], unindexed: list[int],
+                        labels: dict[str, str]) -> list[int]:
+    """Positions that can match *labels*, in original order."""
+    if not index:
+        return unindexed
+    picked = list(unindexed)
+    for name, by_value in index.items():
+        picked.extend(by_value.get(labels.get(name, ""), ()))
+    picked.sort()
+    return picked
+
+
+class _RouteNode:
+    __slots__ = ("path", "matchers", "cont", "settings", "children",
+                 "index", "unindexed")
+
+    def __init__(self, route: dict, path: str, inherited: dict, is_root: bool):
+        self.path = path
+        # The root matches everything, whatever it declares.
+        self.matchers = [] if is_root else _compile_matchers(
+            _route_matcher_strings(route), path)
+        self.cont = bool(route.get("continue", False))
+        self.settings = {**inherited,
+                         **{k: route[k] for k in INHERITED_ROUTE_KEYS if k in route}}
+        self.children = [
+            _RouteNode(child, f"{path}.routes[{i}]", self.settings, False)
+            for i, child in enumerate(route.get("routes") or [])
+            if isinstance(child, dict)
+        ]
+        # Children indexed by an equality matcher; the rest are always tried.
+        self.index, self.unindexed = _equality_index(
+            [child.matchers for child in self.children])
+
+    def walk(self, labels: dict[str, str]) -> list[_RouteNode]:
+        """Routes below this (already matched) node that handle *labels*."""
+        out: list[_RouteNode] = []
+        for pos in _indexed_candidates(self.index, self.unindexed, labels):
+            child = self.children[pos]
+            if all(m.matches(labels) for m in child.matchers):
+                out.extend(child.walk(labels) or [child])
+                if not child.cont:
+                    break
+        return out
+
+
+class RouteTree:
+    """A compiled Alertmanager route tree.
+
+    *root* is the top-level `route:` dict; a bare generated routes list can be
+    wrapped as `{"routes": routes}` (settings then inherit from nothing).
+    Raises ValueError on an invalid matcher.
+    """
+
+    def __init__(self, root: dict):
+        self._root = _RouteNode(root or {}, "route", {}, True)
+
+    def resolve(self, labels: dict[str, str]) -> list[dict]:
+        """Deliveries for one alert, in Alertmanager order: the effective
+        INHERITED_ROUTE_KEYS settings plus the handling route's `path`."""
+        nodes = self._root.walk(labels) or [self._root]
+        return [{**n.settings, "path": n.path} for n in nodes]
+
+    def resolve_many(self, alerts: list[dict[str, str]]) -> list[list[dict]]:
+        return [self.resolve(labels) for labels in alerts]
+
+
+class InhibitIndex:
+    """Compiled inhibit_rules (current `*_matchers` and legacy map forms).
+
+    Both sides are indexed like route children, so a per-tenant rule set
+    (one `tenant="x"` rule per tenant) costs O(1) rules per alert.
+    """
+
+    def __init__(self, rules: list[dict] | None):
+        self._rules = []
+        for i, rule in enumerate(rules or []):
+            if not isinstance(rule, dict):
+                continue
+            src = _inhibit_side_matchers(rule, "source")
+            tgt = _inhibit_side_matchers(rule, "target")
+            if src is None or tgt is None:
+                continue
+            equal = tuple(lbl for lbl in rule.get("equal") or [] if isinstance(lbl, str))
+            self._rules.append((
+                i,
+                _compile_matchers(src, f"inhibit_rules[{i}].source"),
+                _compile_matchers(tgt, f"inhibit_rules[{i}].target"),
+                equal,
+            ))
+        self._src_index = _equality_index([r[1] for r in self._rules])
+        self._tgt_index = _equality_index([r[2] for r in self._rules])
+
+    def inhibitors(self, alerts: list[dict[str, str]]) -> list[int | None]:
+        """For each alert of a concurrently-firing batch, the index of the
+        first inhibit rule that mutes it, or None."""
+        # rule position → equal-label key → [also matches target, ...]
+        sources: dict[int, dict[tuple, list[bool]]] = {}
+        for labels in alerts:
+            for r in _indexed_candidates(*self._src_index, labels):
+                _idx, src, tgt, equal = self._rules[r]
+                if all(m.matches(labels) for m in src):
+                    key = tuple(labels.get(lbl, "") for lbl in equal)
+                    sources.setdefault(r, {}).setdefault(key, []).append(
+                        all(m.matches(labels) for m in tgt))
+        out: list[int | None] = []
+        for labels in alerts:
+            muted = None
+            for r in _indexed_candidates(*self._tgt_index, labels):
+                if r not in sources:
+                    continue
+                idx, src, tgt, equal = self._rules[r]
+                if not all(m.matches(labels) for m in tgt):
+                    continue
+                key = tuple(labels.get(lbl, "") for lbl in equal)
+                two_sided = all(m.matches(labels) for m in src)
+                if any(not (two_sided and both) for both in sources[r].get(key, ())):
+                    muted = idx
+                    break
+            out.append(muted)
+        return out
+
+
+def simulate_alerts(config: dict, alerts: list[dict[str, str]]) -> list[dict]:
+    """Route + inhibit a batch of alerts against an Alertmanager config dict.
+
+    The batch is treated as firing together (it is the inhibit source set).
+    Returns one dict per alert, in order:
+    {labels, receivers, routes, inhibited, inhibited_by}.
+    """
+    tree = RouteTree(config.get("route") or {})
+    muted = InhibitIndex(config.get("inhibit_rules")).inhibitors(alerts)
+    results = []
+    for labels, deliveries, rule in zip(alerts, tree.resolve_many(alerts), muted):
+        results.append({
+            "labels": labels,
+            "receivers": [d.get("receiver") for d in deliveries],
+            "routes": deliveries,
+            "inhibited": rule is not None,
+            "inhibited_by": None if rule is None else f"inhibit_rules[{rule}]",
+        })
+    return results
+
+
+def load_alertmanager_config(path: str) -> dict:
+    """Load alertmanager.yml — plain, or the ConfigMap that wraps it
+    (data["alertmanager.yml"], as --output-configmap renders)."""
+    with open(path, encoding="utf-8") as fh:
+        doc = yaml.safe_load(fh) or {}
+    if isinstance(doc, dict) and doc.get("kind") == "ConfigMap":
+        doc = yaml.safe_load((doc.get("data") or {}).get("alertmanager.yml") or "") or {}
+    if not isinstance(doc, dict):
+        raise ValueError(f"{path}: not an Alertmanager config mapping")
+    return doc
+
+
+def load_alerts(path: str) -> list[dict[str, str]]:
+    """Read alert label sets from YAML / JSON.
+
+    Accepts a list whose items are label maps or Alertmanager API alerts
+    (`{labels: {...}}`), or a mapping with such a list under `alerts`.
+    Label values are stringified; anything else raises ValueError.
+    """
+    with open(path, encoding="utf-8") as fh:
+        doc = yaml.safe_load(fh)
+    if isinstance(doc, dict):
+        doc = doc.get("alerts")
+    if not isinstance(doc, list):
+        raise ValueError(f"{path}: expected a list of alerts (or `alerts:` list)")
+    alerts = []
+    for i, item in enumerate(doc):
+        labels = item.get("labels", item) if isinstance(item, dict) else None
+        if not isinstance(labels, dict):
+            raise ValueError(f"{path}: alerts[{i}] is not a label mapping")
+        alerts.append({str(k): str(v) for k, v in labels.items()})
+    return alerts
+
+
+# ── A sharded route tree must deliver exactly like the flat one ────────────
+#
+# The sharded route mode (_grar_routes.generate_routes) regroups tenant routes
+# under shard parents and collapses identically-configured tenants into shared
+# routes. The proof resolves probe label sets against both trees and compares
+# what each is delivered to: the receiver's name and config plus the grouping
+# and timing in effect. A collapsed tenant's receiver name changes on purpose;
+# the caller declares each such rename, and any other name change is a gap (an
+# alert re-pointed at a different, identically-configured receiver). Both trees
+# hang off an implicit shared root, so base-config root settings need not be
+# known.
+
+def _route_probes(routes: list[dict] | None) -> list[dict[str, str]]:
+    """Label sets that exercise every route of a (flat) tree: the literal
+    `label="value"` matchers along each route path, plus an alert with no
+    tenant and one whose tenant is not configured."""
+    seen: dict[tuple, dict[str, str]] = {}
+
+    def visit(level: list[dict], base: dict[str, str]) -> None:
+        for route in level or []:
+            if not isinstance(route, dict):
+                continue
+            labels = dict(base)
+            for matcher in _route_matcher_strings(route):
+                compiled = _compile_matcher(matcher) if isinstance(matcher, str) else None
+                if compiled and compiled.op == "=":
+                    labels[compiled.name] = compiled.value
+            seen.setdefault(tuple(sorted(labels.items())), labels)
+            visit(route.get("routes") or [], labels)
+
+    visit(routes or [], {})
+    for extra in ({}, {"tenant": "__unrouted__"}):
+        seen.setdefault(tuple(sorted(extra.items())), extra)
+    return list(seen.values())
+
+
+def find_route_equivalence_gaps(
+        reference_routes: list[dict] | None,
+        reference_receivers: list[dict] | None,
+        candidate_routes: list[dict] | None,
+        candidate_receivers: list[dict] | None,
+        renamed: dict[str, str] | None = None,
+) -> list[tuple[dict, list, list]]:
+    """Return [(labels, reference_deliveries, candidate_deliveries), ...] for
+    every probe (see _route_probes, drawn from the reference tree) the two
+    route trees deliver differently.
+
+    A delivery is the receiver name and config (None if the route's receiver
+    is undefined) plus the group_by / timing in effect. *renamed* maps a
+    reference receiver name to the candidate name it is expected under.
+
+    Empty result = the trees are equivalent over the probe universe.
+    """
+    renamed = renamed or {}
+
+    def deliveries(tree: RouteTree, by_name: dict, labels: dict,
+                   names: dict[str, str]) -> list:
+        out = []
+        for eff in tree.resolve(labels):
+            name = eff.get("receiver")
+            cfg = by_name.get(name)
+            out.append((
+                names.get(name, name),
+                None if cfg is None else
+                {k: v for k, v in cfg.items() if k != "name"},
+                *(eff.get(k) for k in INHERITED_ROUTE_KEYS[1:]),
+            ))
+        return out
+
+    ref_tree = RouteTree({"routes": reference_routes or []})
+    cand_tree = RouteTree({"routes": candidate_routes or []})
+    ref_recv = {r.get("name"): r for r in reference_receivers or [] if isinstance(r, dict)}
+    cand_recv = {r.get("name"): r for r in candidate_receivers or [] if isinstance(r, dict)}
+    gaps: list[tuple[dict, list, list]] = []
+    for labels in _route_probes(reference_routes):
+        ref = deliveries(ref_tree, ref_recv, labels, renamed)
+        cand = deliveries(cand_tree, cand_recv, labels, {})
+        if ref != cand:
+            gaps.append((labels, ref, cand))
+    return gaps
+
+
+def assert_routes_equivalent(
+        reference_routes: list[dict] | None,
+        reference_receivers: list[dict] | None,
+        candidate_routes: list[dict] | None,
+        candidate_receivers: list[dict] | None,
+        renamed: dict[str, str] | None = None,
+) -> None:
+    """Fail-closed guard: raise ValueError if *candidate* (the sharded route
+    tree) delivers any probe label set differently from *reference* (the flat
+    tree), modulo the declared receiver *renamed* map."""
+    gaps = find_route_equivalence_gaps(reference_routes, reference_receivers,
+                                       candidate_routes, candidate_receivers,
+                                       renamed)
+    if not gaps:
+        return
+    details = "; ".join(f"labels={labels}" for labels, _ref, _cand in gaps[:5])
+    more = f" (+{len(gaps) - 5} more)" if len(gaps) > 5 else ""
+    raise ValueError(
+        "Sharded route tree is not equivalent to the flat form: "
+        f"{len(gaps)} label set(s) are delivered differently ({details}){more}. "
+        "Emit the flat route tree instead.")
+
@@ -8,6 +8,7 @@ Functions:
   _extract_host(value)          → hostname (lowercase) or None
   validate_receiver_domains(...) → SSRF-prevention domain allowlist check
   load_policy(path)             → list of allowed_domains from policy YAML
+  assert_inhibit_rules_equivalent(...) → consolidated vs per-tenant dedup proof
   validate_tenant_keys(...)      → schema-key typo / unknown-key warnings
   _validate_profile_refs(parsed) → ADR-007 profile-reference existence check
   check_domain_policies(...)    → ADR-007 domain-policy constraint validation
@@ -17,10 +18,12 @@ from __future__ import annotations
 import base64
 import binascii
 import fnmatch
+import functools
 import os
 import re
 import sys
 from pathlib import Path
+from typing import NamedTuple
 from urllib.parse import urlparse
 
 import yaml
@@ -105,6 +108,49 @@ WATCHDOG_IDENTITY_LABELS = {"alertname": "Watchdog", "severity": "none"}
 _INHIBIT_MATCHER_RE = re.compile(r'^\s*([a-zA-Z_]\w*)\s*(=~|!~|!=|=)\s*"?(.*?)"?\s*$')
 
 
+class _Matcher(NamedTuple):
+    """One parsed matcher string; `regex` is the compiled (anchored) pattern
+    for `=~` / `!~`, None for `=` / `!=` or when the pattern is invalid."""
+    name: str
+    op: str
+    value: str
+    regex: "re.Pattern[str] | None"
+
+    def matches(self, labels: dict[str, str]) -> bool:
+        actual = labels.get(self.name, "")
+        if self.op == "=":
+            return actual == self.value
+        if self.op == "!=":
+            return actual != self.value
+        if self.regex is None:
+            return True  # invalid regex → conservatively "could match"
+        hit = self.regex.fullmatch(actual) is not None
+        return hit if self.op == "=~" else not hit
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile_matcher(matcher: str) -> _Matcher | None:
+    """Parse + compile one matcher string once, or None if unparseable.
+
+    Cached: the guards, the equivalence proofs and the route simulator
+    (_grar_simulate) evaluate the same few matcher strings against many label
+    sets; parsing is quadratic in the length of a long `tenant!~"a|b|..."`
+    alternation, and the regex is compiled here rather than looked up in
+    `re`'s cache on every evaluation.
+    """
+    m = _INHIBIT_MATCHER_RE.match(matcher)
+    if not m:
+        return None
+    name, op, value = m.group(1), m.group(2), m.group(3)
+    regex = None
+    if op in ("=~", "!~"):
+        try:
+            regex = re.compile(value)
+        except re.error:
+            regex = None
+    return _Matcher(name, op, value, regex)
+
+
 def _matcher_matches_labels(matcher: str, labels: dict[str, str]) -> bool:
     """Evaluate one Alertmanager matcher string against a concrete label set.
 
@@ -112,25 +158,8 @@ def _matcher_matches_labels(matcher: str, labels: dict[str, str]) -> bool:
     malformed inhibit rule can never silently slip a Watchdog-suppressing matcher
     past the guard. An invalid regex value is likewise treated as a match.
     """
-    m = _INHIBIT_MATCHER_RE.match(matcher)
-    if not m:
-        return True
-    name, op, value = m.group(1), m.group(2), m.group(3)
-    actual = labels.get(name, "")
-    if op == "=":
-        return actual == value
-    if op == "!=":
-        return actual != value
-    if op == "=~":
-        try:
-            return re.fullmatch(value, actual) is not None
-        except re.error:
-            return True
-    # op == "!~"
-    try:
-        return re.fullmatch(value, actual) is None
-    except re.error:
-        return True
+    compiled = _compile_matcher(matcher)
+    return True if compiled is None else compiled.matches(labels)
 
 
 def _inhibit_side_matchers(rule: dict, side: str) -> list[str] | None:
@@ -179,10 +208,10 @@ def _matchers_gate_label_present(matchers: list[str], label: str) -> bool:
     does not. An unnamed label is not gated by that matcher.
     """
     for m in matchers or []:
-        parsed = _INHIBIT_MATCHER_RE.match(m)
-        if not parsed or parsed.group(1) != label:
+        compiled = _compile_matcher(m)
+        if compiled is None or compiled.name != label:
             continue
-        if not _matcher_matches_labels(m, {label: ""}):
+        if not compiled.matches({label: ""}):
             return True
     return False
 
@@ -453,9 +482,9 @@ def _pinned_label_values(matchers: list[str], label: str) -> list[str]:
     """Literal values *matchers* pins for *label* via ``label="value"``."""
     out: list[str] = []
     for matcher in matchers or []:
-        parsed = _INHIBIT_MATCHER_RE.match(matcher)
-        if parsed and parsed.group(1) == label and parsed.group(2) == "=":
-            out.append(parsed.group(3))
+        compiled = _compile_matcher(matcher)
+        if compiled and compiled.name == label and compiled.op == "=":
+            out.append(compiled.value)
     return out
 
 
@@ -526,6 +555,152 @@ def assert_platform_alerts_not_tenant_silenceable(
         "match while platform alerts are excluded), or narrow the target.")
 
 
+# ── Consolidated severity-dedup inhibits must match the per-tenant form ─────
+#
+# The consolidated emission mode (_grar_routes.generate_inhibit_rules) replaces
+# N per-tenant rules with one `equal: [tenant, metric_group]` rule. That is only
+# a safe rewrite if both sets inhibit exactly the same (source, target) alert
+# pairs, so the mode proves it before returning — with the SAME matcher
+# evaluator the Watchdog / #1132 guards use, not a second interpretation of
+# Alertmanager's operators.
+#
+# Neither form names a label other than severity / metric_group / tenant, so a
+# probe universe over those three is exhaustive for them: every severity the
+# rules pin plus one they do not, metric_group equal / different / missing, and
+# for each configured tenant the pairs it can form with itself, with other
+# configured tenants, with a tenant value that names no configured tenant, and
+# with an alert carrying no tenant label.
+_EQUIV_SEVERITIES = ("critical", "warning", "none")
+_EQUIV_METRIC_GROUPS = ("a", "b", "")
+
+
+def _probe_labels(severity: str, metric_group: str, tenant: str) -> dict[str, str]:
+    """Alert label set for the equivalence probe ("" = label absent)."""
+    labels = {"severity": severity}
+    if metric_group:
+        labels["metric_group"] = metric_group
+    if tenant:
+        labels["tenant"] = tenant
+    return labels
+
+
+def _inhibited_pairs(rules: list[dict], probes: list[dict[str, str]],
+                     allowed: set[tuple[str, str]]) -> set[tuple[int, int]]:
+    """Indices (i, j) of probe pairs where some rule lets probes[i] inhibit
+    probes[j] — Alertmanager semantics: AND-joined matchers per side, `equal:`
+    labels compared with missing == "". Each side is matched once per probe
+    (not once per pair); only pairs whose tenants are in *allowed* count."""
+    out: set[tuple[int, int]] = set()
+    for rule in rules:
+        src = _inhibit_side_matchers(rule, "source")
+        tgt = _inhibit_side_matchers(rule, "target")
+        if src is None or tgt is None:
+            continue
+        equal = [lbl for lbl in rule.get("equal") or [] if isinstance(lbl, str)]
+        sources = [i for i, p in enumerate(probes)
+                   if all(_matcher_matches_labels(m, p) for m in src)]
+        targets = [j for j, p in enumerate(probes)
+                   if all(_matcher_matches_labels(m, p) for m in tgt)]
+        for i in sources:
+            s = probes[i]
+            for j in targets:
+                t = probes[j]
+                if ((s.get("tenant", ""), t.get("tenant", "")) in allowed
+                        and all(s.get(lbl, "") == t.get(lbl, "") for lbl in equal)):
+                    out.add((i, j))
+    return out
+
+
+def _rules_by_source_tenant(rules: list[dict] | None) -> tuple[dict[str, list[dict]], list[dict]]:
+    """Bucket rules by the literal source `tenant="x"` they pin (plus the
+    unpinned rest), so each tenant's probes only meet its own rules — keeps the
+    proof linear in the tenant count instead of quadratic."""
+    by_tenant: dict[str, list[dict]] = {}
+    unpinned: list[dict] = []
+    for rule in rules or []:
+        if not isinstance(rule, dict):
+            continue
+        pinned = set(_pinned_label_values(
+            _inhibit_side_matchers(rule, "source") or [], "tenant"))
+        if len(pinned) == 1:
+            by_tenant.setdefault(pinned.pop(), []).append(rule)
+        else:
+            unpinned.append(rule)
+    return by_tenant, unpinned
+
+
+def find_inhibit_equivalence_gaps(
+        reference: list[dict] | None,
+        candidate: list[dict] | None,
+        tenants: "list[str] | set[str]",
+) -> list[tuple[dict, dict, bool]]:
+    """Return [(source_labels, target_labels, reference_inhibits), ...] for
+    every probe pair the two severity-dedup rule sets disagree on.
+
+    Scope is the configured *tenants*, one tenant value that names none of
+    them, and alerts with no tenant label.
+
+    Empty result = the sets are equivalent over the probe universe.
+    """
+    ref_pinned, ref_rest = _rules_by_source_tenant(reference)
+    cand_pinned, cand_rest = _rules_by_source_tenant(candidate)
+    names = sorted(set(tenants))
+    stranger = "unconfigured"
+    while stranger in names:
+        stranger += "-x"
+    # Cross-tenant partners: the next tenant overall, and the next one of the
+    # same kind (with / without its own reference rule), so both an
+    # enabled-enabled and a mixed pair are probed for every tenant.
+    kinds = {kind: [t for t in names if (t in ref_pinned) is kind] for kind in (True, False)}
+    gaps: list[tuple[dict, dict, bool]] = []
+    for i, tenant in enumerate(names):
+        same = kinds[tenant in ref_pinned]
+        partners = [names[(i + 1) % len(names)] if len(names) > 1 else f"{tenant}-other"]
+        if len(same) > 1:
+            peer = same[(same.index(tenant) + 1) % len(same)]
+            if peer not in partners:
+                partners.append(peer)
+        labels = (tenant, *partners, stranger, "")
+        allowed = {(s, t) for s in labels for t in labels if tenant in (s, t)}
+        allowed.add((stranger, stranger))
+        probes = [_probe_labels(sev, mg, t)
+                  for t in labels
+                  for sev in _EQUIV_SEVERITIES
+                  for mg in _EQUIV_METRIC_GROUPS]
+        ref = _inhibited_pairs(
+            [*ref_pinned.get(tenant, []),
+             *(r for p in partners for r in ref_pinned.get(p, [])), *ref_rest],
+            probes, allowed)
+        cand = _inhibited_pairs(
+            [*cand_pinned.get(tenant, []),
+             *(r for p in partners for r in cand_pinned.get(p, [])), *cand_rest],
+            probes, allowed)
+        gaps.extend((probes[s], probes[t], (s, t) in ref)
+                    for s, t in sorted(ref ^ cand))
+    return gaps
+
+
+def assert_inhibit_rules_equivalent(
+        reference: list[dict] | None,
+        candidate: list[dict] | None,
+        tenants: "list[str] | set[str]",
+) -> None:
+    """Fail-closed guard: raise ValueError if *candidate* (the consolidated
+    severity-dedup set) inhibits a different set of (source, target) pairs than
+    *reference* (the per-tenant form) for the configured tenants."""
+    gaps = find_inhibit_equivalence_gaps(reference, candidate, tenants)
+    if not gaps:
+        return
+    details = "; ".join(
+        f"source={s} target={t} per-tenant={'inhibits' if exp else 'passes'}"
+        for s, t, exp in gaps[:5])
+    more = f" (+{len(gaps) - 5} more)" if len(gaps) > 5 else ""
+    raise ValueError(
+        "Consolidated severity-dedup inhibit rules are not equivalent to the "
+        f"per-tenant form: {len(gaps)} probe pair(s) differ ({details}){more}. "
+        "Emit the per-tenant form instead.")
+
+
 def load_policy(policy_path: str | None) -> list[str]:
     """Load policy YAML and return allowed_domains list (may be empty)."""
     if not policy_path or not Path(policy_path).is_file():
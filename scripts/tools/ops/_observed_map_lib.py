@@ -30,7 +30,8 @@ Guardrails baked in (#719 / Gemini adversarial review):
 """
 from __future__ import annotations
 
-import re
+import os
+import sys
 from typing import Any, Optional
 
 try:
@@ -38,52 +39,17 @@ try:
 except ImportError:  # pragma: no cover - environments without pyyaml
     yaml = None  # type: ignore
 
-# A threshold reference: tenant:alert_threshold:<key> or
-# tenant_version:alert_threshold:<key> (ADR-024 version-aware packs).
-THRESHOLD_RE = re.compile(r"tenant(?:_version)?:alert_threshold:([A-Za-z0-9_]+)")
-# An observed recording rule: tenant:NAME:AGG or tenant_version:NAME:AGG.
-# The colon convention naturally excludes tenant_metadata_info / user_state_filter
-# (underscore, no colon) — part of the R3 denylist.
-OBSERVED_RE = re.compile(r"tenant(?:_version)?:[A-Za-z0-9_:]+")
-# Numeric scaling adjacent to an operand (e.g. "* 100", "/ 1024", "* (100)").
-# The metadata join "* on(tenant) group_left(...) tenant_metadata_info" is NOT
-# numeric, so it is not matched here. The optional "(" covers parenthesised
-# scalars like "* (100)".
-SCALING_RE = re.compile(r"[*/]\s*\(?\s*[0-9]")
-
-
-def _alert_rules(doc: dict) -> list[dict]:
-    out: list[dict] = []
-    for g in doc.get("groups", []) or []:
-        for r in g.get("rules", []) or []:
-            if isinstance(r, dict) and "alert" in r:
-                out.append(r)
-    return out
-
-
-def _direction_before(expr: str, key: str) -> Optional[str]:
-    """Comparison operator (``>``/``<``) in the window before the threshold token.
-
-    Scans backwards from the ``tenant:alert_threshold:<key>`` occurrence; skips
-    ``=`` so ``>=`` / ``<=`` resolve to ``>`` / ``<``. The ``unless ... == 1``
-    maintenance filter appears AFTER the comparison, so it is not picked up.
-
-    The token is matched with a trailing word-boundary so ``key="cpu"`` does NOT
-    match the ``cpu_critical`` token (a bare ``str.find`` would land on the
-    prefix-sharing sibling when both appear in one composite expr and read the
-    wrong operator — latent across the 14 ``<key>``/``<key>_critical`` pairs).
-    """
-    pat = re.compile(
-        r"tenant(?:_version)?:alert_threshold:" + re.escape(key) + r"(?![A-Za-z0-9_])"
-    )
-    m = pat.search(expr)
-    if m is None:
-        return None
-    window = expr[max(0, m.start() - 100):m.start()]
-    for ch in reversed(window):
-        if ch in "<>":
-            return ch
-    return None
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+# The extraction regexes + direction scan live in the compiled rule-pack index
+# (parsed once per pack content, cached on disk); re-exported here because the
+# drift-guard and its tests read them under these names.
+from _lib_rulepack_index import (  # noqa: E402
+    OBSERVED_RE,
+    SCALING_RE,
+    THRESHOLD_RE,
+    compile_pack,
+    direction_before as _direction_before,
+)
 
 
 def extract_pack(path: str) -> dict[str, dict[str, Any]]:
@@ -91,32 +57,21 @@ def extract_pack(path: str) -> dict[str, dict[str, Any]]:
 
     Returns ``{key: {candidates:set, directions:set, scaled:bool, alerts:set}}``.
     """
-    if yaml is None:
-        raise RuntimeError("pyyaml required")
-    with open(path, encoding="utf-8") as fh:
-        doc = yaml.safe_load(fh) or {}
     by_key: dict[str, dict[str, Any]] = {}
-    for rule in _alert_rules(doc):
-        expr = rule.get("expr", "") or ""
-        keys = set(THRESHOLD_RE.findall(expr))
-        if not keys:
+    for rule in compile_pack(path).alerts():
+        if not rule.threshold_keys:
             continue
-        cands = {
-            m for m in OBSERVED_RE.findall(expr)
-            if "alert_threshold" not in m  # exclude tenant[_version]:alert_threshold:*
-        }
-        scaled = bool(SCALING_RE.search(expr))
-        for key in keys:
+        for key in rule.threshold_keys:
             e = by_key.setdefault(
                 key,
                 {"candidates": set(), "directions": set(), "scaled": False, "alerts": set()},
             )
-            e["candidates"].update(cands)
-            d = _direction_before(expr, key)
+            e["candidates"].update(rule.observed)
+            d = rule.directions[key]
             if d:
                 e["directions"].add(d)
-            e["scaled"] = e["scaled"] or scaled
-            e["alerts"].add(rule.get("alert", "?"))
+            e["scaled"] = e["scaled"] or rule.scaled
+            e["alerts"].add(rule.name)
     return by_key
 
 
@@ -311,18 +266,13 @@ def all_threshold_keys(pack_paths: list[str]) -> set[str]:
     if yaml is None:
         return keys
     for p in pack_paths:
-        with open(p, encoding="utf-8") as fh:
-            text = fh.read()
-        keys.update(THRESHOLD_RE.findall(text))
+        keys.update(compile_pack(p).text_threshold_keys)
     return keys
 
 
 # ---------------------------------------------------------------------------
 # Shared paths / loading / known-deferred (used by recommend + drift-guard)
 # ---------------------------------------------------------------------------
-import os  # noqa: E402
-import sys  # noqa: E402
-
 _THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 # scripts/tools/ops/ -> repo root is three levels up.
 _REPO_ROOT = os.path.abspath(os.path.join(_THIS_DIR, "..", "..", ".."))
@@ -646,10 +596,8 @@ def alert_referenced_keys(pack_paths: list[str]) -> set[str]:
     if yaml is None:
         return keys
     for p in pack_paths:
-        with open(p, encoding="utf-8") as fh:
-            doc = yaml.safe_load(fh) or {}
-        for rule in _alert_rules(doc):
-            keys.update(THRESHOLD_RE.findall(rule.get("expr", "") or ""))
+        for rule in compile_pack(p).alerts():
+            keys.update(rule.threshold_keys)
     return keys
 
 
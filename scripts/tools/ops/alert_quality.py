@@ -10,6 +10,15 @@
 
 產出 per-tenant JSON 報告，可嵌入 Grafana dashboard 或作為 CI gate。
 
+大型 fleet:
+  先以一次 `count by (tenant)` 聚合查詢列出有 firing 紀錄的 tenant，再逐 tenant
+  並行（--workers）抓 ALERTS range 資料；每個 tenant 的回應一到手即歸約成
+  alertname × tenant 的統計後丟棄，記憶體上限約為「workers × 最大單一 tenant」
+  而非整個 fleet。每條 series 的 firing episode 以 C 層 builtin（map / compress）
+  一次切出，不逐樣本走 Python 迴圈；ALERTS 不 firing 時 series 缺樣本（而非
+  值 0），缺樣本的間隔即視為一次 resolve。某個 tenant 的查詢失敗時印 WARN，
+  並列入報告的 failed_tenants（不計入分數；--ci 視為未通過）。
+
 用法:
     da-tools alert-quality --prometheus http://localhost:9090 --period 30d
     da-tools alert-quality --prometheus http://localhost:9090 --period 7d --json
@@ -18,12 +27,15 @@
 from __future__ import annotations
 
 import argparse
+import operator
 import os
 import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field, asdict
-from typing import Any, Optional
+from itertools import compress
+from typing import Any, Optional, Sequence
 from urllib.parse import quote
 
 # ---------------------------------------------------------------------------
@@ -35,6 +47,7 @@ from _lib_python import (  # noqa: E402
     format_json_report,
     http_get_json,
     parse_duration_seconds,
+    query_prometheus_instant,
     query_prometheus_range,
 )
 
@@ -64,6 +77,14 @@ GRADE_BAD = "BAD"
 # Tenant 名稱白名單 pattern（僅允許字母、數字、底線、連字號）
 _TENANT_NAME_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
 
+# 逐 tenant 並行抓取的預設執行緒數（與 batch_diagnose 相同）
+DEFAULT_WORKERS = 5
+
+# 相鄰樣本間隔超過 step 的此倍數 → 中間缺樣本（alert 已 resolve）
+_GAP_FACTOR = 1.5
+
+_FIRING = 'alertstate="firing"'
+
 
 # ---------------------------------------------------------------------------
 # Data models
@@ -83,6 +104,8 @@ class AlertQualityMetrics:
     stale_grade: str = GRADE_GOOD
     # Resolution latency
     avg_resolution_secs: float = 0.0
+    p50_resolution_secs: float = 0.0
+    p95_resolution_secs: float = 0.0
     resolution_grade: str = GRADE_GOOD
     # Suppression ratio
     total_alerts: int = 0
@@ -115,52 +138,50 @@ class QualityReport:
     period: str = ""
     tenants: list[dict[str, Any]] = field(default_factory=list)
     summary: dict[str, Any] = field(default_factory=dict)
+    # 查詢失敗、未計入分數的 tenant（"*" = 單次全 fleet 查詢）
+    failed_tenants: list[str] = field(default_factory=list)
 
 
 # ---------------------------------------------------------------------------
 # Core computation engine
 # ---------------------------------------------------------------------------
-def query_prometheus_alerts(
+def _range_window(
+    period_seconds: int,
+    now: Optional[float] = None,
+) -> tuple[int, int, int]:
+    """(start, end, step) of the ALERTS range query — 自適應 step，最小 60s。
+
+    整數秒：query_prometheus_range 以 ``:.0f`` 送出，回傳樣本即落在
+    ``start + k*step`` 格點上，episode 切分以同一組數值判斷。
+    """
+    end_ts = int(time.time() if now is None else now)
+    step = max(60, period_seconds // 1000)
+    return end_ts - period_seconds, end_ts, step
+
+
+def _quote_label_value(value: str) -> str:
+    """PromQL double-quoted label value."""
+    escaped = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def discover_alert_tenants(
     prom_url: str,
-    metric: str,
     period_seconds: int,
     *,
-    tenant: Optional[str] = None,
     timeout: int = 30,
-) -> list[dict[str, Any]]:
-    """查詢 Prometheus ALERTS metric 歷史資料。
-
-    Args:
-        prom_url: Prometheus base URL。
-        metric: Metric 名稱（ALERTS 或 ALERTS_FOR_STATE）。
-        period_seconds: 回溯秒數。
-        tenant: 可選，篩選特定 tenant。
-        timeout: HTTP timeout。
+) -> Optional[list[str]]:
+    """期間內有 firing 紀錄的 tenant（server 端聚合；無 tenant label 者為 ""）。
 
     Returns:
-        Prometheus range query 結果清單。
+        排序後的 tenant 清單；查詢失敗回傳 None（呼叫端退回單次全 fleet 查詢）。
     """
-    end_ts = time.time()
-    start_ts = end_ts - period_seconds
-    step = max(60, period_seconds // 1000)  # 自適應 step，最小 60s
-
-    label_filter = '{alertstate="firing"}'
-    if tenant:
-        if not _TENANT_NAME_RE.match(tenant):
-            return []
-        label_filter = f'{{alertstate="firing",tenant="{tenant}"}}'
-
-    query = f"{metric}{label_filter}"
-    # Fetch core delegated to _lib_prometheus.query_prometheus_range (ROI r3
-    # W1): the lib percent-encodes the whole param set — the raw PromQL
-    # carries `{`, `}` and `"`, which must not be interpolated into a URL
-    # unescaped (#1112 InvalidURL bug-class). The "any error → []" collapse
-    # stays here.
-    result, err = query_prometheus_range(
-        prom_url, query, start_ts, end_ts, step, timeout=timeout)
-    if err:
-        return []
-    return result
+    query = (f"count by (tenant) "
+             f"(count_over_time(ALERTS{{{_FIRING}}}[{int(period_seconds)}s]))")
+    result, err = query_prometheus_instant(prom_url, query, timeout=timeout)
+    if err or result is None:
+        return None
+    return sorted({(r.get("metric") or {}).get("tenant", "") for r in result})
 
 
 def query_alertmanager_alerts(
@@ -350,15 +371,217 @@ def compute_tenant_score(alerts: list[AlertQualityMetrics]) -> float:
     return round(total / len(alerts), 1)
 
 
+# ---------------------------------------------------------------------------
+# Episode engine
+# ---------------------------------------------------------------------------
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Linear-interpolated percentile of an ascending list (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * (p / 100.0)
+    f = int(k)
+    if f + 1 >= len(sorted_values):
+        return sorted_values[-1]
+    return sorted_values[f] + (k - f) * (sorted_values[f + 1] - sorted_values[f])
+
+
+def _walk_series(
+    ts: Sequence[float],
+    raw: Sequence[Any],
+    step: float,
+    end: float,
+) -> tuple[int, list[float], float, int]:
+    """逐樣本 walker（值非全為 "1" 的 series：顯式 0 / 非數值）。
+
+    0→1 為一次 firing；1→0 或缺樣本間隔為一次 resolve。非數值樣本略過
+    （不計入 total、不改變狀態）。
+    """
+    limit = step * _GAP_FACTOR
+    transitions = 0
+    durations: list[float] = []
+    last_fired = 0.0
+    total = 0
+    prev = 0
+    seen_ts = 0.0  # 上一個樣本（含非數值）的 ts——缺口以實際出現的樣本判斷
+    fire_start = 0.0
+    for ts_f, val_str in zip(ts, raw):
+        if prev == 1 and ts_f - seen_ts > limit:
+            # 缺樣本 → 在下一個格點前已 resolve
+            if fire_start > 0:
+                durations.append(seen_ts + step - fire_start)
+            prev = 0
+            fire_start = 0.0
+        seen_ts = ts_f
+        try:
+            val = int(float(val_str))
+        except (ValueError, TypeError):
+            continue
+        total += 1
+        if val == 1 and prev == 0:
+            transitions += 1
+            fire_start = ts_f
+        elif val == 0 and prev == 1 and fire_start > 0:
+            duration = ts_f - fire_start
+            if duration > 0:
+                durations.append(duration)
+            fire_start = 0.0
+        if val == 1 and ts_f > last_fired:
+            last_fired = ts_f
+        prev = val
+    if prev == 1 and fire_start > 0 and seen_ts + step <= end:
+        durations.append(seen_ts + step - fire_start)
+    return transitions, durations, last_fired, total
+
+
+def series_episodes(
+    values: list[list[Any]],
+    step: float,
+    end: float,
+) -> tuple[int, list[float], float, int]:
+    """單一 ALERTS series 的 (firing 次數, 已 resolve episode 秒數, 最後 firing ts, 樣本數)。
+
+    真實 ALERTS{alertstate="firing"} 的值恆為 "1"（不 firing 時缺樣本），
+    走快路徑：相鄰 timestamp 差以 map/compress 一次找出所有缺口，episode
+    邊界即缺口位置，不進 Python 迴圈。其餘 series 交給 _walk_series；兩者
+    對全 "1" 輸入結果相同。最後一段若延續到查詢視窗尾端則仍在 firing，
+    不計入 duration。
+    """
+    if not values:
+        return 0, [], 0.0, 0
+    ts, raw = zip(*values)
+    if type(ts[0]) is not float:
+        ts = tuple(map(float, ts))
+    n = len(ts)
+    if raw.count("1") != n:
+        return _walk_series(ts, raw, step, end)
+
+    limit = step * _GAP_FACTOR
+    gaps = map(limit.__lt__, map(operator.sub, ts[1:], ts[:-1]))
+    breaks = list(compress(range(1, n), gaps))
+    starts = [0] + breaks
+    ends = [b - 1 for b in breaks]
+    ends.append(n - 1)
+    starts_ts = [ts[i] for i in starts]
+    ends_ts = [ts[i] + step for i in ends]
+    if ends_ts[-1] > end:
+        # 最後一段仍在 firing
+        starts_ts.pop()
+        ends_ts.pop()
+    durations = list(map(operator.sub, ends_ts, starts_ts))
+    return len(starts), durations, ts[-1], n
+
+
 # ---------------------------------------------------------------------------
 # Prometheus-based analysis (main path)
 # ---------------------------------------------------------------------------
+def _new_bucket() -> dict[str, Any]:
+    return {"fire_transitions": 0, "last_fired_ts": 0.0, "durations": [], "total": 0}
+
+
+def reduce_alert_series(
+    results: list[dict[str, Any]],
+    step: float,
+    end: float,
+    alert_data: Optional[dict[tuple[str, str], dict[str, Any]]] = None,
+) -> dict[tuple[str, str], dict[str, Any]]:
+    """把一批 ALERTS range 結果歸約進 alertname × tenant 統計（就地累加）。"""
+    if alert_data is None:
+        alert_data = {}
+    for series in results:
+        labels = series.get("metric", {})
+        key = (labels.get("alertname", "unknown"), labels.get("tenant", "unknown"))
+        data = alert_data.get(key)
+        if data is None:
+            data = alert_data[key] = _new_bucket()
+        transitions, durations, last_fired, total = series_episodes(
+            series.get("values") or [], step, end)
+        data["fire_transitions"] += transitions
+        data["durations"].extend(durations)
+        data["total"] += total
+        if last_fired > data["last_fired_ts"]:
+            data["last_fired_ts"] = last_fired
+    return alert_data
+
+
+def _fetch_reduced(
+    prom_url: str,
+    selector: str,
+    window: tuple[int, int, int],
+) -> Optional[dict[tuple[str, str], dict[str, Any]]]:
+    """抓一個 selector 的 ALERTS range 資料並立即歸約（原始回應不留存）。
+
+    查詢失敗時印 WARN（含 selector 與錯誤）並回傳 None，由呼叫端記錄。
+    """
+    start_ts, end_ts, step = window
+    query = f"ALERTS{{{selector}}}"
+    result, err = query_prometheus_range(
+        prom_url, query, start_ts, end_ts, step, timeout=30)
+    if err:
+        print(f"  WARN: range query {query} failed: {err}", file=sys.stderr)
+        return None
+    return reduce_alert_series(result or [], step, end_ts)
+
+
+def collect_alert_stats(
+    prom_url: str,
+    period_seconds: int,
+    *,
+    tenant: Optional[str] = None,
+    workers: int = DEFAULT_WORKERS,
+    failed: Optional[list[str]] = None,
+) -> dict[tuple[str, str], dict[str, Any]]:
+    """ALERTS 歷史 → alertname × tenant 統計（逐 tenant 並行、串流歸約）。
+
+    查詢失敗的 tenant 不在結果內；若給了 *failed*，就地追加其名稱
+    （單次全 fleet 查詢失敗記為 "*"），讓報告標明分數缺了誰。
+    """
+    if failed is None:
+        failed = []
+    window = _range_window(period_seconds)
+    if tenant:
+        if not _TENANT_NAME_RE.match(tenant):
+            return {}
+        part = _fetch_reduced(prom_url, f'{_FIRING},tenant="{tenant}"', window)
+        if part is None:
+            failed.append(tenant)
+        return part or {}
+
+    tenants = discover_alert_tenants(prom_url, period_seconds)
+    if not tenants:
+        # 聚合查詢失敗（或無資料）→ 單次全 fleet 查詢
+        part = _fetch_reduced(prom_url, _FIRING, window)
+        if part is None:
+            failed.append("*")
+        return part or {}
+
+    selectors = [f"{_FIRING},tenant={_quote_label_value(t)}" for t in tenants]
+    alert_data: dict[tuple[str, str], dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(selectors)))) as pool:
+        parts = pool.map(lambda sel: _fetch_reduced(prom_url, sel, window), selectors)
+        for tname, part in zip(tenants, parts):
+            if part is None:
+                failed.append(tname)
+                continue
+            for key, data in part.items():
+                if key not in alert_data:
+                    alert_data[key] = data
+                    continue
+                acc = alert_data[key]
+                acc["fire_transitions"] += data["fire_transitions"]
+                acc["durations"].extend(data["durations"])
+                acc["total"] += data["total"]
+                acc["last_fired_ts"] = max(acc["last_fired_ts"], data["last_fired_ts"])
+    return alert_data
+
+
 def analyze_from_prometheus(
     prom_url: str,
     period_seconds: int,
     *,
     tenant: Optional[str] = None,
     am_url: Optional[str] = None,
+    workers: int = DEFAULT_WORKERS,
+    failed: Optional[list[str]] = None,
 ) -> list[AlertQualityMetrics]:
     """從 Prometheus ALERTS metric 分析品質。
 
@@ -367,6 +590,8 @@ def analyze_from_prometheus(
         period_seconds: 回溯秒數。
         tenant: 可選，篩選特定 tenant。
         am_url: 可選 Alertmanager URL（取得 suppression 資料）。
+        workers: 逐 tenant 並行抓取的執行緒數。
+        failed: 可選，就地追加查詢失敗的 tenant（見 collect_alert_stats）。
 
     Returns:
         每個 alertname × tenant 的品質指標清單。
@@ -374,59 +599,10 @@ def analyze_from_prometheus(
     now = time.time()
     period_days = period_seconds // 86400 or 1
 
-    # 查詢 ALERTS metric
-    results = query_prometheus_alerts(
-        prom_url, "ALERTS", period_seconds, tenant=tenant,
+    alert_data = collect_alert_stats(
+        prom_url, period_seconds, tenant=tenant, workers=workers, failed=failed,
     )
 
-    # 按 alertname × tenant 聚合
-    alert_data: dict[tuple[str, str], dict[str, Any]] = {}
-    for series in results:
-        labels = series.get("metric", {})
-        aname = labels.get("alertname", "unknown")
-        tname = labels.get("tenant", "unknown")
-        key = (aname, tname)
-
-        if key not in alert_data:
-            alert_data[key] = {
-                "fire_transitions": 0,
-                "last_fired_ts": 0.0,
-                "durations": [],
-                "total": 0,
-            }
-
-        values = series.get("values", [])
-        if not values:
-            continue
-
-        # 計算 fire transitions（0→1 轉換次數）
-        prev_val = 0
-        fire_start = 0.0
-        for ts, val_str in values:
-            try:
-                val = int(float(val_str))
-            except (ValueError, TypeError):
-                continue
-
-            ts_f = float(ts)
-            alert_data[key]["total"] += 1
-
-            if val == 1 and prev_val == 0:
-                # 新的 firing 事件
-                alert_data[key]["fire_transitions"] += 1
-                fire_start = ts_f
-            elif val == 0 and prev_val == 1 and fire_start > 0:
-                # Resolved
-                duration = ts_f - fire_start
-                if duration > 0:
-                    alert_data[key]["durations"].append(duration)
-                fire_start = 0.0
-
-            if val == 1 and ts_f > alert_data[key]["last_fired_ts"]:
-                alert_data[key]["last_fired_ts"] = ts_f
-
-            prev_val = val
-
     # 查詢 suppression 資料（從 Alertmanager）
     suppressed_counts: dict[tuple[str, str], int] = {}
     if am_url:
@@ -457,9 +633,12 @@ def analyze_from_prometheus(
         )
 
         # Resolution latency
+        durations = sorted(data["durations"])
         m.avg_resolution_secs, m.resolution_grade = compute_resolution_latency(
-            data["durations"],
+            durations,
         )
+        m.p50_resolution_secs = percentile(durations, 50)
+        m.p95_resolution_secs = percentile(durations, 95)
 
         # Suppression
         key = (aname, tname)
@@ -482,12 +661,14 @@ def analyze_from_prometheus(
 def generate_report(
     metrics: list[AlertQualityMetrics],
     period: str,
+    failed_tenants: Optional[Sequence[str]] = None,
 ) -> QualityReport:
     """從指標清單生成完整報告。
 
     Args:
         metrics: AlertQualityMetrics 清單。
         period: 期間字串（如 "30d"）。
+        failed_tenants: 查詢失敗、未計入分數的 tenant。
 
     Returns:
         QualityReport 物件。
@@ -495,6 +676,7 @@ def generate_report(
     report = QualityReport(
         timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         period=period,
+        failed_tenants=sorted(failed_tenants or ()),
     )
 
     # 按 tenant 分組
@@ -532,6 +714,7 @@ def generate_report(
         "overall_score": round(
             sum(t["score"] for t in report.tenants) / max(len(report.tenants), 1), 1,
         ),
+        "failed_tenants": len(report.failed_tenants),
     }
 
     return report
@@ -560,6 +743,10 @@ def print_text_report(report: QualityReport) -> None:
           f"{summary.get('bad', 0)} BAD")
     score_label = "綜合分數" if lang == "zh" else "Overall Score"
     print(f"  {score_label}: {summary.get('overall_score', 0)}/100")
+    if report.failed_tenants:
+        failed_label = ("查詢失敗、未計入分數" if lang == "zh"
+                        else "Query failed, not scored")
+        print(f"  ⚠ {failed_label}: {', '.join(report.failed_tenants)}")
     print()
 
     for t in report.tenants:
@@ -617,6 +804,10 @@ def generate_markdown(report: QualityReport) -> str:
     lines.append(f"**Overall Score: {s.get('overall_score', 0)}/100** "
                  f"({s.get('good', 0)} GOOD / {s.get('warn', 0)} WARN / {s.get('bad', 0)} BAD)")
     lines.append("")
+    if report.failed_tenants:
+        lines.append("⚠️ Query failed, not scored: "
+                     + ", ".join(f"`{t}`" for t in report.failed_tenants))
+        lines.append("")
 
     lines.append("| Tenant | Score | GOOD | WARN | BAD |")
     lines.append("|--------|-------|------|------|-----|")
@@ -666,6 +857,8 @@ def build_parser() -> argparse.ArgumentParser:
         parser.add_argument("--markdown", action="store_true", help="Markdown 格式輸出")
         parser.add_argument("--ci", action="store_true", help="CI 模式: BAD 時 exit code 1")
         parser.add_argument("--min-score", type=float, default=0, help="CI 最低分數門檻（預設: 0）")
+        parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                            help=f"逐 tenant 並行查詢執行緒數（預設: {DEFAULT_WORKERS}）")
     else:
         parser = argparse.ArgumentParser(
             description="Alert Quality Scoring — analyze Alertmanager history to identify problem alerts",
@@ -678,6 +871,8 @@ def build_parser() -> argparse.ArgumentParser:
         parser.add_argument("--markdown", action="store_true", help="Markdown output")
         parser.add_argument("--ci", action="store_true", help="CI mode: exit 1 if any BAD alert")
         parser.add_argument("--min-score", type=float, default=0, help="CI minimum score threshold (default: 0)")
+        parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                            help=f"Parallel per-tenant query threads (default: {DEFAULT_WORKERS})")
 
     return parser
 
@@ -700,15 +895,18 @@ def main() -> None:
         sys.exit(EXIT_CALLER_ERROR)
 
     # 分析
+    failed: list[str] = []
     metrics = analyze_from_prometheus(
         args.prometheus,
         period_secs,
         tenant=args.tenant,
         am_url=args.alertmanager,
+        workers=args.workers,
+        failed=failed,
     )
 
     # 產生報告
-    report = generate_report(metrics, args.period)
+    report = generate_report(metrics, args.period, failed_tenants=failed)
 
     # 輸出
     if args.json_output:
@@ -722,7 +920,8 @@ def main() -> None:
     if args.ci:
         score = report.summary.get("overall_score", 100)
         bad_count = report.summary.get("bad", 0)
-        if bad_count > 0 or score < args.min_score:
+        # 缺了 tenant 的分數不能當作通過
+        if bad_count > 0 or score < args.min_score or report.failed_tenants:
             sys.exit(EXIT_VIOLATION)
 
 
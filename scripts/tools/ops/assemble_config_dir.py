@@ -9,6 +9,31 @@ Usage:
     assemble_config_dir.py --sources team-a/conf.d,team-b/conf.d --output build/config-dir
     assemble_config_dir.py --sources team-a/conf.d,team-b/conf.d --check   # dry-run conflict check
     assemble_config_dir.py --sources ... --output ... --manifest out.json   # assemble + save manifest
+    assemble_config_dir.py --sources ... --output ... --incremental   # rewrite only changed files
+    assemble_config_dir.py --sources ... --output ... --swap          # build a generation, flip a symlink
+
+Incremental assembly:
+    The default mode copies every file on every run, so each file's mtime
+    moves and threshold-exporter's (mtime, size) guard rehashes the whole
+    tree. --incremental compares content hashes instead: a file whose bytes
+    did not change is left alone (same inode, same mtime), a changed file is
+    reflinked from its source where the filesystem supports it (else copied)
+    into a dot-prefixed temporary and renamed over the target, and a *.yaml
+    no source provides any more is removed. Hashes are computed on --workers threads and cached
+    beside the output in .<output>.hashes.json, keyed by (size, mtime_ns).
+
+    --swap goes one step further: --output becomes a symlink to a hidden
+    .<output>.XXXX generation directory. Each run builds a new generation
+    (hardlinking unchanged files from the live one, so their inodes and
+    mtimes carry over), then renames a fresh symlink over --output, so a
+    reader sees either the old tree or the new one, never a mix.
+
+    --link-mode hardlink also hardlinks changed files from their sources
+    (when the source mode is already 0644). That saves the copy, but the
+    inode is then shared: anything that rewrites a source in place — shell
+    redirection, or vim on a file with several links — edits the live tree
+    directly, bypassing assembly. Only use it on sources that are replaced
+    by rename, such as a git checkout.
 
 Exit codes:
     0  success
@@ -18,12 +43,17 @@ Exit codes:
 
 import argparse
 import hashlib
+import json
 import os
 import shutil
 import stat
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 # Pull `try_utf8_stdout` from the shared compat lib at scripts/tools/.
 # Migrated in #489 Phase B (was missing encoding setup → would crash on
@@ -33,7 +63,7 @@ sys.path.insert(0, str(_THIS_DIR))
 sys.path.insert(0, os.path.join(str(_THIS_DIR), ".."))
 from _lib_compat import try_utf8_stdout  # noqa: E402
 from _lib_exitcodes import EXIT_OK, EXIT_VIOLATION, EXIT_CALLER_ERROR  # noqa: E402
-from _lib_python import format_json_report  # noqa: E402
+from _lib_python import format_json_report, write_json_secure  # noqa: E402
 from _lib_confd import warn_nested  # noqa: E402
 
 try:
@@ -41,12 +71,30 @@ try:
 except ImportError:
     yaml = None  # graceful fallback — only needed for --validate
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows — reflinks are skipped, copies still work
+
 SCRIPT_DIR = Path(__file__).resolve().parent
 REPO_ROOT = SCRIPT_DIR.parent.parent.parent
 
 # Platform-owned files that are merged specially (first source wins).
 PLATFORM_FILES = {"_defaults.yaml", "_profiles.yaml"}
 
+DEFAULT_WORKERS = 8
+
+# Mode of every assembled file (0644) — the exporter may run as another user.
+OUTPUT_MODE = stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH
+
+# Linux FICLONE ioctl (_IOW(0x94, 9, int)): share extents copy-on-write.
+_FICLONE = 0x40049409
+
+# A (size, mtime_ns) pair only identifies content once the file is older than
+# the filesystem's mtime granularity — a second write inside the same tick
+# keeps both. Same 2 s safety window the exporter's own mtime guard uses.
+_RACY_WINDOW_NS = 2_000_000_000
+
 
 # ── Source discovery ─────────────────────────────────────────────────
 
@@ -70,13 +118,87 @@ def _file_sha256(path: Path) -> str:
     return h.hexdigest()
 
 
+class HashCache:
+    """SHA-256 digests keyed by path and validated by (size, mtime_ns).
+
+    Persisted as JSON between runs when *path* is given; an unreadable or
+    corrupt cache file simply starts empty. Only entries looked up during
+    this run are saved, so files that left the tree drop out of the cache.
+    """
+
+    def __init__(self, path: Optional[Path] = None,
+                 workers: int = DEFAULT_WORKERS) -> None:
+        self.path = path
+        self.workers = max(1, workers)
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, list] = {}
+        self._seen: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        if path is not None:
+            try:
+                loaded = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                loaded = {}
+            if isinstance(loaded, dict):
+                self._entries = {k: v for k, v in loaded.items()
+                                 if isinstance(v, list) and len(v) == 3}
+
+    def digest(self, path: Path) -> str:
+        """SHA-256 of *path*, reusing the cached digest while its stat holds."""
+        key = str(path)
+        st = path.stat()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == st.st_size \
+                and entry[1] == st.st_mtime_ns:
+            with self._lock:
+                self.hits += 1
+                self._seen[key] = entry
+            return entry[2]
+        digest = _file_sha256(path)
+        with self._lock:
+            self.misses += 1
+            if time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS:
+                self._seen[key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def digest_many(self, paths: Iterable[Path]) -> Dict[Path, str]:
+        """Digest *paths* on the worker pool; returns {path: sha256}."""
+        paths = list(dict.fromkeys(paths))
+        if self.workers == 1 or len(paths) <= 1:
+            return {p: self.digest(p) for p in paths}
+        with ThreadPoolExecutor(
+                max_workers=min(self.workers, len(paths))) as pool:
+            return dict(zip(paths, pool.map(self.digest, paths)))
+
+    def record(self, path: Path, digest: str) -> None:
+        """Note that *path* now holds content with *digest* (just written)."""
+        st = path.stat()
+        with self._lock:
+            if time.time_ns() - st.st_mtime_ns > _RACY_WINDOW_NS:
+                self._seen[str(path)] = [st.st_size, st.st_mtime_ns, digest]
+            else:
+                self._seen.pop(str(path), None)
+
+    def save(self) -> None:
+        """Write the entries seen this run back to the cache file."""
+        if self.path is None:
+            return
+        write_json_secure(str(self.path), dict(sorted(self._seen.items())),
+                          indent=0)
+
+
 # ── Conflict detection ───────────────────────────────────────────────
 
 def detect_conflicts(
     sources: List[Path],
+    cache: Optional[HashCache] = None,
 ) -> Tuple[Dict[str, List[Tuple[str, Path]]], Dict[str, Path]]:
     """Scan sources for tenant file conflicts.
 
+    With a *cache*, duplicate files are hashed on its worker pool and their
+    digests reused across runs.
+
     Returns:
         (conflicts, file_map)
         conflicts: {filename: [(source_label, path), ...]} for duplicates
@@ -92,6 +214,13 @@ def detect_conflicts(
     conflicts: Dict[str, List[Tuple[str, Path]]] = {}
     file_map: Dict[str, Path] = {}
 
+    digest = _file_sha256
+    if cache is not None:
+        digest = cache.digest_many(
+            p for name, entries in seen.items()
+            if len(entries) > 1 and name not in PLATFORM_FILES
+            for _, p in entries).__getitem__
+
     for name, entries in seen.items():
         if name in PLATFORM_FILES:
             # Platform files: first source wins, warn if multiple
@@ -102,7 +231,7 @@ def detect_conflicts(
 
         if len(entries) > 1:
             # Check if files are identical (same SHA-256)
-            hashes = {_file_sha256(p) for _, p in entries}
+            hashes = {digest(p) for _, p in entries}
             if len(hashes) == 1:
                 # Identical content — not a real conflict, take first
                 file_map[name] = entries[0][1]
@@ -137,27 +266,162 @@ def assemble(
             print(f"  {name:40s} ← {src}")
         else:
             shutil.copy2(src, dst)
-            os.chmod(dst,
-                     stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP
-                     | stat.S_IROTH)
+            os.chmod(dst, OUTPUT_MODE)
         count += 1
 
     return count
 
 
+def _reflink(src: Path, dst: Path) -> bool:
+    """Clone *src* to a new *dst* copy-on-write; False where unsupported."""
+    if fcntl is None:
+        return False
+    try:
+        with open(src, "rb") as fin, open(dst, "xb") as fout:
+            fcntl.ioctl(fout.fileno(), _FICLONE, fin.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def _materialize(src: Path, dst: Path, link_mode: str) -> str:
+    """Atomically place *src*'s content at *dst*; returns the method used.
+
+    The content lands in a dot-prefixed sibling first (the exporter skips
+    dot-files) and is renamed over *dst*, so a reader never sees a partial
+    file. A hardlink is only taken when *src* already has OUTPUT_MODE —
+    chmod on a shared inode would change the source too.
+    """
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    method = "copy"
+    if link_mode == "hardlink" \
+            and stat.S_IMODE(src.stat().st_mode) == OUTPUT_MODE:
+        try:
+            os.link(src, tmp)
+            method = "hardlink"
+        except OSError:
+            pass
+    if method == "copy" and link_mode != "copy" and _reflink(src, tmp):
+        method = "reflink"
+    if method == "copy":
+        shutil.copy2(src, tmp)
+    if method != "hardlink":
+        os.chmod(tmp, OUTPUT_MODE)
+    os.replace(tmp, dst)
+    return method
+
+
+def cache_path_for(output_dir: Path) -> Path:
+    """Hash-cache file kept beside (not inside) the assembled tree."""
+    return output_dir.parent / f".{output_dir.name}.hashes.json"
+
+
+def assemble_incremental(
+    file_map: Dict[str, Path],
+    output_dir: Path,
+    cache: HashCache,
+    *,
+    swap: bool = False,
+    link_mode: str = "auto",
+) -> Dict[str, List[str]]:
+    """Bring output_dir to file_map's content, touching only what changed.
+
+    *output_dir* must not be resolved: with *swap* it is the symlink that
+    gets flipped, and hashes are keyed by the paths under it so they stay
+    valid across generations.
+
+    Returns {"written": [...], "unchanged": [...], "removed": [...]} (names).
+    Raises NotADirectoryError when *swap* is asked for but output_dir is a
+    real directory.
+    """
+    if swap and output_dir.exists() and not output_dir.is_symlink():
+        raise NotADirectoryError(
+            f"--swap needs {output_dir} to be a symlink or absent, "
+            "but it is a real directory; move it aside first")
+    live = output_dir if output_dir.is_dir() else None
+    live_names: set = set()
+    if live is not None:
+        # #1339: third scan site — stale removal only sees the flat level.
+        warn_nested(live, tool="assemble_config_dir")
+        live_names = {p.name for p in live.glob("*.yaml")}
+
+    digests = cache.digest_many(
+        list(file_map.values())
+        + [output_dir / n for n in sorted(live_names & file_map.keys())])
+    unchanged = sorted(
+        n for n in live_names & file_map.keys()
+        if digests[output_dir / n] == digests[file_map[n]])
+    written = sorted(set(file_map) - set(unchanged))
+    removed = sorted(live_names - file_map.keys())
+
+    if not swap:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for name in written:
+            _materialize(file_map[name], output_dir / name, link_mode)
+        for name in removed:
+            (output_dir / name).unlink()
+    elif written or removed or live is None:
+        _swap_generation(file_map, output_dir, unchanged, link_mode)
+
+    # Written files carry their source's mtime, so their digest is known.
+    for name in written:
+        cache.record(output_dir / name, digests[file_map[name]])
+    return {"written": written, "unchanged": unchanged, "removed": removed}
+
+
+def _swap_generation(
+    file_map: Dict[str, Path],
+    output_dir: Path,
+    unchanged: List[str],
+    link_mode: str,
+) -> None:
+    """Build a new generation beside output_dir and flip the symlink to it."""
+    parent = output_dir.parent
+    parent.mkdir(parents=True, exist_ok=True)
+    previous = output_dir.resolve() if output_dir.is_symlink() else None
+    gen = Path(tempfile.mkdtemp(prefix=f".{output_dir.name}.", dir=parent))
+    os.chmod(gen, stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP
+             | stat.S_IROTH | stat.S_IXOTH)
+    keep = set(unchanged)
+    for name in sorted(file_map):
+        if name in keep:
+            # Same inode → same mtime: the exporter's guard reuses its hash.
+            try:
+                os.link(previous / name, gen / name)
+            except OSError:
+                shutil.copy2(previous / name, gen / name)
+        else:
+            _materialize(file_map[name], gen / name, link_mode)
+
+    link = parent / f".{output_dir.name}.link"
+    link.unlink(missing_ok=True)
+    os.symlink(gen.name, link)
+    os.replace(link, output_dir)
+    # previous is fully resolved; resolve parent too, or a symlinked parent
+    # directory never compares equal and every run leaks a generation.
+    if previous is not None and previous.parent == parent.resolve() \
+            and previous.name.startswith(f".{output_dir.name}."):
+        shutil.rmtree(previous, ignore_errors=True)
+
+
 # ── Manifest ─────────────────────────────────────────────────────────
 
 def build_manifest(
     sources: List[Path],
     file_map: Dict[str, Path],
     conflicts: Dict[str, List[Tuple[str, Path]]],
+    cache: Optional[HashCache] = None,
 ) -> dict:
     """Build a JSON manifest of the assembly."""
+    digest = _file_sha256 if cache is None else cache.digest
     files = {}
     for name, path in sorted(file_map.items()):
         files[name] = {
             "source": str(path),
-            "sha256": _file_sha256(path),
+            "sha256": digest(path),
         }
     return {
         "sources": [str(s) for s in sources],
@@ -232,7 +496,28 @@ def main() -> int:
         "--json", action="store_true",
         help="Output results as JSON",
     )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Rewrite only files whose content changed and remove stale "
+             "ones (hash cache kept beside --output)",
+    )
+    parser.add_argument(
+        "--swap", action="store_true",
+        help="Implies --incremental: assemble into a new generation "
+             "directory and atomically flip the --output symlink to it",
+    )
+    parser.add_argument(
+        "--link-mode", choices=("auto", "hardlink", "copy"), default="auto",
+        help="How changed files are written in incremental mode: auto "
+             "reflinks where supported, else copies; hardlink shares the "
+             "source inode (see below) (default: auto)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help=f"Hashing threads in incremental mode (default: {DEFAULT_WORKERS})",
+    )
     args = parser.parse_args()
+    incremental = args.incremental or args.swap
 
     # Parse sources
     if not args.sources and not args.manifest:
@@ -243,9 +528,15 @@ def main() -> int:
         sources = [Path(s.strip()).resolve() for s in args.sources.split(",")
                    if s.strip()]
 
+    cache: Optional[HashCache] = None
+    if incremental and args.output:
+        # abspath, not resolve(): under --swap the output IS a symlink.
+        output_dir = Path(os.path.abspath(args.output))
+        cache = HashCache(cache_path_for(output_dir), workers=args.workers)
+
     # Detect conflicts
     try:
-        conflicts, file_map = detect_conflicts(sources)
+        conflicts, file_map = detect_conflicts(sources, cache)
     except FileNotFoundError as e:
         print(f"ERROR: {e}", file=sys.stderr)
         return EXIT_CALLER_ERROR
@@ -304,8 +595,19 @@ def main() -> int:
     if not args.output:
         parser.error("--output is required for assembly (or use --check)")
 
-    output_dir = Path(args.output).resolve()
-    count = assemble(file_map, output_dir)
+    changes: Optional[Dict[str, List[str]]] = None
+    if cache is not None:
+        try:
+            changes = assemble_incremental(file_map, output_dir, cache,
+                                           swap=args.swap,
+                                           link_mode=args.link_mode)
+        except NotADirectoryError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return EXIT_CALLER_ERROR
+        count = len(file_map)
+    else:
+        output_dir = Path(args.output).resolve()
+        count = assemble(file_map, output_dir)
 
     # Validate
     validation_issues: List[str] = []
@@ -314,14 +616,16 @@ def main() -> int:
 
     # Manifest
     if args.manifest:
-        manifest = build_manifest(sources, file_map, conflicts)
+        manifest = build_manifest(sources, file_map, conflicts, cache)
         manifest_path = Path(args.manifest)
         manifest_path.write_text(
             format_json_report(manifest) + "\n",
             encoding="utf-8", newline="\n",
         )
-        os.chmod(manifest_path,
-                 stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.chmod(manifest_path, OUTPUT_MODE)
+
+    if cache is not None:
+        cache.save()
 
     # Output
     if args.json:
@@ -331,11 +635,17 @@ def main() -> int:
             "file_count": count,
             "sources": [str(s) for s in sources],
         }
+        if changes is not None:
+            result.update(changes)
         if validation_issues:
             result["validation"] = validation_issues
         print(format_json_report(result))
     else:
         print(f"\n✅ Assembled {count} file(s) into {output_dir}")
+        if changes is not None:
+            print(f"   {len(changes['written'])} written, "
+                  f"{len(changes['unchanged'])} unchanged, "
+                  f"{len(changes['removed'])} removed")
         if validation_issues:
             print(f"\nValidation ({len(validation_issues)} issue(s)):")
             for issue in validation_issues:
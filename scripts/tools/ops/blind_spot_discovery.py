@@ -6,15 +6,27 @@ to find cluster instances not covered by this platform's threshold monitoring.
 Complements analyze_rule_pack_gaps.py (custom rule vs Rule Pack coverage).
 Blind Spot Discovery analyzes infrastructure coverage vs tenant config coverage.
 
+Large fleets: the targets API response is stream-parsed and folded straight
+into per-DB instance sets (only those sets grow with the target count),
+``--scrape-pools`` narrows it server-side,
+``--source series`` reads one ``count by (job, instance, namespace) (up)``
+vector instead, and a comma-separated ``--prometheus`` list (shards /
+federation endpoints) is queried concurrently and merged.
+
 Usage:
   python3 scripts/tools/blind_spot_discovery.py --prometheus http://localhost:9090 --config-dir conf.d/
   python3 scripts/tools/blind_spot_discovery.py --config-dir conf.d/ --json-output
+  python3 scripts/tools/blind_spot_discovery.py --config-dir conf.d/ \\
+      --prometheus http://prom-a:9090,http://prom-b:9090 --source series
 """
 import argparse
+import functools
 import os
 import re
 import sys
 import textwrap
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 _THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -22,34 +34,79 @@ sys.path.insert(0, _THIS_DIR)  # Docker flat layout
 sys.path.insert(0, os.path.join(_THIS_DIR, '..'))  # Repo subdir layout
 from _lib_python import (  # noqa: E402
     format_json_report,
-    http_get_json,
+    iter_json_array,
     load_tenant_configs,
     load_yaml_file,
+    query_prometheus_instant,
     JOB_DB_MAP,
     METRIC_PREFIX_DB_MAP,
 )
 from _lib_exitcodes import EXIT_VIOLATION  # noqa: E402
 
+SOURCES = ("targets", "series")
+# Targets responses on big fleets take longer than the 10s query default.
+_TARGETS_TIMEOUT = 60
+
 
-def query_prometheus_targets(prom_url):
+def iter_prometheus_targets(prom_url, scrape_pool=None):
+    """Stream active targets from Prometheus /api/v1/targets.
+
+    Yields dicts ``{job, instance, namespace, labels}`` as the response is
+    read, so a 60k-target payload is never held in memory. *scrape_pool*
+    filters server-side (``scrapePool=``, Prometheus ≥ 2.42).
+    Raises OSError / ValueError on transport or response errors.
+    """
+    params = {"state": "active"}
+    if scrape_pool:
+        params["scrapePool"] = scrape_pool
+    url = f"{prom_url}/api/v1/targets?{urllib.parse.urlencode(params)}"
+    for target in iter_json_array(url, "activeTargets", timeout=_TARGETS_TIMEOUT):
+        labels = target.get("labels", {})
+        yield {
+            "job": labels.get("job", ""),
+            "instance": labels.get("instance", ""),
+            "namespace": labels.get("namespace", ""),
+            "labels": labels,
+        }
+
+
+def query_prometheus_targets(prom_url, scrape_pool=None):
     """Fetch active targets from Prometheus /api/v1/targets.
 
-    Returns list of dicts: [{job, instance, namespace, labels}].
+    Returns list of dicts: [{job, instance, namespace, labels}]; ``[]`` (with
+    a warning) when Prometheus is unreachable or answers with an error.
+    Materializes the whole response — :func:`collect_live_instances` folds
+    :func:`iter_prometheus_targets` instead.
     """
-    url = f"{prom_url}/api/v1/targets?state=active"
-    data, err = http_get_json(url)
-    if err:
-        print(f"WARN: Cannot reach Prometheus: {err}", file=sys.stderr)
+    try:
+        return list(iter_prometheus_targets(prom_url, scrape_pool))
+    except (OSError, ValueError) as exc:
+        print(f"WARN: Cannot read targets from {prom_url}: {exc}", file=sys.stderr)
         return []
 
-    if data.get("status") != "success":
-        print(f"WARN: Prometheus returned non-success: {data.get('error', '?')}",
-              file=sys.stderr)
-        return []
 
+def query_prometheus_series(prom_url, scrape_pools=None):
+    """Fetch one sample per scraped target via ``count by (job, instance, namespace) (up)``.
+
+    A far lighter alternative to the targets API: only the three grouping
+    labels come back. Also works against federation endpoints that expose
+    ``up`` but not ``/api/v1/targets``. Returns the same dict shape as
+    :func:`query_prometheus_targets`; ``[]`` with a warning on error.
+    """
+    selector = ""
+    if scrape_pools:
+        # Default scrape configs set job = scrape pool name.
+        pools = "|".join(re.escape(p) for p in scrape_pools)
+        selector = '{job=~"' + pools.replace("\\", "\\\\") + '"}'
+    results, err = query_prometheus_instant(
+        prom_url, f"count by (job, instance, namespace) (up{selector})",
+        timeout=_TARGETS_TIMEOUT)
+    if err:
+        print(f"WARN: Cannot query series from {prom_url}: {err}", file=sys.stderr)
+        return []
     targets = []
-    for target in data.get("data", {}).get("activeTargets", []):
-        labels = target.get("labels", {})
+    for item in results:
+        labels = item.get("metric", {})
         targets.append({
             "job": labels.get("job", ""),
             "instance": labels.get("instance", ""),
@@ -59,6 +116,51 @@ def query_prometheus_targets(prom_url):
     return targets
 
 
+def collect_live_instances(prom_urls, source="targets", scrape_pools=None,
+                           exclude_jobs=None, workers=4):
+    """Query every endpoint (and scrape pool) concurrently and merge the results.
+
+    Each endpoint × pool response is folded into ``{db_type: set(instance_id)}``
+    while it streams in — the targets are never collected into a list — and
+    the per-request maps are then unioned, so the same instance seen by two
+    shards counts once.
+    Returns ``(live_instances, target_count)``. ``target_count`` is the number
+    of targets each request returned, summed: a target scraped by two shards
+    (or listed under two scrape pools) is counted once per request. It only
+    tells whether any endpoint answered; use ``live_instances`` for totals.
+    """
+    if source == "series":
+        tasks = [(url, functools.partial(query_prometheus_series, url, scrape_pools))
+                 for url in prom_urls]
+    else:
+        tasks = [(url, functools.partial(iter_prometheus_targets, url, pool))
+                 if pool else (url, functools.partial(iter_prometheus_targets, url))
+                 for url in prom_urls for pool in (scrape_pools or [None])]
+
+    def run(task):
+        url, stream = task
+        count = 0
+
+        def counted(targets):
+            nonlocal count
+            for target in targets:
+                count += 1
+                yield target
+        try:
+            return extract_db_instances(counted(stream()), exclude_jobs=exclude_jobs), count
+        except (OSError, ValueError) as exc:
+            print(f"WARN: Cannot read targets from {url}: {exc}", file=sys.stderr)
+            return {}, 0
+
+    merged, count = {}, 0
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tasks)))) as pool:
+        for instances, n in pool.map(run, tasks):
+            count += n
+            for db_type, ids in instances.items():
+                merged.setdefault(db_type, set()).update(ids)
+    return merged, count
+
+
 def extract_db_instances(targets, exclude_jobs=None):
     """Map targets to DB types by job name.
 
@@ -80,6 +182,14 @@ def extract_db_instances(targets, exclude_jobs=None):
     return result
 
 
+_JOB_SEGMENT_RE = re.compile(r'[-_.\s/]+')
+# Keyword → its position in JOB_DB_MAP: the earliest-listed keyword among a
+# job's segments wins, exactly as the former in-order scan did.
+_JOB_KEYWORD_RANK = {keyword: i for i, keyword in enumerate(JOB_DB_MAP)}
+_JOB_KEYWORDS = list(JOB_DB_MAP)
+
+
+@functools.lru_cache(maxsize=8192)
 def _infer_db_type_from_job(job):
     """Infer DB type from job name using JOB_DB_MAP.
 
@@ -87,16 +197,19 @@ def _infer_db_type_from_job(job):
     1. Exact match against full job name
     2. Segment match — split job name by separators and match each word
     This avoids false positives like 'es' matching 'prometheus'.
+
+    Memoized: a fleet has tens of thousands of targets but only a few hundred
+    job names, so each name is matched once.
     """
     job_lower = job.lower()
     # Exact match
     if job_lower in JOB_DB_MAP:
         return JOB_DB_MAP[job_lower]
     # Segment match (split by common separators: -, _, ., /)
-    segments = set(re.split(r'[-_.\s/]+', job_lower))
-    for keyword, db_type in JOB_DB_MAP.items():
-        if keyword in segments:
-            return db_type
+    ranks = [_JOB_KEYWORD_RANK[seg] for seg in _JOB_SEGMENT_RE.split(job_lower)
+             if seg in _JOB_KEYWORD_RANK]
+    if ranks:
+        return JOB_DB_MAP[_JOB_KEYWORDS[min(ranks)]]
     return "unknown"
 
 
@@ -235,13 +348,22 @@ def build_parser():
         """),
     )
     parser.add_argument("--prometheus", default=None,
-                        help="Prometheus URL (default: $PROMETHEUS_URL or http://localhost:9090)")
+                        help="Prometheus URL, or a comma-separated list of shard / "
+                             "federation URLs queried concurrently "
+                             "(default: $PROMETHEUS_URL or http://localhost:9090)")
     parser.add_argument("--config-dir", required=True,
                         help="Tenant config directory (conf.d/)")
     parser.add_argument("--json-output", action="store_true",
                         help="Output JSON instead of text report")
     parser.add_argument("--exclude-jobs", default=None,
                         help="Comma-separated job names to exclude")
+    parser.add_argument("--source", choices=SOURCES, default="targets",
+                        help="targets: stream /api/v1/targets (default); "
+                             "series: one count by (job, instance, namespace) (up) query")
+    parser.add_argument("--scrape-pools", default=None,
+                        help="Comma-separated scrape pools to scan (default: all)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Concurrent endpoint requests (default: 4)")
     return parser
 
 
@@ -255,17 +377,19 @@ def main():
     # "") would satisfy get()'s key lookup and yield an empty URL. Same
     # empty-string hardening as _lib_io.add_prometheus_arg.
     prom_url = args.prometheus or os.environ.get("PROMETHEUS_URL") or "http://localhost:9090"
+    prom_urls = [u.strip().rstrip("/") for u in prom_url.split(",") if u.strip()]
     exclude_jobs = [j.strip() for j in args.exclude_jobs.split(",")] if args.exclude_jobs else []
-
-    # 1. Query Prometheus targets
-    targets = query_prometheus_targets(prom_url)
-    if not targets:
+    scrape_pools = ([p.strip() for p in args.scrape_pools.split(",") if p.strip()]
+                    if args.scrape_pools else None)
+
+    # 1-2. Query every endpoint and map targets to DB instances
+    live_instances, target_count = collect_live_instances(
+        prom_urls, source=args.source, scrape_pools=scrape_pools,
+        exclude_jobs=exclude_jobs, workers=args.workers)
+    if not target_count:
         print("WARN: No active targets found (Prometheus unreachable or empty)",
               file=sys.stderr)
 
-    # 2. Extract DB instances from targets
-    live_instances = extract_db_instances(targets, exclude_jobs=exclude_jobs)
-
     # 3. Load monitored DB types from tenant configs
     monitored = load_monitored_db_types(args.config_dir)
     if monitored is None:
@@ -28,6 +28,12 @@
     --readiness-json validation_output/cutover-readiness.json \\
     --tenant db-a --force
 
+  # Wave 模式：readiness 中 converged_tenants 整批切換；步驟 1–4 只跑一次，
+  # 健康驗證以 fleet-wide 查詢批次並行，進度寫入 checkpoint，失敗後重跑即續做
+  python3 cutover_tenant.py \\
+    --readiness-json validation_output/cutover-readiness.json \\
+    --wave --workers 8 --alertmanager http://localhost:9093
+
 需求:
   - kubectl 已配置且可存取目標叢集
   - cutover-readiness.json 由 validate_migration.py --auto-detect-convergence 產出
@@ -36,10 +42,16 @@
 
 import sys
 import os
+import re
 import json
+import hashlib
+import tempfile
+import threading
 import subprocess
 import argparse
 import datetime
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 # Pull `try_utf8_stdout` from the shared compat lib at scripts/tools/.
 # Migrated in #489 Phase B (was missing encoding setup → would crash on
@@ -49,7 +61,7 @@ sys.path.insert(0, str(_THIS_DIR))
 sys.path.insert(0, os.path.join(str(_THIS_DIR), ".."))
 from _lib_compat import try_utf8_stdout  # noqa: E402
 from _lib_exitcodes import EXIT_VIOLATION, EXIT_CALLER_ERROR  # noqa: E402
-from _lib_python import format_json_report, add_prometheus_arg  # noqa: E402
+from _lib_python import format_json_report, add_prometheus_arg, http_get_json  # noqa: E402
 
 
 # ---------------------------------------------------------------------------
@@ -191,13 +203,6 @@ def verify_health(tenant, prometheus_url, dry_run=False):
               file=sys.stderr)
         return True, "(dry-run)"
 
-    import urllib.parse
-
-    _this_dir = os.path.dirname(os.path.abspath(__file__))
-    sys.path.insert(0, _this_dir)
-    sys.path.insert(0, os.path.join(_this_dir, '..'))
-    from _lib_python import http_get_json  # noqa: E402
-
     # Check threshold metrics exist for tenant
     query = f'count(user_threshold{{tenant="{tenant}"}})'
     params = urllib.parse.urlencode({"query": query})
@@ -298,6 +303,416 @@ def apply_cutover(readiness_json, tenant, prometheus_url,
     return report
 
 
+# ---------------------------------------------------------------------------
+# Wave mode — many converged tenants per invocation
+# ---------------------------------------------------------------------------
+#
+# Steps 1–4 act on namespace-wide objects (the shadow Job, the old-rules and
+# Alertmanager ConfigMaps), so a wave runs them once, in §7.1 order, instead
+# of once per tenant. Verification is the per-tenant part: tenants are
+# chunked into one `count by (tenant)` query each and the chunks fan out over
+# a bounded worker pool. Every finished node is checkpointed so a rerun after
+# a failure resumes where the wave stopped. The checkpoint is bound to its
+# wave (readiness JSON + tenant list) and marked completed on success, so a
+# later wave never inherits an earlier one's progress.
+
+WAVE_CHECKPOINT_VERSION = 2
+DEFAULT_WAVE_CHECKPOINT = "cutover-wave-checkpoint.json"
+# Tenants per fleet-wide verification query; keeps the GET URL far below
+# the 8 KiB request-line limit of common proxies.
+DEFAULT_VERIFY_BATCH = 50
+_SHADOW_ALERTS_NODE = "Check Alertmanager shadow alerts"
+_VERIFY_STEP = "Verify tenant health"
+
+
+def wave_tenants(readiness, tenants=None, force=False):
+    """Return the sorted tenants a wave should cut over.
+
+    Uses ``converged_tenants`` from the readiness JSON (written by
+    validate_migration.py --auto-detect-convergence). *tenants* narrows the
+    wave; naming a tenant that has not converged raises ValueError unless
+    *force* is set.
+    """
+    if "converged_tenants" not in readiness:
+        raise ValueError(
+            "Readiness JSON has no converged_tenants; re-run validate_migration.py "
+            "--auto-detect-convergence to produce a wave-capable report")
+    converged = set(readiness["converged_tenants"])
+    if not tenants:
+        return sorted(converged)
+    wanted = set(tenants)
+    not_ready = sorted(wanted - converged)
+    if not_ready and not force:
+        raise ValueError(f"Tenants not converged: {', '.join(not_ready)}. "
+                         "Use --force to override.")
+    return sorted(wanted)
+
+
+def _tenant_regex(tenants):
+    """Build a PromQL-string-safe RE2 alternation that matches exactly *tenants*."""
+    alternation = "|".join(re.escape(t) for t in tenants)
+    return alternation.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def verify_health_batch(tenants, prometheus_url, dry_run=False):
+    """Step 5 for many tenants with a single Prometheus query.
+
+    Returns ``(ok, results)``: on transport failure ``(False, message)`` with
+    the caller-error prefix; otherwise ``(True, {tenant: (ok, message)})``.
+    """
+    query = f'count by (tenant) (user_threshold{{tenant=~"{_tenant_regex(tenants)}"}})'
+    if dry_run:
+        print(f"  [dry-run] query {prometheus_url}: {len(tenants)} tenant(s)",
+              file=sys.stderr)
+        return True, {t: (True, "(dry-run)") for t in tenants}
+
+    params = urllib.parse.urlencode({"query": query})
+    data, err = http_get_json(f"{prometheus_url}/api/v1/query?{params}",
+                              headers={"Accept": "application/json"})
+    if err or not isinstance(data, dict):
+        return False, (f"{CALLER_ERROR_PREFIX}Prometheus query failed: "
+                       f"{err or 'non-JSON-object response'}")
+    counts = {}
+    for item in data.get("data", {}).get("result", []):
+        tenant = item.get("metric", {}).get("tenant")
+        if tenant is not None:
+            counts[tenant] = item.get("value", [None, "0"])[1]
+    results = {}
+    for tenant in tenants:
+        if tenant in counts:
+            results[tenant] = (True, f"tenant={tenant}: {counts[tenant]} threshold metrics active")
+        else:
+            results[tenant] = (False, f"No threshold metrics found for tenant={tenant}")
+    return True, results
+
+
+def shadow_alerts_by_tenant(alertmanager_url, dry_run=False):
+    """Fetch active alerts still carrying ``migration_status="shadow"`` in one call.
+
+    Returns ``(ok, {tenant: [alertname, ...]})`` or ``(False, message)``.
+    """
+    if dry_run:
+        print(f"  [dry-run] GET {alertmanager_url}/api/v2/alerts "
+              '(migration_status="shadow")', file=sys.stderr)
+        return True, {}
+    params = urllib.parse.urlencode({"filter": 'migration_status="shadow"',
+                                     "active": "true"})
+    data, err = http_get_json(f"{alertmanager_url}/api/v2/alerts?{params}",
+                              headers={"Accept": "application/json"})
+    if err or not isinstance(data, list):
+        return False, (f"{CALLER_ERROR_PREFIX}Alertmanager query failed: "
+                       f"{err or 'non-JSON-array response'}")
+    by_tenant = {}
+    for alert in data:
+        labels = alert.get("labels", {})
+        if labels.get("migration_status") != "shadow" or "tenant" not in labels:
+            continue
+        by_tenant.setdefault(labels["tenant"], []).append(
+            labels.get("alertname", "unknown"))
+    return True, {t: sorted(names) for t, names in by_tenant.items()}
+
+
+def run_dag(nodes, workers=4, done=(), on_done=None):
+    """Run a dependency DAG of ``(ok, msg)`` callables on a bounded pool.
+
+    *nodes* maps name → ``(deps, fn)``. Names in *done* count as finished
+    without running. A failed node blocks every node that depends on it,
+    directly or transitively; independent branches keep running.
+    *on_done(name, ok, msg)* is called from the scheduling thread.
+
+    Returns ``{name: (status, msg)}`` with status ``ok`` / ``failed`` /
+    ``blocked`` for every node not in *done*.
+    """
+    for name, (deps, _fn) in nodes.items():
+        unknown = [d for d in deps if d not in nodes]
+        if unknown:
+            raise ValueError(f"Node {name!r} depends on unknown {unknown}")
+    finished = set(done)
+    outcome = {}
+    pending = {name for name in nodes if name not in finished}
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        while pending or running:
+            progressed = True
+            while progressed:  # blocking cascades down chains in one pass each
+                progressed = False
+                for name in sorted(pending):
+                    deps = nodes[name][0]
+                    if any(outcome.get(d, ("",))[0] in ("failed", "blocked") for d in deps):
+                        outcome[name] = ("blocked", "dependency failed")
+                    elif all(d in finished for d in deps):
+                        running[pool.submit(nodes[name][1])] = name
+                    else:
+                        continue
+                    pending.discard(name)
+                    progressed = True
+            if not running:
+                if pending:  # a cycle: nothing runs and nothing can start
+                    raise ValueError(f"Dependency cycle among {sorted(pending)}")
+                break
+            completed, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in completed:
+                name = running.pop(future)
+                try:
+                    ok, msg = future.result()
+                except Exception as exc:  # noqa: BLE001 — a node bug must not hang the wave
+                    ok, msg = False, f"{type(exc).__name__}: {exc}"
+                outcome[name] = ("ok" if ok else "failed", msg)
+                if ok:
+                    finished.add(name)
+                if on_done:
+                    on_done(name, ok, msg)
+    return outcome
+
+
+def load_wave_checkpoint(path):
+    """Load a wave checkpoint, or return None when *path* does not exist."""
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except FileNotFoundError:
+        return None
+    if not isinstance(data, dict) or data.get("version") != WAVE_CHECKPOINT_VERSION:
+        raise ValueError(f"Unrecognised wave checkpoint: {path}")
+    return data
+
+
+def _write_checkpoint(path, data):
+    """Atomically replace *path* with *data* (``0o600``), so a crash mid-write
+    leaves the previous checkpoint intact."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".cutover-wave.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as fh:
+            json.dump(data, fh, indent=2, ensure_ascii=False)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def wave_fingerprint(readiness, wave):
+    """Identify a wave: sha256 over the canonical readiness JSON and sorted tenants."""
+    payload = json.dumps({"readiness": readiness, "tenants": sorted(wave)},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def apply_wave_cutover(readiness_json, prometheus_url, namespace="monitoring",
+                       tenants=None, alertmanager_url=None, workers=4,
+                       verify_batch=DEFAULT_VERIFY_BATCH, checkpoint=None,
+                       dry_run=False, force=False):
+    """Cut over every converged tenant in one run, resuming from *checkpoint*.
+
+    Returns the apply_cutover report plus ``mode``, ``tenants_total``,
+    ``tenants_verified``, ``tenants_failed`` ({tenant: reason}),
+    ``tenants_resumed`` (verified by an earlier run) and ``checkpoint``.
+    Only an unfinished checkpoint of the same wave (see
+    :func:`wave_fingerprint`) is resumed; one left by a completed wave is
+    started over, and an unfinished one of a different wave is refused.
+    Dry runs neither read nor write the checkpoint.
+    """
+    report = {
+        "success": False,
+        "mode": "wave",
+        "steps_completed": [],
+        "failed_step": None,
+        "message": "",
+        "caller_error": False,
+        "tenants_total": 0,
+        "tenants_verified": [],
+        "tenants_failed": {},
+        "tenants_resumed": 0,
+        "checkpoint": None,
+        "timestamp": _now(),
+    }
+
+    # ── Readiness + wave membership ───────────────────────────────────
+    try:
+        readiness = load_cutover_readiness(readiness_json)
+        wave = wave_tenants(readiness, tenants, force=force)
+    except (FileNotFoundError, ValueError, json.JSONDecodeError) as exc:
+        report["failed_step"] = "load_readiness"
+        report["message"] = str(exc)
+        report["caller_error"] = True
+        return report
+    if not readiness.get("ready") and not force:
+        report["failed_step"] = "readiness_check"
+        pct = readiness.get("convergence_percentage", "?")
+        report["message"] = (
+            f"Not ready for cutover (convergence={pct}%). "
+            "Use --force to override.")
+        return report
+    if not readiness.get("ready") and force:
+        print("⚠️  WARNING: Readiness check shows NOT READY — "
+              "proceeding due to --force", file=sys.stderr)
+    if not wave:
+        report["failed_step"] = "readiness_check"
+        report["message"] = "No converged tenants in this wave"
+        return report
+    report["tenants_total"] = len(wave)
+
+    # ── Checkpoint ────────────────────────────────────────────────────
+    fingerprint = wave_fingerprint(readiness, wave)
+    state = {"version": WAVE_CHECKPOINT_VERSION, "namespace": namespace,
+             "wave": fingerprint, "status": "in_progress",
+             "steps": {}, "tenants": {}}
+    if not dry_run:
+        checkpoint = checkpoint or os.path.join(
+            os.path.dirname(os.path.abspath(readiness_json)), DEFAULT_WAVE_CHECKPOINT)
+        report["checkpoint"] = checkpoint
+        try:
+            previous = load_wave_checkpoint(checkpoint)
+        except (ValueError, json.JSONDecodeError) as exc:
+            report["failed_step"] = "load_checkpoint"
+            report["message"] = str(exc)
+            report["caller_error"] = True
+            return report
+        if previous is not None and previous.get("status") == "completed":
+            print(f"↻ {checkpoint} records a completed wave; starting a new one",
+                  file=sys.stderr)
+        elif previous is not None:
+            if previous.get("namespace") != namespace:
+                report["failed_step"] = "load_checkpoint"
+                report["message"] = (
+                    f"Checkpoint {checkpoint} belongs to namespace "
+                    f"{previous.get('namespace')!r}; pass another --checkpoint")
+                report["caller_error"] = True
+                return report
+            if previous.get("wave") != fingerprint:
+                report["failed_step"] = "load_checkpoint"
+                report["message"] = (
+                    f"Checkpoint {checkpoint} belongs to an unfinished wave with a "
+                    "different readiness JSON or tenant list; re-run that wave to "
+                    "finish it, or pass another --checkpoint")
+                report["caller_error"] = True
+                return report
+            state = previous
+            print(f"↻ Resuming wave from {checkpoint}", file=sys.stderr)
+
+    verified_before = {t for t, rec in state["tenants"].items()
+                       if rec.get("status") == "verified"}
+    to_verify = [t for t in wave if t not in verified_before]
+    report["tenants_resumed"] = len(wave) - len(to_verify)
+
+    # ── DAG ───────────────────────────────────────────────────────────
+    chain = [
+        ("Stop Shadow Monitor Job",
+         lambda: stop_shadow_job(namespace=namespace, dry_run=dry_run)),
+        ("Remove old Recording Rules",
+         lambda: remove_old_rules(namespace=namespace, dry_run=dry_run)),
+        ("Remove shadow label from rules",
+         lambda: remove_shadow_label(namespace=namespace, dry_run=dry_run)),
+        ("Remove Alertmanager shadow route",
+         lambda: remove_shadow_route(namespace=namespace, dry_run=dry_run)),
+    ]
+    nodes = {}
+    previous_step = None
+    for name, fn in chain:
+        nodes[name] = ((previous_step,) if previous_step else (), fn)
+        previous_step = name
+
+    shadow_alerts = {}
+    if alertmanager_url and to_verify:
+        def _check_shadow_alerts():
+            ok, found = shadow_alerts_by_tenant(alertmanager_url, dry_run=dry_run)
+            if not ok:
+                return False, found
+            shadow_alerts.update(found)
+            return True, f"{len(found)} tenant(s) with shadow-routed alerts"
+        nodes[_SHADOW_ALERTS_NODE] = ((previous_step,), _check_shadow_alerts)
+        previous_step = _SHADOW_ALERTS_NODE
+
+    lock = threading.Lock()
+    tenant_results = {}
+
+    def _verify_chunk(chunk):
+        ok, results = verify_health_batch(chunk, prometheus_url, dry_run=dry_run)
+        if not ok:
+            return False, results
+        for tenant in chunk:
+            t_ok, t_msg = results[tenant]
+            if t_ok and tenant in shadow_alerts:
+                t_ok, t_msg = False, (f"tenant={tenant}: shadow-routed alerts still "
+                                      f"active: {', '.join(shadow_alerts[tenant])}")
+            results[tenant] = (t_ok, t_msg)
+        with lock:
+            tenant_results.update(results)
+        failed = sum(1 for t_ok, _m in results.values() if not t_ok)
+        return True, f"{len(chunk) - failed}/{len(chunk)} tenant(s) healthy"
+
+    batch = max(verify_batch, 1)
+    verify_nodes = {}
+    for i in range(0, len(to_verify), batch):
+        chunk = to_verify[i:i + batch]
+        name = f"{_VERIFY_STEP} [{i // batch + 1}]"
+        verify_nodes[name] = chunk
+        nodes[name] = ((previous_step,), lambda chunk=chunk: _verify_chunk(chunk))
+
+    def _on_done(name, ok, msg):
+        shown = msg[len(CALLER_ERROR_PREFIX):] if msg.startswith(CALLER_ERROR_PREFIX) else msg
+        print(f"▸ {name}\n  {'✓' if ok else '✗'} {shown}", file=sys.stderr)
+        with lock:
+            if ok and name not in verify_nodes:
+                state["steps"][name] = {"status": "done", "message": msg, "at": _now()}
+            for tenant in verify_nodes.get(name, ()):
+                if tenant in tenant_results:
+                    t_ok, t_msg = tenant_results[tenant]
+                    state["tenants"][tenant] = {
+                        "status": "verified" if t_ok else "failed",
+                        "message": t_msg, "at": _now()}
+            if report["checkpoint"]:
+                _write_checkpoint(report["checkpoint"], state)
+
+    done = {name for name, rec in state["steps"].items()
+            if rec.get("status") == "done" and name in nodes}
+    outcome = run_dag(nodes, workers=workers, done=done, on_done=_on_done)
+
+    # ── Report ────────────────────────────────────────────────────────
+    for name, _fn in chain:
+        if name in done or outcome.get(name, ("",))[0] == "ok":
+            report["steps_completed"].append(name)
+    for name in [n for n, _fn in chain] + [_SHADOW_ALERTS_NODE] + list(verify_nodes):
+        status, msg = outcome.get(name, ("", ""))
+        if status == "failed" and report["failed_step"] is None:
+            if msg.startswith(CALLER_ERROR_PREFIX):
+                report["caller_error"] = True
+                msg = msg[len(CALLER_ERROR_PREFIX):]
+            report["failed_step"] = _VERIFY_STEP if name in verify_nodes else name
+            report["message"] = msg
+    for tenant in wave:
+        rec = state["tenants"].get(tenant)
+        if tenant in tenant_results:
+            t_ok, t_msg = tenant_results[tenant]
+        elif rec is not None:
+            t_ok, t_msg = rec["status"] == "verified", rec["message"]
+        else:
+            t_ok, t_msg = False, "not verified (wave stopped before this tenant)"
+        if t_ok:
+            report["tenants_verified"].append(tenant)
+        else:
+            report["tenants_failed"][tenant] = t_msg
+    if not report["failed_step"] and report["tenants_failed"]:
+        report["failed_step"] = _VERIFY_STEP
+        report["message"] = f"{len(report['tenants_failed'])} tenant(s) failed verification"
+    if report["failed_step"] is None:
+        report["success"] = True
+        report["message"] = (f"Wave completed: {len(wave)} tenant(s) cut over "
+                             f"({report['tenants_resumed']} from checkpoint)")
+        if report["checkpoint"]:
+            state["status"] = "completed"
+            _write_checkpoint(report["checkpoint"], state)
+    return report
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
@@ -312,10 +727,16 @@ def build_parser():
         "--readiness-json", required=True,
         help="Path to cutover-readiness.json from validate_migration.py",
     )
-    parser.add_argument(
-        "--tenant", required=True,
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        "--tenant",
         help="Tenant name for post-cutover health verification",
     )
+    target.add_argument(
+        "--wave", action="store_true",
+        help="Cut over every converged_tenants entry of the readiness JSON "
+             "in one run (steps 1-4 once, batched verification, checkpointed)",
+    )
     add_prometheus_arg(
         parser,
         help_text="Prometheus URL (default: $PROMETHEUS_URL, else http://localhost:9090)",
@@ -336,6 +757,28 @@ def build_parser():
         "--json-output", action="store_true",
         help="Output structured JSON report to stdout",
     )
+    wave = parser.add_argument_group("wave mode")
+    wave.add_argument(
+        "--tenants",
+        help="Comma-separated subset of converged tenants for this wave",
+    )
+    wave.add_argument(
+        "--workers", type=int, default=4,
+        help="Concurrent verification queries (default: 4)",
+    )
+    wave.add_argument(
+        "--verify-batch", type=int, default=DEFAULT_VERIFY_BATCH,
+        help=f"Tenants per fleet-wide verification query (default: {DEFAULT_VERIFY_BATCH})",
+    )
+    wave.add_argument(
+        "--checkpoint",
+        help="Progress file for resuming a wave "
+             f"(default: {DEFAULT_WAVE_CHECKPOINT} next to --readiness-json)",
+    )
+    wave.add_argument(
+        "--alertmanager",
+        help="Alertmanager URL; fail tenants whose alerts are still shadow-routed",
+    )
     return parser
 
 
@@ -344,19 +787,41 @@ def main():
     try_utf8_stdout()
     parser = build_parser()
     args = parser.parse_args()
-
-    report = apply_cutover(
-        readiness_json=args.readiness_json,
-        tenant=args.tenant,
-        prometheus_url=args.prometheus,
-        namespace=args.namespace,
-        dry_run=args.dry_run,
-        force=args.force,
-    )
+    if not args.wave and (args.tenants or args.checkpoint or args.alertmanager):
+        parser.error("--tenants/--checkpoint/--alertmanager require --wave")
+
+    if args.wave:
+        report = apply_wave_cutover(
+            readiness_json=args.readiness_json,
+            prometheus_url=args.prometheus,
+            namespace=args.namespace,
+            tenants=[t.strip() for t in (args.tenants or "").split(",") if t.strip()],
+            alertmanager_url=args.alertmanager,
+            workers=args.workers,
+            verify_batch=args.verify_batch,
+            checkpoint=args.checkpoint,
+            dry_run=args.dry_run,
+            force=args.force,
+        )
+    else:
+        report = apply_cutover(
+            readiness_json=args.readiness_json,
+            tenant=args.tenant,
+            prometheus_url=args.prometheus,
+            namespace=args.namespace,
+            dry_run=args.dry_run,
+            force=args.force,
+        )
 
     if args.json_output:
         print(format_json_report(report))
 
+    for tenant, reason in sorted(report.get("tenants_failed", {}).items()):
+        print(f"  ✗ {tenant}: {reason}", file=sys.stderr)
+    if report.get("checkpoint") and not report["success"]:
+        print(f"   Progress saved to {report['checkpoint']}; re-run the same "
+              "command to resume.", file=sys.stderr)
+
     if report["success"]:
         print("\n✅ Cutover completed successfully.", file=sys.stderr)
         print("Next: run 'da-tools batch-diagnose' for full health report.",
@@ -13,6 +13,7 @@ Usage:
     da_assembler.py --config-dir ./build/config-dir --once         # one-shot render
     da_assembler.py --config-dir ./build/config-dir --dry-run      # preview without writing
     da_assembler.py --render-cr example.yaml --config-dir ./out    # render a single CR file
+    da_assembler.py --config-dir /etc/... --metrics-port 9102      # watch + serve /metrics
 
 Prerequisites:
     pip install kubernetes pyyaml
@@ -35,6 +36,7 @@ _THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, _THIS_DIR)  # Docker flat layout
 sys.path.insert(0, os.path.join(_THIS_DIR, ".."))  # Repo subdir layout
 from _lib_exitcodes import EXIT_OK, EXIT_CALLER_ERROR  # noqa: E402
+from _lib_metrics import MetricsRegistry, serve_metrics  # noqa: E402
 
 try:
     import yaml
@@ -59,6 +61,24 @@ CRD_PLURAL = "thresholdconfigs"
 # Graceful shutdown
 _shutdown = False
 
+# Reconcile throughput / latency, served on --metrics-port in watch mode.
+METRICS = MetricsRegistry()
+_reconciles = METRICS.counter(
+    "da_assembler_reconcile_total",
+    "ThresholdConfig reconciles by result (rendered / unchanged / error).",
+    ["result"])
+for _result in ("rendered", "unchanged", "error"):
+    _reconciles.labels(_result)
+_reconcile_seconds = METRICS.histogram(
+    "da_assembler_reconcile_duration_seconds",
+    "Render + write + status update time of one ThresholdConfig.")
+_deleted = METRICS.counter(
+    "da_assembler_deleted_total",
+    "Rendered files removed because their ThresholdConfig was deleted.")
+_watch_restarts = METRICS.counter(
+    "da_assembler_watch_restarts_total",
+    "Watch streams that failed and were reconnected.")
+
 
 def _signal_handler(signum, frame):
     global _shutdown
@@ -210,6 +230,7 @@ def reconcile_one(
     name = cr["metadata"]["name"]
     namespace = cr["metadata"].get("namespace", "default")
     filename = _output_filename(cr)
+    started = time.perf_counter()
 
     try:
         content = render_cr_to_yaml(cr)
@@ -226,11 +247,14 @@ def reconcile_one(
         if api and not dry_run:
             update_cr_status(api, cr, "Rendered", sha=sha,
                              message=f"Written to {filename}")
+        _reconciles.labels("rendered" if changed else "unchanged").inc()
 
     except Exception as e:
         log.error("Failed to reconcile %s/%s: %s", namespace, name, e)
+        _reconciles.labels("error").inc()
         if api and not dry_run:
             update_cr_status(api, cr, "Error", message=str(e)[:200])
+    _reconcile_seconds.observe(time.perf_counter() - started)
 
 
 def run_once(
@@ -312,12 +336,14 @@ def run_watch(
                     removed = remove_rendered(config_dir, filename,
                                               dry_run=dry_run)
                     if removed:
+                        _deleted.inc()
                         log.info("Deleted %s (CR %s/%s removed)",
                                  filename, ns, name)
 
         except Exception as e:
             if _shutdown:
                 break
+            _watch_restarts.inc()
             log.warning("Watch interrupted: %s. Reconnecting in 5s...", e)
             time.sleep(5)
 
@@ -381,6 +407,10 @@ def main() -> int:
         "--kubeconfig", type=str, default="",
         help="Path to kubeconfig file (default: in-cluster or ~/.kube/config)",
     )
+    parser.add_argument(
+        "--metrics-port", type=int, default=0,
+        help="Serve Prometheus /metrics on this port in watch mode (default: off)",
+    )
     parser.add_argument(
         "--verbose", action="store_true",
         help="Enable debug logging",
@@ -425,6 +455,10 @@ def main() -> int:
                         namespace=args.namespace)
 
     # Default: watch mode
+    if args.metrics_port:
+        serve_metrics(METRICS, args.metrics_port)
+        log.info("Serving /metrics on :%d", args.metrics_port)
+
     # Do initial sync first
     rc = run_once(api, config_dir, dry_run=args.dry_run,
                   namespace=args.namespace)
@@ -21,7 +21,11 @@
 
 注意:
   此工具處理 conf.d/ 層面的設定清理。Prometheus ConfigMap 中的
-  Recording Rule / Alert Rule 需在下個 Release Cycle 手動移除。
+  Recording Rule / Alert Rule 需在下個 Release Cycle 手動移除；
+  Step 3 會列出 --rule-packs-dir 中實際引用該閾值的 Alert。
+
+Step 2 只開啟 _lib_dependency_index 反向索引中帶有該 key 的檔案（索引以
+檔案內容 hash 增量更新），也只改寫實際移除了 key 的檔案。
 """
 
 import sys
@@ -43,7 +47,7 @@ sys.path.insert(0, os.path.join(_THIS_DIR, '..'))  # Repo subdir layout
 from _lib_python import load_yaml_file as _lib_load_yaml  # noqa: E402
 from _lib_python import write_text_secure  # noqa: E402
 from _lib_exitcodes import EXIT_CALLER_ERROR  # noqa: E402
-from _lib_confd import warn_nested  # noqa: E402
+from _lib_dependency_index import load_index, threshold_key_alerts  # noqa: E402
 
 
 def load_yaml_file(path):
@@ -88,14 +92,12 @@ def scan_for_metric(metric_key, config_dir):
     ]
 
     config_base = Path(config_dir)
-    # #1339: flat by design here — but a hierarchical conf.d must not
-    # look like an empty one. Name the files this scan cannot see.
-    warn_nested(config_base, tool="deprecate_rule")
-    for entry in sorted(list(config_base.glob("*.yaml")) + list(config_base.glob("*.yml"))):
-        filename = entry.name
-        path = str(entry)
-        if filename.startswith('.'):
-            continue
+    # Every pattern key contains metric_key, so the index's candidates are a
+    # superset of the files this loop can report. The index scan is flat and
+    # names nested files itself (#1339).
+    index = load_index(config_base, tool="deprecate_rule")
+    for filename in index.files_with_key(metric_key):
+        path = str(config_base / filename)
 
         data = load_yaml_file(path)
         if data is None:
@@ -179,13 +181,12 @@ def remove_from_tenants(metric_key, config_dir, execute=False):
     ]
 
     config_base = Path(config_dir)
-    # #1339: second scan site — the guard must live where the scan does,
-    # otherwise a hierarchical conf.d is silently empty on THIS path.
-    warn_nested(config_base, tool="deprecate_rule")
-    for entry in sorted(list(config_base.glob("*.yaml")) + list(config_base.glob("*.yml"))):
-        filename = entry.name
-        path = str(entry)
-        if filename.startswith('_') or filename.startswith('.'):
+    # Only files the index says carry a matching key are opened (and only
+    # the ones that actually lose a key are rewritten).
+    index = load_index(config_base, tool="deprecate_rule")
+    for filename in index.files_with_key(metric_key):
+        path = str(config_base / filename)
+        if filename.startswith('_'):
             continue  # Skip _defaults.yaml
 
         data = load_yaml_file(path)
@@ -234,6 +235,8 @@ def main():
                         help="conf.d 目錄路徑")
     parser.add_argument("--execute", action="store_true",
                         help="實際執行下架 (預設只預覽)")
+    parser.add_argument("--rule-packs-dir", default="rule-packs",
+                        help="Rule packs 目錄，用於列出引用該閾值的 Alert (預設 rule-packs/)")
 
     args = parser.parse_args()
 
@@ -242,6 +245,12 @@ def main():
         sys.exit(EXIT_CALLER_ERROR)
 
     mode = "執行" if args.execute else "預覽"
+    packs = sorted(Path(args.rule_packs_dir).glob("rule-pack-*.yaml"))
+    try:
+        key_alerts = threshold_key_alerts(packs)
+    except (OSError, UnicodeDecodeError, yaml.YAMLError) as e:
+        print(f"  ⚠️  無法讀取 rule packs: {e}")
+        key_alerts = {}
 
     print(f"{'='*60}")
     print(f"🗑️  規則下架工具 — {mode}模式")
@@ -285,6 +294,10 @@ def main():
         print(f"  📋 下一個 Release Cycle 請手動移除:")
         print(f"     • Recording Rule: tenant:{metric}:* 或 tenant:custom_{metric}:*")
         print(f"     • Alert Rule: 引用上述 Recording Rule 的 Alert")
+        for key in (metric, f"{metric}_critical"):
+            if key_alerts.get(key):
+                print(f"       ↳ tenant:alert_threshold:{key} ← "
+                      f"{', '.join(key_alerts[key])}")
         print(f"     • Threshold Rule: tenant:alert_threshold:{metric}")
 
     # 總結
@@ -8,6 +8,13 @@ in tenant names.
 
 ADR-006 companion: lowers the barrier to adopting 1:N mapping topology.
 
+Huge exporters (Oracle / DB2 with 100k tablespaces): each candidate label
+keeps at most ``--max-values`` exact values; past that a HyperLogLog sketch
+only counts, so memory is bounded and ranking still sees the cardinality.
+The Prometheus path asks ``/api/v1/label/<name>/values`` with ``match[]`` +
+``limit`` for all candidate labels concurrently, and takes cardinality
+estimates for truncated labels from ``/api/v1/status/tsdb``.
+
 Usage:
     # Scrape exporter directly
     discover-mappings --endpoint http://exporter:9104/metrics
@@ -24,11 +31,11 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import math
 import os
-import re
 import sys
 import urllib.parse
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 
 import yaml
@@ -50,6 +57,7 @@ from _lib_python import (  # noqa: E402
     write_text_secure,
 )
 from _lib_exitcodes import EXIT_OK, EXIT_VIOLATION, EXIT_CALLER_ERROR  # noqa: E402
+from _lib_exposition import ExpositionReader  # noqa: E402
 
 _LANG = detect_cli_lang()
 
@@ -91,51 +99,140 @@ DB_METRIC_PREFIXES: list[str] = [
 ]
 
 
+# Exact values kept per label before counting switches to the sketch.
+# Far above the 200-value ranking cut-off, far below a 100k-value label.
+DEFAULT_MAX_VALUES = 1000
+
+
+class _HyperLogLog:
+    """Distinct-count sketch: 2**p one-byte registers, ~1.04/sqrt(2**p) error.
+
+    Uses the process's string hash (SipHash, 64-bit), which is uniformly
+    distributed and already cached on the str, so adding a value is a few
+    integer ops. Estimates are only compared within one process.
+    """
+
+    def __init__(self, p: int = 12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(self.m)
+        self._tail_bits = 64 - p
+
+    def add(self, value: str) -> None:
+        h = hash(value) & 0xFFFFFFFFFFFFFFFF
+        idx = h >> self._tail_bits
+        rank = self._tail_bits - (h & ((1 << self._tail_bits) - 1)).bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def estimate(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))  # linear counting
+        return round(raw)
+
+
+class DistinctValues(set):
+    """The distinct values of one label: exact up to *cap*, then estimated.
+
+    Behaves as the set of retained values (so callers that only need a
+    sample or a mapping draft are unchanged); :attr:`cardinality` is the
+    estimated total and :attr:`truncated` tells whether values were dropped.
+    """
+
+    def __init__(self, cap: int = DEFAULT_MAX_VALUES, values=()):
+        super().__init__()
+        self.cap = cap
+        self.unseen = 0   # values known to exist but not retained (API path)
+        self._sketch: Optional[_HyperLogLog] = None
+        for value in values:
+            self.observe(value)
+
+    def observe(self, value: str) -> None:
+        if value in self:
+            return
+        if len(self) < self.cap:
+            self.add(value)
+            return
+        if self._sketch is None:
+            self._sketch = _HyperLogLog()
+        self._sketch.add(value)
+
+    @property
+    def truncated(self) -> bool:
+        return self._sketch is not None or self.unseen > 0
+
+    @property
+    def cardinality(self) -> int:
+        extra = max(self._sketch.estimate(), 1) if self._sketch is not None else 0
+        return len(self) + extra + self.unseen
+
+
+def _cardinality(values: set[str]) -> int:
+    return getattr(values, "cardinality", len(values))
+
+
+def scan_exposition(source, max_values: int = DEFAULT_MAX_VALUES,
+                    ) -> tuple[dict[str, set[str]], str, int]:
+    """Stream an exposition body once (str, bytes or an open /metrics
+    response) and return (label_values, db_type, sample_count).
+
+    label_values maps label_name → :class:`DistinctValues` of non-empty
+    values, for labels in PARTITION_LABEL_CANDIDATES only — other labels are
+    never stored (keep_labels pushdown), and each label keeps at most
+    *max_values* values (the rest are only counted), so a ~500k-line
+    exporter scrape costs a bounded sample, not the body. db_type comes
+    from the metric names seen, DB_METRIC_PREFIXES order.
+    """
+    label_values: dict[str, DistinctValues] = {}
+    metric_names: set[str] = set()
+    reader = ExpositionReader(source, keep_labels=PARTITION_LABEL_CANDIDATES,
+                              intern_labels=True)
+    for name, labels, _value, _ts in reader:
+        metric_names.add(name)
+        for label_name, label_value in labels.items():
+            if label_value:
+                values = label_values.get(label_name)
+                if values is None:
+                    values = label_values[label_name] = DistinctValues(max_values)
+                if label_value not in values:  # the common case stays inline
+                    values.observe(label_value)
+    return label_values, _db_type_from_names(metric_names), reader.samples
+
+
 def parse_prometheus_text(raw: str) -> dict[str, set[str]]:
     """Parse Prometheus text exposition format and extract label values.
 
     Returns dict mapping label_name → set of unique values.
     Only considers labels in PARTITION_LABEL_CANDIDATES.
     """
-    label_values: dict[str, set[str]] = defaultdict(set)
-    # Match metric lines with labels: metric_name{label="value",...} value
-    label_re = re.compile(r'(\w+)="([^"]*)"')
-
-    for line in raw.splitlines():
-        line = line.strip()
-        if not line or line.startswith('#'):
-            continue
-        # Find labels block
-        brace_start = line.find('{')
-        if brace_start < 0:
-            continue
-        brace_end = line.find('}', brace_start)
-        if brace_end < 0:
-            continue
-        labels_str = line[brace_start + 1:brace_end]
-        for m in label_re.finditer(labels_str):
-            label_name = m.group(1)
-            label_value = m.group(2)
-            if label_name in PARTITION_LABEL_CANDIDATES and label_value:
-                label_values[label_name].add(label_value)
-
-    return dict(label_values)
+    return scan_exposition(raw)[0]
 
 
-def detect_db_type(raw: str) -> str:
-    """Heuristically detect database type from metric names."""
-    line_sample = raw[:8000].lower()
+def _db_type_from_names(metric_names: set[str]) -> str:
     for prefix in DB_METRIC_PREFIXES:
-        if prefix in line_sample:
+        if any(n.lower().startswith(prefix) for n in metric_names):
             return prefix.rstrip('_')
     return "unknown"
 
 
-def scrape_metrics_endpoint(endpoint: str,
-                            timeout: int = 15) -> tuple[Optional[str], Optional[str]]:
-    """Scrape a Prometheus-format /metrics endpoint.
+def detect_db_type(raw: str) -> str:
+    """Heuristically detect database type from metric names."""
+    return scan_exposition(raw)[1]
+
 
-    Returns (raw_text, None) on success, (None, error) on failure.
+def scan_metrics_endpoint(
+    endpoint: str,
+    timeout: int = 15,
+    max_values: int = DEFAULT_MAX_VALUES,
+) -> tuple[Optional[tuple[dict[str, set[str]], str, int]], Optional[str]]:
+    """Scrape a Prometheus-format /metrics endpoint, parsing while reading.
+
+    Returns (scan_exposition result, None) on success, (None, error) on
+    failure.
     """
     import urllib.request
     import urllib.error
@@ -148,7 +245,7 @@ def scrape_metrics_endpoint(endpoint: str,
         req = urllib.request.Request(endpoint)  # nosec B310
         req.add_header("Accept", "text/plain")
         with urllib.request.urlopen(req, timeout=timeout) as resp:  # nosec B310
-            return resp.read().decode("utf-8", errors="replace"), None
+            return scan_exposition(resp, max_values), None
     except (urllib.error.URLError, urllib.error.HTTPError, OSError) as exc:
         return None, str(exc)
 
@@ -158,59 +255,80 @@ def query_prometheus_label_values(
     instance: str | None = None,
     job: str | None = None,
     timeout: int = 10,
+    max_values: int = DEFAULT_MAX_VALUES,
+    workers: int = 8,
 ) -> dict[str, set[str]]:
     """Query Prometheus /api/v1/label/<name>/values for partition labels.
 
-    Uses instance or job selector to filter.
-    Returns dict mapping label_name → set of unique values.
+    Uses instance or job selector (``match[]``) to filter; one request per
+    candidate label, run concurrently on *workers* threads. Each asks for
+    ``limit=max_values + 1`` values, so a label with more is returned
+    truncated (:attr:`DistinctValues.truncated`) instead of in full —
+    Prometheus ignores ``limit`` before 2.51 and the cap then applies
+    client-side.
+    Returns dict mapping label_name → :class:`DistinctValues`.
     """
-    label_values: dict[str, set[str]] = defaultdict(set)
     base = prom_url.rstrip('/')
-
-    for label in PARTITION_LABEL_CANDIDATES:
-        # Build matcher
-        matchers = []
-        if instance:
-            matchers.append(f'instance="{instance}"')
-        if job:
-            matchers.append(f'job="{job}"')
-        matcher_str = ','.join(matchers)
-
-        # Use series API with matcher
-        if matcher_str:
-            # W1 bug fix: the matcher carries `{`, `}`, `"` and possibly
-            # spaces — it MUST be percent-encoded (#1112 InvalidURL
-            # bug-class; an f-string interpolation crashes http.client on
-            # any whitespace/control character).
-            params = urllib.parse.urlencode({"match[]": f"{{{matcher_str}}}"})
-            url = f"{base}/api/v1/series?{params}"
-        else:
-            url = f"{base}/api/v1/label/{label}/values"
-
-        data, err = http_get_json(url, timeout=timeout)
+    matchers = []
+    if instance:
+        matchers.append(f'instance="{instance}"')
+    if job:
+        matchers.append(f'job="{job}"')
+    params = {"limit": str(max_values + 1)}
+    if matchers:
+        # W1 bug fix: the matcher carries `{`, `}`, `"` and possibly
+        # spaces — it MUST be percent-encoded (#1112 InvalidURL
+        # bug-class; an f-string interpolation crashes http.client on
+        # any whitespace/control character).
+        params["match[]"] = "{" + ",".join(matchers) + "}"
+    query = urllib.parse.urlencode(params)
+
+    def fetch(label: str) -> Optional[DistinctValues]:
+        data, err = http_get_json(f"{base}/api/v1/label/{label}/values?{query}",
+                                  timeout=timeout)
         # isinstance guard: a top-level JSON list (e.g. --prometheus pointed
         # at an Alertmanager v2 API) must skip, not AttributeError on .get().
         if err or not isinstance(data, dict):
-            continue
-
+            return None
         items = data.get("data")
         if not isinstance(items, list):
-            continue
-        # W1 bug fix: the two branches previously tested the IDENTICAL
-        # condition (`isinstance(data["data"], list)` twice), so the
-        # /api/v1/label/<label>/values branch was unreachable and the
-        # no-matcher path never collected a value. Dispatch on the ELEMENT
-        # type instead: /api/v1/series returns a list of label-set dicts,
-        # /api/v1/label/.../values returns a list of plain strings.
+            return None
+        values = DistinctValues(max_values)
+        # W1 bug fix: dispatch on the ELEMENT type — /api/v1/label/.../values
+        # returns plain strings, a /api/v1/series-shaped answer label-set dicts.
         for item in items:
             if isinstance(item, dict):
-                val = item.get(label)
-                if val:
-                    label_values[label].add(val)
-            elif isinstance(item, str) and item:
-                label_values[label].add(item)
-
-    return dict(label_values)
+                item = item.get(label)
+            if isinstance(item, str) and item:
+                if item not in values and len(values) >= max_values:
+                    values.unseen = 1  # more exist; main() may refine the count
+                    break
+                values.observe(item)
+        return values or None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        found = pool.map(fetch, PARTITION_LABEL_CANDIDATES)
+        return {label: values for label, values
+                in zip(PARTITION_LABEL_CANDIDATES, found) if values}
+
+
+def query_tsdb_label_cardinality(prom_url: str, timeout: int = 10) -> dict[str, int]:
+    """Return ``{label_name: distinct value count}`` from /api/v1/status/tsdb.
+
+    Counts are for the whole head block (all instances), so they bound a
+    single instance's cardinality from above; only the top labels are
+    listed. Returns ``{}`` when unavailable.
+    """
+    params = urllib.parse.urlencode({"limit": "100"})
+    data, err = http_get_json(f"{prom_url.rstrip('/')}/api/v1/status/tsdb?{params}",
+                              timeout=timeout)
+    if err or not isinstance(data, dict) or not isinstance(data.get("data"), dict):
+        return {}
+    counts: dict[str, int] = {}
+    for item in data["data"].get("labelValueCountByLabelName") or []:
+        if isinstance(item, dict) and isinstance(item.get("value"), (int, float)):
+            counts[str(item.get("name"))] = int(item["value"])
+    return counts
 
 
 def rank_partition_labels(
@@ -218,13 +336,14 @@ def rank_partition_labels(
 ) -> list[tuple[str, set[str], int]]:
     """Rank discovered labels by suitability for partition.
 
-    Considers: number of unique values (2-200 is ideal),
+    Considers: number of unique values (2-200 is ideal; the estimated
+    cardinality for a truncated :class:`DistinctValues`),
     label name priority from PARTITION_LABEL_CANDIDATES.
     Returns sorted list of (label_name, values, score).
     """
     scored: list[tuple[str, set[str], int]] = []
     for label, values in label_values.items():
-        count = len(values)
+        count = _cardinality(values)
         if count < 2:
             continue  # not useful for partitioning
 
@@ -309,6 +428,14 @@ _HELP: dict[str, dict[str, str]] = {
         "zh": "以 JSON 格式輸出",
         "en": "Output in JSON format",
     },
+    "max_values": {
+        "zh": f"每個標籤最多保留的值數，超過只估算數量（預設 {DEFAULT_MAX_VALUES}）",
+        "en": f"Values kept per label; beyond this they are only counted (default {DEFAULT_MAX_VALUES})",
+    },
+    "workers": {
+        "zh": "並行的 Prometheus label 查詢數（預設 8）",
+        "en": "Concurrent Prometheus label queries (default 8)",
+    },
 }
 
 
@@ -328,8 +455,13 @@ def main(argv: list[str] | None = None) -> int:
     parser.add_argument("--job", help=_h("job"))
     parser.add_argument("-o", "--output", help=_h("output"))
     parser.add_argument("--json", action="store_true", help=_h("json"))
+    parser.add_argument("--max-values", type=int, default=DEFAULT_MAX_VALUES,
+                        help=_h("max_values"))
+    parser.add_argument("--workers", type=int, default=8, help=_h("workers"))
 
     args = parser.parse_args(argv)
+    if args.max_values < 1:
+        parser.error("--max-values must be >= 1")
 
     # ── Discover label values ──────────────────────────────────────
     label_values: dict[str, set[str]] = {}
@@ -358,16 +490,13 @@ def main(argv: list[str] | None = None) -> int:
 
     if args.endpoint:
         print(f"Scraping {args.endpoint} ...", file=sys.stderr)
-        raw, err = scrape_metrics_endpoint(args.endpoint)
+        scanned, err = scan_metrics_endpoint(args.endpoint, max_values=args.max_values)
         if err:
             print(f"ERROR: {err}", file=sys.stderr)
             return EXIT_CALLER_ERROR
-        label_values = parse_prometheus_text(raw)
-        db_type = detect_db_type(raw)
+        label_values, db_type, metric_count = scanned
         # Use endpoint as instance identifier
         instance_id = args.endpoint.split("//")[-1].split("/")[0]
-        metric_count = sum(1 for line in raw.splitlines()
-                          if line and not line.startswith('#'))
         print(f"  Scraped {metric_count} metric samples, db_type={db_type}",
               file=sys.stderr)
 
@@ -381,8 +510,18 @@ def main(argv: list[str] | None = None) -> int:
             args.prometheus,
             instance=args.instance,
             job=args.job,
+            max_values=args.max_values,
+            workers=args.workers,
         )
         instance_id = args.instance or args.job or "unknown"
+        truncated = [lbl for lbl, vals in label_values.items()
+                     if getattr(vals, "truncated", False)]
+        if truncated:
+            # Only labels past the cap need an estimate; one TSDB-stats call.
+            estimates = query_tsdb_label_cardinality(args.prometheus)
+            for label in truncated:
+                values = label_values[label]
+                values.unseen = max(estimates.get(label, 0) - len(values), 1)
 
     if not label_values:
         msg = ("未發現可用於分區的標籤值" if lang == "zh"
@@ -401,10 +540,11 @@ def main(argv: list[str] | None = None) -> int:
     header = "發現的分區標籤:" if lang == "zh" else "Discovered partition labels:"
     print(f"\n{header}", file=sys.stderr)
     for label, values, score in ranked:
-        count = len(values)
+        count = _cardinality(values)
         sample = sorted(values)[:5]
         more = f"  (+{count - 5} more)" if count > 5 else ""
-        print(f"  {label}: {count} values (score={score})", file=sys.stderr)
+        approx = "~" if getattr(values, "truncated", False) else ""
+        print(f"  {label}: {approx}{count} values (score={score})", file=sys.stderr)
         print(f"    sample: {', '.join(sample)}{more}", file=sys.stderr)
 
     if not ranked:
@@ -417,6 +557,13 @@ def main(argv: list[str] | None = None) -> int:
     best_label, best_values, _ = ranked[0]
     print(f"\n{'推薦分區標籤' if lang == 'zh' else 'Recommended partition label'}: {best_label}",
           file=sys.stderr)
+    if getattr(best_values, "truncated", False):
+        print("  " + (f"草稿只列出前 {len(best_values)} 個值（約 {_cardinality(best_values)} 個）；"
+                       "可調高 --max-values"
+                       if lang == "zh" else
+                       f"Draft lists {len(best_values)} of ~{_cardinality(best_values)} values; "
+                       "raise --max-values for more"),
+              file=sys.stderr)
 
     # ── Generate mapping draft ────────────────────────────────────
     draft = generate_mapping_draft(instance_id, best_label, best_values, db_type)
@@ -22,7 +22,6 @@ import hashlib
 import json
 import os
 import stat
-import subprocess
 import sys
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -304,6 +303,8 @@ def compute_crd_manifest(
 
     Returns FileManifest with label="cluster-crd" and files={name: sha256}.
     """
+    import subprocess  # only operator mode shells out; keep it off start-up
+
     cmd = ["kubectl", "get", "prometheusrules", "-n", namespace, "-o", "json"]
     if kubeconfig:
         cmd.extend(["--kubeconfig", kubeconfig])
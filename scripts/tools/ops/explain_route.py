@@ -11,6 +11,12 @@ Usage:
     explain_route.py --config-dir conf.d
     explain_route.py --config-dir conf.d --tenant db-a
     explain_route.py --config-dir conf.d --show-profile-expansion
+    explain_route.py --config-dir conf.d --simulate alerts.yaml
+    explain_route.py --alertmanager-config am-configmap.yaml --simulate alerts.yaml
+
+--simulate routes a whole batch of alerts through the compiled route tree +
+inhibit rules (_grar_simulate) — the config generate_alertmanager_routes would
+render from --config-dir, or an already-rendered --alertmanager-config.
 """
 from __future__ import annotations
 
@@ -32,9 +38,21 @@ if _HERE not in sys.path:
     sys.path.insert(0, _HERE)
 
 from generate_alertmanager_routes import (  # noqa: E402
+    INHIBIT_MODES,
+    ROUTE_MODES,
     _parse_config_files,
+    generate_inhibit_rules,
+    generate_routes,
+    load_base_config,
+    load_tenant_configs,
+    merge_into_base,
     merge_routing_with_defaults,
 )
+from _grar_simulate import (  # noqa: E402
+    load_alertmanager_config,
+    load_alerts,
+    simulate_alerts,
+)
 from _lib_python import detect_cli_lang, format_json_report  # noqa: E402
 from _lib_exitcodes import EXIT_OK, EXIT_CALLER_ERROR  # noqa: E402
 
@@ -439,6 +457,68 @@ def format_trace(trace: dict, *, lang: str = "en") -> str:
     return "\n".join(lines)
 
 
+def build_simulation_config(
+    config_dir: str,
+    base_config: str | None = None,
+    *,
+    route_mode: str = "flat",
+    inhibit_mode: str = "per-tenant",
+) -> dict:
+    """Assemble the alertmanager.yml generate_alertmanager_routes would render
+    for config_dir (routes, receivers, severity-dedup inhibits merged into the
+    base config). ValueError from generation propagates."""
+    routing_configs, dedup_configs, _, enforced_routing, _ = \
+        load_tenant_configs(config_dir)
+    routes, receivers, _ = generate_routes(
+        routing_configs, enforced_routing=enforced_routing,
+        route_mode=route_mode)
+    inhibit_rules, _ = generate_inhibit_rules(dedup_configs, mode=inhibit_mode)
+    return merge_into_base(load_base_config(base_config), routes, receivers,
+                           inhibit_rules)
+
+
+def _fmt_labels(labels: dict[str, str]) -> str:
+    return "{" + ", ".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+def format_simulation(results: list[dict], *, lang: str = "en") -> str:
+    """One line per alert: labels → receivers [inhibited by ...]."""
+    lines: list[str] = []
+    inhibited = 0
+    for r in results:
+        line = f"{_fmt_labels(r['labels'])} → {', '.join(r['receivers'])}"
+        if r["inhibited"]:
+            inhibited += 1
+            tag = "被抑制於" if lang == "zh" else "inhibited by"
+            line += f"  [{tag} {r['inhibited_by']}]"
+        lines.append(line)
+    if lang == "zh":
+        lines.append(f"── {len(results)} 筆 alert，{inhibited} 筆被抑制 ──")
+    else:
+        lines.append(f"── {len(results)} alert(s), {inhibited} inhibited ──")
+    return "\n".join(lines)
+
+
+def _run_simulation(args: argparse.Namespace, lang: str) -> int:
+    try:
+        if args.alertmanager_config:
+            config = load_alertmanager_config(args.alertmanager_config)
+        else:
+            config = build_simulation_config(
+                args.config_dir, args.base_config,
+                route_mode=args.route_mode, inhibit_mode=args.inhibit_mode)
+        alerts = load_alerts(args.simulate)
+        results = simulate_alerts(config, alerts)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return EXIT_CALLER_ERROR
+    if args.json:
+        print(format_json_report(results))
+    else:
+        print(format_simulation(results, lang=lang))
+    return EXIT_OK
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
@@ -472,6 +552,28 @@ _HELP = {
         "zh": "Alert 嚴重度（預設 warning）",
         "en": "Alert severity (default: warning)",
     },
+    "simulate": {
+        "zh": "批次模擬：將 alert 檔（YAML/JSON label 集合）逐筆路由並套用 inhibit 規則",
+        "en": "Batch simulate: route every alert in a YAML/JSON label-set file "
+              "and apply inhibit rules",
+    },
+    "alertmanager_config": {
+        "zh": "搭配 --simulate：改用已渲染的 alertmanager.yml 或其 ConfigMap（免 --config-dir）",
+        "en": "With --simulate: use a rendered alertmanager.yml or its ConfigMap "
+              "(no --config-dir needed)",
+    },
+    "base_config": {
+        "zh": "搭配 --simulate：基礎 Alertmanager 設定（同 generate_alertmanager_routes）",
+        "en": "With --simulate: base Alertmanager config (as generate_alertmanager_routes)",
+    },
+    "route_mode": {
+        "zh": "搭配 --simulate：路由樹模式（預設 flat）",
+        "en": "With --simulate: route tree mode (default: flat)",
+    },
+    "inhibit_mode": {
+        "zh": "搭配 --simulate：inhibit 規則模式（預設 per-tenant）",
+        "en": "With --simulate: inhibit rule mode (default: per-tenant)",
+    },
 }
 
 
@@ -484,7 +586,7 @@ def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(
         description="Routing merge pipeline debugger (ADR-007)",
     )
-    parser.add_argument("--config-dir", required=True, help=_h("config_dir"))
+    parser.add_argument("--config-dir", help=_h("config_dir"))
     parser.add_argument("--tenant", action="append", dest="tenants",
                         help=_h("tenant"))
     parser.add_argument("--show-profile-expansion", action="store_true",
@@ -495,14 +597,30 @@ def main(argv: list[str] | None = None) -> int:
     parser.add_argument("--severity", default="warning",
                         help=_h("severity"))
     parser.add_argument("--json", action="store_true", help=_h("json"))
+    parser.add_argument("--simulate", metavar="ALERTS_FILE",
+                        help=_h("simulate"))
+    parser.add_argument("--alertmanager-config", help=_h("alertmanager_config"))
+    parser.add_argument("--base-config", help=_h("base_config"))
+    parser.add_argument("--route-mode", choices=ROUTE_MODES, default="flat",
+                        help=_h("route_mode"))
+    parser.add_argument("--inhibit-mode", choices=INHIBIT_MODES,
+                        default="per-tenant", help=_h("inhibit_mode"))
 
     args = parser.parse_args(argv)
 
-    if not Path(args.config_dir).is_dir():
+    if args.alertmanager_config and not args.simulate:
+        parser.error("--alertmanager-config requires --simulate")
+    if not args.config_dir and not args.alertmanager_config:
+        parser.error("--config-dir is required")
+
+    if args.config_dir and not Path(args.config_dir).is_dir():
         print(f"ERROR: config directory not found: {args.config_dir}",
               file=sys.stderr)
         return EXIT_CALLER_ERROR
 
+    if args.simulate:
+        return _run_simulation(args, lang)
+
     parsed = _parse_config_files(args.config_dir)
 
     # --trace mode: simulate alert routing path
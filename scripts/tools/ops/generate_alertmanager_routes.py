@@ -9,6 +9,13 @@ Severity Dedup (per-tenant):
   Default (absent or "enable"): generate inhibit_rule that suppresses warning when critical fires
   "disable": skip inhibit_rule — both warning and critical notifications are sent
   Mechanism: per-tenant inhibit_rules with tenant="<name>" + metric_group matchers
+  --inhibit-mode consolidated: one rule with equal: [tenant, metric_group] and a
+    tenant=~ matcher for the enabled tenants, proven equivalent before emitting
+
+Route tree (--route-mode):
+  flat (default): one top-level route per tenant (+ override sub-routes)
+  sharded: ~sqrt(N) tenant=~ shard parents + shared routes for identically
+    configured tenants, proven to deliver like the flat tree before emitting
 
 v2.0.0 Bilingual Templates (i18n):
   Rule Packs can include Chinese annotations: summary_zh, description_zh, platform_summary_zh
@@ -53,9 +60,11 @@ from _grar_validate import (  # noqa: E402, F401
     _extract_host,
     _validate_profile_refs,
     assert_equal_labels_gated,
+    assert_inhibit_rules_equivalent,
     assert_platform_alerts_not_tenant_silenceable,
     assert_watchdog_inhibit_immunity,
     check_domain_policies,
+    find_inhibit_equivalence_gaps,
     find_tenant_silenceable_platform_inhibits,
     find_ungated_equal_label_inhibits,
     find_watchdog_suppressing_inhibits,
@@ -82,12 +91,22 @@ from _grar_parse import (  # noqa: E402, F401
     load_tenant_configs,
 )
 
+# ── Re-exports from _grar_simulate ─────────────────────────────────
+from _grar_simulate import (  # noqa: E402, F401
+    assert_routes_equivalent,
+    find_route_equivalence_gaps,
+)
+
 # ── Re-exports from _grar_routes ───────────────────────────────────
 from _grar_routes import (  # noqa: E402, F401
+    INHIBIT_MODES,
+    ROUTE_MODES,
+    _build_consolidated_inhibit_rules,
     _build_enforced_routes,
     _build_inhibit_rules,
     _build_override_matchers,
     _build_override_route,
+    _build_sharded_tenant_routes,
     _build_custom_alert_routes,
     _build_watchdog_route,
     _build_synthetic_probe_route,
@@ -111,6 +130,7 @@ from _grar_render import (  # noqa: E402, F401
     apply_to_configmap,
     assemble_configmap,
     load_base_config,
+    merge_into_base,
     render_output,
 )
 
@@ -293,6 +313,16 @@ def main() -> None:
                         help="Policy YAML with allowed_domains for webhook URL validation")
     parser.add_argument("--yes", action="store_true",
                         help="Skip confirmation prompt for --apply")
+    parser.add_argument("--route-mode", choices=ROUTE_MODES, default="flat",
+                        help="Tenant route tree: one top-level route per tenant "
+                             "(default) or a two-level sharded tree with shared "
+                             "routes for identical configs, proven equivalent "
+                             "before emitting (fleet-scale configs)")
+    parser.add_argument("--inhibit-mode", choices=INHIBIT_MODES, default="per-tenant",
+                        help="Severity-dedup inhibit emission: one rule per tenant "
+                             "(default) or one consolidated rule keyed on "
+                             "equal: [tenant, metric_group], proven equivalent "
+                             "before emitting (fleet-scale configs)")
 
     args = parser.parse_args()
 
@@ -315,12 +345,21 @@ def main() -> None:
     _print_config_summary(routing_configs, dedup_configs, enforced_routing)
 
     # Generate routes + receivers (enforced route inserted first)
-    routes, receivers, route_warnings = generate_routes(
-        routing_configs, allowed_domains=allowed_domains,
-        enforced_routing=enforced_routing)
+    try:
+        routes, receivers, route_warnings = generate_routes(
+            routing_configs, allowed_domains=allowed_domains,
+            enforced_routing=enforced_routing, route_mode=args.route_mode)
+    except ValueError as e:
+        print(f"FAIL: {e}", file=sys.stderr)
+        sys.exit(EXIT_VIOLATION)
 
-    # Generate per-tenant severity dedup inhibit rules
-    inhibit_rules, dedup_warnings = generate_inhibit_rules(dedup_configs)
+    # Generate severity dedup inhibit rules (per-tenant or consolidated)
+    try:
+        inhibit_rules, dedup_warnings = generate_inhibit_rules(
+            dedup_configs, mode=args.inhibit_mode)
+    except ValueError as e:
+        print(f"FAIL: {e}", file=sys.stderr)
+        sys.exit(EXIT_VIOLATION)
 
     # Collect all warnings
     all_warnings = schema_warnings + route_warnings + dedup_warnings
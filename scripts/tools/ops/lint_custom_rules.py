@@ -25,10 +25,22 @@ policy 的 `file_overrides` 取得逐檔豁免（例如 forecast recipe 的 pred
   # CI 模式 (非零退出碼)
   python3 scripts/tools/lint_custom_rules.py rule-packs/custom/ --ci
 
+  # PR 模式：只 lint 相對 origin/main 有變動的檔案（policy 檔本身變動則全掃）
+  python3 scripts/tools/lint_custom_rules.py rule-packs/custom/ --changed-only origin/main --ci
+
+大型規則庫:
+  policy 先編譯成 _CompiledPolicy（deny-list 合併成單一 gate regex、duration
+  上限預先換算），同一 (expr, policy) 的檢查結果只算一次；檔案數 ≥
+  _PARALLEL_MIN_FILES 時以 process pool 並行（--workers，預設 CPU 數）。
+  輸出順序與逐檔循序完全一致（依排序後檔案路徑）。
+
 參考: docs/custom-rule-governance.md §4
 """
 
 import argparse
+import functools
+import hashlib
+import json
 import os
 import re
 import sys
@@ -49,6 +61,16 @@ sys.path.insert(0, os.path.join(_THIS_DIR, '..'))  # Repo subdir layout
 from _lib_python import parse_duration_seconds  # noqa: E402
 from _lib_exitcodes import EXIT_OK, EXIT_VIOLATION  # noqa: E402
 
+# Below this many files a process pool costs more to start than it saves.
+_PARALLEL_MIN_FILES = 64
+
+# Distinct expressions whose findings are memoized per compiled policy.
+_EXPR_CACHE_SIZE = 65536
+
+_RANGE_RE = re.compile(r"\[(\d+[smhd])\]")
+
+_HAS_CSAFE_LOADER = hasattr(yaml, "CSafeLoader")
+
 # ---------------------------------------------------------------------------
 # Defaults (used when no policy file is provided)
 # ---------------------------------------------------------------------------
@@ -131,57 +153,112 @@ class LintResult:
         return f"{self.severity}: {loc}{name} - {self.message}"
 
 
-def lint_expr(expr, policy, filepath, rule_name):
-    """Check a PromQL expr string against policy. Returns list of LintResult."""
-    results = []
-    if not expr:
-        return results
+def _denied_pattern_regex(pat):
+    """Whitespace-tolerant regex source for one `denied_patterns` literal."""
+    # Escape each character for literal match, then insert optional \s*
+    # after operator chars and before/after parens. This tolerates
+    # '=~ ".*"' matching '=~".*"' and 'without (tenant)' matching
+    # 'without(tenant)'.
+    regex_parts = []
+    for ch in pat:
+        # Insert optional whitespace before opening/closing parens
+        if ch in ('(', ')'):
+            regex_parts.append(r'\s*')
+        regex_parts.append(re.escape(ch))
+        # Insert optional whitespace after operator chars and parens
+        if ch in ('=', '~', '!', '<', '>', '(', ')'):
+            regex_parts.append(r'\s*')
+    return ''.join(regex_parts)
+
+
+class _CompiledPolicy:
+    """The expr-level part of a policy, compiled once.
+
+    Every denied function / pattern is still checked with its own regex (one
+    finding per entry, in policy order), but only after a single combined
+    gate regex has matched — the common clean expression costs one search.
+    Instances are interned by policy digest (see compile_policy), so they
+    double as the policy half of the findings cache key.
+    """
 
-    # Check denied functions
-    for func in policy.get("denied_functions", []):
-        pattern = re.compile(r"\b" + re.escape(func) + r"\s*\(")
-        if pattern.search(expr):
-            results.append(LintResult(
-                filepath, rule_name, None, "ERROR",
-                f"denied function '{func}' in expr"
-            ))
+    __slots__ = ("digest", "functions", "function_gate", "patterns",
+                 "pattern_gate", "max_range", "max_secs")
+
+    def __init__(self, policy, digest):
+        self.digest = digest
+        funcs = [str(f) for f in policy.get("denied_functions", [])]
+        self.functions = [
+            (f, re.compile(r"\b" + re.escape(f) + r"\s*\(")) for f in funcs]
+        self.function_gate = re.compile(
+            "|".join(f"(?:{rx.pattern})" for _f, rx in self.functions)
+        ) if self.functions else None
+        pats = [str(p) for p in policy.get("denied_patterns", [])]
+        self.patterns = [(p, re.compile(_denied_pattern_regex(p))) for p in pats]
+        self.pattern_gate = re.compile(
+            "|".join(f"(?:{rx.pattern})" for _p, rx in self.patterns)
+        ) if self.patterns else None
+        self.max_range = policy.get("max_range_duration")
+        self.max_secs = (parse_duration_seconds(self.max_range)
+                         if self.max_range else None)
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __eq__(self, other):
+        return isinstance(other, _CompiledPolicy) and other.digest == self.digest
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_policy_digest(digest, policy_json):
+    return _CompiledPolicy(json.loads(policy_json), digest)
+
+
+def compile_policy(policy):
+    """Compile the expr-level keys of *policy* (interned by content)."""
+    relevant = {k: policy.get(k) for k in
+                ("denied_functions", "denied_patterns", "max_range_duration")}
+    policy_json = json.dumps(relevant, sort_keys=True, default=str)
+    digest = hashlib.sha256(policy_json.encode("utf-8")).hexdigest()
+    return _compile_policy_digest(digest, policy_json)
+
+
+@functools.lru_cache(maxsize=_EXPR_CACHE_SIZE)
+def _expr_findings(expr, compiled):
+    """(severity, message) findings for one expr under one compiled policy."""
+    findings = []
+    gate = compiled.function_gate
+    if gate is not None and gate.search(expr):
+        for func, rx in compiled.functions:
+            if rx.search(expr):
+                findings.append(("ERROR", f"denied function '{func}' in expr"))
+
+    gate = compiled.pattern_gate
+    if gate is not None and gate.search(expr):
+        for pat, rx in compiled.patterns:
+            if rx.search(expr):
+                findings.append(("ERROR", f"denied pattern '{pat}' in expr"))
+
+    if compiled.max_secs:
+        for m in _RANGE_RE.finditer(expr):
+            range_secs = parse_duration_seconds(m.group(1))
+            if range_secs and range_secs > compiled.max_secs:
+                findings.append((
+                    "ERROR",
+                    f"range vector [{m.group(1)}] exceeds max allowed "
+                    f"[{compiled.max_range}]"))
+    return tuple(findings)
 
-    # Check denied patterns (whitespace-tolerant matching)
-    for pat in policy.get("denied_patterns", []):
-        # Build regex: escape each character for literal match, then insert
-        # optional \s* after operator chars and before/after parens.
-        # This tolerates '=~ ".*"' matching '=~".*"' and
-        # 'without (tenant)' matching 'without(tenant)'.
-        regex_parts = []
-        for ch in pat:
-            # Insert optional whitespace before opening/closing parens
-            if ch in ('(', ')'):
-                regex_parts.append(r'\s*')
-            regex_parts.append(re.escape(ch))
-            # Insert optional whitespace after operator chars and parens
-            if ch in ('=', '~', '!', '<', '>', '(', ')'):
-                regex_parts.append(r'\s*')
-        ws_regex = ''.join(regex_parts)
-        if re.search(ws_regex, expr):
-            results.append(LintResult(
-                filepath, rule_name, None, "ERROR",
-                f"denied pattern '{pat}' in expr"
-            ))
 
-    # Check range vector duration
-    max_range = policy.get("max_range_duration")
-    if max_range:
-        max_secs = parse_duration_seconds(max_range)
-        if max_secs:
-            for m in re.finditer(r"\[(\d+[smhd])\]", expr):
-                range_secs = parse_duration_seconds(m.group(1))
-                if range_secs and range_secs > max_secs:
-                    results.append(LintResult(
-                        filepath, rule_name, None, "ERROR",
-                        f"range vector [{m.group(1)}] exceeds max allowed [{max_range}]"
-                    ))
+def lint_expr(expr, policy, filepath, rule_name):
+    """Check a PromQL expr string against policy. Returns list of LintResult.
 
-    return results
+    *policy* may be a policy dict or a compile_policy() result.
+    """
+    if not expr:
+        return []
+    compiled = policy if isinstance(policy, _CompiledPolicy) else compile_policy(policy)
+    return [LintResult(filepath, rule_name, None, severity, message)
+            for severity, message in _expr_findings(str(expr), compiled)]
 
 
 def lint_labels(labels, policy, filepath, rule_name, is_recording):
@@ -245,6 +322,20 @@ def check_owner_label(labels, filepath, rule_name):
 # ---------------------------------------------------------------------------
 # File processing
 # ---------------------------------------------------------------------------
+def _safe_load(text):
+    """yaml.safe_load via libyaml when available — parsing is most of a lint.
+
+    A document libyaml rejects is re-parsed by the pure-Python loader so the
+    reported YAMLError (and thus the finding text) is the same either way.
+    """
+    if not _HAS_CSAFE_LOADER:
+        return yaml.safe_load(text)
+    try:
+        return yaml.load(text, Loader=yaml.CSafeLoader)
+    except yaml.YAMLError:
+        return yaml.safe_load(text)
+
+
 def lint_file(filepath, policy):
     """Lint a single YAML rule file. Returns (list of LintResult, rule_count)."""
     results = []
@@ -262,7 +353,7 @@ def lint_file(filepath, policy):
 
     # Handle ConfigMap-wrapped rules (data: key: |)
     try:
-        doc = yaml.safe_load(content)
+        doc = _safe_load(content)
     except yaml.YAMLError as e:
         results.append(LintResult(filepath, None, None, "ERROR", f"YAML parse error: {e}"))
         return results, rule_count
@@ -280,7 +371,7 @@ def lint_file(filepath, policy):
             for _key, val in doc["data"].items():
                 if isinstance(val, str):
                     try:
-                        inner = yaml.safe_load(val)
+                        inner = _safe_load(val)
                         if isinstance(inner, dict) and "groups" in inner:
                             groups.extend(inner["groups"])
                     except yaml.YAMLError:
@@ -289,6 +380,7 @@ def lint_file(filepath, policy):
     if not groups:
         return results, rule_count
 
+    compiled = compile_policy(policy)
     for group in groups:
         if not isinstance(group, dict):
             continue
@@ -311,7 +403,7 @@ def lint_file(filepath, policy):
             labels = rule.get("labels", {})
 
             # Core checks
-            results.extend(lint_expr(expr, policy, filepath, rule_name))
+            results.extend(lint_expr(expr, compiled, filepath, rule_name))
             results.extend(lint_labels(labels, policy, filepath, rule_name, is_recording))
 
             # Governance checks (Tier 3 best practices)
@@ -427,6 +519,89 @@ def collect_files(paths):
     return sorted(set(files))
 
 
+def lint_files(files, policy, workers=1):
+    """Lint *files*; returns [(results, rule_count)] in input order.
+
+    With workers > 1 and at least _PARALLEL_MIN_FILES files, files are linted
+    across a process pool (each worker keeps its own findings cache).
+    """
+    files = list(files)
+    if workers <= 1 or len(files) < _PARALLEL_MIN_FILES:
+        return [lint_file(f, policy) for f in files]
+    # Imported here: the process-pool machinery is a fifth of this module's
+    # import time, and a serial run (the common CI case) never needs it.
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(workers, len(files))
+    chunksize = max(1, len(files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(functools.partial(lint_file, policy=policy),
+                             files, chunksize=chunksize))
+
+
+def changed_files(base):
+    """``(repo_root, paths)`` changed vs git ref *base*, or None on failure.
+
+    *paths* are absolute and cover committed, staged and unstaged changes
+    (`git diff <base>`) plus untracked, non-ignored files (`git ls-files
+    --others`) — a brand-new rule file is a change too. Deletions are
+    dropped since there is nothing left to lint.
+    """
+    import subprocess  # only --changed shells out; keep it off the start-up path
+
+    try:
+        top = subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"],
+            capture_output=True, text=True, encoding="utf-8", timeout=30,
+        )
+        if top.returncode != 0:
+            return None
+        root = Path(top.stdout.strip())
+        diff = subprocess.run(
+            ["git", "diff", "--name-only", "--diff-filter=d", base, "--"],
+            capture_output=True, text=True, encoding="utf-8", timeout=60,
+            cwd=root,
+        )
+        untracked = subprocess.run(
+            ["git", "ls-files", "--others", "--exclude-standard"],
+            capture_output=True, text=True, encoding="utf-8", timeout=60,
+            cwd=root,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+    if diff.returncode != 0 or untracked.returncode != 0:
+        return None
+    lines = diff.stdout.splitlines() + untracked.stdout.splitlines()
+    return root.resolve(), {str((root / ln.strip()).resolve())
+                            for ln in lines if ln.strip()}
+
+
+def select_changed(files, base, policy_path=None):
+    """Narrow *files* to those changed vs *base* (order preserved).
+
+    Falls back to all *files* — never to fewer — when git cannot answer,
+    when the policy file itself changed (every verdict may differ), or when
+    a file lies outside the repository git answered for (the cwd is another
+    repo, so "unchanged" would mean "never looked at").
+    """
+    answer = changed_files(base)
+    if answer is None:
+        print(f"⚠️  git diff against '{base}' failed; linting all files.",
+              file=sys.stderr)
+        return list(files)
+    root, changed = answer
+    resolved = [Path(f).resolve() for f in files]
+    outside = [f for f, r in zip(files, resolved)
+               if r != root and root not in r.parents]
+    if outside:
+        print(f"⚠️  {outside[0]} is outside the git repository at {root}; "
+              "linting all files.", file=sys.stderr)
+        return list(files)
+    if policy_path and str(Path(policy_path).resolve()) in changed:
+        return list(files)
+    return [f for f, r in zip(files, resolved) if str(r) in changed]
+
+
 def main():
     """CLI entry point: Custom Rule deny-list linter。."""
     try_utf8_stdout()
@@ -445,21 +620,32 @@ def main():
         "--ci", action="store_true",
         help="CI mode: exit with non-zero code on any ERROR"
     )
+    parser.add_argument(
+        "--changed-only", metavar="REF", default=None,
+        help="Only lint files changed vs git REF (e.g. origin/main); "
+             "all files when the policy file changed or git fails"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0,
+        help="Worker processes for large file sets (default: CPU count; 1 = serial)"
+    )
     args = parser.parse_args()
 
     policy = load_policy(args.policy)
     files = collect_files(args.paths)
+    if args.changed_only:
+        files = select_changed(files, args.changed_only, args.policy)
 
     if not files:
-        print("No YAML files found.")
+        print("No changed YAML files." if args.changed_only else "No YAML files found.")
         sys.exit(EXIT_OK)
 
     all_results = []
     files_checked = 0
     rules_checked = 0
 
-    for filepath in files:
-        results, count = lint_file(filepath, policy)
+    workers = args.workers or os.cpu_count() or 1
+    for results, count in lint_files(files, policy, workers=workers):
         all_results.extend(results)
         files_checked += 1
         rules_checked += count
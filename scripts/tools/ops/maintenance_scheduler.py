@@ -40,6 +40,7 @@ from _lib_python import (  # noqa: E402
     http_request_with_retry,
 )
 from _lib_exitcodes import EXIT_OK, EXIT_VIOLATION, EXIT_CALLER_ERROR  # noqa: E402
+from _lib_metrics import CONTENT_TYPE, MetricsRegistry  # noqa: E402
 
 # Creator label for idempotency checks
 SILENCE_CREATOR = "da-tools/maintenance-scheduler"
@@ -383,26 +384,23 @@ def push_metrics(pushgateway_url, created, skipped, errors, duration_s):
       - maintenance_scheduler_errors                        (gauge per run)
       - maintenance_scheduler_run_duration_seconds          (gauge)
     """
-    now_ts = time.time()
-    lines = [
-        "# TYPE maintenance_scheduler_last_run_timestamp_seconds gauge",
-        f"maintenance_scheduler_last_run_timestamp_seconds {now_ts:.3f}",
-        "# TYPE maintenance_scheduler_silences_created gauge",
-        f"maintenance_scheduler_silences_created {created}",
-        "# TYPE maintenance_scheduler_silences_skipped gauge",
-        f"maintenance_scheduler_silences_skipped {skipped}",
-        "# TYPE maintenance_scheduler_errors gauge",
-        f"maintenance_scheduler_errors {errors}",
-        "# TYPE maintenance_scheduler_run_duration_seconds gauge",
-        f"maintenance_scheduler_run_duration_seconds {duration_s:.3f}",
-    ]
-    body = "\n".join(lines) + "\n"
+    registry = MetricsRegistry()
+    registry.gauge("maintenance_scheduler_last_run_timestamp_seconds",
+                   "Unix time of the last scheduler run.").set(round(time.time(), 3))
+    registry.gauge("maintenance_scheduler_silences_created",
+                   "Silences created by the last run.").set(created)
+    registry.gauge("maintenance_scheduler_silences_skipped",
+                   "Windows skipped by the last run (silence already present).").set(skipped)
+    registry.gauge("maintenance_scheduler_errors",
+                   "Silence creation errors in the last run.").set(errors)
+    registry.gauge("maintenance_scheduler_run_duration_seconds",
+                   "Wall time of the last run.").set(round(duration_s, 3))
 
     url = f"{pushgateway_url}/metrics/job/maintenance-scheduler"
     try:
         req = urllib.request.Request(url, method="POST")  # nosec B310  #operator-supplied internal Pushgateway URL
-        req.add_header("Content-Type", "text/plain")
-        data = body.encode("utf-8")
+        req.add_header("Content-Type", CONTENT_TYPE)
+        data = registry.render_bytes()
         with urllib.request.urlopen(req, data=data, timeout=5) as resp:  # nosec B310  #see Request line above
             resp.read()
         print(f"  Pushed metrics to {pushgateway_url}", file=sys.stderr)
@@ -17,12 +17,20 @@
   python3 migrate_rule.py <legacy_rules.yml> --triage           # Triage 模式: 只產出 CSV 分桶報告
   python3 migrate_rule.py <legacy_rules.yml> --no-prefix        # 停用 custom_ 前綴 (不建議)
   python3 migrate_rule.py <legacy_rules.yml> --no-ast           # 強制使用舊版 regex 引擎
+  python3 migrate_rule.py <legacy_rules.yml> --workers 8        # 大型規則庫: 8 個 process 並行
 
 v4 升級 (AST Engine — Phase 11):
   - promql-parser (Rust/PyO3) 取代 regex 進行 metric name 辨識
   - AST-Informed String Surgery: 精準 prefix 替換 + tenant label 注入
   - Reparse 驗證: 確保改寫後的 PromQL 仍然合法
   - Graceful degradation: promql-parser 不可用時自動降級為 regex
+
+大型規則庫 (數萬條規則):
+  - 每個「正規化後相同」的表達式只 parse 一次 (_ast_summary, 以 LRU 快取
+    metric / label matcher / 語義中斷 / 合法性摘要)；extract_*_ast、
+    detect_semantic_break_ast 與改寫後的 reparse 驗證都讀同一份摘要
+  - process_rules(workers=N): 依表達式分塊交給 process pool，結果保持輸入順序
+  - 輸出以 write_lines_secure 串流落盤，不先組出整份字串
 """
 
 import sys
@@ -31,6 +39,8 @@ import os
 import csv
 import io
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import yaml
@@ -45,7 +55,7 @@ sys.path.insert(0, os.path.join(str(_THIS_DIR), ".."))
 from _lib_compat import try_utf8_stdout  # noqa: E402
 sys.path.insert(0, str(_THIS_DIR))  # Docker flat layout
 sys.path.insert(0, str(_THIS_DIR.parent))  # Repo subdir layout
-from _lib_python import write_text_secure  # noqa: E402
+from _lib_python import write_lines_secure, write_text_secure  # noqa: E402
 from _lib_exitcodes import EXIT_CALLER_ERROR  # noqa: E402
 
 # ---------------------------------------------------------------------------
@@ -58,6 +68,11 @@ except ImportError:
     HAS_AST = False
 
 
+# libyaml loader when available — parsing a 30k-rule input file is otherwise
+# the single largest cost of a migration. Same documents as yaml.safe_load.
+_HAS_CSAFE_LOADER = hasattr(yaml, "CSafeLoader")
+
+
 # ============================================================
 # AST Engine: PromQL AST 走訪與改寫
 # ============================================================
@@ -95,57 +110,104 @@ def _walk_vector_selectors(node):
         yield from _walk_vector_selectors(param)
 
 
-def extract_metrics_ast(expr_str):
-    """使用 AST 精準提取 PromQL 中所有 metric 名稱。
+# Expression-level summary cache: one parse per distinct (normalized) expr.
+# Enterprise estates repeat the same expression across groups/files and every
+# rewrite is re-validated, so the walks below would otherwise re-parse it
+# several times per rule.
+_AST_CACHE_SIZE = 65536
 
-    回傳: list of unique metric names (保留出現順序)。
-    若 promql-parser 不可用或解析失敗，回傳空 list (呼叫端降級為 regex)。
-    """
-    if not HAS_AST:
-        return []
-    try:
-        ast = promql_parser.parse(expr_str)
-    except Exception:
-        return []
-    names = []
-    for vs in _walk_vector_selectors(ast):
-        name = vs.name
-        if name and name not in names:
-            names.append(name)
-    return names
+# Quoted strings are opaque (label values keep their whitespace); a `#`
+# comment runs to end of line, so an expr with one is only stripped.
+_EXPR_TOKEN_RE = re.compile(
+    r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|`[^`]*`|(#)|(\s+)')
 
+_SKIP_DIM_LABELS = frozenset({'job', 'instance', '__name__', 'namespace', 'pod', 'container'})
 
-def extract_label_matchers_ast(expr_str):
-    """使用 AST 提取每個 VectorSelector 的 label matchers。
 
-    回傳: list of {"metric": str, "labels": dict}
-    只保留「有意義」的維度標籤 (排除 job/instance/__name__/namespace/pod/container)。
+def normalize_expr(expr_str):
+    """Whitespace-normalized PromQL (the AST cache key).
+
+    Runs of whitespace outside string literals collapse to one space —
+    PromQL tokens never depend on it — so a multi-line `|` block and its
+    one-line copy share one parse.
+    """
+    out = []
+    pos = 0
+    for m in _EXPR_TOKEN_RE.finditer(expr_str):
+        if m.group(1):
+            return expr_str.strip()
+        if m.group(2):
+            out.append(expr_str[pos:m.start()])
+            out.append(' ')
+            pos = m.end()
+    out.append(expr_str[pos:])
+    return ''.join(out).strip()
+
+
+@functools.lru_cache(maxsize=_AST_CACHE_SIZE)
+def _summarize(norm_expr):
+    """Parse once → immutable summary, or None if promql-parser rejects it.
+
+    (metrics, label_matchers, semantic_break) — metrics in first-seen order;
+    label_matchers as ((metric, ((label, value), ...)), ...).
     """
-    if not HAS_AST:
-        return []
     try:
-        ast = promql_parser.parse(expr_str)
+        ast = promql_parser.parse(norm_expr)
     except Exception:
-        return []
-
-    skip_labels = frozenset({'job', 'instance', '__name__', 'namespace', 'pod', 'container'})
-    results = []
+        return None
+    metrics = []
+    matchers = []
     for vs in _walk_vector_selectors(ast):
-        name = vs.name or ''
+        name = vs.name
+        if name and name not in metrics:
+            metrics.append(name)
         matchers_obj = vs.matchers
         if matchers_obj is None:
             continue
-        inner = getattr(matchers_obj, 'matchers', [])
         labels = {}
-        for m in inner:
-            if m.name in skip_labels:
+        for m in getattr(matchers_obj, 'matchers', []):
+            if m.name in _SKIP_DIM_LABELS:
                 continue
             # Only exact-match labels for dimension hints
             if str(m.op) == 'MatchOp.Equal':
                 labels[m.name] = m.value
         if labels:
-            results.append({"metric": name, "labels": labels})
-    return results
+            matchers.append((name or '', tuple(labels.items())))
+    return tuple(metrics), tuple(matchers), _has_semantic_break(ast)
+
+
+def _ast_summary(expr_str):
+    """Cached AST summary of *expr_str* (None when AST is off or it fails to parse)."""
+    if not HAS_AST:
+        return None
+    return _summarize(normalize_expr(expr_str))
+
+
+def _ast_valid(expr_str):
+    """Reparse validation for rewrites — True when promql-parser accepts it."""
+    return _ast_summary(expr_str) is not None
+
+
+def extract_metrics_ast(expr_str):
+    """使用 AST 精準提取 PromQL 中所有 metric 名稱。
+
+    回傳: list of unique metric names (保留出現順序)。
+    若 promql-parser 不可用或解析失敗，回傳空 list (呼叫端降級為 regex)。
+    """
+    summary = _ast_summary(expr_str)
+    return list(summary[0]) if summary else []
+
+
+def extract_label_matchers_ast(expr_str):
+    """使用 AST 提取每個 VectorSelector 的 label matchers。
+
+    回傳: list of {"metric": str, "labels": dict}
+    只保留「有意義」的維度標籤 (排除 job/instance/__name__/namespace/pod/container)。
+    """
+    summary = _ast_summary(expr_str)
+    if not summary:
+        return []
+    return [{"metric": name, "labels": dict(labels)} for name, labels in summary[1]]
 
 
 def detect_semantic_break_ast(expr_str):
@@ -153,13 +215,12 @@ def detect_semantic_break_ast(expr_str):
 
     回傳: True 如果表達式包含語義中斷函式。
     """
-    if not HAS_AST:
-        return False
-    try:
-        ast = promql_parser.parse(expr_str)
-    except Exception:
-        return False
+    summary = _ast_summary(expr_str)
+    return bool(summary and summary[2])
 
+
+def _has_semantic_break(ast):
+    """Walk Call nodes of a parsed AST for SEMANTIC_BREAK_FUNCS."""
     def _walk_calls(node):
         tname = type(node).__name__
         if tname == 'Call':
@@ -199,18 +260,22 @@ def rewrite_expr_prefix(expr_str, rename_map):
     使用 word-boundary regex，確保不誤改 label name 或子字串。
     改寫後 reparse 驗證；驗證失敗回傳原始字串。
     """
+    return _rewrite_prefix(expr_str, tuple(rename_map.items()), HAS_AST)
+
+
+# Rewrites are pure in (expr, names, engine); estates repeat both, and the
+# per-metric patterns otherwise overflow `re`'s own compile cache.
+@functools.lru_cache(maxsize=_AST_CACHE_SIZE)
+def _rewrite_prefix(expr_str, renames, validate):
     result = expr_str
-    for old_name, new_name in rename_map.items():
+    for old_name, new_name in renames:
         if old_name == new_name:
             continue
         result = re.sub(r'\b' + re.escape(old_name) + r'\b', new_name, result)
 
     # Validate rewrite
-    if HAS_AST:
-        try:
-            promql_parser.parse(result)
-        except Exception:
-            return expr_str  # 驗證失敗，回退原始
+    if validate and not _ast_valid(result):
+        return expr_str  # 驗證失敗，回退原始
     return result
 
 
@@ -227,6 +292,11 @@ def rewrite_expr_tenant_label(expr_str, metric_names):
     帶 label 的 pattern，裸露出現不會被注入 tenant。Recording rule LHS 通常
     只有一種形式，此限制在實際遷移場景中影響極小。
     """
+    return _rewrite_tenant_label(expr_str, tuple(metric_names), HAS_AST)
+
+
+@functools.lru_cache(maxsize=_AST_CACHE_SIZE)
+def _rewrite_tenant_label(expr_str, metric_names, validate):
     result = expr_str
     for name in metric_names:
         # Pattern 1: metric{existing...} → metric{tenant=~".+",existing...}
@@ -244,11 +314,8 @@ def rewrite_expr_tenant_label(expr_str, metric_names):
             result = re.sub(pattern_bare, name + '{tenant=~".+"}', result)
 
     # Validate rewrite
-    if HAS_AST:
-        try:
-            promql_parser.parse(result)
-        except Exception:
-            return expr_str  # 驗證失敗，回退原始
+    if validate and not _ast_valid(result):
+        return expr_str  # 驗證失敗，回退原始
     return result
 
 
@@ -674,6 +741,51 @@ def process_rule(rule, interactive=False, prefix="custom_", dictionary=None,
     return result
 
 
+# Below this many rules a process pool costs more than it saves.
+_PARALLEL_MIN_RULES = 500
+
+
+def _process_chunk(chunk, prefix, dictionary, use_ast):
+    """Process-pool worker: [(index, rule), ...] → [(index, result), ...]."""
+    return [(i, process_rule(rule, prefix=prefix, dictionary=dictionary, use_ast=use_ast))
+            for i, rule in chunk]
+
+
+def _expr_key(rule):
+    expr = rule.get('expr', '') if isinstance(rule, dict) else ''
+    return normalize_expr(expr) if isinstance(expr, str) else ''
+
+
+def process_rules(rules, interactive=False, prefix="custom_", dictionary=None,
+                  use_ast=True, workers=1):
+    """批次處理規則，回傳 MigrationResult list (保持輸入順序，略過非 alert 規則)。
+
+    workers > 1 且規則數達 _PARALLEL_MIN_RULES 時分塊交給 process pool。
+    分塊前依正規化表達式排序，相同表達式落在同一個 worker → 每個 distinct
+    expr 只 parse 一次 (_ast_summary 快取是 per-process 的)。結果與逐條
+    process_rule 完全相同。--interactive 需要 stdin，一律循序。
+    """
+    rules = list(rules)
+    if interactive or workers <= 1 or len(rules) < _PARALLEL_MIN_RULES:
+        results = (process_rule(rule, interactive=interactive, prefix=prefix,
+                                dictionary=dictionary, use_ast=use_ast)
+                   for rule in rules)
+        return [r for r in results if r]
+
+    order = sorted(range(len(rules)), key=lambda i: _expr_key(rules[i]))
+    size = -(-len(order) // (workers * 4))
+    chunks = [[(i, rules[i]) for i in order[k:k + size]]
+              for k in range(0, len(order), size)]
+    slots = [None] * len(rules)
+    work = functools.partial(_process_chunk, prefix=prefix, dictionary=dictionary,
+                             use_ast=use_ast)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for done in pool.map(work, chunks):
+            for i, result in done:
+                slots[i] = result
+    return [r for r in slots if r]
+
+
 # ============================================================
 # Auto-Suppression: Warning ↔ Critical 配對
 # ============================================================
@@ -765,7 +877,24 @@ def write_triage_csv(results, output_dir, dictionary):
     # Do NOT "restore" the old comment's reasoning: the translation it
     # describes no longer exists.
     writer = csv.writer(buf, lineterminator='\n')
-    writer.writerow([
+
+    def rows():
+        # One row at a time through a reused buffer → the file is streamed,
+        # never held whole (30k+ rule estates).
+        yield "\ufeff"  # CSV with BOM for Excel compatibility
+        for row in _triage_rows(results):
+            writer.writerow(row)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+
+    write_lines_secure(csv_path, rows())
+    return csv_path
+
+
+def _triage_rows(results):
+    """triage-report.csv 的表頭與每條規則的資料列。"""
+    yield [
         "Alert Name",
         "Triage Action",
         "Status",
@@ -780,7 +909,7 @@ def write_triage_csv(results, output_dir, dictionary):
         "Dictionary Note",
         "Dimensions",
         "Original Expression",
-    ])
+    ]
     for r in results:
         golden_match = r.dict_match.get("maps_to", "") if r.dict_match else ""
         golden_rule = r.dict_match.get("golden_rule", "") if r.dict_match else ""
@@ -790,7 +919,7 @@ def write_triage_csv(results, output_dir, dictionary):
         thresholds = ", ".join(r.tenant_config.values()) if r.tenant_config else ""
         dims = "; ".join(str(d) for d in r.dim_hints) if r.dim_hints else ""
 
-        writer.writerow([
+        yield [
             r.alert_name,
             r.triage_action or "unknown",
             r.status,
@@ -805,10 +934,7 @@ def write_triage_csv(results, output_dir, dictionary):
             dict_note,
             dims,
             r.original_expr[:200],  # Truncate long exprs
-        ])
-    # CSV with BOM for Excel compatibility
-    write_text_secure(csv_path, "\ufeff" + buf.getvalue())
-    return csv_path
+        ]
 
 
 def write_prefix_mapping(results, output_dir, prefix):
@@ -871,8 +997,8 @@ def _dedup_recording_rules(results):
     return deduplicated_rules
 
 
-def render_tenant_config(results):
-    """組出 tenant-config.yaml 內容字串 (純函式，無 IO)。"""
+def iter_tenant_config(results):
+    """逐段產出 tenant-config.yaml 內容 (串流用；render_tenant_config 為其 join)。"""
     # --- tenant-config.yaml (含 boilerplate 範例) ---
     tenant_configs = {}
     for r in results:
@@ -883,37 +1009,40 @@ def render_tenant_config(results):
         for k, v in r.tenant_config.items():
             tenant_configs[k] = v
 
-    buf = io.StringIO()
-    buf.write("# ============================================================\n")
-    buf.write("# Tenant Config — 複製到 conf.d/<tenant>.yaml\n")
-    buf.write("# ============================================================\n")
-    buf.write("# 請將以下內容縮排並貼入您專屬的 tenant 設定中，例如：\n")
-    buf.write("# tenants:\n")
-    buf.write("#   my-tenant-name:\n")
+    yield "# ============================================================\n"
+    yield "# Tenant Config — 複製到 conf.d/<tenant>.yaml\n"
+    yield "# ============================================================\n"
+    yield "# 請將以下內容縮排並貼入您專屬的 tenant 設定中，例如：\n"
+    yield "# tenants:\n"
+    yield "#   my-tenant-name:\n"
     for k, v in tenant_configs.items():
-        buf.write(f'#     {k}: "{v}"\n')
-    buf.write("\n")
+        yield f'#     {k}: "{v}"\n'
+    yield "\n"
     for r in results:
         if r.status == "unparseable" or r.triage_action == "use_golden":
             continue
-        buf.write(f"# --- From: {r.alert_name} (severity: {r.severity}) ---\n")
+        yield f"# --- From: {r.alert_name} (severity: {r.severity}) ---\n"
         if r.notes:
             for note in r.notes:
-                buf.write(f"# 📖 {note}\n")
+                yield f"# 📖 {note}\n"
         for k, v in r.tenant_config.items():
-            buf.write(f'{k}: "{v}"\n')
+            yield f'{k}: "{v}"\n'
         if r.dim_hints:
-            buf.write("# 維度標籤替代語法:\n")
+            yield "# 維度標籤替代語法:\n"
             for hint in r.dim_hints:
                 label_pairs = ', '.join(f'{lk}="{lv}"' for lk, lv in hint["labels"].items())
                 dim_key = f'{list(r.tenant_config.keys())[0].split("_critical")[0]}{{{label_pairs}}}'
-                buf.write(f'# "{dim_key}": "{list(r.tenant_config.values())[0]}"\n')
-        buf.write("\n")
-    return buf.getvalue()
+                yield f'# "{dim_key}": "{list(r.tenant_config.values())[0]}"\n'
+        yield "\n"
 
 
-def render_recording_rules(results, prefix="custom_"):
-    """組出 platform-recording-rules.yaml 內容字串 (純函式，無 IO)。"""
+def render_tenant_config(results):
+    """組出 tenant-config.yaml 內容字串 (純函式，無 IO)。"""
+    return "".join(iter_tenant_config(results))
+
+
+def iter_recording_rules(results, prefix="custom_"):
+    """逐段產出 platform-recording-rules.yaml 內容 (串流用)。"""
     # --- platform-recording-rules.yaml (合法 YAML, 含 groups/rules 結構) ---
     # Deduplication: 追蹤已產出的 recording rule record 名稱
     deduplicated_rules = _dedup_recording_rules(results)
@@ -923,82 +1052,84 @@ def render_recording_rules(results, prefix="custom_"):
     total_output = len(deduplicated_rules)
 
     group_name = f"{prefix}migrated-recording-rules" if prefix else "migrated-recording-rules"
-    buf = io.StringIO()
-    buf.write("# ============================================================\n")
-    buf.write("# Platform Recording Rules — 可直接合併至 Prometheus ConfigMap\n")
-    buf.write("# ============================================================\n")
+    yield "# ============================================================\n"
+    yield "# Platform Recording Rules — 可直接合併至 Prometheus ConfigMap\n"
+    yield "# ============================================================\n"
     if total_input > 0:
         compression = round((1 - total_output / max(total_input * 2, 1)) * 100, 1)
-        buf.write(f"# 收斂率: {total_input} 條規則 → {total_output} 條 Recording Rules")
-        buf.write(f" (壓縮 {compression}%)\n")
-    buf.write("# ============================================================\n\n")
-    buf.write("groups:\n")
-    buf.write(f"  - name: {group_name}\n")
-    buf.write("    rules:\n")
+        yield f"# 收斂率: {total_input} 條規則 → {total_output} 條 Recording Rules"
+        yield f" (壓縮 {compression}%)\n"
+    yield "# ============================================================\n\n"
+    yield "groups:\n"
+    yield f"  - name: {group_name}\n"
+    yield "    rules:\n"
     for r, rr in deduplicated_rules:
         # 當聚合模式為 AI 猜測 (非使用者手動選擇) 時，插入醒目警告方塊
         if r.status == "complex" and r.agg_reason != "使用者手動選擇":
-            buf.write("      # ============================================================\n")
-            buf.write("      # 🚨🚨🚨 [AI 智能猜測注意] 🚨🚨🚨\n")
-            buf.write("      # ============================================================\n")
-            buf.write(f"      # 以下 recording rule 的聚合模式為 AI 自動猜測: {r.agg_mode}\n")
-            buf.write(f"      # 猜測原因: {r.agg_reason}\n")
-            buf.write(f"      # 原始 Alert: {r.alert_name}\n")
-            buf.write("      #\n")
-            buf.write("      # ⚠️  請在複製貼上前確認:\n")
-            buf.write(f"      #   - 聚合模式 {r.agg_mode} 是否正確? (sum=叢集總量, max=單點瓶頸)\n")
-            buf.write("      #   - 如不確定，請用 --interactive 模式重新執行\n")
-            buf.write("      # ============================================================\n")
+            yield "      # ============================================================\n"
+            yield "      # 🚨🚨🚨 [AI 智能猜測注意] 🚨🚨🚨\n"
+            yield "      # ============================================================\n"
+            yield f"      # 以下 recording rule 的聚合模式為 AI 自動猜測: {r.agg_mode}\n"
+            yield f"      # 猜測原因: {r.agg_reason}\n"
+            yield f"      # 原始 Alert: {r.alert_name}\n"
+            yield "      #\n"
+            yield "      # ⚠️  請在複製貼上前確認:\n"
+            yield f"      #   - 聚合模式 {r.agg_mode} 是否正確? (sum=叢集總量, max=單點瓶頸)\n"
+            yield "      #   - 如不確定，請用 --interactive 模式重新執行\n"
+            yield "      # ============================================================\n"
         else:
-            buf.write(f"      # {r.alert_name} | {r.agg_mode} — {r.agg_reason}\n")
-        buf.write(f"      - record: {rr['record']}\n")
-        buf.write(f"        expr: {rr['expr']}\n")
-        buf.write("\n")
-    return buf.getvalue()
+            yield f"      # {r.alert_name} | {r.agg_mode} — {r.agg_reason}\n"
+        yield f"      - record: {rr['record']}\n"
+        yield f"        expr: {rr['expr']}\n"
+        yield "\n"
 
 
-def render_alert_rules(results, prefix="custom_"):
-    """組出 platform-alert-rules.yaml 內容字串 (純函式，無 IO)。"""
+def render_recording_rules(results, prefix="custom_"):
+    """組出 platform-recording-rules.yaml 內容字串 (純函式，無 IO)。"""
+    return "".join(iter_recording_rules(results, prefix))
+
+
+def iter_alert_rules(results, prefix="custom_"):
+    """逐段產出 platform-alert-rules.yaml 內容 (串流用)。"""
     # --- platform-alert-rules.yaml (合法 YAML, 含 groups/rules 結構) ---
     alert_group_name = f"{prefix}migrated-alert-rules" if prefix else "migrated-alert-rules"
-    buf = io.StringIO()
-    buf.write("# ============================================================\n")
-    buf.write("# Platform Dynamic Alert Rules — 可直接合併至 Prometheus ConfigMap\n")
-    buf.write("# ============================================================\n")
-    buf.write("groups:\n")
-    buf.write(f"  - name: {alert_group_name}\n")
-    buf.write("    rules:\n")
+    yield "# ============================================================\n"
+    yield "# Platform Dynamic Alert Rules — 可直接合併至 Prometheus ConfigMap\n"
+    yield "# ============================================================\n"
+    yield "groups:\n"
+    yield f"  - name: {alert_group_name}\n"
+    yield "    rules:\n"
     for r in results:
         if r.status == "unparseable" or r.triage_action == "use_golden":
             continue
-        buf.write(f"      # --- {r.alert_name} ---\n")
+        yield f"      # --- {r.alert_name} ---\n"
         # Write alert rule with proper indentation
         for ar in r.alert_rules:
-            buf.write(f"      - alert: {ar['alert']}\n")
+            yield f"      - alert: {ar['alert']}\n"
             # Multiline expr — use YAML literal block
-            buf.write("        expr: |\n")
+            yield "        expr: |\n"
             for line in ar['expr'].strip().split('\n'):
-                buf.write(f"          {line}\n")
+                yield f"          {line}\n"
             if 'for' in ar:
-                buf.write(f"        for: {ar['for']}\n")
+                yield f"        for: {ar['for']}\n"
             if 'labels' in ar:
-                buf.write("        labels:\n")
+                yield "        labels:\n"
                 for lk, lv in ar['labels'].items():
-                    buf.write(f"          {lk}: {lv}\n")
+                    yield f"          {lk}: {lv}\n"
             if 'annotations' in ar:
-                buf.write("        annotations:\n")
+                yield "        annotations:\n"
                 for ak, av in ar['annotations'].items():
-                    buf.write(f"          {ak}: \"{av}\"\n")
-        buf.write("\n")
-    return buf.getvalue()
+                    yield f"          {ak}: \"{av}\"\n"
+        yield "\n"
 
 
-def render_report(results):
-    """組出 migration-report.txt 內容字串 (純函式，無 IO)。
+def render_alert_rules(results, prefix="custom_"):
+    """組出 platform-alert-rules.yaml 內容字串 (純函式，無 IO)。"""
+    return "".join(iter_alert_rules(results, prefix))
 
-    收斂率所需的 total_input / total_output 與 render_recording_rules 用同一個
-    _dedup_recording_rules 純函式計算，確保兩份輸出的數字一致。
-    """
+
+def iter_report(results):
+    """逐段產出 migration-report.txt 內容 (串流用)。"""
     # --- migration-report.txt ---
     perfect = [r for r in results if r.status == "perfect"]
     complex_rules = [r for r in results if r.status == "complex"]
@@ -1008,16 +1139,15 @@ def render_report(results):
     total_input = len([r for r in results if r.status != "unparseable"])
     total_output = len(_dedup_recording_rules(results))
 
-    buf = io.StringIO()
-    buf.write("=" * 60 + "\n")
+    yield "=" * 60 + "\n"
     engine = "AST" if HAS_AST else "regex"
-    buf.write(f"遷移報告 (Migration Report) — v4 ({engine} engine)\n")
-    buf.write("=" * 60 + "\n\n")
-    buf.write(f"總規則數: {len(results)}\n")
-    buf.write(f"  ✅ 完美解析: {len(perfect)}\n")
-    buf.write(f"  ⚠️  複雜表達式 (已自動猜測): {len(complex_rules)}\n")
-    buf.write(f"  🚨 無法解析 (需 LLM 協助): {len(unparseable)}\n")
-    buf.write(f"  📖 建議使用黃金標準: {len(golden_matches)}\n\n")
+    yield f"遷移報告 (Migration Report) — v4 ({engine} engine)\n"
+    yield "=" * 60 + "\n\n"
+    yield f"總規則數: {len(results)}\n"
+    yield f"  ✅ 完美解析: {len(perfect)}\n"
+    yield f"  ⚠️  複雜表達式 (已自動猜測): {len(complex_rules)}\n"
+    yield f"  🚨 無法解析 (需 LLM 協助): {len(unparseable)}\n"
+    yield f"  📖 建議使用黃金標準: {len(golden_matches)}\n\n"
 
     # 收斂率統計 — 排除 unparseable 的 golden matches 避免多扣
     golden_parseable = len([r for r in results
@@ -1025,85 +1155,94 @@ def render_report(results):
                             and r.status != "unparseable"])
     convertible = len(perfect) + len(complex_rules) - golden_parseable
     if convertible > 0:
-        buf.write("📊 收斂率統計:\n")
-        buf.write(f"  輸入: {len(results)} 條傳統規則\n")
-        buf.write(f"  輸出: {total_output} 條 Recording Rules "
+        yield "📊 收斂率統計:\n"
+        yield f"  輸入: {len(results)} 條傳統規則\n"
+        yield (f"  輸出: {total_output} 條 Recording Rules "
                   f"+ {convertible} 條 Alert Rules\n")
         if total_input > 0:
             compression = round((1 - total_output / max(total_input * 2, 1)) * 100, 1)
-            buf.write(f"  壓縮率: {compression}%\n")
-        buf.write("\n")
+            yield f"  壓縮率: {compression}%\n"
+        yield "\n"
 
     if golden_matches:
-        buf.write("-" * 40 + "\n")
-        buf.write("📖 建議使用黃金標準 — 請用 scaffold_tenant.py 設定閾值\n")
-        buf.write("-" * 40 + "\n")
+        yield "-" * 40 + "\n"
+        yield "📖 建議使用黃金標準 — 請用 scaffold_tenant.py 設定閾值\n"
+        yield "-" * 40 + "\n"
         for r in golden_matches:
             golden = r.dict_match
-            buf.write(f"  • {r.alert_name}\n")
-            buf.write(f"    → 黃金標準: {golden.get('golden_rule', '?')}\n")
-            buf.write(f"    → Metric Key: {golden.get('maps_to', '?')}\n")
-            buf.write(f"    → Rule Pack: {golden.get('rule_pack', '?')}\n")
-            buf.write(f"    → {golden.get('note', '')}\n")
-        buf.write("\n")
+            yield f"  • {r.alert_name}\n"
+            yield f"    → 黃金標準: {golden.get('golden_rule', '?')}\n"
+            yield f"    → Metric Key: {golden.get('maps_to', '?')}\n"
+            yield f"    → Rule Pack: {golden.get('rule_pack', '?')}\n"
+            yield f"    → {golden.get('note', '')}\n"
+        yield "\n"
 
     if perfect:
-        buf.write("-" * 40 + "\n")
-        buf.write("✅ 完美解析的規則\n")
-        buf.write("-" * 40 + "\n")
+        yield "-" * 40 + "\n"
+        yield "✅ 完美解析的規則\n"
+        yield "-" * 40 + "\n"
         for r in perfect:
             if r.triage_action == "use_golden":
                 continue
-            buf.write(f"  • {r.alert_name}: {r.agg_mode} ({r.agg_reason})\n")
-        buf.write("\n")
+            yield f"  • {r.alert_name}: {r.agg_mode} ({r.agg_reason})\n"
+        yield "\n"
 
     if complex_rules:
-        buf.write("-" * 40 + "\n")
-        buf.write("⚠️  複雜表達式 — 已自動猜測聚合模式，建議人工確認\n")
-        buf.write("-" * 40 + "\n")
+        yield "-" * 40 + "\n"
+        yield "⚠️  複雜表達式 — 已自動猜測聚合模式，建議人工確認\n"
+        yield "-" * 40 + "\n"
         for r in complex_rules:
             if r.triage_action == "use_golden":
                 continue
-            buf.write(f"  • {r.alert_name}: {r.agg_mode} ({r.agg_reason})\n")
+            yield f"  • {r.alert_name}: {r.agg_mode} ({r.agg_reason})\n"
             if r.dim_hints:
-                buf.write(f"    📐 維度標籤偵測: {r.dim_hints}\n")
-        buf.write("\n")
+                yield f"    📐 維度標籤偵測: {r.dim_hints}\n"
+        yield "\n"
 
     if unparseable:
-        buf.write("-" * 40 + "\n")
-        buf.write("🚨 無法自動解析 — 請將以下 LLM Prompt 交給 Claude 處理\n")
-        buf.write("-" * 40 + "\n")
+        yield "-" * 40 + "\n"
+        yield "🚨 無法自動解析 — 請將以下 LLM Prompt 交給 Claude 處理\n"
+        yield "-" * 40 + "\n"
         for r in unparseable:
             if r.triage_action == "use_golden":
                 continue
-            buf.write(f"\n### {r.alert_name} ###\n")
-            buf.write(r.llm_prompt)
-            buf.write("\n")
-    return buf.getvalue()
+            yield f"\n### {r.alert_name} ###\n"
+            yield r.llm_prompt
+            yield "\n"
+
+
+def render_report(results):
+    """組出 migration-report.txt 內容字串 (純函式，無 IO)。
+
+    收斂率所需的 total_input / total_output 與 render_recording_rules 用同一個
+    _dedup_recording_rules 純函式計算，確保兩份輸出的數字一致。
+    """
+    return "".join(iter_report(results))
 
 
 def write_outputs(results, output_dir, prefix="custom_", dictionary=None):
     """將遷移結果寫入分離的 YAML 檔案 (含合法 YAML 結構)。
 
-    序列化邏輯已抽成 render_* 純函式；本函式僅負責路徑組裝與落盤 (thin writer)。
+    序列化邏輯已抽成 iter_* / render_* 純函式；本函式僅負責路徑組裝與串流落盤
+    (thin writer)。
     """
     os.makedirs(output_dir, exist_ok=True)
 
     # --- tenant-config.yaml (含 boilerplate 範例) ---
     tenant_config_path = str(Path(output_dir) / "tenant-config.yaml")
-    write_text_secure(tenant_config_path, render_tenant_config(results))
+    write_lines_secure(tenant_config_path, iter_tenant_config(results))
 
     # --- platform-recording-rules.yaml (合法 YAML, 含 groups/rules 結構) ---
     recording_rules_path = str(Path(output_dir) / "platform-recording-rules.yaml")
-    write_text_secure(recording_rules_path, render_recording_rules(results, prefix))
+    write_lines_secure(recording_rules_path, iter_recording_rules(results, prefix))
 
     # --- platform-alert-rules.yaml (合法 YAML, 含 groups/rules 結構) ---
     alert_rules_path = str(Path(output_dir) / "platform-alert-rules.yaml")
-    write_text_secure(alert_rules_path, render_alert_rules(results, prefix))
+    write_lines_secure(alert_rules_path, iter_alert_rules(results, prefix))
 
     # --- migration-report.txt ---
     report_path = str(Path(output_dir) / "migration-report.txt")
-    write_text_secure(report_path, render_report(results))
+    write_lines_secure(report_path, iter_report(results))
 
     # --- v3: Triage CSV ---
     csv_path = write_triage_csv(results, output_dir, dictionary)
@@ -1216,6 +1355,9 @@ def main():
                         help="停用啟發式字典比對")
     parser.add_argument("--no-ast", action="store_true",
                         help="停用 AST 引擎，強制使用舊版 regex 解析 (除錯用)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="並行處理的 process 數 (預設 0 = CPU 核心數；"
+                             f"少於 {_PARALLEL_MIN_RULES} 條規則時一律循序)")
     args = parser.parse_args()
 
     # 確定 prefix
@@ -1232,7 +1374,8 @@ def main():
 
     try:
         with open(args.input_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+            data = (yaml.load(f, Loader=yaml.CSafeLoader) if _HAS_CSAFE_LOADER
+                    else yaml.safe_load(f))
     except (OSError, yaml.YAMLError) as e:
         print(f"Error reading YAML file: {e}", file=sys.stderr)
         sys.exit(EXIT_CALLER_ERROR)
@@ -1243,19 +1386,14 @@ def main():
         return
 
     # 處理所有規則
-    results = []
-    for group in groups:
-        rules = group.get('rules', [])
-        for rule in rules:
-            result = process_rule(
-                rule,
-                interactive=args.interactive,
-                prefix=prefix,
-                dictionary=dictionary,
-                use_ast=use_ast,
-            )
-            if result:
-                results.append(result)
+    results = process_rules(
+        (rule for group in groups for rule in group.get('rules', [])),
+        interactive=args.interactive,
+        prefix=prefix,
+        dictionary=dictionary,
+        use_ast=use_ast,
+        workers=args.workers or os.cpu_count() or 1,
+    )
 
     if not results:
         print("No alert rules found to process.")
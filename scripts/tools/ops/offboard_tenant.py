@@ -16,8 +16,12 @@
 Pre-check 項目:
   1. 確認 tenant config 檔案存在
   2. 掃描所有其他 tenant 是否有引用此 tenant
-  3. 列出此 tenant 的所有已設定指標
-  4. 檢查是否有 custom_ 前綴的規則引用此 tenant
+  3. 列出此 tenant 的依賴 (profile / routing profile / routing / custom alert
+     recipe / instance mapping / domain policy / 靜音與維護)
+  4. 列出此 tenant 的所有已設定指標
+
+步驟 2、3 查的是 _lib_dependency_index 的反向索引（以檔案內容 hash 增量更新、
+持久化於 cache 目錄），只有變動過的檔案會重新解析 YAML。
 """
 
 import sys
@@ -35,7 +39,18 @@ sys.path.insert(0, str(_THIS_DIR))
 sys.path.insert(0, os.path.join(str(_THIS_DIR), ".."))
 from _lib_compat import try_utf8_stdout  # noqa: E402
 from _lib_exitcodes import EXIT_VIOLATION  # noqa: E402
-from _lib_confd import warn_nested  # noqa: E402
+from _lib_dependency_index import load_index  # noqa: E402
+
+# Report wording per dependency kind (tenant_dependencies()).
+_DEPENDENCY_LABELS = {
+    "profile": "profile",
+    "routing_profile": "routing profile",
+    "routing": "routing receiver",
+    "recipes": "custom alert recipe",
+    "silences": "靜音 / 維護設定",
+    "instance_mapping": "instance mapping",
+    "domain_policy": "domain policy",
+}
 
 
 def find_config_file(tenant, config_dir):
@@ -49,40 +64,6 @@ def find_config_file(tenant, config_dir):
     return None
 
 
-def load_all_configs(config_dir):
-    """載入 conf.d 下所有設定檔案。"""
-    configs = {}
-    base = Path(config_dir)
-    # #1339: flat by design here — but a hierarchical conf.d must not
-    # look like an empty one. Name the files this scan cannot see.
-    warn_nested(base, tool="offboard_tenant")
-    yaml_paths = sorted(base.glob("*.yaml")) + sorted(base.glob("*.yml"))
-    for entry in yaml_paths:
-        filename = entry.name
-        if filename.startswith('.'):
-            continue
-        try:
-            with open(entry, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f) or {}
-            configs[filename] = {"path": str(entry), "data": data}
-        except (OSError, yaml.YAMLError) as e:
-            print(f"  ⚠️  無法讀取 {filename}: {e}")
-    return configs
-
-
-def check_cross_references(tenant, configs):
-    """檢查其他設定檔中是否有引用此 tenant。"""
-    references = []
-    for filename, info in configs.items():
-        if filename.startswith(f"{tenant}."):
-            continue  # 跳過自己
-        # 搜尋檔案內容中是否出現 tenant 名稱
-        content = yaml.dump(info["data"], default_flow_style=False)
-        if tenant in content:
-            references.append(filename)
-    return references
-
-
 def get_tenant_metrics(tenant, configs):
     """取得 tenant 的所有已設定指標。"""
     for filename, info in configs.items():
@@ -109,12 +90,16 @@ def run_precheck(tenant, config_dir):
         report.append(f"❌ 找不到設定檔案: {tenant}.yaml")
         issues.append("設定檔案不存在")
 
-    # 2. 載入所有 configs
-    configs = load_all_configs(config_dir)
-    report.append(f"\n📂 掃描目錄: {config_dir} ({len(configs)} 個檔案)\n")
+    # 2. 反向索引（只重新解析變動過的檔案）
+    index = load_index(config_dir, tool="offboard_tenant")
+    errors = index.errors()
+    for filename, err in errors.items():
+        print(f"  ⚠️  無法讀取 {filename}: {err}")
+    report.append(f"\n📂 掃描目錄: {config_dir} "
+                  f"({len(index.files) - len(errors)} 個檔案)\n")
 
     # 3. Cross-reference check
-    refs = check_cross_references(tenant, configs)
+    refs = [f for f in index.mentions(tenant) if not f.startswith(f"{tenant}.")]
     if refs:
         report.append(f"⚠️  發現跨檔案引用 (請手動確認):")
         for ref in refs:
@@ -123,8 +108,22 @@ def run_precheck(tenant, config_dir):
     else:
         report.append(f"✅ 無跨檔案引用")
 
-    # 4. 列出 tenant 的所有指標
-    metrics = get_tenant_metrics(tenant, configs)
+    deps = index.tenant_dependencies(tenant)
+    if deps:
+        report.append(f"\n🔗 此 tenant 的依賴 ({len(deps)} 項，下架前請一併處理):")
+        for filename, kind, detail in deps:
+            report.append(f"   • {_DEPENDENCY_LABELS.get(kind, kind)}: {detail} [{filename}]")
+
+    # 4. 列出 tenant 的所有指標（只讀自己的設定檔）
+    own = {}
+    if config_file:
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                own[os.path.basename(config_file)] = {
+                    "path": config_file, "data": yaml.safe_load(f) or {}}
+        except (OSError, yaml.YAMLError):
+            pass  # already reported by the index scan above
+    metrics = get_tenant_metrics(tenant, own)
     if metrics:
         report.append(f"\n📊 此 tenant 的已設定指標 ({len(metrics)} 個):")
         for key, val in metrics.items():
@@ -27,8 +27,10 @@ Usage:
 """
 import argparse
 import csv
+import functools
 import io
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 import glob
 import json
 import os
@@ -59,6 +61,7 @@ from _lib_python import (  # noqa: E402
     validate_and_clamp,
     write_onboard_hints,
     write_text_secure,
+    write_lines_secure,
     write_json_secure,
     RECEIVER_TYPES,
     METRIC_PREFIX_DB_MAP,
@@ -518,9 +521,68 @@ def extract_threshold_candidates(alert_rule, metric_dict=None):
     return result
 
 
-def analyze_rule_files(file_paths, tenant_label=DEFAULT_TENANT_LABEL, metric_dict=None):
+def _analyze_rule_file(fpath, metric_dict):
+    """Analyze ONE rule file (process-pool unit of analyze_rule_files).
+
+    Returns (candidates, recording_rules, errors, n_groups, n_rules).
+    """
+    candidates = []
+    recording_rules = []
+    total_groups = 0
+    total_rules = 0
+
+    data = load_yaml_file(fpath)
+    if data is None:
+        return [], [], [f"Failed to load: {fpath}"], 0, 0
+
+    groups = data.get("groups")
+    if not groups or not isinstance(groups, list):
+        # Try ConfigMap wrapper
+        if "data" in data and isinstance(data["data"], dict):
+            for key, val in data["data"].items():
+                if isinstance(val, str):
+                    try:
+                        inner = yaml.safe_load(val)
+                        if isinstance(inner, dict) and "groups" in inner:
+                            groups = inner["groups"]
+                    except yaml.YAMLError:
+                        pass
+        if not isinstance(groups, list):
+            return [], [], [f"No 'groups' found in: {fpath}"], 0, 0
+
+    for group in groups:
+        if not isinstance(group, dict):
+            continue
+        total_groups += 1
+        group_name = group.get("name", "unnamed")
+
+        for rule in group.get("rules", []):
+            total_rules += 1
+            rtype = classify_rule(rule)
+
+            if rtype == "recording":
+                recording_rules.append({
+                    "name": rule.get("record", ""),
+                    "expr": rule.get("expr", ""),
+                    "group": group_name,
+                    "file": Path(fpath).name,
+                })
+            elif rtype == "alert":
+                candidate = extract_threshold_candidates(rule, metric_dict)
+                candidate["group"] = group_name
+                candidate["file"] = Path(fpath).name
+                candidates.append(candidate)
+
+    return candidates, recording_rules, [], total_groups, total_rules
+
+
+def analyze_rule_files(file_paths, tenant_label=DEFAULT_TENANT_LABEL, metric_dict=None,
+                       workers=1):
     """Analyze Prometheus rule files and generate migration plan.
 
+    workers > 1 analyzes files across a process pool (whole enterprise rule
+    estates); results are merged in file order, identical to a serial run.
+
     Returns:
         (candidates, recording_rules, summary)
         candidates: list of threshold candidate dicts
@@ -536,50 +598,19 @@ def analyze_rule_files(file_paths, tenant_label=DEFAULT_TENANT_LABEL, metric_dic
     total_groups = 0
     total_rules = 0
 
-    for fpath in file_paths:
-        data = load_yaml_file(fpath)
-        if data is None:
-            errors.append(f"Failed to load: {fpath}")
-            continue
+    work = functools.partial(_analyze_rule_file, metric_dict=metric_dict)
+    if workers > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(file_paths))) as pool:
+            per_file = list(pool.map(work, file_paths))
+    else:
+        per_file = map(work, file_paths)
 
-        groups = data.get("groups")
-        if not groups or not isinstance(groups, list):
-            # Try ConfigMap wrapper
-            if "data" in data and isinstance(data["data"], dict):
-                for key, val in data["data"].items():
-                    if isinstance(val, str):
-                        try:
-                            inner = yaml.safe_load(val)
-                            if isinstance(inner, dict) and "groups" in inner:
-                                groups = inner["groups"]
-                        except yaml.YAMLError:
-                            pass
-            if not isinstance(groups, list):
-                errors.append(f"No 'groups' found in: {fpath}")
-                continue
-
-        for group in groups:
-            if not isinstance(group, dict):
-                continue
-            total_groups += 1
-            group_name = group.get("name", "unnamed")
-
-            for rule in group.get("rules", []):
-                total_rules += 1
-                rtype = classify_rule(rule)
-
-                if rtype == "recording":
-                    recording_rules.append({
-                        "name": rule.get("record", ""),
-                        "expr": rule.get("expr", ""),
-                        "group": group_name,
-                        "file": Path(fpath).name,
-                    })
-                elif rtype == "alert":
-                    candidate = extract_threshold_candidates(rule, metric_dict)
-                    candidate["group"] = group_name
-                    candidate["file"] = Path(fpath).name
-                    candidates.append(candidate)
+    for f_candidates, f_recording, f_errors, n_groups, n_rules in per_file:
+        candidates.extend(f_candidates)
+        recording_rules.extend(f_recording)
+        errors.extend(f_errors)
+        total_groups += n_groups
+        total_rules += n_rules
 
     summary = {
         "files_scanned": len(file_paths),
@@ -794,13 +825,21 @@ def write_migration_csv(candidates, output_path):
     ]
     buf = io.StringIO()
     writer = csv.DictWriter(buf, fieldnames=fieldnames, extrasaction="ignore")
-    writer.writeheader()
-    for c in candidates:
-        row = dict(c)
-        if row.get("dict_match"):
-            row["dict_match"] = row["dict_match"].get("maps_to", "")
-        writer.writerow(row)
-    write_text_secure(output_path, buf.getvalue())
+
+    def rows():
+        # Streamed one row at a time through a reused buffer (30k+ rule estates).
+        writer.writeheader()
+        for c in candidates:
+            row = dict(c)
+            if row.get("dict_match"):
+                row["dict_match"] = row["dict_match"].get("maps_to", "")
+            writer.writerow(row)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        yield buf.getvalue()  # header only, when there are no candidates
+
+    write_lines_secure(output_path, rows())
 
 
 # ============================================================
@@ -1219,6 +1258,9 @@ def main():
                         help="Preview analysis without writing files")
     parser.add_argument("--json", action="store_true",
                         help="JSON output for CI pipeline integration")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Phase 2: parallel processes over rule files "
+                             "(default 0 = CPU count)")
 
     args = parser.parse_args()
 
@@ -1268,7 +1310,8 @@ def main():
         else:
             metric_dict = load_metric_dictionary() if HAS_MIGRATE else {}
             candidates, recording_rules, summary = analyze_rule_files(
-                rule_files, args.tenant_label, metric_dict)
+                rule_files, args.tenant_label, metric_dict,
+                workers=args.workers or os.cpu_count() or 1)
             phase2_results = (candidates, recording_rules, summary)
 
             print(f"  Scanned {summary['files_scanned']} file(s), "
@@ -6,6 +6,7 @@ ConfigMap structures. Auto-detects format by checking for '_defaults.yaml' key.
 
 Usage: patch_config.py <tenant> <metric_key> <value>
        patch_config.py --diff <tenant> <metric_key> <value>
+       patch_config.py --batch <changeset.yaml> [--diff [--json]]
 
 Three-state logic (for keys `_defaults.yaml` gives a value to, under `defaults:`):
   - Custom value:  patch_config.py db-a mysql_connections 50
@@ -24,8 +25,30 @@ Dimensional metrics (Phase 2B):
   - patch_config.py db-a 'redis_queue_length{queue="tasks"}' 500
   - patch_config.py db-a 'redis_db_keys{db="db0"}' disable
   Note: Shell quoting is important — wrap the metric key in single quotes.
+
+Batch mode (many tenants / keys, one ConfigMap write):
+  - patch_config.py --batch changes.yaml          (apply)
+  - patch_config.py --batch changes.yaml --diff   (preview every edit)
+  The changeset is a ``tenants:``-rooted YAML mapping — the same shape
+  ``threshold_recommend --export-patch`` emits and conf.d uses::
+
+      tenants:
+        db-a:
+          mysql_connections: "50"
+          'redis_db_keys{db="db0"}': disable
+        db-b:
+          mysql_cpu: default
+
+  The ConfigMap is read once, every edit is applied in memory in file order
+  (each previewed against the state the earlier edits left), and a single
+  merge patch carrying ``metadata.resourceVersion`` is submitted — one
+  ConfigMap update, so the exporter sees one reload instead of one per edit.
+  If the ConfigMap changed in between, the API server rejects the patch with
+  a Conflict; the tool then re-reads it and re-applies the edits (up to
+  ``BATCH_CONFLICT_RETRIES`` attempts).
 """
 import argparse
+import copy
 import subprocess
 import yaml
 import sys
@@ -39,6 +62,8 @@ sys.path.insert(0, os.path.join(_THIS_DIR, ".."))  # Repo subdir layout
 from _lib_exitcodes import EXIT_CALLER_ERROR  # noqa: E402
 from _lib_python import format_json_report  # noqa: E402
 
+BATCH_CONFLICT_RETRIES = 5
+
 
 def run_cmd(cmd):
     """Execute a command safely using list arguments (no shell=True)."""
@@ -340,14 +365,143 @@ def apply_patch(cm_data, mode, tenant, metric_key, value):
     print("Success! Exporter will reload within its interval.")
 
 
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+def load_changeset(path):
+    """Read a ``tenants:``-rooted changeset → ``[(tenant, metric_key, value)]``.
+
+    File order is kept (it is the order edits are applied and previewed in).
+    A malformed changeset is a caller error: nothing is read from or written
+    to the cluster.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            doc = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as e:
+        print(f"ERROR: cannot read changeset {path}: {e}", file=sys.stderr)
+        sys.exit(EXIT_CALLER_ERROR)
+    tenants = doc.get("tenants") if isinstance(doc, dict) else None
+    if not isinstance(tenants, dict) or not tenants:
+        print(f"ERROR: changeset {path} must be a mapping with a non-empty "
+              "'tenants:' mapping (tenant → {metric_key: value}).", file=sys.stderr)
+        sys.exit(EXIT_CALLER_ERROR)
+    changes = []
+    for tenant, keys in tenants.items():
+        if not isinstance(keys, dict) or not keys:
+            print(f"ERROR: changeset {path}: tenant '{tenant}' must map to a "
+                  "non-empty {metric_key: value} mapping.", file=sys.stderr)
+            sys.exit(EXIT_CALLER_ERROR)
+        for metric_key, value in keys.items():
+            if value is None or isinstance(value, (dict, list)):
+                print(f"ERROR: changeset {path}: {tenant}.{metric_key} needs a "
+                      "scalar value (a number, 'default', or 'disable').",
+                      file=sys.stderr)
+                sys.exit(EXIT_CALLER_ERROR)
+            changes.append((str(tenant), str(metric_key), str(value)))
+    return changes
+
+
+def apply_changeset(cm_data, mode, changes):
+    """Apply every edit to an in-memory copy of *cm_data*.
+
+    Returns ``(diffs, patch_data)``: one ``diff_preview`` per edit, each taken
+    against the state the earlier edits left (so a batch reads exactly like
+    the same edits run one invocation at a time), and the merge-patch ``data``
+    holding only the keys whose final content differs from *cm_data*.
+    """
+    working = copy.deepcopy(cm_data)
+    data = working.setdefault("data", {})
+    diffs = []
+    touched = set()
+    patch_fn = patch_legacy if mode == "legacy" else patch_multifile
+    for tenant, metric_key, value in changes:
+        diffs.append(diff_preview(working, mode, tenant, metric_key, value))
+        part = patch_fn(working, tenant, metric_key, value)["data"]
+        data.update(part)
+        touched.update(part)
+    original = cm_data.get("data", {})
+    patch_data = {k: data[k] for k in sorted(touched) if original.get(k) != data[k]}
+    return diffs, patch_data
+
+
+def _submit_patch(patch):
+    """``kubectl patch`` the ConfigMap → (ok, stderr). A failure is returned,
+    not fatal, so the caller can tell a resourceVersion Conflict apart."""
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json',
+                                     encoding="utf-8", newline='\n') as temp:
+        json.dump(patch, temp)
+        temp_path = temp.name
+    try:
+        result = subprocess.run(
+            ["kubectl", "patch", "configmap", "threshold-config",
+             "-n", "monitoring", "--type", "merge", "--patch-file", temp_path],
+            capture_output=True, text=True, timeout=60)
+    finally:
+        os.remove(temp_path)
+    return result.returncode == 0, result.stderr
+
+
+def _is_conflict(stderr):
+    return "Conflict" in stderr or "the object has been modified" in stderr
+
+
+def apply_batch(changes):
+    """Read once, patch once; on a resourceVersion Conflict re-read and redo.
+
+    Returns the diffs of the attempt that was submitted (empty patch → no
+    write at all).
+    """
+    for attempt in range(1, BATCH_CONFLICT_RETRIES + 1):
+        cm_data = json.loads(run_cmd(["kubectl", "get", "configmap", "threshold-config",
+                                      "-n", "monitoring", "-o", "json"]))
+        mode = detect_mode(cm_data)
+        diffs, patch_data = apply_changeset(cm_data, mode, changes)
+        if not patch_data:
+            print(f"No changes: all {len(changes)} edit(s) already in effect ({mode}).")
+            return diffs
+        patch = {"data": patch_data}
+        rv = (cm_data.get("metadata") or {}).get("resourceVersion")
+        if rv:
+            # merge-patch precondition: the API server rejects the write with
+            # a Conflict if anyone updated the ConfigMap since our read.
+            patch["metadata"] = {"resourceVersion": rv}
+        for d in diffs:
+            if d["changed"]:
+                print(f"  ~ {d['tenant']} {d['metric_key']}: {d['before']['state']}"
+                      f" -> {d['after']['state']}")
+        print(f"Patching ConfigMap ({mode}): {len(changes)} edit(s) across "
+              f"{len(patch_data)} key(s) in one update...")
+        ok, stderr = _submit_patch(patch)
+        if ok:
+            print("Success! Exporter will reload once, within its interval.")
+            return diffs
+        if not _is_conflict(stderr):
+            print(f"Error executing: kubectl patch configmap threshold-config\n{stderr}",
+                  file=sys.stderr)
+            sys.exit(EXIT_CALLER_ERROR)
+        print(f"ConfigMap changed since it was read (attempt {attempt}/"
+              f"{BATCH_CONFLICT_RETRIES}); re-reading and re-applying...",
+              file=sys.stderr)
+    print(f"ERROR: ConfigMap kept changing under the batch; gave up after "
+          f"{BATCH_CONFLICT_RETRIES} attempts. Nothing was applied.", file=sys.stderr)
+    sys.exit(EXIT_CALLER_ERROR)
+
+
 def main():
     """CLI entry point: Patch threshold-config ConfigMap for a specific tenant."""
     parser = argparse.ArgumentParser(
         description="Patch threshold-config ConfigMap for a specific tenant",
     )
-    parser.add_argument("tenant", help="Tenant name (e.g., db-a)")
-    parser.add_argument("metric_key", help="Metric key to patch")
-    parser.add_argument("value", help="New value, 'default', or 'disable'")
+    parser.add_argument("tenant", nargs="?", help="Tenant name (e.g., db-a)")
+    parser.add_argument("metric_key", nargs="?", help="Metric key to patch")
+    parser.add_argument("value", nargs="?", help="New value, 'default', or 'disable'")
+    parser.add_argument(
+        "--batch", metavar="CHANGESET",
+        help="Apply a tenants:-rooted YAML changeset (many tenants/keys) with one "
+             "ConfigMap read and one patch; replaces the positional arguments",
+    )
     parser.add_argument(
         "--diff", action="store_true",
         help="Preview change without applying (like terraform plan)",
@@ -368,6 +522,34 @@ def main():
               "to apply while --json was requested.", file=sys.stderr)
         sys.exit(EXIT_CALLER_ERROR)
 
+    positional = [args.tenant, args.metric_key, args.value]
+    if args.batch:
+        if any(a is not None for a in positional):
+            parser.error("--batch replaces <tenant> <metric_key> <value>; pass one or the other")
+        changes = load_changeset(args.batch)
+        if args.diff:
+            cm_data = json.loads(run_cmd(["kubectl", "get", "configmap", "threshold-config",
+                                          "-n", "monitoring", "-o", "json"]))
+            mode = detect_mode(cm_data)
+            diffs, patch_data = apply_changeset(cm_data, mode, changes)
+            if args.json:
+                print(format_json_report({
+                    "configmap_mode": mode,
+                    "edits": len(diffs),
+                    "changed": sum(1 for d in diffs if d["changed"]),
+                    "patched_keys": sorted(patch_data),
+                    "diffs": diffs,
+                }))
+            else:
+                for diff in diffs:
+                    print_diff(diff)
+        else:
+            apply_batch(changes)
+        return
+    if any(a is None for a in positional):
+        parser.error("the following arguments are required: tenant, metric_key, value "
+                     "(or --batch CHANGESET)")
+
     # 1. Get existing ConfigMap
     cm_json = run_cmd(["kubectl", "get", "configmap", "threshold-config",
                        "-n", "monitoring", "-o", "json"])
@@ -90,6 +90,7 @@ sys.path.insert(0, os.path.join(_THIS_DIR, ".."))
 from _lib_compat import try_utf8_stdout  # noqa: E402
 from _lib_exitcodes import EXIT_OK, EXIT_VIOLATION, EXIT_CALLER_ERROR  # noqa: E402
 from _lib_python import format_json_report  # noqa: E402
+from _lib_rulepack_index import compile_pack  # noqa: E402
 
 try:
     import yaml
@@ -107,8 +108,7 @@ except ImportError:
 def load_rule_pack(path: Path) -> dict | None:
     """Parse a rule pack YAML file. Returns the top-level dict, or None on error."""
     try:
-        with path.open(encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+        data = compile_pack(path).doc
     except OSError as exc:
         print(f"ERROR: cannot read {path}: {exc}", file=sys.stderr)
         return None
@@ -98,6 +98,7 @@ sys.path.insert(0, str(_THIS_DIR))
 sys.path.insert(0, os.path.join(str(_THIS_DIR), ".."))
 from _lib_compat import try_utf8_stdout  # noqa: E402
 from _lib_python import detect_cli_lang, format_json_report, http_get_json  # noqa: E402
+from _lib_rulepack_index import compile_pack  # noqa: E402
 from _lib_exitcodes import (  # noqa: E402
     EXIT_OK,
     EXIT_VIOLATION,
@@ -206,9 +207,10 @@ def parse_declared_rules(
     declared: dict[tuple[str, str], dict[str, str]] = {}
     for path in rule_pack_paths:
         try:
-            doc = yaml.safe_load(path.read_text(encoding="utf-8"))
+            pack = compile_pack(path)
         except (yaml.YAMLError, OSError) as exc:
             raise ValueError(f"{path}: {exc}") from exc
+        doc = pack.doc
         if not isinstance(doc, dict):
             continue
         # Fail loud on a structurally-wrong top-level `groups:` (e.g.
@@ -221,20 +223,12 @@ def parse_declared_rules(
             raise ValueError(
                 f"{path}: top-level 'groups:' must be a list, "
                 f"got {type(groups).__name__}")
-        for group in groups or []:
-            if not isinstance(group, dict):
-                continue
-            gname = group.get("name", "")
-            for rule in group.get("rules") or []:
-                if not isinstance(rule, dict):
-                    continue
-                if "alert" in rule:
-                    name, rtype = rule["alert"], "alerting"
-                elif "record" in rule:
-                    name, rtype = rule["record"], "recording"
-                else:
-                    continue
-                declared[(gname, name)] = {"type": rtype}
+        # Rules come from the compiled index (one parse per pack content,
+        # cached across runs — see _lib_rulepack_index).
+        for rule in pack.rules:
+            gname = "" if rule.group is None else rule.group
+            rtype = "alerting" if rule.kind == "alert" else "recording"
+            declared[(gname, rule.name)] = {"type": rtype}
     return declared
 
 
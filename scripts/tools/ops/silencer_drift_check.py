@@ -92,6 +92,7 @@ sys.path.insert(0, os.path.join(_THIS_DIR, ".."))
 from _lib_compat import try_utf8_stdout  # noqa: E402
 from _lib_exitcodes import EXIT_OK, EXIT_VIOLATION, EXIT_CALLER_ERROR  # noqa: E402
 from _lib_python import format_json_report  # noqa: E402
+from _lib_rulepack_index import compile_pack  # noqa: E402
 
 try:
     import yaml
@@ -192,8 +193,7 @@ def load_alerts(rule_source: Path) -> tuple[list[dict], list[str]]:
     alerts: list[dict] = []
     for f in files:
         try:
-            with f.open(encoding="utf-8") as h:
-                data = yaml.safe_load(h)
+            data = compile_pack(f).doc
         except OSError as exc:
             errors.append(f"cannot read {f}: {exc}")
             continue
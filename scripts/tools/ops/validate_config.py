@@ -49,7 +49,6 @@ import argparse
 import json
 import os
 import sys
-import traceback
 from pathlib import Path
 
 # Add script dir to path for lib imports
@@ -1112,6 +1111,7 @@ def _run_check(name: str, fn, *args, _config_dir: str | None = None,
         row["reads_config_dir"] = _reads_config_dir(_config_dir, args, kwargs)
         return row
     except Exception as exc:  # noqa: BLE001 — see the contract above
+        import traceback  # crash path only; keep it off the start-up path
         traceback.print_exc()
         detail = " ".join(str(exc).split()) or exc.__class__.__name__
         row = _make_result(
@@ -23,6 +23,10 @@
     --prometheus http://prometheus.monitoring.svc.cluster.local:9090 \\
     --watch --interval 60 --rounds 1440
 
+  # 大量比對組 (數千組): 16 個並行查詢
+  python3 validate_migration.py \\
+    --mapping migration_output/prefix-mapping.yaml --workers 16
+
   # 本地開發 (透過 port-forward)
   kubectl port-forward svc/prometheus 9090:9090 -n monitoring &
   python3 validate_migration.py \\
@@ -48,6 +52,9 @@ import io
 import json
 import time
 import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -69,6 +76,9 @@ from _lib_exitcodes import EXIT_OK, EXIT_VIOLATION, EXIT_CALLER_ERROR  # noqa: E
 # Alias for backward-compat within this module
 query_prometheus = query_prometheus_instant
 
+# Concurrent pair comparisons per round (I/O-bound: threads, not processes).
+DEFAULT_WORKERS = 8
+
 
 def extract_value_map(results, group_by="tenant"):
     """將 Prometheus 結果轉換為 {label_key: float_value} 字典。"""
@@ -90,9 +100,7 @@ def compare_vectors(old_map, new_map, tolerance=0.001):
     tolerance: 允許的數值誤差 (預設 0.1%)
     """
     diffs = []
-    all_keys = sorted(set(list(old_map.keys()) + list(new_map.keys())))
-
-    for key in all_keys:
+    for key in sorted(old_map.keys() | new_map.keys()):
         old_val = old_map.get(key)
         new_val = new_map.get(key)
 
@@ -117,14 +125,20 @@ def compare_vectors(old_map, new_map, tolerance=0.001):
     return diffs
 
 
-def run_single_comparison(prom_url, old_query, new_query, label):
-    """執行單次比對，回傳 diff 結果。"""
-    old_results, old_err = query_prometheus(prom_url, old_query)
+def run_single_comparison(prom_url, old_query, new_query, label,
+                          tolerance=0.001, fetch=None):
+    """執行單次比對，回傳 diff 結果。
+
+    fetch: 查詢函式 (簽名同 query_prometheus)；compare_pairs 傳入本輪共用的
+    _RoundQueryCache，讓多組共用的查詢只打一次 Prometheus。
+    """
+    fetch = fetch or query_prometheus
+    old_results, old_err = fetch(prom_url, old_query)
     if old_err:
         print(f"  ❌ 查詢舊規則失敗: {old_err}", file=sys.stderr)
         return None
 
-    new_results, new_err = query_prometheus(prom_url, new_query)
+    new_results, new_err = fetch(prom_url, new_query)
     if new_err:
         print(f"  ❌ 查詢新規則失敗: {new_err}", file=sys.stderr)
         return None
@@ -132,7 +146,7 @@ def run_single_comparison(prom_url, old_query, new_query, label):
     old_map = extract_value_map(old_results, group_by="tenant")
     new_map = extract_value_map(new_results, group_by="tenant")
 
-    diffs = compare_vectors(old_map, new_map)
+    diffs = compare_vectors(old_map, new_map, tolerance)
     return {
         "label": label,
         "old_query": old_query,
@@ -143,6 +157,59 @@ def run_single_comparison(prom_url, old_query, new_query, label):
     }
 
 
+class _RoundQueryCache:
+    """One round's query results, memoized by query string (thread-safe).
+
+    Mapping files routinely repeat a side across pairs (warning / critical
+    keys of one metric share the old query). The first thread to ask for a
+    query fetches it; concurrent askers wait on that fetch instead of
+    issuing their own. Scoped to a round — the next round re-queries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # query → [threading.Event, (results, err)]
+
+    def __call__(self, prom_url, query):
+        with self._lock:
+            entry = self._entries.get(query)
+            owner = entry is None
+            if owner:
+                entry = self._entries[query] = [threading.Event(), (None, None)]
+        if owner:
+            try:
+                entry[1] = query_prometheus(prom_url, query)
+            except Exception as exc:  # noqa: BLE001 — waiters must not hang
+                entry[1] = (None, str(exc))
+            finally:
+                entry[0].set()
+        else:
+            entry[0].wait()
+        return entry[1]
+
+
+def compare_pairs(prom_url, pairs, tolerance=0.001, workers=DEFAULT_WORKERS):
+    """並行比對一輪所有比對組，回傳與 pairs 同序的結果 list (失敗組為 None)。
+
+    以 thread pool 同時跑 workers 組 (每組兩側查詢)，同一輪內相同查詢字串
+    只查一次。數千組比對時，一輪的耗時由「組數 × 兩次 RTT」降為約
+    「組數 × 兩次 RTT / workers」。
+    """
+    fetch = _RoundQueryCache()
+
+    def one(pair):
+        print(f"  🔍 比對: {pair['label']}...")
+        return run_single_comparison(
+            prom_url, pair["old_query"], pair["new_query"], pair["label"],
+            tolerance=tolerance, fetch=fetch,
+        )
+
+    if workers <= 1 or len(pairs) <= 1:
+        return [one(pair) for pair in pairs]
+    with ThreadPoolExecutor(max_workers=min(workers, len(pairs))) as executor:
+        return list(executor.map(one, pairs))
+
+
 def load_mapping_pairs(mapping_path):
     """從 prefix-mapping.yaml 載入比對組。"""
     with open(mapping_path, 'r', encoding='utf-8') as f:
@@ -284,25 +351,55 @@ def write_csv_report(all_results, output_dir):
     return csv_path
 
 
+# Worst status wins when a tenant's diffs across pairs are folded into one.
+_STATUS_RANK = {"match": 0, "mixed": 1, "mismatch": 2}
+
+
 class ConvergenceTracker:
     """Track metric pair convergence across watch rounds.
 
     Records per-pair status ("match" / "mixed" / "error") each round.
     Reports cutover readiness when all pairs are stable for N consecutive rounds.
+
+    Only the last stability_window statuses can affect readiness, so each
+    pair's history is a ring buffer of that size — memory stays
+    O(pairs × window) however long a watch runs.
+
+    Tenants are tracked the same way: a tenant's round status is "match" only
+    when every diff carrying its label matched, so ``converged_tenants`` lists
+    the tenants a ``cutover --wave`` can move even while other tenants are
+    still settling.
+
+    A round never leaves stale "match" history behind: a tracked pair whose
+    query failed (``None`` result) records "error", and a tracked tenant with
+    no diff this round — or any tenant in a round where some pair failed,
+    since the failed pair's tenants are unknown — records "mixed".
     """
 
     def __init__(self, stability_window=5):
         self.stability_window = stability_window
-        self.pair_history = {}  # {label: [status, status, ...]}
+        self.pair_history = {}  # {label: deque([status, ...], maxlen=stability_window)}
+        self.tenant_history = {}  # {tenant: deque([status, ...], maxlen=stability_window)}
         self.round_count = 0
 
+    def _append(self, histories, key, status):
+        history = histories.get(key)
+        if history is None:
+            history = histories[key] = deque(maxlen=max(self.stability_window, 1))
+        history.append(status)
+
     def record_round(self, all_results):
         """Record results from one polling round."""
         self.round_count += 1
+        tenant_round = {}
+        seen_pairs = set()
+        failed = False
         for result in all_results:
             if result is None:
+                failed = True
                 continue
             label = result["label"]
+            seen_pairs.add(label)
             statuses = [d["status"] for d in result["diffs"]]
             if all(s == "match" for s in statuses):
                 agg = "match"
@@ -310,15 +407,34 @@ class ConvergenceTracker:
                 agg = "mismatch"
             else:
                 agg = "mixed"  # missing or empty
-            self.pair_history.setdefault(label, []).append(agg)
+            self._append(self.pair_history, label, agg)
+            for d in result["diffs"]:
+                tenant = d.get("tenant")
+                if tenant is None or tenant == "__no_label__":
+                    continue
+                status = d["status"] if d["status"] in _STATUS_RANK else "mixed"
+                if _STATUS_RANK[status] >= _STATUS_RANK[tenant_round.get(tenant, "match")]:
+                    tenant_round[tenant] = status
+        for label in set(self.pair_history) - seen_pairs:
+            self._append(self.pair_history, label, "error")
+        for tenant in set(self.tenant_history) | set(tenant_round):
+            status = tenant_round.get(tenant, "mixed")
+            if failed and status == "match":
+                status = "mixed"
+            self._append(self.tenant_history, tenant, status)
 
     def is_converged(self, label):
         """Check if a single pair has been stable for stability_window rounds."""
-        history = self.pair_history.get(label, [])
+        return self._stable(self.pair_history.get(label, ()))
+
+    def is_tenant_converged(self, tenant):
+        """Check if every pair for *tenant* has matched for stability_window rounds."""
+        return self._stable(self.tenant_history.get(tenant, ()))
+
+    def _stable(self, history):
         if len(history) < self.stability_window:
             return False
-        recent = history[-self.stability_window:]
-        return all(s == "match" for s in recent)
+        return all(s == "match" for s in history)
 
     def compute_report(self):
         """Return cutover readiness assessment."""
@@ -343,6 +459,8 @@ class ConvergenceTracker:
 
         pct = 100.0 * len(converged) / total
         ready = len(unconverged) == 0
+        tenants = sorted(self.tenant_history)
+        converged_tenants = [t for t in tenants if self.is_tenant_converged(t)]
 
         return {
             "ready": ready,
@@ -352,6 +470,8 @@ class ConvergenceTracker:
             "total_pairs": total,
             "converged_pairs": converged,
             "unconverged_pairs": unconverged,
+            "converged_tenants": converged_tenants,
+            "unconverged_tenants": sorted(set(tenants) - set(converged_tenants)),
             "round_count": self.round_count,
             "stability_window": self.stability_window,
             "recommendation": "Safe to cutover" if ready
@@ -409,6 +529,8 @@ def main():
                         help="Consecutive match rounds required for convergence (default: 5)")
     parser.add_argument("--convergence-output",
                         help="Write cutover readiness report JSON to file")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"並行比對的組數 (預設: {DEFAULT_WORKERS})")
 
     args = parser.parse_args()
 
@@ -436,17 +558,8 @@ def main():
         return EXIT_CALLER_ERROR
 
     def run_once():
-        all_results = []
-        for pair in pairs:
-            print(f"  🔍 比對: {pair['label']}...")
-            result = run_single_comparison(
-                args.prometheus,
-                pair["old_query"],
-                pair["new_query"],
-                pair["label"],
-            )
-            all_results.append(result)
-        return all_results
+        return compare_pairs(args.prometheus, pairs,
+                             tolerance=args.tolerance, workers=args.workers)
 
     if args.watch:
         tracker = None
@@ -159,6 +159,36 @@ def _force_utf8_subprocess_io():
             os.environ["PYTHONIOENCODING"] = old
 
 
+# ── Isolated on-disk caches ──────────────────────────────────────────
+#
+# The rule-pack index, custom-alerts compiler and dependency index persist
+# under $XDG_CACHE_HOME/da-tools/ (or their DA_*_CACHE override). Point
+# them at a per-run temp dir so the suite never writes to — or reads a
+# stale entry from — the developer's real ~/.cache. Set in os.environ
+# (not monkeypatch) so subprocess'd tools inherit it too; tests that need
+# their own dir still monkeypatch the DA_*_CACHE variable.
+_CACHE_ENVS = ("DA_RULEPACK_INDEX_CACHE", "DA_CUSTOM_ALERTS_CACHE",
+               "DA_DEPENDENCY_INDEX_CACHE")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _isolated_tool_caches(tmp_path_factory):
+    """Redirect every da-tools disk cache into a session temp dir."""
+    names = ("XDG_CACHE_HOME",) + _CACHE_ENVS
+    old = {name: os.environ.get(name) for name in names}
+    os.environ["XDG_CACHE_HOME"] = str(tmp_path_factory.mktemp("xdg-cache"))
+    for name in _CACHE_ENVS:
+        os.environ.pop(name, None)
+    try:
+        yield
+    finally:
+        for name, value in old.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
 # ── Session-scoped constant fixtures ──────────────────────────────────
 
 @pytest.fixture(scope="session")
@@ -0,0 +1,108 @@
+"""Tests for bench_python_tools.py — the Python tooling fleet-scale bench suite.
+
+What is pinned here is the CONTRACT with the nightly pipeline, not the
+numbers (timings are host noise in a unit test):
+
+  1. Output rows parse with analyze_bench_history's own regexes — the suite
+     exists so the trend watchdog can read it; a format drift would silently
+     drop every Python row from the watchdog.
+  2. Fixtures are deterministic per seed and reused only when complete —
+     a nightly trend over non-identical inputs measures the generator.
+  3. Every case runs end-to-end on a tiny fixture, so a refactor of any tool
+     under test that breaks the bench shows up at PR time, not at 03:00 UTC.
+"""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+import analyze_bench_history as ab
+import bench_python_tools as bpt
+
+
+def _tree_digest(root: Path) -> str:
+    h = hashlib.sha256()
+    for p in sorted(root.rglob("*.yaml")):
+        h.update(str(p.relative_to(root)).encode())
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+# --- rendering ---------------------------------------------------------------
+
+def test_rows_parse_with_analyze_bench_history(tmp_path: Path):
+    sample = {"cold_ns": 812345678, "warm_ns": 401234567.4,
+              "warm_iters": 3, "peak_rss_kb": 154321}
+    text = "\n".join(bpt.header_lines()
+                     + bpt.bench_lines("DescribeTenantAll", 1000, sample, 4)) + "\n"
+    p = tmp_path / "bench.txt"
+    p.write_text(text, encoding="utf-8")
+
+    rows = list(ab.parse_bench_file(p, run_id=1))
+    assert [(r.bench, r.ns_per_op) for r in rows] == [
+        ("BenchmarkPyDescribeTenantAll_1000_Cold", 812345678.0),
+        ("BenchmarkPyDescribeTenantAll_1000_Warm", 401234567.0),
+    ]
+    # The watchdog stratifies by host class; a header it cannot read would put
+    # every Python row in the unstratified fallback.
+    assert ab.parse_cpu_model(p)
+
+
+def test_cold_only_sample_emits_no_warm_row():
+    sample = {"cold_ns": 10, "warm_ns": 0.0, "warm_iters": 0, "peak_rss_kb": 1}
+    rows = bpt.bench_lines("PolicyEngine", 100, sample, 1)
+    assert len(rows) == 1 and "_Cold-1" in rows[0]
+
+
+def test_measure_counts_one_cold_and_n_warm_calls():
+    calls = []
+    out = bpt.measure(lambda: calls.append(1), warm_iters=4)
+    assert len(calls) == 5
+    assert out["warm_iters"] == 4
+    assert out["cold_ns"] >= 0 and out["peak_rss_kb"] >= 0
+
+
+# --- fixtures ----------------------------------------------------------------
+
+def test_fixtures_are_deterministic_per_seed(tmp_path: Path):
+    a = bpt.ensure_fixtures(tmp_path / "a", 24, seed=7)
+    b = bpt.ensure_fixtures(tmp_path / "b", 24, seed=7)
+    for layout in ("synthetic-v2", "flat"):
+        assert _tree_digest(a[layout]) == _tree_digest(b[layout])
+
+
+def test_incomplete_fixture_is_regenerated(tmp_path: Path):
+    fx = bpt.ensure_fixtures(tmp_path, 12, seed=1)
+    digest = _tree_digest(fx["flat"])
+    # Simulate a run killed mid-write: marker gone, one tenant file lost.
+    (fx["flat"].parent / ".complete").unlink()
+    next(fx["flat"].glob("*-0000.yaml")).unlink()
+    fx = bpt.ensure_fixtures(tmp_path, 12, seed=1)
+    assert _tree_digest(fx["flat"]) == digest
+
+
+# --- end-to-end ----------------------------------------------------------------
+
+@pytest.mark.parametrize("case", list(bpt.CASES))
+def test_every_case_runs_in_a_child(tmp_path: Path, case: str):
+    fx = bpt.ensure_fixtures(tmp_path, 12, seed=3)
+    sample = bpt.run_sample(case, fx, warm_iters=1)
+    assert sample["warm_iters"] == 1
+    assert sample["cold_ns"] > 0
+
+
+def test_main_writes_go_bench_text(tmp_path: Path):
+    out = tmp_path / "bench-python.txt"
+    rc = bpt.main(["--sizes", "8", "--cases", "policy_engine", "--warm-iters", "1",
+                   "--fixture-dir", str(tmp_path / "fx"), "-o", str(out)])
+    assert rc == 0
+    names = [r.bench for r in ab.parse_bench_file(out, run_id=1)]
+    assert names == ["BenchmarkPyPolicyEngine_8_Cold", "BenchmarkPyPolicyEngine_8_Warm"]
+
+
+def test_unknown_case_is_a_caller_error(capsys):
+    with pytest.raises(SystemExit) as exc:
+        bpt.main(["--cases", "nope"])
+    assert exc.value.code == 2
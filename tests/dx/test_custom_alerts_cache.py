@@ -0,0 +1,150 @@
+"""Tests for the incremental custom-alerts compile cache (custom_alerts/cache.py).
+
+Pinned contracts
+----------------
+1. **Byte-identical** — a warm (cached) compile renders exactly the pack an
+   uncached compile renders, and the fragment renderer matches one whole-pack
+   yaml.dump.
+2. **Incremental** — after editing one conf.d file, a recompile YAML-parses only
+   that file and re-emits only the shapes whose content changed.
+3. **Never lossy** — a value that does not survive a JSON round trip is neither
+   keyed nor cached; `DA_CUSTOM_ALERTS_CACHE=off` writes nothing to disk.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+_DX = os.path.join(os.path.dirname(__file__), "..", "..", "scripts", "tools", "dx")
+_LINT = os.path.join(os.path.dirname(__file__), "..", "..", "scripts", "tools", "lint")
+_TOOLS = os.path.join(os.path.dirname(__file__), "..", "..", "scripts", "tools")
+sys.path.insert(0, _DX)
+sys.path.insert(0, _LINT)
+sys.path.insert(0, _TOOLS)
+
+import compile_custom_alerts as cc  # noqa: E402
+from custom_alerts import cache  # noqa: E402
+from custom_alerts import loader as ld  # noqa: E402
+from custom_alerts import recipes as rc  # noqa: E402
+
+_REPO = Path(__file__).resolve().parents[2]
+_EXAMPLES = _REPO / "rule-packs" / "recipes" / "examples" / "conf.d"
+
+_RECIPE = ('      - {{recipe: threshold, name: {name}, metric: {metric}, op: ">", '
+           'window: 5m, threshold: "{value}:warning"}}\n')
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(cache.CACHE_ENV, str(tmp_path / "cache"))
+    cache.clear_memo()
+    yield
+    cache.clear_memo()
+
+
+def _tenant_file(tenant: str, metric: str, value: int = 1) -> str:
+    return (f"tenants:\n  {tenant}:\n    _custom_alerts:\n"
+            + _RECIPE.format(name=f"{tenant}_hi", metric=metric, value=value))
+
+
+def _tree(root: Path, n: int = 4) -> Path:
+    conf = root / "conf.d"
+    (conf / "dom").mkdir(parents=True)
+    (conf / "dom" / "_defaults.yaml").write_text(
+        "_custom_alerts:\n" + _RECIPE.format(name="shared", metric="dom_m", value=9),
+        encoding="utf-8")
+    for i in range(n):
+        (conf / "dom" / f"t{i}.yaml").write_text(_tenant_file(f"t{i}", f"m{i}"),
+                                                encoding="utf-8")
+    return conf
+
+
+def _compile(conf: Path) -> str:
+    return cc._render(cc.build_pack(conf)["groups"])
+
+
+def _full_dump(groups) -> str:
+    return cc._render([])[:-len("groups:\n")] + cc._dump({"groups": groups})
+
+
+@pytest.mark.parametrize("conf", [_EXAMPLES, None], ids=["examples", "synthetic"])
+def test_warm_compile_is_byte_identical(conf, tmp_path, monkeypatch):
+    conf = conf or _tree(tmp_path)
+    monkeypatch.setenv(cache.CACHE_ENV, "off")
+    cold = _compile(conf)
+    cache.clear_memo()
+    monkeypatch.setenv(cache.CACHE_ENV, str(tmp_path / "cache"))
+    assert _compile(conf) == cold                  # populates memo + disk
+    cache.clear_memo()
+    assert _compile(conf) == cold                  # served from disk
+    assert _compile(conf) == cold                  # served from memo
+
+
+def test_fragment_render_matches_whole_pack_dump():
+    pack = cc.build_pack(_EXAMPLES)
+    groups = pack["groups"] + [
+        {"name": "edge", "rules": [{"alert": "Ünïcode", "expr": "a\n  and b\n",
+                                    "labels": {"k": "'quoted': yes"}}]},
+        {"name": "rules-not-last", "rules": [{"record": "r", "expr": "1"}], "interval": "1m"},
+        {"name": "empty", "rules": []},
+    ]
+    assert cc._render(groups) == _full_dump(groups)
+
+
+def test_edit_reparses_one_file_and_reemits_changed_shapes(tmp_path, monkeypatch):
+    conf = _tree(tmp_path)
+    _compile(conf)
+    cache.clear_memo()                             # a fresh process, warm disk
+
+    parsed, emitted = [], []
+    real_load, real_emit = ld.yaml.safe_load, rc.emit_shape
+    monkeypatch.setattr(ld.yaml, "safe_load", lambda s: parsed.append(s) or real_load(s))
+    monkeypatch.setattr(rc, "emit_shape", lambda s: emitted.append(s["recipe_id"]) or real_emit(s))
+    (conf / "dom" / "t2.yaml").write_text(_tenant_file("t2", "m2_v2"), encoding="utf-8")
+
+    out = _compile(conf)
+    assert len(parsed) == 1 and "m2_v2" in parsed[0]
+    assert len(emitted) == 1                       # only t2's shape changed
+    assert "m2_v2" in out
+    cache.clear_memo()
+    monkeypatch.setenv(cache.CACHE_ENV, "off")
+    assert out == _compile(conf)
+
+
+def test_malformed_file_still_quarantined_when_siblings_are_cached(tmp_path):
+    conf = _tree(tmp_path, n=2)
+    _compile(conf)
+    (conf / "dom" / "bad.yaml").write_text('tenants:\n  "x\x1by": {}\n', encoding="utf-8")
+    _shapes, _per, skipped = ld.build_shapes(conf)
+    assert [s["origin"] for s in skipped] == [os.path.join("dom", "bad.yaml")]
+
+
+def test_off_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.setenv(cache.CACHE_ENV, "off")
+    assert cache.cache_dir() is None
+    _compile(_tree(tmp_path))
+    assert not (tmp_path / "cache").exists()
+
+
+@pytest.mark.parametrize("value", [(1, 2), {1: "a"}, {"x": float("nan")}, {"s": {1, 2}}])
+def test_non_round_tripping_values_are_not_keyed_or_cached(value):
+    assert cache.digest(value) is None
+    assert cache.store("emit", "k", value) is value
+    assert cache.lookup("emit", "k") is None
+
+
+def test_hits_are_fresh_objects():
+    cache.store("emit", "k", {"a": [1]})
+    first = cache.lookup("emit", "k")
+    first["a"].append(2)
+    assert cache.lookup("emit", "k") == {"a": [1]}
+
+
+def test_unwritable_cache_dir_degrades_to_recompute(tmp_path, monkeypatch):
+    blocker = tmp_path / "file"
+    blocker.write_text("", encoding="utf-8")
+    monkeypatch.setenv(cache.CACHE_ENV, str(blocker))
+    assert cache.cached("yaml", "k", lambda: "v") == "v"
@@ -374,6 +374,39 @@ def test_attribute_alerts_identity_exact_match():
     assert un == [aggregated, no_signature, wrong_topo]
 
 
+def test_attribute_alerts_index_matches_pairwise_scan():
+    """dict 索引歸因 == 逐 alert×record 掃描（fan-out 規模；含錯 series、錯 topology、
+    聚合 alert）。"""
+    records, alerts = [], []
+    for sig in range(20):
+        records.append(_rec(sig, "base", None, {"host": f"h{sig}"}))
+        for i in range(25):
+            sid = f"f{i:02d}"
+            records.append(_rec(sig, "fanout", sid, {"host": f"h{sig}", "series": sid}))
+            lb = {"waveform_signature": str(sig), "waveform_variant": "fanout",
+                  "series": sid, "host": f"h{sig}" if i % 7 else "other"}
+            alerts.append(_alert({"alertname": "A", **lb}))
+        alerts.append(_alert({"alertname": "B", "waveform_signature": str(sig),
+                              "waveform_variant": "base", "host": f"h{sig}",
+                              "series": "ignored-on-base"}))
+        alerts.append(_alert({"alertname": "C", "waveform_signature": str(sig),
+                              "waveform_variant": "fanout", "series": "f99"}))
+    alerts.append(_alert({"alertname": "Agg"}))
+
+    def scan(rec, lb):
+        return (lb.get("waveform_signature") == str(rec["signature_index"])
+                and lb.get("waveform_variant") == rec["variant"]
+                and (rec["series"] is None or lb.get("series") == rec["series"])
+                and all(lb.get(k) == v for k, v in rec["labels"].items()
+                        if k not in iw.RESERVED_LABEL_KEYS))
+
+    want = [[a for a in alerts if scan(r, a["labels"])] for r in records]
+    un = iw.attribute_alerts(records, alerts)
+    assert [r["alerts"] for r in records] == want
+    assert un == [a for a in alerts if not any(scan(r, a["labels"]) for r in records)]
+    assert len(un) == 20 * 4 + 20 + 1    # 錯 topology + 錯 series + 聚合
+
+
 def test_attribution_regression_two_sigs_same_labels_diff_metric():
     """FIX-1 回歸（外審 probe 場景）：兩個 signature 同 topology labels、異 metric
     ——修前 ALERTS 無 __name__ 可判別，一條 alert 同時歸因到兩個 signature 的同
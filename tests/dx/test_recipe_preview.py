@@ -1,13 +1,15 @@
 """Tests for recipe_preview.preview_recipe — recipe would-fire preview (#657 P2).
 
-The firing/inactive assertions need `promtool` (they go through the real
-compiler + promtool, the two-eval-homes rule) → scoped skip, NOT a module-level
-skip, so the gating / error / synthetic-input tests still run everywhere
-(the #655 lesson: a module-level promtool skip silently hides host coverage).
+The firing/inactive assertions run under BOTH engines: the embedded
+evaluator everywhere, and promtool (the oracle — the real compiler + promtool)
+behind a scoped skip, NOT a module-level skip, so the gating / error /
+synthetic-input tests still run everywhere (the #655 lesson: a module-level
+promtool skip silently hides host coverage).
 """
 import os
 import shutil
 import sys
+from pathlib import Path
 
 import pytest
 import yaml
@@ -35,20 +37,57 @@ _ABSENCE = {
     "recipe": "absence", "metric": "app_heartbeat_total",
     "window": "10m", "for": "1m", "threshold": "0:critical", "name": "heartbeat_gone",
 }
+# time-dependent types — mirror the rate / ratio / p99 / forecast goldens.
+_RATE = {
+    "recipe": "rate", "metric": "http_requests_total", "op": ">", "window": "5m",
+    "for": "1m", "threshold": "10:critical", "name": "post_5xx",
+    "selectors": {"method": "POST"},
+}
+_RATIO = {
+    "recipe": "ratio", "metric": "http_errors_total",
+    "denominator_metric": "http_requests_total", "op": ">", "window": "5m",
+    "for": "1m", "threshold": "0.05:warning", "name": "error_ratio",
+}
+_P99 = {
+    "recipe": "p99_latency", "metric": "http_request_duration_seconds", "op": ">",
+    "window": "5m", "for": "1m", "threshold": "0.5:warning", "name": "slow",
+}
+_FORECAST = {
+    "recipe": "forecast", "metric": "kubelet_volume_stats_available_bytes",
+    "capacity_metric": "kubelet_volume_stats_capacity_bytes", "op": "<",
+    "horizon": "4h", "for": "30m", "threshold": "0.1:warning", "name": "disk_fill",
+}
 
 
 # ── per-type gating + error handling (no promtool needed — run everywhere) ──
 
 class TestGatingAndErrors:
     def test_unsupported_recipe_type_not_compiled(self):
-        """rate/ratio/forecast/p99 (still time-dependent) → supported:false, no
-        compile, no states. (threshold + absence ARE supported — see TestWouldFire.)"""
-        rate = {"recipe": "rate", "metric": "http_requests_total", "op": ">",
-                "window": "5m", "threshold": "1:warning", "name": "r"}
-        out = rp.preview_recipe(rate, "shop-a", {"value": 5})
+        """slo_burn_rate (a multi-window error-budget history, not one value) →
+        supported:false, no compile, no states. (Every other type IS supported —
+        see TestWouldFire.)"""
+        slo = {"recipe": "slo_burn_rate", "metric": "checkout_requests_errors_total",
+               "denominator_metric": "checkout_requests_total", "objective": "0.999",
+               "name": "slo"}
+        out = rp.preview_recipe(slo, "shop-a", {"value": 5})
         assert out["supported"] is False
         assert out["states"] == []
-        assert any("rate" in w for w in out["warnings"])
+        assert any("slo_burn_rate" in w for w in out["warnings"])
+
+    @pytest.mark.parametrize("recipe,scenario,needle", [
+        (_RATE, {}, "required"),
+        (_RATE, {"value": -1}, "negative"),
+        (_RATIO, {"value": "nan"}, "finite"),
+        (_P99, {"value": "inf"}, "finite"),
+        (_FORECAST, {"value": 0.3, "trend": "down"}, "trend"),
+        (dict(_RATE, window="soon"), {"value": 1}, "window"),
+    ])
+    def test_time_dependent_scenario_is_validated(self, recipe, scenario, needle):
+        """The time-dependent types BUILD their series from the scenario, so a
+        value that can't be a slope / bucket bound is state:error up front."""
+        out = rp.preview_recipe(recipe, "shop-a", scenario)
+        assert out["states"][0]["state"] == "error"
+        assert needle in out["states"][0]["reason"]
 
     def test_absence_malformed_window_is_error(self):
         """absence needs a parseable `window` to size eval_time; a bad one →
@@ -111,6 +150,7 @@ class TestGatingAndErrors:
         or a wrong verdict (the fail-closed contract)."""
         def boom(*a, **k):
             raise FileNotFoundError("promtool disappeared")
+        monkeypatch.setattr(rp, "_ENGINE", "promtool")
         monkeypatch.setattr(rp, "_PROMTOOL", "/nonexistent/promtool")
         monkeypatch.setattr(rp.subprocess, "run", boom)
         out = rp.preview_recipe(_THRESHOLD, "shop-a", {"value": 1500})
@@ -118,6 +158,13 @@ class TestGatingAndErrors:
         assert out["states"][0]["state"] == "error"
         assert "promtool eval failed" in out["states"][0]["reason"]
 
+    def test_promtool_engine_without_promtool_warns(self, monkeypatch):
+        monkeypatch.setattr(rp, "_ENGINE", "promtool")
+        monkeypatch.setattr(rp, "_PROMTOOL", None)
+        out = rp.preview_recipe(_THRESHOLD, "shop-a", {"value": 1500})
+        assert out["states"] == []
+        assert out["warnings"] == ["promtool not available — cannot evaluate locally"]
+
     def test_unsupported_for_window_is_error(self, monkeypatch):
         """If `for:` is valid for the compiler but unmapped in _FOR_MINUTES
         (enum drift), fail closed to error — never silently shrink to 1m and
@@ -186,6 +233,33 @@ class TestBuildPreviewTest:
         assert "exp_alerts: []" in doc                # inverted-assert
         assert f"alertname: Custom_{slug}" in doc
 
+    def test_rate_series_is_a_counter_at_the_scenario_rate(self):
+        """15s samples of a counter growing value/s; eval past window + for."""
+        group, *_ = rp.build_test_group(_RATE, "shop-a", 12, rp.shape.recipe_id(_RATE))
+        assert group["interval"] == "15s"
+        assert group["alert_rule_test"][0]["eval_time"] == "11m"   # 5 + 1 + 5
+        metric = group["input_series"][0]
+        assert metric["series"] == 'http_requests_total{tenant="shop-a", method="POST"}'
+        assert metric["values"] == "0.0+180.0x64"                  # 12/s · 15s, (11+5)·4
+
+    def test_p99_series_puts_the_quantile_on_the_value(self):
+        group, *_ = rp.build_test_group(_P99, "shop-a", 0.8, rp.shape.recipe_id(_P99))
+        series = [s["series"] for s in group["input_series"]]
+        assert 'http_request_duration_seconds_bucket{tenant="shop-a", le="0.8"}' in series
+        assert 'http_request_duration_seconds_bucket{tenant="shop-a", le="+Inf"}' in series
+
+    def test_forecast_is_sized_past_the_compiler_lookback(self):
+        """lookback = max(2·4h, 1h) = 480m; eval = 480 + for 30 + 5. The line
+        reaches `value` exactly at eval time."""
+        group, *_ = rp.build_test_group(_FORECAST, "shop-a", 0.3, rp.shape.recipe_id(_FORECAST),
+                                        trend=-0.06)
+        assert group["alert_rule_test"][0]["eval_time"] == "515m"
+        avail, cap = group["input_series"][:2]
+        assert cap["values"] == "1x520"
+        start, rest = avail["values"].split("-", 1)
+        step = float(rest.split("x")[0])
+        assert float(start) - step * 515 == pytest.approx(0.3)
+
     def test_absence_compound_and_subsecond_window(self):
         """A compound / sub-second window (schema grammar, e.g. 1h30m / 500ms) must
         NOT false-error: the compiler interpolates it raw into count_over_time, so
@@ -226,9 +300,188 @@ class TestClassifyPromtoolResult:
         assert rp.classify_promtool_result(1, "error loading test file: yaml: line 3") == "error"
 
 
-# ── end-to-end firing/inactive (needs promtool) ──
+# ── batched run: attribution (pure) + orchestration (fake promtool) ──
+
+_FAIL_BLOCK = ("  FAILED:\n    name: {g},\n    alertname: Custom_x, time: 6m, \n"
+               "        exp:[], \n        got:[\n            0:\n"
+               "              Labels:{{alertname=\"Custom_x\"}}\n            ]\n")
+
+
+class TestClassifyBatchResult:
+    NAMES = ["preview-0", "preview-1", "preview-2"]
+
+    def test_rc0_all_inactive(self):
+        assert rp.classify_batch_result(0, "SUCCESS", self.NAMES) == dict.fromkeys(
+            self.NAMES, "inactive")
+
+    def test_named_blocks_attribute_firing(self):
+        out = ("Unit Testing:  preview_test.yaml\n" + _FAIL_BLOCK.format(g="preview-0")
+               + "\n" + _FAIL_BLOCK.format(g="preview-2"))
+        assert rp.classify_batch_result(1, out, self.NAMES) == {
+            "preview-0": "firing", "preview-1": "inactive", "preview-2": "firing"}
+
+    def test_no_failed_signature_is_error_for_all(self):
+        states = rp.classify_batch_result(1, "error loading test file", self.NAMES)
+        assert set(states.values()) == {"error"}
+
+    def test_unattributable_output_returns_none(self):
+        """Anything but well-formed blocks for OUR groups → None (re-run alone),
+        never a guessed verdict."""
+        unnamed = "  FAILED:\n    alertname: Custom_x, time: 6m, \n exp:[], \n got:[x]\n"
+        assert rp.classify_batch_result(1, unnamed, self.NAMES) is None
+        trailing = _FAIL_BLOCK.format(g="preview-1") + "  FAILED:\n    parse error in series\n"
+        assert rp.classify_batch_result(1, trailing, self.NAMES) is None
+        foreign = _FAIL_BLOCK.format(g="preview-9")
+        assert rp.classify_batch_result(1, foreign, self.NAMES) is None
+
+
+class _FakePromtool:
+    """Stands in for promtool: `check` passes; `test` fires a group when its
+    metric series value exceeds its user_threshold value, printing promtool's
+    named-group FAILED blocks. Records every invocation."""
+
+    def __init__(self, attribute=True):
+        self.calls = []
+        self.attribute = attribute
+
+    def __call__(self, cmd, cwd=None, **_kw):
+        import subprocess
+        self.calls.append(cmd[1])
+        if cmd[1] == "check":
+            return subprocess.CompletedProcess(cmd, 0, "SUCCESS", "")
+        doc = yaml.safe_load((Path(cwd) / cmd[3]).read_text(encoding="utf-8"))
+        blocks = []
+        for g in doc["tests"]:
+            vals = {s["series"].split("{")[0]: float(s["values"].split("x")[0])
+                    for s in g["input_series"]}
+            metric = [k for k in vals if k not in ("user_threshold", "tenant_metadata_info")]
+            if metric and vals[metric[0]] > vals["user_threshold"]:
+                block = _FAIL_BLOCK.format(g=g.get("name", ""))
+                if "name" not in g or not self.attribute:
+                    block = block.replace("    name: ,\n", "").replace(
+                        f"    name: {g.get('name')},\n", "")
+                blocks.append(block)
+        if not blocks:
+            return subprocess.CompletedProcess(cmd, 0, "SUCCESS\n", "")
+        return subprocess.CompletedProcess(cmd, 1, "Unit Testing:  preview_test.yaml\n",
+                                           "\n".join(blocks))
+
+
+@pytest.fixture()
+def fake_promtool(monkeypatch):
+    fake = _FakePromtool()
+    monkeypatch.setattr(rp, "_ENGINE", "promtool")
+    monkeypatch.setattr(rp, "_PROMTOOL", "/fake/promtool")
+    monkeypatch.setattr(rp.subprocess, "run", fake)
+    monkeypatch.setattr(rp, "_COMPILED", rp.OrderedDict())
+    return fake
+
+
+class TestPreviewBatch:
+    def _sweep(self, values):
+        return [(_THRESHOLD, "shop-a", {"value": v}) for v in values]
+
+    def test_sweep_is_one_check_and_one_test_run(self, fake_promtool):
+        out = rp.preview_batch(self._sweep([500, 999, 1001, 1500]))
+        assert [r["states"][0]["state"] for r in out] == [
+            "inactive", "inactive", "firing", "firing"]
+        assert fake_promtool.calls == ["check", "test"]
+        assert out[2]["states"][0]["reason"] == "value 1001 > threshold 1000"
+
+    def test_matches_single_preview_item_for_item(self, fake_promtool):
+        items = [(_THRESHOLD, "shop-a", {"value": 1500}),
+                 (dict(_THRESHOLD, threshold="2000:critical"), "shop-a", {"value": 1500}),
+                 (dict(_THRESHOLD, recipe="slo_burn_rate"), "shop-a", {"value": 1}),
+                 (_THRESHOLD, "shop-a", {"value": "1+2"}),
+                 (dict(_THRESHOLD, selectors={"q": "a"}), "shop-a", {"value": 5000})]
+        batch = rp.preview_batch(items)
+        assert batch == [rp.preview_recipe(*item) for item in items]
+
+    def test_threshold_slider_reuses_compiled_groups(self, fake_promtool):
+        items = [(dict(_THRESHOLD, threshold=f"{t}:warning"), "shop-a", {"value": 1200})
+                 for t in (1000, 1100, 1300)]
+        out = rp.preview_batch(items)
+        assert [r["states"][0]["state"] for r in out] == ["firing", "firing", "inactive"]
+        assert fake_promtool.calls.count("check") == 1
+
+    def test_unattributable_output_falls_back_per_item(self, fake_promtool):
+        fake_promtool.attribute = False
+        out = rp.preview_batch(self._sweep([500, 1500]))
+        assert [r["states"][0]["state"] for r in out] == ["inactive", "firing"]
+        assert fake_promtool.calls == ["check", "test", "test", "test"]
+
+    def test_non_plain_value_runs_alone(self, fake_promtool):
+        out = rp.preview_batch(self._sweep([500, 1500, "1e4"]))
+        assert [r["states"][0]["state"] for r in out] == ["inactive", "firing", "firing"]
+        assert fake_promtool.calls == ["check", "test", "test"]
+
+    def test_promtool_vanishing_is_fail_closed(self, fake_promtool, monkeypatch):
+        def boom(*a, **k):
+            raise FileNotFoundError("promtool disappeared")
+        monkeypatch.setattr(rp.subprocess, "run", boom)
+        out = rp.preview_batch(self._sweep([500, 1500]))
+        assert {r["states"][0]["state"] for r in out} == {"error"}
 
-@_needs_promtool
+
+class TestWorkspacePool:
+    def test_workspaces_are_reused_and_emptied(self, tmp_path):
+        pool = rp._WorkspacePool(1)
+        with pool.workspace() as w1:
+            (w1 / "sub").mkdir()
+            (w1 / "sub" / "f").write_text("x", encoding="utf-8")
+        with pool.workspace() as w2:
+            assert w2 == w1 and list(w2.iterdir()) == []
+        pool.close()
+        assert not w1.exists()
+
+
+# ── embedded engine: no subprocess; falls back to promtool outside its subset ──
+
+class TestEmbeddedEngine:
+    def test_never_spawns_promtool(self, monkeypatch):
+        def boom(*a, **k):
+            raise AssertionError("embedded preview spawned a process")
+        monkeypatch.setattr(rp.subprocess, "run", boom)
+        items = [(_THRESHOLD, "shop-a", {"value": 1500}), (_RATE, "shop-a", {"value": 12})]
+        assert [r["states"][0]["state"] for r in rp.preview_batch(items)] == [
+            "firing", "firing"]
+
+    def test_unsupported_rule_falls_back_to_promtool(self, fake_promtool, monkeypatch):
+        def unsupported(*a, **k):
+            raise rp.pe.Unsupported("offset modifiers are not supported")
+        monkeypatch.setattr(rp, "_ENGINE", "embedded")
+        monkeypatch.setattr(rp.pe, "run_alert_tests", unsupported)
+        out = rp.preview_recipe(_THRESHOLD, "shop-a", {"value": 1500})
+        assert out["states"][0]["state"] == "firing"
+        assert fake_promtool.calls == ["check", "test"]
+
+    def test_unsupported_rule_without_promtool_is_error(self, monkeypatch):
+        def unsupported(*a, **k):
+            raise rp.pe.Unsupported("offset modifiers are not supported")
+        monkeypatch.setattr(rp, "_PROMTOOL", None)
+        monkeypatch.setattr(rp.pe, "run_alert_tests", unsupported)
+        out = rp.preview_recipe(_THRESHOLD, "shop-a", {"value": 1500})
+        assert out["states"][0]["state"] == "error"
+        assert "offset" in out["states"][0]["reason"]
+
+    def test_eval_error_is_error_not_firing(self, monkeypatch):
+        def clash(*a, **k):
+            raise rp.pe.EvalError("many-to-many matching not allowed")
+        monkeypatch.setattr(rp.pe, "run_alert_tests", clash)
+        out = rp.preview_recipe(_THRESHOLD, "shop-a", {"value": 1500})
+        assert out["states"][0]["state"] == "error"
+        assert "rule evaluation failed" in out["states"][0]["reason"]
+
+
+# ── end-to-end firing/inactive: embedded everywhere, promtool where installed ──
+
+@pytest.fixture(params=["embedded", pytest.param("promtool", marks=_needs_promtool)])
+def engine(request, monkeypatch):
+    monkeypatch.setattr(rp, "_ENGINE", request.param)
+    return request.param
+
+
+@pytest.mark.usefixtures("engine")
 class TestWouldFire:
     def test_threshold_fires_above(self):
         out = rp.preview_recipe(_THRESHOLD, "shop-a", {"value": 1500})
@@ -278,3 +531,52 @@ class TestWouldFire:
         assert out["states"][0]["state"] == "firing"
         assert out["states"][0]["severity"] == "critical"
         assert out["alertname"] == "Custom_" + rp.shape.recipe_id(_ABSENCE)
+
+    @pytest.mark.parametrize("recipe,scenario,state,reason", [
+        (_RATE, {"value": 12}, "firing", "rate 12/s > threshold 10"),
+        (_RATE, {"value": 8}, "inactive", "rate 8/s does not cross threshold 10 (>)"),
+        (dict(_RATE, window="30s"), {"value": 12}, "firing", "rate 12/s > threshold 10"),
+        (_RATIO, {"value": 0.1}, "firing", "ratio 0.1 > threshold 0.05"),
+        (_RATIO, {"value": 0.01}, "inactive", "ratio 0.01 does not cross threshold 0.05 (>)"),
+        (_P99, {"value": 0.8}, "firing", "quantile 0.99 latency 0.8s > threshold 0.5"),
+        (dict(_P99, quantile="0.95"), {"value": 0.2}, "inactive",
+         "quantile 0.95 latency 0.2s does not cross threshold 0.5 (>)"),
+        (_FORECAST, {"value": 0.3, "trend": -0.06}, "firing", "forecast 0.06 in 4h < threshold 0.1"),
+        (_FORECAST, {"value": 0.3, "trend": -0.01}, "inactive",
+         "forecast 0.26 in 4h does not cross threshold 0.1 (<)"),
+        (_FORECAST, {"value": 0.6, "trend": -0.2}, "inactive",
+         "current headroom 0.6 is not below the forecast band 0.5 — suppressed whatever the trend"),
+        ({k: v for k, v in _FORECAST.items() if k != "capacity_metric"} | {"op": ">",
+          "threshold": "1000:warning"}, {"value": 500, "trend": 200}, "firing",
+         "forecast 1300 in 4h > threshold 1000"),
+    ])
+    def test_time_dependent_types(self, recipe, scenario, state, reason):
+        out = rp.preview_recipe(recipe, "shop-a", scenario)
+        assert out["states"][0]["state"] == state
+        assert out["states"][0]["reason"] == reason
+
+
+@pytest.mark.usefixtures("engine")
+class TestWouldFireBatch:
+    def test_batch_matches_single_previews(self):
+        items = [(_THRESHOLD, "shop-a", {"value": v}) for v in (500, 1500)]
+        items += [(_EQUALS, "shop-a", {"value": 1236}), (_ABSENCE, "shop-a", {})]
+        items += [(_RATE, "shop-a", {"value": v}) for v in (8, 12)]
+        assert rp.preview_batch(items) == [rp.preview_recipe(*i) for i in items]
+
+
+@_needs_promtool
+def test_embedded_engine_agrees_with_promtool(monkeypatch):
+    """The oracle check: every verdict the embedded evaluator gives, promtool
+    gives too — both sides of each threshold, every supported type."""
+    items = [(_THRESHOLD, "shop-a", {"value": v}) for v in (999, 1000, 1001)]
+    items += [(_EQUALS, "shop-a", {"value": v}) for v in (1236, 1237)]
+    items += [(_ABSENCE, "shop-a", {})]
+    items += [(_RATE, "shop-a", {"value": v}) for v in (0, 9.5, 10.5)]
+    items += [(_RATIO, "shop-a", {"value": v}) for v in (0.04, 0.06)]
+    items += [(_P99, "shop-a", {"value": v}) for v in (0.4, 0.6)]
+    items += [(_FORECAST, "shop-a", {"value": 0.3, "trend": t}) for t in (-0.1, -0.01, 0)]
+    monkeypatch.setattr(rp, "_ENGINE", "embedded")
+    embedded = [rp.preview_recipe(*i) for i in items]
+    monkeypatch.setattr(rp, "_ENGINE", "promtool")
+    assert [rp.preview_recipe(*i) for i in items] == embedded
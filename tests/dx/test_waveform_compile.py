@@ -248,6 +248,26 @@ def test_three_variants_always_on_and_fanout_count():
     assert len([s for s in series5 if s.variant == "fanout"]) == 5
 
 
+@pytest.mark.parametrize("noise_kind", ["gaussian", "uniform"])
+def test_array_noise_is_bitwise_the_scalar_helper(noise_kind):
+    """陣列化 _apply_noise == 逐樣本 v + _noise_sample(...)（同 seed、同抽樣順序、
+    逐位元相同）——determinism 契約不因陣列路徑改變。"""
+    base, _fw = wf._base_waveform(wf.load_pack(str(_DISK))["signatures"][0])
+    rng_a, rng_b = wf.random.Random("k"), wf.random.Random("k")
+    got = wf._apply_noise(base, rng_a, 1.5, noise_kind)
+    want = [v + wf._noise_sample(rng_b, 1.5, noise_kind) for v in base]
+    assert [v.hex() for v in got] == [v.hex() for v in want]
+
+
+def test_streamed_materializations_match_and_gap_free_series_are_arrays():
+    series = _series_of(_ERRORS, fanout=4) + _series_of(_DISK)
+    assert "".join(wf.stream_vm(series)) == wf.materialize_vm(series)
+    assert "".join(wf.stream_promtool(series)) == wf.materialize_promtool(series)
+    for s in series:   # dropout → list with None gaps; otherwise array('d')
+        assert isinstance(s.samples, wf.array) == (None not in s.samples)
+    assert any(isinstance(s.samples, wf.array) for s in series)
+
+
 def test_noise_amplitude_within_hard_bound():
     series = _series_of(_DISK)
     base = next(s for s in series if s.variant == "base")
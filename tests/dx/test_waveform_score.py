@@ -211,6 +211,24 @@ def test_conservation_identity_holds_across_mix():
     assert s["hits"] + s["false_negatives"] == s["scored_denominator"]
 
 
+def test_reports_are_consumed_one_at_a_time():
+    """score() 只走一遍 reports：generator 逐份產出，下一份載入前前一份已計完
+    （CLI 以此串流 N 份報告、O(cases) 常駐）；結果與一次傳 list 相同。"""
+    reps = [(f"r{i}.json", _report([_record(sig=i, alerts=[_alert(fire=1000)])],
+                                   [_meta(sig=i)])) for i in range(3)]
+    consumed = []
+
+    def lazy():
+        for path, rep in reps:
+            consumed.append(path)
+            yield path, rep
+
+    out = ws.score(lazy(), _TOLS)
+    assert consumed == ["r0.json", "r1.json", "r2.json"]
+    assert out == ws.score(reps, _TOLS)
+    assert out["summary"]["hits"] == 3
+
+
 def test_zero_scored_denominator_is_operational_error():
     """全部 case 被排除 → 零分母 catch-rate = vacuous green，不得產 PASS。"""
     tol = dict(_TOLS)
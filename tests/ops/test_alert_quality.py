@@ -12,12 +12,15 @@
   8. generate_markdown() — Markdown 輸出
   9. print_text_report() — 文字輸出
   10. CLI — 參數解析
-  11. Prometheus / Alertmanager query — mock 測試
+  11. Alertmanager query — mock 測試
+  12. series_episodes() — episode 引擎（快路徑 ≡ walker）+ 逐 tenant 串流
 """
 
 import json
+import random
 import sys
 import time
+import urllib.parse
 from unittest.mock import patch
 
 import pytest
@@ -323,41 +326,6 @@ class TestPrintTextReport:
         assert "BAD" in out
 
 
-# ── Prometheus query mock ──────────────────────────────────────
-# W1: query_prometheus_alerts 的 fetch core 收斂進
-# _lib_prometheus.query_prometheus_range，HTTP seam 改 patch
-# _lib_prometheus.http_get_json（Alertmanager 路徑仍走 aq.http_get_json，
-# 那些測試不變）。
-
-class TestQueryPrometheusAlerts:
-    """Prometheus 查詢 mock 測試。"""
-
-    def test_success(self, monkeypatch):
-        """成功查詢回傳結果。"""
-        def mock_get(url, timeout=10):
-            return {
-                "status": "success",
-                "data": {"result": [{"metric": {"alertname": "X"}, "values": [[1, "1"]]}]},
-            }, None
-        monkeypatch.setattr("_lib_prometheus.http_get_json", mock_get)
-        result = aq.query_prometheus_alerts("http://prom", "ALERTS", 86400)
-        assert len(result) == 1
-
-    def test_error_returns_empty(self, monkeypatch):
-        """HTTP 錯誤回傳空清單。"""
-        monkeypatch.setattr("_lib_prometheus.http_get_json",
-                            lambda url, timeout=10: (None, "refused"))
-        result = aq.query_prometheus_alerts("http://prom", "ALERTS", 86400)
-        assert result == []
-
-    def test_api_error(self, monkeypatch):
-        """API 錯誤狀態回傳空清單。"""
-        monkeypatch.setattr("_lib_prometheus.http_get_json",
-                            lambda url, timeout=10: ({"status": "error"}, None))
-        result = aq.query_prometheus_alerts("http://prom", "ALERTS", 86400)
-        assert result == []
-
-
 # ── Alertmanager query mock ────────────────────────────────────
 
 class TestQueryAlertmanagerAlerts:
@@ -429,6 +397,139 @@ class TestAnalyzeFromPrometheus:
         assert metrics == []
 
 
+# ── Episode engine / per-tenant streaming ─────────────────────
+
+class TestSeriesEpisodes:
+    """series_episodes()：缺樣本即 resolve；快路徑與 walker 結果一致。"""
+
+    STEP, BASE = 60, 1_700_000_000
+    END = BASE + 60 * 100
+
+    def test_gap_splits_episodes(self):
+        values = [[self.BASE + t, "1"] for t in (0, 60, 120, 600, 660)]
+        transitions, durations, last, total = aq.series_episodes(values, self.STEP, self.END)
+        assert (transitions, total, last) == (2, 5, self.BASE + 660.0)
+        assert durations == [180.0, 120.0]       # 0→180, 600→720
+
+    def test_episode_open_at_window_end_has_no_duration(self):
+        values = [[t, "1"] for t in (self.END - 120, self.END - 60, self.END)]
+        assert aq.series_episodes(values, self.STEP, self.END)[:2] == (1, [])
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_fast_path_matches_walker(self, seed):
+        rng = random.Random(seed)
+        grid = [self.BASE + t * self.STEP for t in range(100)]
+        values = [[t, "1"] for t in grid if rng.random() < 0.6]
+        ts = [float(t) for t, _ in values]
+        raw = [v for _, v in values]
+        assert aq.series_episodes(values, self.STEP, self.END) == \
+            aq._walk_series(ts, raw, self.STEP, self.END)
+
+    def test_explicit_zero_and_junk_values(self):
+        values = [[self.BASE + t, v] for t, v in
+                  ((0, "0"), (60, "1"), (120, "x"), (180, "1"), (240, "0"))]
+        transitions, durations, last, total = aq.series_episodes(values, self.STEP, self.END)
+        assert (transitions, durations, last, total) == (1, [180.0], self.BASE + 180.0, 4)
+
+    def test_percentile(self):
+        assert aq.percentile([], 95) == 0.0
+        assert aq.percentile([10.0, 20.0, 30.0], 50) == 20.0
+        assert aq.percentile([10.0, 20.0], 95) == pytest.approx(19.5)
+
+
+def _fake_prom(tenants, series_by_tenant, calls):
+    def get(url, timeout=30):
+        q = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)["query"][0]
+        calls.append(q)
+        if "count by (tenant)" in q:
+            if tenants is None:
+                return None, "boom"
+            return {"status": "success", "data": {"result": [
+                {"metric": ({"tenant": t} if t else {}), "value": [0, "1"]}
+                for t in tenants]}}, None
+        result = []
+        for t, series in series_by_tenant.items():
+            if tenants is None or f"tenant={json.dumps(t)}" in q:
+                result.extend(series)
+        return {"status": "success", "data": {"result": result}}, None
+    return get
+
+
+class TestCollectAlertStats:
+    """逐 tenant 並行抓取、各自歸約後合併。"""
+
+    def _series(self, tenant, name, values):
+        labels = {"alertname": name}
+        if tenant:
+            labels["tenant"] = tenant
+        return {"metric": labels, "values": values}
+
+    def test_fans_out_per_discovered_tenant(self, monkeypatch):
+        now = time.time()
+        fleet = {
+            "db-a": [self._series("db-a", "X", [[now - 120, "1"]]),
+                     self._series("db-a", "X", [[now - 7200, "1"]])],
+            'we"ird': [self._series('we"ird', "Y", [[now - 60, "1"]])],
+            "": [self._series("", "Z", [[now - 60, "1"]])],
+        }
+        calls = []
+        monkeypatch.setattr("_lib_prometheus.http_get_json",
+                            _fake_prom(sorted(fleet), fleet, calls))
+        stats = aq.collect_alert_stats("http://prom", 86400, workers=3)
+        assert set(stats) == {("X", "db-a"), ("Y", 'we"ird'), ("Z", "unknown")}
+        assert stats[("X", "db-a")]["fire_transitions"] == 2
+        assert len(calls) == 1 + len(fleet)
+        assert 'ALERTS{alertstate="firing",tenant="we\\"ird"}' in calls
+
+    def test_discovery_failure_falls_back_to_one_fleet_query(self, monkeypatch):
+        now = time.time()
+        fleet = {"db-a": [self._series("db-a", "X", [[now - 60, "1"]])]}
+        calls = []
+        monkeypatch.setattr("_lib_prometheus.http_get_json",
+                            _fake_prom(None, fleet, calls))
+        stats = aq.collect_alert_stats("http://prom", 86400)
+        assert list(stats) == [("X", "db-a")]
+        assert calls[-1] == 'ALERTS{alertstate="firing"}'
+
+    def test_failed_tenant_warned_and_recorded(self, monkeypatch, capsys):
+        now = time.time()
+        fleet = {t: [self._series(t, "X", [[now - 60, "1"]])] for t in ("db-a", "db-b")}
+        ok = _fake_prom(sorted(fleet), fleet, [])
+
+        def get(url, timeout=30):
+            if "db-b" in urllib.parse.unquote(url):
+                return None, "HTTP 503"
+            return ok(url, timeout)
+
+        monkeypatch.setattr("_lib_prometheus.http_get_json", get)
+        failed = []
+        stats = aq.collect_alert_stats("http://prom", 86400, failed=failed)
+        assert list(stats) == [("X", "db-a")] and failed == ["db-b"]
+        err = capsys.readouterr().err
+        assert 'tenant="db-b"' in err and "HTTP 503" in err
+
+    def test_failed_fleet_query_recorded(self, monkeypatch):
+        monkeypatch.setattr("_lib_prometheus.http_get_json",
+                            lambda url, timeout=30: (None, "refused"))
+        failed = []
+        assert aq.collect_alert_stats("http://prom", 86400, failed=failed) == {}
+        assert failed == ["*"]
+
+    def test_percentiles_reported(self, monkeypatch):
+        now = int(time.time())
+        step = aq._range_window(86400, now)[2]
+        base = now - 50 * step
+        values = ([[base + i * step, "1"] for i in range(2)]
+                  + [[base + 10 * step + i * step, "1"] for i in range(6)])
+        fleet = {"db-a": [self._series("db-a", "X", values)]}
+        monkeypatch.setattr("_lib_prometheus.http_get_json",
+                            _fake_prom(["db-a"], fleet, []))
+        [m] = aq.analyze_from_prometheus("http://prom", 86400)
+        assert m.fire_count >= 2
+        assert m.p50_resolution_secs == pytest.approx(4 * step)
+        assert m.p95_resolution_secs == pytest.approx(5.8 * step)
+
+
 # ── CLI ────────────────────────────────────────────────────────
 
 class TestCLI:
@@ -526,6 +627,20 @@ class TestMain:
             aq.main()
         assert exc_info.value.code == 1
 
+    def test_failed_tenant_in_report_and_fails_ci(self, monkeypatch, capsys):
+        """查詢失敗的 tenant 列入 JSON 報告；--ci 不可在缺資料時通過。"""
+        monkeypatch.setattr("_lib_prometheus.http_get_json",
+                            lambda url, timeout=30: (None, "refused"))
+        monkeypatch.setattr("sys.argv", [
+            "alert_quality", "--prometheus", "http://prom", "--json", "--ci",
+        ])
+        with pytest.raises(SystemExit) as exc_info:
+            aq.main()
+        assert exc_info.value.code == 1
+        data = json.loads(capsys.readouterr().out)
+        assert data["failed_tenants"] == ["*"]
+        assert data["summary"]["failed_tenants"] == 1
+
     def test_invalid_period_exits(self, monkeypatch):
         """無效 period 字串應 exit 2 (caller error, #452)。"""
         monkeypatch.setattr("sys.argv", [
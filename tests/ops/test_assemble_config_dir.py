@@ -10,6 +10,7 @@ pytest style：使用 plain assert + conftest fixtures。
   4. assemble() — 檔案組裝（含 dry-run）
   5. validate_merged() — YAML 驗證（含邊界情況）
   6. build_manifest() — 組裝清單產生
+  7. assemble_incremental() — 只寫內容變動的檔案、清除過期檔、symlink 切換世代
 """
 
 import json
@@ -20,10 +21,14 @@ from pathlib import Path
 
 import pytest
 
+import assemble_config_dir
 from assemble_config_dir import (
+    OUTPUT_MODE,
     PLATFORM_FILES,
+    HashCache,
     _file_sha256,
     assemble,
+    assemble_incremental,
     build_manifest,
     detect_conflicts,
     discover_yamls,
@@ -230,6 +235,143 @@ class TestAssemble:
         assert mode == expected
 
 
+# ============================================================
+# assemble_incremental
+# ============================================================
+
+def _backdate(*paths):
+    """把 mtime 推到 racy window 之外，讓 (size, mtime_ns) 快取可以生效。"""
+    for p in paths:
+        os.utime(p, ns=(1_600_000_000_000_000_000,) * 2)
+
+
+@pytest.mark.skipif(sys.platform == "win32",
+                    reason="hardlink / symlink / mode-bit semantics are POSIX")
+class TestAssembleIncremental:
+    """assemble_incremental() 只動內容變動的檔案。"""
+
+    def _src(self, config_dir, **files):
+        src = Path(config_dir) / "src"
+        src.mkdir(exist_ok=True)
+        for name, body in files.items():
+            _write_file(src / f"{name}.yaml", body)
+        return src, {f"{n}.yaml": src / f"{n}.yaml" for n in files}
+
+    def test_unchanged_files_keep_inode_and_mtime(self, config_dir):
+        """第二次組裝只重寫內容變動的檔案，其餘 inode / mtime 不動。"""
+        src, fmap = self._src(config_dir, a="a: 1", b="b: 1")
+        out = Path(config_dir) / "out"
+        first = assemble_incremental(fmap, out, HashCache())
+        assert first["written"] == ["a.yaml", "b.yaml"]
+        before = os.stat(out / "a.yaml")
+
+        _write_file(src / "b.yaml", "b: 2")
+        second = assemble_incremental(fmap, out, HashCache())
+        assert second == {"written": ["b.yaml"], "unchanged": ["a.yaml"],
+                          "removed": []}
+        after = os.stat(out / "a.yaml")
+        assert (after.st_ino, after.st_mtime_ns) == (before.st_ino,
+                                                     before.st_mtime_ns)
+        assert (out / "b.yaml").read_text(encoding="utf-8") == "b: 2"
+        assert os.stat(out / "b.yaml").st_mode & 0o777 == OUTPUT_MODE
+        assert not list(out.glob(".*"))         # no temporaries left behind
+
+    def test_stale_files_are_removed(self, config_dir):
+        """來源不再提供的 *.yaml 從輸出移除，非 YAML 檔不碰。"""
+        _src, fmap = self._src(config_dir, a="a: 1", b="b: 1")
+        out = Path(config_dir) / "out"
+        assemble_incremental(fmap, out, HashCache())
+        _write_file(out / "README.txt", "keep me")
+        del fmap["b.yaml"]
+        result = assemble_incremental(fmap, out, HashCache())
+        assert result["removed"] == ["b.yaml"]
+        assert sorted(p.name for p in out.iterdir()) == ["README.txt", "a.yaml"]
+
+    def test_hardlink_only_on_request_and_when_source_mode_matches(self, config_dir):
+        """預設不與來源共用 inode；hardlink 模式下也只有 0644 來源才連結，來源權限不被改動。"""
+        src, fmap = self._src(config_dir, shared="a: 1", private="b: 1")
+        os.chmod(src / "shared.yaml", OUTPUT_MODE)
+        default = Path(config_dir) / "default"
+        assemble_incremental(fmap, default, HashCache())
+        assert os.stat(default / "shared.yaml").st_ino != os.stat(src / "shared.yaml").st_ino
+
+        out = Path(config_dir) / "out"
+        assemble_incremental(fmap, out, HashCache(), link_mode="hardlink")
+        assert os.stat(out / "shared.yaml").st_ino == os.stat(src / "shared.yaml").st_ino
+        assert os.stat(out / "private.yaml").st_ino != os.stat(src / "private.yaml").st_ino
+        assert os.stat(src / "private.yaml").st_mode & 0o777 == 0o600
+
+    def test_hash_cache_skips_rehashing_unchanged_files(self, config_dir, monkeypatch):
+        """(size, mtime_ns) 沒變的檔案下次不再讀內容；快取存在輸出目錄之外。"""
+        _src, fmap = self._src(config_dir, a="a: 1", b="b: 1")
+        out = Path(config_dir) / "out"
+        cache_file = assemble_config_dir.cache_path_for(out)
+        _backdate(*fmap.values())
+        cache = HashCache(cache_file, workers=4)
+        assemble_incremental(fmap, out, cache)
+        cache.save()
+        assert cache_file.parent == out.parent and cache_file.name.startswith(".")
+
+        hashed = []
+        real = assemble_config_dir._file_sha256
+        monkeypatch.setattr(assemble_config_dir, "_file_sha256",
+                            lambda p: hashed.append(p.name) or real(p))
+        warm = HashCache(cache_file, workers=4)
+        assert assemble_incremental(fmap, out, warm)["unchanged"] == ["a.yaml", "b.yaml"]
+        assert hashed == [] and warm.hits == 4
+
+    def test_fresh_mtimes_are_not_trusted(self, config_dir):
+        """racy window 內的 mtime 不寫入快取。"""
+        _src, fmap = self._src(config_dir, a="a: 1")
+        cache = HashCache(Path(config_dir) / "cache.json")
+        cache.digest(fmap["a.yaml"])
+        cache.save()
+        assert json.loads((Path(config_dir) / "cache.json").read_text(encoding="utf-8")) == {}
+
+    def test_swap_flips_symlink_and_carries_unchanged_inodes(self, config_dir):
+        """--swap：輸出是指向世代目錄的 symlink，未變動檔案跨世代保持同一 inode。"""
+        src, fmap = self._src(config_dir, a="a: 1", b="b: 1")
+        out = Path(config_dir) / "config-dir"
+        assemble_incremental(fmap, out, HashCache(), swap=True)
+        assert out.is_symlink()
+        gen1 = os.readlink(out)
+        ino_a = os.stat(out / "a.yaml").st_ino
+
+        noop = assemble_incremental(fmap, out, HashCache(), swap=True)
+        assert noop["written"] == [] and os.readlink(out) == gen1
+
+        _write_file(src / "b.yaml", "b: 2")
+        fmap["c.yaml"] = _write_file(src / "c.yaml", "c: 1")
+        result = assemble_incremental(fmap, out, HashCache(), swap=True)
+        assert result["written"] == ["b.yaml", "c.yaml"]
+        gen2 = os.readlink(out)
+        assert gen2 != gen1 and not (Path(config_dir) / gen1).exists()
+        assert os.stat(out / "a.yaml").st_ino == ino_a
+        assert (out / "b.yaml").read_text(encoding="utf-8") == "b: 2"
+        assert sorted(p.name for p in Path(config_dir).glob(".config-dir*")) == [gen2]
+
+    def test_swap_under_symlinked_parent_removes_old_generation(self, config_dir):
+        """輸出父目錄經 symlink 存取時，舊世代仍被清除（不每次洩漏一份）。"""
+        src, fmap = self._src(config_dir, a="a: 1")
+        real = Path(config_dir) / "real"
+        real.mkdir()
+        alias = Path(config_dir) / "alias"
+        alias.symlink_to(real)
+        out = alias / "config-dir"
+        for i in range(3):
+            _write_file(src / "a.yaml", f"a: {i + 2}")
+            assemble_incremental(fmap, out, HashCache(), swap=True)
+        assert [p.name for p in real.glob(".config-dir.*")] == [os.readlink(out)]
+
+    def test_swap_refuses_a_real_output_directory(self, config_dir):
+        """--swap 不覆蓋既有的實體目錄。"""
+        _src, fmap = self._src(config_dir, a="a: 1")
+        out = Path(config_dir) / "out"
+        out.mkdir()
+        with pytest.raises(NotADirectoryError, match="move it aside"):
+            assemble_incremental(fmap, out, HashCache(), swap=True)
+
+
 # ============================================================
 # validate_merged
 # ============================================================
@@ -405,6 +547,23 @@ class TestMainCLI:
         assert output["status"] == "ok"
         assert output["file_count"] == 2
 
+    @pytest.mark.skipif(sys.platform == "win32", reason="symlink creation")
+    def test_swap_json_reports_changes(self, config_dir, capsys, cli_argv):
+        """--swap --json 回報 written / unchanged / removed。"""
+        sources = self._setup_sources(config_dir)
+        out = Path(config_dir) / "output"
+        cli_argv("assemble", "--sources", sources, "--output", str(out), "--swap")
+        assert main() == 0
+        capsys.readouterr()
+        (Path(config_dir) / "team-b" / "db-b.yaml").unlink()
+        cli_argv("assemble", "--sources", sources, "--output", str(out),
+                 "--swap", "--json", "--validate")
+        assert main() == 0
+        output = json.loads(capsys.readouterr().out)
+        assert (output["written"], output["unchanged"], output["removed"]) == (
+            [], ["db-a.yaml"], ["db-b.yaml"])
+        assert out.is_symlink() and [p.name for p in out.iterdir()] == ["db-a.yaml"]
+
     def test_assemble_with_validate(self, config_dir, monkeypatch, cli_argv):
         """組裝模式含 --validate 檢查 YAML 有效性。"""
         sources = self._setup_sources(config_dir)
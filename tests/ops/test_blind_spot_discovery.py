@@ -3,8 +3,10 @@
 
 import json
 import os
+import re
 import sys
 import tempfile
+import urllib.error
 from unittest import mock
 from unittest.mock import patch
 
@@ -258,58 +260,117 @@ class TestCLI:
 # ── 7. query_prometheus_targets ───────────────────────────────────
 
 class TestQueryPrometheusTargets:
-    """query_prometheus_targets() 測試。"""
-
-    @patch("blind_spot_discovery.http_get_json")
-    def test_success(self, mock_http):
-        """正常回傳 targets。"""
-        mock_http.return_value = (
-            {
-                "status": "success",
-                "data": {
-                    "activeTargets": [
-                        {"labels": {"job": "mysqld", "instance": "10.0.0.1:9104",
-                                    "namespace": "db-a"}},
-                        {"labels": {"job": "redis", "instance": "10.0.0.2:9121",
-                                    "namespace": "db-b"}},
-                    ]
-                }
-            },
-            None,
-        )
+    """query_prometheus_targets() 測試（串流解析 activeTargets）。"""
+
+    @patch("blind_spot_discovery.iter_json_array")
+    def test_success(self, mock_stream):
+        """正常回傳 targets；只要 state=active。"""
+        mock_stream.return_value = iter([
+            {"labels": {"job": "mysqld", "instance": "10.0.0.1:9104",
+                        "namespace": "db-a"}},
+            {"labels": {"job": "redis", "instance": "10.0.0.2:9121",
+                        "namespace": "db-b"}},
+        ])
         result = bsd.query_prometheus_targets("http://prom:9090")
         assert len(result) == 2
         assert result[0]["job"] == "mysqld"
         assert result[1]["namespace"] == "db-b"
-
-    @patch("blind_spot_discovery.http_get_json")
-    def test_http_error(self, mock_http):
+        url, key = mock_stream.call_args[0]
+        assert url == "http://prom:9090/api/v1/targets?state=active"
+        assert key == "activeTargets"
+
+    @patch("blind_spot_discovery.iter_json_array")
+    def test_scrape_pool_filter(self, mock_stream):
+        """--scrape-pools 以 scrapePool= 在伺服器端過濾。"""
+        mock_stream.return_value = iter([])
+        bsd.query_prometheus_targets("http://prom:9090", "mysqld")
+        assert "scrapePool=mysqld" in mock_stream.call_args[0][0]
+
+    @patch("blind_spot_discovery.iter_json_array")
+    def test_http_error(self, mock_stream):
         """HTTP 錯誤回傳空列表。"""
-        mock_http.return_value = (None, "connection refused")
+        mock_stream.side_effect = urllib.error.URLError("connection refused")
         result = bsd.query_prometheus_targets("http://prom:9090")
         assert result == []
 
-    @patch("blind_spot_discovery.http_get_json")
-    def test_non_success_status(self, mock_http):
+    @patch("blind_spot_discovery.iter_json_array")
+    def test_non_success_status(self, mock_stream):
         """非 success 狀態回傳空列表。"""
-        mock_http.return_value = (
-            {"status": "error", "error": "bad query"},
-            None,
-        )
+        mock_stream.side_effect = ValueError("bad query")
         result = bsd.query_prometheus_targets("http://prom:9090")
         assert result == []
 
-    @patch("blind_spot_discovery.http_get_json")
-    def test_empty_targets(self, mock_http):
+    @patch("blind_spot_discovery.iter_json_array")
+    def test_empty_targets(self, mock_stream):
         """空 targets 回傳空列表。"""
-        mock_http.return_value = (
-            {"status": "success", "data": {"activeTargets": []}},
-            None,
-        )
+        mock_stream.return_value = iter([])
         result = bsd.query_prometheus_targets("http://prom:9090")
         assert result == []
 
 
+class TestQueryPrometheusSeries:
+    """--source series：count by (job, instance, namespace) (up)。"""
+
+    @patch("blind_spot_discovery.query_prometheus_instant")
+    def test_series_source(self, mock_query):
+        mock_query.return_value = ([
+            {"metric": {"job": "mysqld", "instance": "10.0.0.1:9104",
+                        "namespace": "db-a"}, "value": [0, "1"]},
+        ], None)
+        result = bsd.query_prometheus_series("http://prom:9090", ["mysqld", "pg.x"])
+        assert result[0]["instance"] == "10.0.0.1:9104"
+        promql = mock_query.call_args[0][1]
+        assert promql == 'count by (job, instance, namespace) (up{job=~"mysqld|pg\\\\.x"})'
+
+    @patch("blind_spot_discovery.query_prometheus_instant",
+           return_value=(None, "timeout"))
+    def test_series_error(self, _mock):
+        assert bsd.query_prometheus_series("http://prom:9090") == []
+
+
+class TestCollectLiveInstances:
+    """多個 Prometheus / federation endpoint 並行查詢並合併。"""
+
+    def test_shards_are_merged_and_deduplicated(self, monkeypatch):
+        shards = {
+            "http://a": [{"job": "mysqld", "instance": "i1", "namespace": "n"},
+                         {"job": "redis", "instance": "i2", "namespace": "n"}],
+            "http://b": [{"job": "mysqld", "instance": "i1", "namespace": "n"},
+                         {"job": "mysqld", "instance": "i3", "namespace": "n"}],
+        }
+        calls = []
+
+        def fake(url, pool=None):
+            calls.append((url, pool))
+            return shards[url]
+        monkeypatch.setattr(bsd, "iter_prometheus_targets", fake)
+        live, count = bsd.collect_live_instances(["http://a", "http://b"],
+                                                 scrape_pools=["p1", "p2"])
+        assert live == {"mariadb": {"n/i1", "n/i3"}, "redis": {"n/i2"}}
+        assert count == 8 and len(calls) == 4
+
+    def test_stream_error_drops_only_that_endpoint(self, monkeypatch, capsys):
+        """串流中途失敗 → 該 endpoint 以警告略過，其他 shard 照常合併。"""
+        def fake(url):
+            yield {"job": "redis", "instance": "i1", "namespace": "n"}
+            if url == "http://b":
+                raise ValueError("Truncated 'activeTargets' array")
+        monkeypatch.setattr(bsd, "iter_prometheus_targets", fake)
+        live, count = bsd.collect_live_instances(["http://a", "http://b"])
+        assert live == {"redis": {"n/i1"}} and count == 1
+        assert "Cannot read targets from http://b" in capsys.readouterr().err
+
+    def test_job_matcher_matches_in_map_order(self):
+        """預編譯 matcher 與逐一掃描 JOB_DB_MAP 的結果一致（最先列出的關鍵字勝出）。"""
+        jobs = ["mysqld", "prod-redis-mysql", "es-cluster", "kafka_pg", "prometheus",
+                "x/oracle/y", "MongoDB-Exporter", "db2.cluster"]
+        for job in jobs:
+            segments = set(re.split(r"[-_.\s/]+", job.lower()))
+            expected = bsd.JOB_DB_MAP.get(job.lower()) or next(
+                (db for kw, db in bsd.JOB_DB_MAP.items() if kw in segments), "unknown")
+            assert bsd._infer_db_type_from_job(job) == expected, job
+
+
 # ── 8. render_report 進階分支 ─────────────────────────────────────
 
 class TestRenderReportAdvanced:
@@ -361,7 +422,7 @@ class TestMainIntegration:
         cli_argv("blind_spot_discovery",
             "--config-dir", str(conf_dir),
             "--prometheus", "http://prom:9090")
-        monkeypatch.setattr(bsd, "query_prometheus_targets", lambda url: [
+        monkeypatch.setattr(bsd, "iter_prometheus_targets", lambda url: [
             {"job": "mysqld_exporter", "instance": "10.0.0.1:9104",
              "namespace": "db-a", "labels": {}},
         ])
@@ -381,7 +442,7 @@ class TestMainIntegration:
             "--config-dir", str(conf_dir),
             "--prometheus", "http://prom:9090",
             "--json-output")
-        monkeypatch.setattr(bsd, "query_prometheus_targets", lambda url: [])
+        monkeypatch.setattr(bsd, "iter_prometheus_targets", lambda url: [])
         bsd.main()
         out = capsys.readouterr().out
         data = json.loads(out)
@@ -399,7 +460,7 @@ class TestMainIntegration:
             "--config-dir", str(conf_dir),
             "--prometheus", "http://prom:9090",
             "--exclude-jobs", "prometheus,node-exporter")
-        monkeypatch.setattr(bsd, "query_prometheus_targets", lambda url: [
+        monkeypatch.setattr(bsd, "iter_prometheus_targets", lambda url: [
             {"job": "prometheus", "instance": "localhost:9090",
              "namespace": "monitoring", "labels": {}},
         ])
@@ -419,7 +480,7 @@ class TestMainIntegration:
         def mock_targets(url):
             captured_url.append(url)
             return []
-        monkeypatch.setattr(bsd, "query_prometheus_targets", mock_targets)
+        monkeypatch.setattr(bsd, "iter_prometheus_targets", mock_targets)
         bsd.main()
         assert captured_url[0] == "http://env-prom:9090"
 
@@ -440,6 +501,6 @@ class TestMainIntegration:
         def mock_targets(url):
             captured_url.append(url)
             return []
-        monkeypatch.setattr(bsd, "query_prometheus_targets", mock_targets)
+        monkeypatch.setattr(bsd, "iter_prometheus_targets", mock_targets)
         bsd.main()
         assert captured_url[0] == "http://localhost:9090"
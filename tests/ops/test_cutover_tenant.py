@@ -15,7 +15,8 @@ import cutover_tenant as ct
 # Fixtures
 # ---------------------------------------------------------------------------
 
-def _make_readiness(tmp, ready=True, pct=100.0, converged=5, total=5):
+def _make_readiness(tmp, ready=True, pct=100.0, converged=5, total=5,
+                    tenants=None):
     """Write a cutover-readiness.json and return its path."""
     data = {
         "ready": ready,
@@ -29,6 +30,8 @@ def _make_readiness(tmp, ready=True, pct=100.0, converged=5, total=5):
         "stability_window": 5,
         "recommendation": "Safe to cutover" if ready else "Not ready",
     }
+    if tenants is not None:
+        data["converged_tenants"] = tenants
     path = os.path.join(tmp, "cutover-readiness.json")
     with open(path, "w", encoding="utf-8") as fh:
         json.dump(data, fh)
@@ -242,6 +245,172 @@ class TestApplyCutover:
         assert report["failed_step"] == "load_readiness"
 
 
+# ---------------------------------------------------------------------------
+# TestWaveCutover
+# ---------------------------------------------------------------------------
+
+def _prom_counts(healthy):
+    """Fake http_get_json answering `count by (tenant)` for *healthy* tenants."""
+    def fake(url, **_kw):
+        if "/api/v2/alerts" in url:
+            return [{"labels": {"tenant": "t03", "alertname": "HighCPU",
+                                "migration_status": "shadow"}}], None
+        return {"data": {"result": [
+            {"metric": {"tenant": t}, "value": [0, "4"]}
+            for t in healthy if f"{t}" in ct.urllib.parse.unquote(url)]}}, None
+    return fake
+
+
+class TestWaveCutover:
+    """apply_wave_cutover() — one run for many converged tenants。"""
+
+    TENANTS = [f"t{i:02d}" for i in range(10)]
+
+    def test_wave_tenants_requires_converged_list(self):
+        """舊版 readiness（無 converged_tenants）無法跑 wave。"""
+        with pytest.raises(ValueError, match="converged_tenants"):
+            ct.wave_tenants({"ready": True})
+        with pytest.raises(ValueError, match="not converged"):
+            ct.wave_tenants({"converged_tenants": ["a"]}, ["a", "b"])
+        assert ct.wave_tenants({"converged_tenants": ["b", "a"]}) == ["a", "b"]
+
+    def test_run_dag_blocks_dependents_but_not_siblings(self):
+        """失敗節點擋住下游，不影響獨立分支。"""
+        ran = []
+
+        def node(name, ok=True):
+            return lambda: (ran.append(name) or ok, name)
+        outcome = ct.run_dag({
+            "a": ((), node("a")),
+            "b": (("a",), node("b", ok=False)),
+            "c": (("b",), node("c")),
+            "d": (("a",), node("d")),
+        }, workers=2)
+        assert outcome["b"][0] == "failed" and outcome["c"][0] == "blocked"
+        assert outcome["d"][0] == "ok" and "c" not in ran
+        with pytest.raises(ValueError, match="cycle"):
+            ct.run_dag({"x": (("y",), node("x")), "y": (("x",), node("y"))})
+
+    @mock.patch("cutover_tenant._run_kubectl", return_value=(True, "ok"))
+    def test_global_steps_once_and_batched_queries(self, kube):
+        """步驟 1–4 只跑一次；10 個 tenant 以 3 個批次查詢驗證。"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_readiness(tmp, tenants=self.TENANTS)
+            with mock.patch("cutover_tenant.http_get_json",
+                            side_effect=_prom_counts(self.TENANTS)) as get:
+                report = ct.apply_wave_cutover(path, "http://prom:9090",
+                                               verify_batch=4, workers=3)
+            assert report["success"], report["message"]
+            assert kube.call_count == 4
+            assert get.call_count == 3
+            assert report["tenants_verified"] == self.TENANTS
+            assert os.path.isfile(report["checkpoint"])
+
+    @mock.patch("cutover_tenant._run_kubectl", return_value=(True, "ok"))
+    def test_resume_skips_finished_steps_and_tenants(self, kube):
+        """失敗後重跑：已完成步驟與已驗證 tenant 不重做，只補驗失敗者。"""
+        healthy = [t for t in self.TENANTS if t != "t07"]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_readiness(tmp, tenants=self.TENANTS)
+            with mock.patch("cutover_tenant.http_get_json",
+                            side_effect=_prom_counts(healthy)):
+                first = ct.apply_wave_cutover(path, "http://prom:9090", verify_batch=4)
+            assert not first["success"] and not first["caller_error"]
+            assert list(first["tenants_failed"]) == ["t07"]
+            with mock.patch("cutover_tenant.http_get_json",
+                            side_effect=_prom_counts(self.TENANTS)) as get:
+                second = ct.apply_wave_cutover(path, "http://prom:9090", verify_batch=4)
+            assert second["success"]
+            assert kube.call_count == 4
+            assert get.call_count == 1 and second["tenants_resumed"] == 9
+
+    @mock.patch("cutover_tenant._run_kubectl", return_value=(True, "ok"))
+    def test_second_wave_does_not_inherit_completed_checkpoint(self, kube):
+        """第一波成功後 checkpoint 標記 completed；第二波（不同 tenant）重新跑完全部步驟。"""
+        wave2 = [f"u{i:02d}" for i in range(4)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_readiness(tmp, tenants=self.TENANTS)
+            with mock.patch("cutover_tenant.http_get_json",
+                            side_effect=_prom_counts(self.TENANTS)):
+                first = ct.apply_wave_cutover(path, "http://prom:9090")
+            assert first["success"]
+            assert ct.load_wave_checkpoint(first["checkpoint"])["status"] == "completed"
+            path = _make_readiness(tmp, tenants=wave2)
+            with mock.patch("cutover_tenant.http_get_json",
+                            side_effect=_prom_counts(["u01", "u02", "u03"])) as get:
+                second = ct.apply_wave_cutover(path, "http://prom:9090")
+            assert kube.call_count == 8 and get.call_count == 1
+            assert second["tenants_resumed"] == 0
+            assert list(second["tenants_failed"]) == ["u00"] and not second["success"]
+
+    @mock.patch("cutover_tenant._run_kubectl", return_value=(True, "ok"))
+    def test_unfinished_checkpoint_of_another_wave_is_refused(self, kube):
+        """未完成的 checkpoint 屬於另一個 wave → caller-error，不執行任何步驟。"""
+        healthy = [t for t in self.TENANTS if t != "t07"]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_readiness(tmp, tenants=self.TENANTS)
+            with mock.patch("cutover_tenant.http_get_json",
+                            side_effect=_prom_counts(healthy)):
+                first = ct.apply_wave_cutover(path, "http://prom:9090")
+            assert not first["success"]
+            report = ct.apply_wave_cutover(path, "http://prom:9090",
+                                           tenants=["t01", "t02"])
+            assert report["failed_step"] == "load_checkpoint" and report["caller_error"]
+            assert "different readiness JSON or tenant list" in report["message"]
+            assert kube.call_count == 4
+
+    @mock.patch("cutover_tenant._run_kubectl",
+                side_effect=[(True, "ok"), (False, "forbidden"), (True, "ok"),
+                             (True, "ok"), (True, "ok")])
+    def test_step_failure_blocks_verification_then_resumes(self, kube):
+        """第二步失敗 → 驗證不執行；重跑從第二步接續。"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_readiness(tmp, tenants=self.TENANTS)
+            with mock.patch("cutover_tenant.http_get_json",
+                            side_effect=_prom_counts(self.TENANTS)) as get:
+                first = ct.apply_wave_cutover(path, "http://prom:9090")
+                assert first["failed_step"] == "Remove old Recording Rules"
+                assert get.call_count == 0 and not first["tenants_verified"]
+                second = ct.apply_wave_cutover(path, "http://prom:9090")
+            assert second["success"] and kube.call_count == 5
+
+    @mock.patch("cutover_tenant._run_kubectl", return_value=(True, "ok"))
+    def test_alertmanager_shadow_alerts_fail_tenant(self, _kube):
+        """仍經 shadow route 的 alert 讓該 tenant 驗證失敗。"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_readiness(tmp, tenants=self.TENANTS)
+            with mock.patch("cutover_tenant.http_get_json",
+                            side_effect=_prom_counts(self.TENANTS)):
+                report = ct.apply_wave_cutover(
+                    path, "http://prom:9090", alertmanager_url="http://am:9093")
+            assert list(report["tenants_failed"]) == ["t03"]
+            assert "HighCPU" in report["tenants_failed"]["t03"]
+
+    @mock.patch("cutover_tenant._run_kubectl", return_value=(True, "ok"))
+    def test_unreachable_prometheus_is_caller_error(self, _kube):
+        """Prometheus 無法連線 = caller-error，tenant 留待重跑。"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_readiness(tmp, tenants=self.TENANTS)
+            with mock.patch("cutover_tenant.http_get_json",
+                            return_value=(None, "connection refused")):
+                report = ct.apply_wave_cutover(path, "http://prom:9090")
+            assert report["caller_error"]
+            assert report["failed_step"] == "Verify tenant health"
+            assert len(report["tenants_failed"]) == 10
+
+    def test_dry_run_writes_no_checkpoint(self):
+        """Dry-run 不讀寫 checkpoint。"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _make_readiness(tmp, tenants=self.TENANTS)
+            report = ct.apply_wave_cutover(path, "http://prom:9090", dry_run=True)
+            assert report["success"] and report["checkpoint"] is None
+            assert os.listdir(tmp) == ["cutover-readiness.json"]
+
+    def test_tenant_regex_is_quoted_for_promql(self):
+        """tenant 名稱中的 regex 特殊字元被跳脫，且字串可安全放入 PromQL 雙引號。"""
+        assert ct._tenant_regex(["db.a", "db-b"]) == "db\\\\.a|db\\\\-b"
+
+
 # ---------------------------------------------------------------------------
 # TestCLI
 # ---------------------------------------------------------------------------
@@ -304,6 +473,19 @@ class TestCLI:
         assert args.json_output
         assert args.namespace == "custom-ns"
 
+    def test_parser_wave_flags(self):
+        """--wave 與 --tenant 互斥；wave 旗標正確解析。"""
+        parser = ct.build_parser()
+        args = parser.parse_args([
+            "--readiness-json", "r.json", "--wave", "--tenants", "a,b",
+            "--workers", "8", "--checkpoint", "cp.json",
+        ])
+        assert args.wave and args.tenant is None
+        assert args.workers == 8 and args.checkpoint == "cp.json"
+        with pytest.raises(SystemExit):
+            parser.parse_args(["--readiness-json", "r.json", "--wave",
+                               "--tenant", "db-a"])
+
     def test_parser_missing_required(self):
         """缺失必要引數時退出。"""
         parser = ct.build_parser()
@@ -10,6 +10,7 @@ import yaml
 
 from _lib_exitcodes import EXIT_CALLER_ERROR  # noqa: E402
 from da_assembler import (  # noqa: E402
+    METRICS,
     _content_sha256,
     _output_filename,
     _signal_handler,
@@ -310,6 +311,24 @@ class TestReconcileOne:
             reconcile_one(cr, Path(d), api=mock_api)
 
 
+    def test_metrics_count_results(self):
+        """每次 reconcile 依結果計數並記錄耗時。"""
+        results = METRICS.get("da_assembler_reconcile_total")
+        latency = METRICS.get("da_assembler_reconcile_duration_seconds")
+        before = {r: results.labels(r).value for r in ("rendered", "unchanged", "error")}
+        observed = latency.count
+        with tempfile.TemporaryDirectory() as d:
+            cr = _make_cr(name="metrics-test")
+            reconcile_one(cr, Path(d))
+            reconcile_one(cr, Path(d))
+            with mock.patch("da_assembler.render_cr_to_yaml", side_effect=ValueError("x")):
+                reconcile_one(cr, Path(d))
+        after = {r: results.labels(r).value - before[r] for r in before}
+        assert after == {"rendered": 1, "unchanged": 1, "error": 1}
+        assert latency.count == observed + 3
+        assert 'da_assembler_reconcile_total{result="unchanged"}' in METRICS.render()
+
+
 class TestRunOnce:
     """run_once() 測試。"""
 
@@ -66,6 +66,31 @@ class TestParsePrometheusText:
         assert result["topic"] == {"orders", "events"}
 
 
+class TestScanExposition:
+    def test_streams_binary_response(self):
+        """Parses while reading a /metrics response (line iterator), one pass."""
+        import io
+        body = textwrap.dedent("""\
+            # TYPE pg_stat_database_xact_commit counter
+            pg_stat_database_xact_commit{datname="prod",instance="db:9187"} 10
+            pg_stat_database_xact_commit{datname="stage",instance="db:9187"} 3
+            pg_up 1
+        """).encode()
+        labels, db_type, count = dim.scan_exposition(io.BufferedReader(io.BytesIO(body)))
+        assert labels == {"datname": {"prod", "stage"}}
+        assert db_type == "pg"
+        assert count == 3
+
+    def test_db_type_ignores_label_values(self):
+        """db_type comes from metric names, not a label value that contains a prefix."""
+        raw = 'custom_metric{schema="pg_catalog"} 1\n'
+        assert dim.scan_exposition(raw)[1] == "unknown"
+
+    def test_escaped_label_values(self):
+        raw = 'm{schema="a\\"b"} 1\n'
+        assert dim.parse_prometheus_text(raw) == {"schema": {'a"b'}}
+
+
 # ---------------------------------------------------------------------------
 # detect_db_type
 # ---------------------------------------------------------------------------
@@ -174,7 +199,7 @@ class TestQueryPrometheusLabelValues:
         assert any("/api/v1/label/schema/values" in u for u in urls)
 
     def test_series_dict_path_still_collects(self, monkeypatch):
-        """有 matcher → /api/v1/series（回 label-set dict 列表）路徑照舊收值。"""
+        """有 matcher 時回 label-set dict 列表（series 形狀）也照舊收值。"""
         def mock_get(url, timeout=10):
             return {"status": "success",
                     "data": [{"__name__": "m", "schema": "sales"},
@@ -217,6 +242,77 @@ class TestQueryPrometheusLabelValues:
             assert qs["match[]"] == ['{instance="oracle prod:9161"}']
 
 
+    def test_label_values_api_with_match_and_limit(self, monkeypatch):
+        """每個候選標籤一個 label/values 查詢，帶 match[] 與 limit（不再拉整份 series）。"""
+        urls: list[str] = []
+
+        def mock_get(url, timeout=10):
+            urls.append(url)
+            return {"status": "success", "data": []}, None
+
+        monkeypatch.setattr(dim, "http_get_json", mock_get)
+        dim.query_prometheus_label_values("http://prom:9090", job="oracle",
+                                          max_values=50)
+        assert len(urls) == len(dim.PARTITION_LABEL_CANDIDATES)
+        for url in urls:
+            parsed = urllib.parse.urlparse(url)
+            assert parsed.path.startswith("/api/v1/label/")
+            qs = urllib.parse.parse_qs(parsed.query)
+            assert qs == {"match[]": ['{job="oracle"}'], "limit": ["51"]}
+
+    def test_values_past_the_cap_mark_label_truncated(self, monkeypatch):
+        monkeypatch.setattr(dim, "http_get_json", lambda url, timeout=10: (
+            {"status": "success", "data": [f"ts{i}" for i in range(6)]}, None))
+        values = dim.query_prometheus_label_values(
+            "http://prom:9090", instance="db:1", max_values=5)["tablespace"]
+        assert len(values) == 5 and values.truncated
+
+
+# ---------------------------------------------------------------------------
+# Bounded distinct values (HyperLogLog past the cap)
+# ---------------------------------------------------------------------------
+class TestDistinctValues:
+    def test_exact_below_cap(self):
+        values = dim.DistinctValues(10, ["a", "b", "a"])
+        assert values == {"a", "b"}
+        assert values.cardinality == 2 and not values.truncated
+
+    @pytest.mark.parametrize("n", [1_500, 100_000])
+    def test_estimate_past_cap_is_close_and_memory_bounded(self, n):
+        values = dim.DistinctValues(1000, (f"TS_{i}" for i in range(n)))
+        assert len(values) == 1000 and values.truncated
+        assert abs(values.cardinality - n) / n < 0.05
+
+    def test_scan_caps_values_and_ranking_uses_estimate(self):
+        """10k tablespace 的 exporter：只留 cap 個值，但排名仍看到 >200 的基數。"""
+        raw = "".join(f'oracledb_tablespace_used{{tablespace="T{i}",schema="S{i % 3}"}} 1\n'
+                      for i in range(10_000))
+        labels, db_type, count = dim.scan_exposition(raw, max_values=100)
+        assert count == 10_000 and db_type == "oracledb"
+        assert len(labels["tablespace"]) == 100
+        assert labels["tablespace"].cardinality > 9_000
+        ranked = dim.rank_partition_labels(labels)
+        assert [name for name, _v, _s in ranked] == ["schema", "tablespace"]
+
+    def test_main_refines_truncated_label_from_tsdb_stats(self, monkeypatch, capsys):
+        def mock_get(url, timeout=10):
+            if "/api/v1/status/tsdb" in url:
+                return {"status": "success", "data": {"labelValueCountByLabelName": [
+                    {"name": "tablespace", "value": 100_000}]}}, None
+            if "/api/v1/label/tablespace/" in url:
+                return {"status": "success", "data": [f"T{i}" for i in range(11)]}, None
+            return {"status": "success", "data": []}, None
+
+        monkeypatch.setattr(dim, "http_get_json", mock_get)
+        rc = dim.main(["--prometheus", "http://prom:9090", "--instance", "db:1",
+                       "--max-values", "10", "--json"])
+        assert rc == 0
+        captured = capsys.readouterr()
+        doc = json.loads(captured.out)
+        assert len(doc["instance_tenant_mapping"]["db:1"]) == 10
+        assert "tablespace: ~100000 values" in captured.err
+
+
 # ---------------------------------------------------------------------------
 # CLI main (unit-level)
 # ---------------------------------------------------------------------------
@@ -311,3 +311,59 @@ class TestCLI:
         assert rc == 0
         err = capsys.readouterr().err
         assert "ghost" in err
+
+
+# ===========================================================================
+# --simulate (batch routing through the compiled route tree)
+# ===========================================================================
+
+class TestSimulate:
+    def _alerts(self, d):
+        return _write(d, "alerts.yaml", {"alerts": [
+            {"tenant": "db-a", "alertname": "X", "severity": "critical",
+             "metric_group": "cpu"},
+            {"tenant": "db-a", "alertname": "X", "severity": "warning",
+             "metric_group": "cpu"},
+            {"tenant": "ghost", "alertname": "X"},
+        ]})
+
+    def test_simulate_from_config_dir(self, full_config, capsys, tmp_path):
+        """由 conf.d 產生設定後批次路由，severity dedup 抑制 warning。"""
+        rc = main(["--config-dir", full_config, "--simulate",
+                   self._alerts(str(tmp_path)), "--json"])
+        assert rc == 0
+        data = json.loads(capsys.readouterr().out)
+        assert len(data) == 3
+        assert data[0]["receivers"] == ["tenant-db-a"]
+        assert data[1]["inhibited"] is True
+        assert data[2]["receivers"] == ["default"]
+
+    def test_simulate_text_output(self, full_config, capsys, tmp_path):
+        rc = main(["--config-dir", full_config, "--simulate",
+                   self._alerts(str(tmp_path))])
+        assert rc == 0
+        out = capsys.readouterr().out
+        assert 'severity="critical", tenant="db-a"} → tenant-db-a' in out
+        assert "inhibited by inhibit_rules[" in out
+        assert "3 alert(s), 1 inhibited" in out
+
+    def test_simulate_rendered_configmap(self, capsys, tmp_path):
+        """--alertmanager-config 可直接模擬已渲染的 ConfigMap，免 --config-dir。"""
+        am = {"route": {"receiver": "root", "routes": [
+            {"matchers": ['tenant="db-a"'], "receiver": "a"}]}}
+        cm = _write(str(tmp_path), "cm.yaml", {
+            "kind": "ConfigMap", "data": {"alertmanager.yml": yaml.safe_dump(am)}})
+        rc = main(["--alertmanager-config", cm, "--simulate",
+                   self._alerts(str(tmp_path)), "--json"])
+        assert rc == 0
+        data = json.loads(capsys.readouterr().out)
+        assert [r["receivers"] for r in data] == [["a"], ["a"], ["root"]]
+
+    def test_simulate_bad_alerts_file(self, full_config, tmp_path):
+        bad = _write(str(tmp_path), "bad.yaml", {"alerts": "nope"})
+        rc = main(["--config-dir", full_config, "--simulate", bad])
+        assert rc == EXIT_CALLER_ERROR
+
+    def test_alertmanager_config_requires_simulate(self, tmp_path):
+        with pytest.raises(SystemExit):
+            main(["--alertmanager-config", str(tmp_path / "x.yaml")])
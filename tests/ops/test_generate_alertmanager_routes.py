@@ -331,6 +331,204 @@ class TestGenerateInhibitRules:
         assert len(warnings) == 2
 
 
+class TestConsolidatedInhibitRules:
+    """generate_inhibit_rules(mode="consolidated") 與 per-tenant 等價性測試。"""
+
+    DEDUP = {"db-a": "enable", "db-b": "disable", "db.c": "disable", "db-d": "enable"}
+
+    def test_single_rule_pins_enabled_tenants(self):
+        """一條 equal: [tenant, metric_group] 規則，兩側都只比對啟用 dedup 的租戶。"""
+        rules, warnings = generate_inhibit_rules(self.DEDUP, mode="consolidated")
+        assert rules == [{
+            "source_matchers": ['severity="critical"', 'metric_group=~".+"',
+                                'tenant=~"db-a|db-d"'],
+            "target_matchers": ['severity="warning"', 'metric_group=~".+"',
+                                'tenant=~"db-a|db-d"'],
+            "equal": ["tenant", "metric_group"],
+        }]
+        assert any("2 per-tenant inhibit rule(s) -> 1" in w for w in warnings)
+
+    def test_all_disabled_emits_nothing(self):
+        rules, _ = generate_inhibit_rules({"db-a": "disable"}, mode="consolidated")
+        assert rules == []
+
+    def test_equivalent_to_per_tenant_form(self):
+        from generate_alertmanager_routes import find_inhibit_equivalence_gaps
+        per_tenant, _ = generate_inhibit_rules(self.DEDUP)
+        consolidated, _ = generate_inhibit_rules(self.DEDUP, mode="consolidated")
+        assert find_inhibit_equivalence_gaps(per_tenant, consolidated, self.DEDUP) == []
+
+    @pytest.mark.parametrize("mutate", [
+        # tenant pin widened to any tenant → dedups db-b / db.c and alerts
+        # whose tenant names no configured tenant
+        lambda r: {**r, "source_matchers": [*r["source_matchers"][:2], 'tenant=~".+"'],
+                   "target_matchers": [*r["target_matchers"][:2], 'tenant=~".+"']},
+        # disabled tenants excluded, unconfigured ones still deduped (the
+        # previous consolidated shape)
+        lambda r: {**r, "source_matchers": [*r["source_matchers"][:2], 'tenant=~".+"'],
+                   "target_matchers": [*r["target_matchers"][:2], 'tenant=~".+"',
+                                       'tenant!~"db-b|db[.]c"']},
+        # drops tenant from equal → a critical in db-a inhibits db-d's warning
+        lambda r: {**r, "equal": ["metric_group"]},
+        # drops metric_group from equal → cross-metric-group suppression
+        lambda r: {**r, "equal": ["tenant"]},
+    ])
+    def test_equivalence_check_catches_drift(self, mutate):
+        from generate_alertmanager_routes import (
+            assert_inhibit_rules_equivalent, find_inhibit_equivalence_gaps)
+        per_tenant, _ = generate_inhibit_rules(self.DEDUP)
+        consolidated, _ = generate_inhibit_rules(self.DEDUP, mode="consolidated")
+        broken = [mutate(consolidated[0])]
+        assert find_inhibit_equivalence_gaps(per_tenant, broken, self.DEDUP)
+        with pytest.raises(ValueError, match="not equivalent"):
+            assert_inhibit_rules_equivalent(per_tenant, broken, self.DEDUP)
+
+    def test_gating_and_watchdog_invariants_hold(self):
+        from generate_alertmanager_routes import (
+            assert_equal_labels_gated, assert_platform_alerts_not_tenant_silenceable,
+            assert_watchdog_inhibit_immunity)
+        rules, _ = generate_inhibit_rules(self.DEDUP, mode="consolidated")
+        assert_equal_labels_gated(rules)
+        assert_watchdog_inhibit_immunity(rules)
+        assert_platform_alerts_not_tenant_silenceable(rules)
+
+    def test_regex_unsafe_enabled_tenant_falls_back(self):
+        dedup = {"db-a": "enable", "db(b)": "enable"}
+        rules, warnings = generate_inhibit_rules(dedup, mode="consolidated")
+        assert rules == generate_inhibit_rules(dedup)[0]
+        assert any("regex-safe" in w for w in warnings)
+
+    def test_regex_unsafe_disabled_tenant_does_not_matter(self):
+        dedup = {"db-a": "enable", "db(b)": "disable"}
+        rules, _ = generate_inhibit_rules(dedup, mode="consolidated")
+        assert len(rules) == 1 and 'tenant=~"db-a"' in rules[0]["target_matchers"]
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError, match="unknown inhibit mode"):
+            generate_inhibit_rules({}, mode="bogus")
+
+
+class TestShardedRouteTree:
+    """generate_routes(route_mode="sharded") 與 flat route tree 等價性測試。"""
+
+    @staticmethod
+    def _configs():
+        configs = {}
+        for i in range(20):
+            # 偶數 tenant 共用同一 receiver（可合併），奇數各自獨立
+            url = "https://shared.example.com" if i % 2 == 0 else f"https://t{i}.example.com"
+            configs[f"db-{i:02d}"] = make_routing_config(url=url)
+        configs["db-03"]["overrides"] = [make_override()]
+        configs["db-05"]["group_wait"] = "1m"
+        configs["db.dot"] = make_routing_config(url="https://dot.example.com")
+        return configs
+
+    def test_shared_routes_and_shards(self):
+        """共用設定的 tenant 合併成一條 shared route，其餘切成 shard。"""
+        routes, receivers, warnings = generate_routes(self._configs(), route_mode="sharded")
+        shared = [r for r in routes if r.get("receiver", "").startswith("tenant-shared-")]
+        assert len(shared) == 1
+        assert shared[0]["matchers"] == [
+            'tenant=~"' + "|".join(f"db-{i:02d}" for i in range(0, 20, 2)) + '"']
+        shards = [r for r in routes if "routes" in r]
+        assert shards and all(r["continue"] is False and "receiver" not in r for r in shards)
+        children = [c for r in shards for c in r["routes"]]
+        # override sub-route 仍排在該 tenant 主 route 之前
+        db03 = [c["receiver"] for c in children if c["matchers"][0] == 'tenant="db-03"']
+        assert db03 == ["tenant-db-03-override-0", "tenant-db-03"]
+        assert any("db[.]dot" in r["matchers"][0] for r in shards)
+        # 每個 tenant 的 receiver 仍保留（custom-alert 子 route 依賴）
+        names = {r["name"] for r in receivers}
+        assert {f"tenant-db-{i:02d}" for i in range(20)} <= names
+        assert any("route tree sharded" in w for w in warnings)
+
+    def _renamed(self):
+        """合併租戶的 tenant-<name> → tenant-shared-<digest> 宣告。"""
+        from generate_alertmanager_routes import _build_sharded_tenant_routes, _build_tenant_routes
+        t_routes, t_recv, _ = _build_tenant_routes(self._configs())
+        return _build_sharded_tenant_routes(t_routes, t_recv)[2]
+
+    def test_renames_only_collapsed_tenants(self):
+        renamed = self._renamed()
+        assert set(renamed) == {f"tenant-db-{i:02d}" for i in range(0, 20, 2)}
+        assert len(set(renamed.values())) == 1
+
+    def test_shared_receiver_name_ignores_member_set(self):
+        """digest 只取 receiver 設定 + timing，增減成員不改名。"""
+        from generate_alertmanager_routes import _build_sharded_tenant_routes, _build_tenant_routes
+
+        def shared(n):
+            configs = {f"t{i}": make_routing_config(url="https://shared.example.com")
+                       for i in range(n)}
+            t_routes, t_recv, _ = _build_tenant_routes(configs)
+            return set(_build_sharded_tenant_routes(t_routes, t_recv)[2].values())
+
+        assert shared(3) == shared(5)
+
+    def test_equivalent_to_flat_tree(self):
+        from generate_alertmanager_routes import find_route_equivalence_gaps
+        enforced = make_enforced_routing()
+        flat, flat_recv, _ = generate_routes(self._configs(), enforced_routing=enforced)
+        sharded, sharded_recv, _ = generate_routes(
+            self._configs(), enforced_routing=enforced, route_mode="sharded")
+        assert sharded[0] == flat[0]  # enforced route 仍在最前
+        assert find_route_equivalence_gaps(flat, flat_recv, sharded, sharded_recv,
+                                           self._renamed()) == []
+        # 未宣告 rename 時，receiver 名稱改變即為差異
+        assert find_route_equivalence_gaps(flat, flat_recv, sharded, sharded_recv)
+
+    @pytest.mark.parametrize("mutate", [
+        # shard 改用 prefix regex → 第一個 shard 接走其他 shard 的 tenant，
+        # 找不到子 route 時由 shard 本身（無 receiver）處理
+        lambda routes: [{**r, "matchers": ['tenant=~"db-.*"']} if "routes" in r else r
+                        for r in routes],
+        # 弄丟 override sub-route
+        lambda routes: [{**r, "routes": [c for c in r["routes"]
+                                         if "override" not in c["receiver"]]}
+                        if "routes" in r else r for r in routes],
+        # shared route 指向錯誤 receiver
+        lambda routes: [{**r, "receiver": "tenant-db-01"}
+                        if r.get("receiver", "").startswith("tenant-shared-") else r
+                        for r in routes],
+        # shared route 指向設定相同、名稱不同的 receiver（只比設定時抓不到）
+        lambda routes: [{**r, "receiver": "tenant-db-00"}
+                        if r.get("receiver", "").startswith("tenant-shared-") else r
+                        for r in routes],
+    ])
+    def test_equivalence_check_catches_drift(self, mutate):
+        from generate_alertmanager_routes import (
+            assert_routes_equivalent, find_route_equivalence_gaps)
+        flat, flat_recv, _ = generate_routes(self._configs())
+        sharded, sharded_recv, _ = generate_routes(self._configs(), route_mode="sharded")
+        broken = mutate(sharded)
+        renamed = self._renamed()
+        assert find_route_equivalence_gaps(flat, flat_recv, broken, sharded_recv, renamed)
+        with pytest.raises(ValueError, match="not equivalent"):
+            assert_routes_equivalent(flat, flat_recv, broken, sharded_recv, renamed=renamed)
+
+    def test_custom_alert_children_survive_sharding(self):
+        """#1092：sharded tree 仍為每個 tenant 產生 custom-alert 子 route。"""
+        from _grar_render import _inject_custom_alert_isolation
+        configs = self._configs()
+        flat, flat_recv, _ = generate_routes(configs)
+        sharded, sharded_recv, _ = generate_routes(configs, route_mode="sharded")
+        custom = lambda rs: next(r for r in rs if 'component="custom"' in r["matchers"])  # noqa: E731
+        assert custom(_inject_custom_alert_isolation(sharded, sharded_recv)[0]) == \
+            custom(_inject_custom_alert_isolation(flat, flat_recv)[0])
+
+    def test_explicit_shard_size_balances(self):
+        from generate_alertmanager_routes import _build_sharded_tenant_routes, _build_tenant_routes
+        configs = {f"t{i:02d}": make_routing_config(url=f"https://t{i}.example.com")
+                   for i in range(10)}
+        t_routes, t_recv, _ = _build_tenant_routes(configs)
+        routes, _recv, _renamed, _ = _build_sharded_tenant_routes(t_routes, t_recv, shard_size=4)
+        assert [len(r["routes"]) for r in routes] == [3, 3, 4]
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError, match="unknown route mode"):
+            generate_routes({}, route_mode="bogus")
+
+
 class TestTenantPlaceholder:
     """{{tenant}} 佔位符處理測試。"""
 
@@ -50,10 +50,13 @@ EXPECTED_REEXPORTS: dict[str, tuple[str, ...]] = {
         "_extract_host",
         "_validate_profile_refs",
         "assert_equal_labels_gated",  # #1132 equal-label-gated invariant
+        # consolidated severity-dedup inhibits ≡ per-tenant form
+        "assert_inhibit_rules_equivalent",
         # tenant-triggered inhibit must not suppress a platform alert
         "assert_platform_alerts_not_tenant_silenceable",
         "assert_watchdog_inhibit_immunity",
         "check_domain_policies",
+        "find_inhibit_equivalence_gaps",
         "find_tenant_silenceable_platform_inhibits",
         "find_ungated_equal_label_inhibits",  # #1132 finder
         "find_watchdog_suppressing_inhibits",
@@ -75,11 +78,20 @@ EXPECTED_REEXPORTS: dict[str, tuple[str, ...]] = {
         "_parse_tenant_overrides",
         "load_tenant_configs",
     ),
+    "_grar_simulate": (
+        # sharded route tree delivers like the flat form
+        "assert_routes_equivalent",
+        "find_route_equivalence_gaps",
+    ),
     "_grar_routes": (
+        "INHIBIT_MODES",
+        "ROUTE_MODES",
+        "_build_consolidated_inhibit_rules",
         "_build_enforced_routes",
         "_build_inhibit_rules",
         "_build_override_matchers",
         "_build_override_route",
+        "_build_sharded_tenant_routes",
         "_build_custom_alert_routes",
         "_build_watchdog_route",
         "_build_synthetic_probe_route",
@@ -101,6 +113,7 @@ EXPECTED_REEXPORTS: dict[str, tuple[str, ...]] = {
         "apply_to_configmap",
         "assemble_configmap",
         "load_base_config",
+        "merge_into_base",
         "render_output",
     ),
 }
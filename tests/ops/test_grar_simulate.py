@@ -0,0 +1,230 @@
+"""Unit tests for _grar_simulate.py (compiled route-tree + inhibit engine).
+
+涵蓋：
+- RouteTree: first-match / continue / 父節點兜底 / 設定繼承 / legacy match
+- equality index 與線性掃描結果一致
+- InhibitIndex: equal 標籤、缺值視為 ""、雙邊匹配排除
+- simulate_alerts / load_alerts / load_alertmanager_config
+- 產生的 sharded 與 flat 設定模擬結果一致
+"""
+import os
+import random
+import sys
+
+import pytest
+import yaml
+
+from factories import make_routing_config
+
+_REPO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(_REPO, "scripts", "tools", "ops"))
+
+from _grar_simulate import (  # noqa: E402
+    InhibitIndex,
+    RouteTree,
+    load_alertmanager_config,
+    load_alerts,
+    simulate_alerts,
+)
+from _grar_validate import _compile_matcher  # noqa: E402
+from generate_alertmanager_routes import (  # noqa: E402
+    generate_routes,
+    merge_into_base,
+)
+
+
+def _receivers(tree, labels):
+    return [d["receiver"] for d in tree.resolve(labels)]
+
+
+def _linear_resolve(route, labels, inherited=None):
+    """Reference walk without indexing — a straight port of the dispatcher."""
+    settings = {**(inherited or {}),
+                **{k: route[k] for k in ("receiver", "group_by") if k in route}}
+    out = []
+    for child in route.get("routes") or []:
+        matchers = [_compile_matcher(m) for m in child.get("matchers") or []]
+        if all(m.matches(labels) for m in matchers):
+            out.extend(_linear_resolve(child, labels, settings) or
+                       [{**settings, **{k: child[k] for k in ("receiver", "group_by")
+                                       if k in child}}])
+            if not child.get("continue"):
+                break
+    return out
+
+
+ROOT = {
+    "receiver": "default",
+    "group_by": ["alertname"],
+    "routes": [
+        {"matchers": ['severity="page"'], "receiver": "noc", "continue": True},
+        {"matchers": ['tenant="db-a"'], "receiver": "db-a",
+         "group_by": ["alertname", "tenant"],
+         "routes": [
+             {"matchers": ['alertname="Disk"'], "receiver": "db-a-disk"},
+         ]},
+        {"matchers": ['tenant=~"db-[bc]"'], "receiver": "db-bc"},
+        {"matchers": ['tenant="db-a"'], "receiver": "shadowed"},
+    ],
+}
+
+
+class TestRouteTree:
+    """Alertmanager dispatcher 語意。"""
+
+    def test_first_match_wins(self):
+        """第一個匹配的 child 勝出，後面同 matcher 的 route 被遮蔽。"""
+        assert _receivers(RouteTree(ROOT), {"tenant": "db-a"}) == ["db-a"]
+
+    def test_continue_keeps_walking(self):
+        """continue: true 的 route 匹配後仍繼續往下。"""
+        got = _receivers(RouteTree(ROOT), {"tenant": "db-b", "severity": "page"})
+        assert got == ["noc", "db-bc"]
+
+    def test_parent_handles_when_children_miss(self):
+        """子 route 全部不匹配時由父 route 自行處理，並帶 path。"""
+        got = RouteTree(ROOT).resolve({"tenant": "db-a", "alertname": "CPU"})
+        assert [d["path"] for d in got] == ["route.routes[1]"]
+
+    def test_settings_inherited(self):
+        """receiver 以外的 group_by 由父層繼承。"""
+        got = RouteTree(ROOT).resolve({"tenant": "db-a", "alertname": "Disk"})
+        assert got[0]["receiver"] == "db-a-disk"
+        assert got[0]["group_by"] == ["alertname", "tenant"]
+        assert got[0]["path"] == "route.routes[1].routes[0]"
+
+    def test_root_fallback(self):
+        """沒有任何 child 匹配時落到 root receiver。"""
+        got = RouteTree(ROOT).resolve({"tenant": "nobody"})
+        assert got == [{"receiver": "default", "group_by": ["alertname"], "path": "route"}]
+
+    def test_legacy_match_maps(self):
+        """legacy match / match_re 與 matchers 同等處理。"""
+        tree = RouteTree({"receiver": "r", "routes": [
+            {"match": {"tenant": "db-a"}, "receiver": "a"},
+            {"match_re": {"tenant": "db-.*"}, "receiver": "any"},
+        ]})
+        assert _receivers(tree, {"tenant": "db-a"}) == ["a"]
+        assert _receivers(tree, {"tenant": "db-z"}) == ["any"]
+
+    def test_invalid_matcher_raises(self):
+        """無法解析的 matcher / regex 與 Alertmanager 一樣拒絕。"""
+        with pytest.raises(ValueError, match="route.routes\\[0\\]"):
+            RouteTree({"routes": [{"matchers": ['tenant=~"("']}]})
+        with pytest.raises(ValueError):
+            RouteTree({"routes": [{"matchers": ["not a matcher"]}]})
+
+    def test_index_agrees_with_linear_scan(self):
+        """equality index 的結果必須與逐一掃描完全一致。"""
+        rng = random.Random(7)
+        routes = []
+        for i in range(200):
+            m = [f'tenant="t{i % 60}"']
+            if i % 7 == 0:
+                m = [f'tenant=~"t{i % 60}|t{(i + 1) % 60}"']
+            if i % 5 == 0:
+                m.append('severity="critical"')
+            routes.append({"matchers": m, "receiver": f"r{i}",
+                           "continue": i % 3 == 0})
+        root = {"receiver": "root", "routes": routes}
+        tree = RouteTree(root)
+        for _ in range(500):
+            labels = {"tenant": f"t{rng.randrange(70)}"}
+            if rng.random() < 0.5:
+                labels["severity"] = rng.choice(["critical", "warning"])
+            want = [d["receiver"] for d in _linear_resolve(root, labels)] or ["root"]
+            assert _receivers(tree, labels) == want
+
+
+class TestInhibitIndex:
+    RULES = [
+        {"source_matchers": ['severity="critical"'],
+         "target_matchers": ['severity="warning"'],
+         "equal": ["alertname", "tenant"]},
+    ]
+
+    def test_equal_labels(self):
+        """只有 equal 標籤相同的 source 才抑制 target。"""
+        alerts = [
+            {"alertname": "X", "tenant": "a", "severity": "critical"},
+            {"alertname": "X", "tenant": "a", "severity": "warning"},
+            {"alertname": "X", "tenant": "b", "severity": "warning"},
+        ]
+        assert InhibitIndex(self.RULES).inhibitors(alerts) == [None, 0, None]
+
+    def test_missing_equal_label_is_empty(self):
+        """equal 標籤缺值視為 ""，兩邊都缺時仍相等。"""
+        alerts = [{"alertname": "X", "severity": "critical"},
+                  {"alertname": "X", "severity": "warning"}]
+        assert InhibitIndex(self.RULES).inhibitors(alerts) == [None, 0]
+
+    def test_two_sided_exclusion(self):
+        """同時匹配兩側的 alert 不會被同樣匹配兩側的 source 抑制。"""
+        rules = [{"source_matchers": ['team="x"'], "target_matchers": ['team="x"'],
+                  "equal": []}]
+        alerts = [{"team": "x", "n": "1"}, {"team": "x", "n": "2"}]
+        assert InhibitIndex(rules).inhibitors(alerts) == [None, None]
+
+    def test_legacy_map_form(self):
+        """legacy source_match / target_match 形式亦可。"""
+        rules = [{"source_match": {"severity": "critical"},
+                  "target_match": {"severity": "warning"}, "equal": ["tenant"]}]
+        alerts = [{"tenant": "a", "severity": "critical"},
+                  {"tenant": "a", "severity": "warning"}]
+        assert InhibitIndex(rules).inhibitors(alerts) == [None, 0]
+
+
+class TestSimulateAlerts:
+    def test_result_shape(self):
+        """每筆結果帶 receivers / routes / inhibited_by。"""
+        config = {"route": ROOT, "inhibit_rules": TestInhibitIndex.RULES}
+        out = simulate_alerts(config, [
+            {"alertname": "Disk", "tenant": "db-a", "severity": "critical"},
+            {"alertname": "Disk", "tenant": "db-a", "severity": "warning"},
+        ])
+        assert out[0]["receivers"] == ["db-a-disk"]
+        assert out[0]["inhibited"] is False
+        assert out[1]["inhibited_by"] == "inhibit_rules[0]"
+
+    def test_sharded_matches_flat(self):
+        """sharded 與 flat 產生的設定對同一批 alert 的模擬結果一致。"""
+        configs = {f"t{i:02d}": make_routing_config(url=f"https://h.example.com/{i % 3}")
+                   for i in range(30)}
+        alerts = [{"tenant": t, "alertname": "A"} for t in list(configs) + ["zz"]]
+
+        def receiver_configs(mode):
+            routes, receivers, _ = generate_routes(configs, route_mode=mode)
+            cfg = merge_into_base({"route": {"receiver": "default"}, "receivers": []},
+                                  routes, receivers, [])
+            by_name = {r["name"]: {k: v for k, v in r.items() if k != "name"}
+                       for r in cfg["receivers"]}
+            return [[by_name.get(r) for r in res["receivers"]]
+                    for res in simulate_alerts(cfg, alerts)]
+
+        assert receiver_configs("sharded") == receiver_configs("flat")
+
+
+class TestLoaders:
+    def test_load_alerts_forms(self, tmp_path):
+        """接受 label map 清單、API alert 形式與 alerts: 包裝。"""
+        p = tmp_path / "a.yaml"
+        p.write_text(yaml.safe_dump({"alerts": [
+            {"tenant": "a", "code": 500},
+            {"labels": {"tenant": "b"}, "annotations": {"x": "y"}},
+        ]}))
+        assert load_alerts(str(p)) == [{"tenant": "a", "code": "500"}, {"tenant": "b"}]
+
+    def test_load_alerts_rejects_garbage(self, tmp_path):
+        p = tmp_path / "a.yaml"
+        p.write_text(yaml.safe_dump({"alerts": ["nope"]}))
+        with pytest.raises(ValueError, match="alerts\\[0\\]"):
+            load_alerts(str(p))
+
+    def test_load_configmap(self, tmp_path):
+        """ConfigMap 包裝會被解開成 alertmanager.yml。"""
+        p = tmp_path / "cm.yaml"
+        p.write_text(yaml.safe_dump({
+            "kind": "ConfigMap",
+            "data": {"alertmanager.yml": yaml.safe_dump({"route": {"receiver": "r"}})},
+        }))
+        assert load_alertmanager_config(str(p)) == {"route": {"receiver": "r"}}
@@ -17,6 +17,8 @@
 
 import itertools
 import os
+import re
+import subprocess
 import tempfile
 
 import pytest
@@ -571,3 +573,148 @@ def test_lint_result_no_rule_name():
     """測試 LintResult 無規則名稱。"""
     r = lint_custom_rules.LintResult("test.yaml", None, None, "ERROR", "msg")
     assert str(r) == "ERROR: test.yaml - msg"
+
+
+# ── Compiled policy / large rule repos ───────────────────────────
+
+def _naive_expr_findings(expr, policy):
+    """Reference: each deny-list entry checked on its own, no gate, no cache."""
+    out = []
+    for func in policy.get("denied_functions", []):
+        if re.search(r"\b" + re.escape(func) + r"\s*\(", expr):
+            out.append(f"denied function '{func}' in expr")
+    for pat in policy.get("denied_patterns", []):
+        if re.search(lint_custom_rules._denied_pattern_regex(pat), expr):
+            out.append(f"denied pattern '{pat}' in expr")
+    return out
+
+
+@pytest.mark.parametrize("expr", [
+    "holt_winters(x[5m], .1, .1) + predict_linear(y[1h], 60)",
+    "quantile_over_time (0.9, x[5m]) and sum without ( tenant ) (z)",
+    'a{job=~".*"} unless b{i=~ ".*"}',
+    "my_predict_linear_metric > 0",
+    "rate(x[5m])",
+])
+def test_compiled_gate_matches_per_entry_checks(policy, expr):
+    """合併 gate 只是加速：逐項結果與未編譯逐一比對完全相同（含順序）。"""
+    got = [r.message for r in lint_custom_rules.lint_expr(expr, policy, "f", "r")
+           if "range vector" not in r.message]
+    assert got == _naive_expr_findings(expr, policy)
+
+
+def test_expr_findings_cached_per_policy(policy):
+    """同一 (expr, policy) 只算一次；policy 內容不同 → 不共用結果。"""
+    lint_custom_rules._expr_findings.cache_clear()
+    for _ in range(3):
+        lint_custom_rules.lint_expr("predict_linear(x[2h], 1)", policy, "f", "r")
+    info = lint_custom_rules._expr_findings.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+    relaxed = dict(policy, denied_functions=[], max_range_duration="96h")
+    assert lint_custom_rules.lint_expr("predict_linear(x[2h], 1)", relaxed, "f", "r") == []
+    assert lint_custom_rules.compile_policy(dict(policy)) is \
+        lint_custom_rules.compile_policy(policy)
+
+
+def _write_rule_files(root, n):
+    for i in range(n):
+        expr = "predict_linear(x[2h], 1)" if i % 3 == 0 else "rate(x[5m])"
+        (root / f"r{i:03d}.yaml").write_text(
+            "groups:\n- name: g\n  rules:\n"
+            f"  - alert: A{i}\n    expr: '{expr}'\n    labels: {{tenant: t}}\n",
+            encoding="utf-8")
+    return lint_custom_rules.collect_files([str(root)])
+
+
+def test_lint_files_parallel_matches_serial(tmp_path, policy, monkeypatch):
+    """process pool 與循序逐檔輸出完全一致（順序、內容、規則數）。"""
+    files = _write_rule_files(tmp_path, 12)
+    (tmp_path / "r005.yaml").write_text("groups: [\n", encoding="utf-8")
+    monkeypatch.setattr(lint_custom_rules, "_PARALLEL_MIN_FILES", 2)
+
+    def flat(out):
+        return [([str(r) for r in results], count) for results, count in out]
+
+    serial = flat(lint_custom_rules.lint_files(files, policy, workers=1))
+    assert flat(lint_custom_rules.lint_files(files, policy, workers=3)) == serial
+    assert "YAML parse error" in serial[5][0][0]
+
+
+def test_yaml_error_text_independent_of_loader(tmp_path, policy, monkeypatch):
+    """libyaml 拒收的檔案以純 Python loader 重解析 → 錯誤訊息與無 libyaml 時相同。"""
+    bad = tmp_path / "bad.yaml"
+    bad.write_text("groups:\n- name: g\n  rules: [\n", encoding="utf-8")
+    fast, _ = lint_custom_rules.lint_file(str(bad), policy)
+    monkeypatch.setattr(lint_custom_rules, "_HAS_CSAFE_LOADER", False)
+    slow, _ = lint_custom_rules.lint_file(str(bad), policy)
+    assert [str(r) for r in fast] == [str(r) for r in slow]
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, timeout=30,
+                   env={**os.environ, "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@t",
+                        "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@t"})
+
+
+def test_select_changed(tmp_path, monkeypatch):
+    """--changed-only：只留相對 base 有變動的檔；policy 變動或 git 失敗 → 全掃。"""
+    rules = tmp_path / "rules"
+    rules.mkdir()
+    files = _write_rule_files(rules, 4)
+    policy_file = tmp_path / "policy.yaml"
+    policy_file.write_text("{}\n", encoding="utf-8")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-qm", "base")
+    monkeypatch.chdir(tmp_path)
+
+    (rules / "r002.yaml").write_text("groups: []\n", encoding="utf-8")
+    (rules / "r001.yaml").unlink()
+    files = [f for f in files if os.path.exists(f)]
+    assert lint_custom_rules.select_changed(files, "HEAD") == [str(rules / "r002.yaml")]
+
+    policy_file.write_text("denied_functions: []\n", encoding="utf-8")
+    assert lint_custom_rules.select_changed(files, "HEAD", str(policy_file)) == files
+    assert lint_custom_rules.select_changed(files, "no-such-ref") == files
+
+
+def test_select_changed_includes_untracked_files(tmp_path, monkeypatch):
+    """新增且尚未 git add 的規則檔也算變動，不能被 --changed-only 略過。"""
+    files = _write_rule_files(tmp_path, 2)
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-qm", "base")
+    new = tmp_path / "new.yaml"
+    new.write_text("groups: []\n", encoding="utf-8")
+    (tmp_path / ".gitignore").write_text("ignored.yaml\n", encoding="utf-8")
+    (tmp_path / "ignored.yaml").write_text("groups: []\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    candidates = [*files, str(new), str(tmp_path / "ignored.yaml")]
+    assert lint_custom_rules.select_changed(candidates, "HEAD") == [str(new)]
+
+
+def test_select_changed_outside_cwd_repo_lints_all(tmp_path, monkeypatch, capsys):
+    """cwd 是另一個 repo 時交集必為空 → 退回全掃，而非什麼都不 lint 就通過。"""
+    other = tmp_path / "other"
+    other.mkdir()
+    _git(other, "init", "-q")
+    _git(other, "commit", "-q", "--allow-empty", "-m", "base")
+    rules = tmp_path / "rules"
+    rules.mkdir()
+    files = _write_rule_files(rules, 2)
+    monkeypatch.chdir(other)
+    assert lint_custom_rules.select_changed(files, "HEAD") == files
+    assert "outside the git repository" in capsys.readouterr().err
+
+
+def test_import_skips_process_pool_and_subprocess():
+    """A serial lint without --changed never loads the pool or subprocess."""
+    import sys
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); import lint_custom_rules; "
+            "print(sorted(m for m in ('concurrent.futures.process', 'subprocess') "
+            "if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code,
+                          os.path.dirname(lint_custom_rules.__file__)],
+                         capture_output=True, text=True, timeout=60, check=True)
+    assert out.stdout.strip() == "[]"
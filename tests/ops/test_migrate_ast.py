@@ -832,3 +832,50 @@ def test_suppress_no_prefix_pairing():
     # v1.2.0: 驗證 metric_group label（不再檢查 PromQL 修改）
     warn_labels = results[0].alert_rules[0]["labels"]
     assert warn_labels["metric_group"] == "connections"
+
+
+# ============================================================
+# 大型規則庫: 表達式摘要快取 + process pool
+# ============================================================
+
+@pytest.mark.parametrize("raw,want", [
+    ("a  >\n  1", "a > 1"),
+    ('x{q="p  q"}\n  > 1', 'x{q="p  q"} > 1'),      # 字串內空白保留
+    ("y{q='u  v'}  > 2", "y{q='u  v'} > 2"),
+    ("x # note\n > 1", "x # note\n > 1"),             # 含註解: 只 strip
+])
+def test_normalize_expr(raw, want):
+    """正規化只收斂字串外的空白。"""
+    assert migrate_rule.normalize_expr(raw) == want
+
+
+@requires_ast
+def test_distinct_expr_parsed_once(monkeypatch):
+    """同一表達式 (含空白差異) 在多條規則間只 parse 一次。"""
+    calls = []
+    real_parse = migrate_rule.promql_parser.parse
+    monkeypatch.setattr(migrate_rule.promql_parser, "parse",
+                        lambda e: calls.append(e) or real_parse(e))
+    migrate_rule._summarize.cache_clear()
+    migrate_rule._rewrite_prefix.cache_clear()
+    migrate_rule._rewrite_tenant_label.cache_clear()
+    for i, expr in enumerate(['rate(unique_once_total{q="a"}[5m]) > 3',
+                              'rate(unique_once_total{q="a"}[5m])\n  > 3']):
+        migrate_rule.process_rule({"alert": f"A{i}", "expr": expr})
+    lhs = 'rate(unique_once_total{q="a"}[5m])'
+    assert calls.count(lhs) == 1
+
+
+def test_process_rules_parallel_matches_serial(monkeypatch):
+    """workers > 1 的結果與逐條 process_rule 相同，且保持輸入順序。"""
+    monkeypatch.setattr(migrate_rule, "_PARALLEL_MIN_RULES", 1)
+    rules = [{"record": "r", "expr": "x"}]
+    for i in range(40):
+        expr = ["m_total > 5", 'q_depth{queue="a"} > 1', "absent(up)",
+                "(a / b) * 100 > 90"][i % 4]
+        rules.append({"alert": f"A{i}", "expr": expr,
+                      "labels": {"severity": "critical" if i % 3 else "warning"}})
+    serial = migrate_rule.process_rules(rules, dictionary={}, workers=1)
+    parallel = migrate_rule.process_rules(rules, dictionary={}, workers=2)
+    assert [r.alert_name for r in parallel] == [f"A{i}" for i in range(40)]
+    assert [vars(r) for r in parallel] == [vars(r) for r in serial]
@@ -18,6 +18,7 @@ import yaml
 import offboard_tenant  # noqa: E402
 import deprecate_rule  # noqa: E402
 import validate_migration  # noqa: E402
+from _lib_dependency_index import load_index  # noqa: E402
 
 
 # ===================================================================
@@ -62,26 +63,38 @@ def test_find_config_file_not_found():
 
 
 # ===================================================================
-# 2. offboard_tenant — check_cross_references
+# 2. offboard_tenant — cross references (DependencyIndex.mentions)
 # ===================================================================
 
-def test_check_cross_references_no_cross_ref():
+def test_mentions_no_cross_ref():
     """測試無交叉引用。"""
-    configs = {
-        "db-a.yaml": {"path": "/x/db-a.yaml", "data": {"tenants": {"db-a": {"m": 1}}}},
-        "db-b.yaml": {"path": "/x/db-b.yaml", "data": {"tenants": {"db-b": {"m": 2}}}},
-    }
-    refs = offboard_tenant.check_cross_references("db-a", configs)
-    assert refs == []
+    with tempfile.TemporaryDirectory() as d:
+        make_confdir(d, {
+            "db-a.yaml": {"tenants": {"db-a": {"m": 1}}},
+            "db-b.yaml": {"tenants": {"db-b": {"m": 2}}},
+        })
+        assert load_index(d).mentions("db-a") == ["db-a.yaml"]
 
-def test_check_cross_references_found_cross_ref():
-    """測試發現交叉引用。"""
-    configs = {
-        "db-a.yaml": {"path": "/x/db-a.yaml", "data": {"tenants": {"db-a": {"m": 1}}}},
-        "db-b.yaml": {"path": "/x/db-b.yaml", "data": {"note": "depends on db-a"}},
-    }
-    refs = offboard_tenant.check_cross_references("db-a", configs)
-    assert "db-b.yaml" in refs
+def test_mentions_found_cross_ref():
+    """測試發現交叉引用（整個名稱比對，非子字串）。"""
+    with tempfile.TemporaryDirectory() as d:
+        make_confdir(d, {
+            "db-a.yaml": {"tenants": {"db-a": {"m": 1}}},
+            "db-b.yaml": {"note": "depends on db-a"},
+            "db-c.yaml": {"note": "depends on db-ab"},
+        })
+        assert load_index(d).mentions("db-a") == ["db-a.yaml", "db-b.yaml"]
+
+def test_run_precheck_reports_cross_ref():
+    """run_precheck 列出引用此 tenant 的其他檔案，並排除自己的設定檔。"""
+    with tempfile.TemporaryDirectory() as d:
+        make_confdir(d, {
+            "db-a.yaml": {"tenants": {"db-a": {"m": 1}}},
+            "db-b.yaml": {"note": "depends on db-a"},
+        })
+        can_proceed, report = offboard_tenant.run_precheck("db-a", d)
+        assert can_proceed is True
+        assert "   → db-b.yaml" in report and "   → db-a.yaml" not in report
 
 
 # ===================================================================
@@ -299,6 +312,40 @@ def test_remove_from_tenants_skips_defaults():
             "mysql_connections", d, execute=True)
         assert len(removed) == 0
 
+def test_remove_from_tenants_opens_only_indexed_candidates(monkeypatch):
+    """只開啟索引中帶有該 key 的檔案。"""
+    with tempfile.TemporaryDirectory() as d:
+        monkeypatch.setenv("DA_DEPENDENCY_INDEX_CACHE", os.path.join(d, ".cache"))
+        make_confdir(d, {
+            "db-a.yaml": {"tenants": {"db-a": {"mysql_connections": 70}}},
+            "db-b.yaml": {"tenants": {"db-b": {"redis_memory": 80}}},
+            "db-c.yaml": {"tenants": {"db-c": {'mysql_connections{db="x"}': 5}}},
+        })
+        opened = []
+        real = deprecate_rule.load_yaml_file
+        monkeypatch.setattr(deprecate_rule, "load_yaml_file",
+                            lambda p: opened.append(os.path.basename(p)) or real(p))
+        removed = deprecate_rule.remove_from_tenants(
+            "mysql_connections", d, execute=True)
+        assert opened == ["db-a.yaml", "db-c.yaml"]
+        assert [r[0] for r in removed] == ["db-a.yaml", "db-c.yaml"]
+        assert deprecate_rule.scan_for_metric("mysql_connections", d) == []
+
+def test_main_lists_alerts_referencing_the_threshold(monkeypatch, capsys):
+    """Step 3 列出引用該閾值的 Alert。"""
+    import sys as _sys
+    packs = os.path.join(os.path.dirname(__file__), "..", "..", "rule-packs")
+    with tempfile.TemporaryDirectory() as d:
+        monkeypatch.setenv("DA_DEPENDENCY_INDEX_CACHE", "off")
+        make_confdir(d, {"_defaults.yaml": {"defaults": {"mysql_connections": 80}}})
+        monkeypatch.setattr(_sys, "argv", [
+            "deprecate_rule.py", "mysql_connections", "--config-dir", d,
+            "--rule-packs-dir", packs])
+        deprecate_rule.main()
+    out = capsys.readouterr().out
+    assert "tenant:alert_threshold:mysql_connections ← " in out
+    assert "MariaDBHighConnections" in out
+
 
 # ===================================================================
 # 8. validate_migration — extract_value_map
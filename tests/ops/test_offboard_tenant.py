@@ -51,58 +51,57 @@ class TestFindConfigFile:
 
 
 # ---------------------------------------------------------------------------
-# load_all_configs
+# run_precheck — directory scan (via the dependency index)
 # ---------------------------------------------------------------------------
-class TestLoadAllConfigs:
-    def test_loads_multiple_files(self, tmp_path):
+class TestPrecheckScan:
+    def test_counts_every_config_file(self, tmp_path):
         configs = {
             "db-a.yaml": {"tenants": {"db-a": {"mysql_connections": "80"}}},
             "db-b.yaml": {"tenants": {"db-b": {"pg_connections": "100"}}},
         }
         d = _make_config_dir(tmp_path, configs)
-        result = ot.load_all_configs(d)
-        assert len(result) == 2
-        assert "db-a.yaml" in result
-        assert "db-b.yaml" in result
+        _, report = ot.run_precheck("db-a", d)
+        assert "(2 個檔案)" in "\n".join(report)
 
     def test_skips_dotfiles(self, tmp_path):
         d = tmp_path / "conf.d"
         d.mkdir()
-        (d / ".hidden.yaml").write_text("hidden: true\n")
+        (d / ".hidden.yaml").write_text("note: db-a\n")
         (d / "db-a.yaml").write_text("tenants:\n  db-a:\n    x: '1'\n")
-        result = ot.load_all_configs(str(d))
-        assert len(result) == 1
-        assert ".hidden.yaml" not in result
+        _, report = ot.run_precheck("db-a", str(d))
+        report_text = "\n".join(report)
+        assert "(1 個檔案)" in report_text
+        assert ".hidden.yaml" not in report_text
 
     def test_empty_directory(self, tmp_path):
         d = tmp_path / "conf.d"
         d.mkdir()
-        result = ot.load_all_configs(str(d))
-        assert len(result) == 0
+        can_proceed, report = ot.run_precheck("db-a", str(d))
+        assert can_proceed is False
+        assert "(0 個檔案)" in "\n".join(report)
 
-    def test_invalid_yaml_handled(self, tmp_path):
+    def test_invalid_yaml_handled(self, tmp_path, capsys):
         d = tmp_path / "conf.d"
         d.mkdir()
         (d / "bad.yaml").write_text("this: is: not: valid: yaml: {{{\n")
-        (d / "good.yaml").write_text("tenants:\n  db-a:\n    x: '1'\n")
-        result = ot.load_all_configs(str(d))
-        # bad.yaml may fail to load, but good.yaml should succeed
-        assert "good.yaml" in result
+        (d / "db-a.yaml").write_text("tenants:\n  db-a:\n    x: '1'\n")
+        _, report = ot.run_precheck("db-a", str(d))
+        assert "無法讀取 bad.yaml" in capsys.readouterr().out
+        assert "(1 個檔案)" in "\n".join(report)
 
 
 # ---------------------------------------------------------------------------
-# check_cross_references
+# run_precheck — cross references (whole-name matches)
 # ---------------------------------------------------------------------------
-class TestCheckCrossReferences:
+class TestPrecheckCrossReferences:
     def test_no_references(self, tmp_path):
         configs = {
             "db-a.yaml": {"tenants": {"db-a": {"mysql_connections": "80"}}},
             "db-b.yaml": {"tenants": {"db-b": {"pg_connections": "100"}}},
         }
         d = _make_config_dir(tmp_path, configs)
-        all_configs = ot.load_all_configs(d)
-        refs = ot.check_cross_references("db-a", all_configs)
-        assert refs == []
+        _, report = ot.run_precheck("db-a", d)
+        assert "✅ 無跨檔案引用" in report
 
     def test_found_reference(self, tmp_path):
         configs = {
@@ -110,48 +109,52 @@ class TestCheckCrossReferences:
             "_defaults.yaml": {"inherit_from": "db-a"},
         }
         d = _make_config_dir(tmp_path, configs)
-        all_configs = ot.load_all_configs(d)
-        refs = ot.check_cross_references("db-a", all_configs)
-        assert "_defaults.yaml" in refs
+        _, report = ot.run_precheck("db-a", d)
+        assert "   → _defaults.yaml" in report
 
     def test_skips_own_file(self, tmp_path):
         configs = {
             "db-a.yaml": {"tenants": {"db-a": {"note": "db-a config"}}},
         }
         d = _make_config_dir(tmp_path, configs)
-        all_configs = ot.load_all_configs(d)
-        refs = ot.check_cross_references("db-a", all_configs)
-        assert refs == []
+        _, report = ot.run_precheck("db-a", d)
+        assert "✅ 無跨檔案引用" in report
+
+    def test_substring_is_not_a_reference(self, tmp_path):
+        configs = {
+            "db-a.yaml": {"tenants": {"db-a": {"mysql_connections": "80"}}},
+            "db-b.yaml": {"tenants": {"db-b": {"note": "see db-ab and xdb-a"}}},
+        }
+        d = _make_config_dir(tmp_path, configs)
+        _, report = ot.run_precheck("db-a", d)
+        assert "✅ 無跨檔案引用" in report
 
 
 # ---------------------------------------------------------------------------
 # get_tenant_metrics
 # ---------------------------------------------------------------------------
 class TestGetTenantMetrics:
-    def test_returns_metrics(self, tmp_path):
+    def test_returns_metrics(self):
         configs = {
             "db-a.yaml": {"tenants": {"db-a": {"mysql_connections": "80", "mysql_threads_running": "75"}}},
         }
-        d = _make_config_dir(tmp_path, configs)
-        all_configs = ot.load_all_configs(d)
+        all_configs = {name: {"path": name, "data": data} for name, data in configs.items()}
         metrics = ot.get_tenant_metrics("db-a", all_configs)
         assert metrics == {"mysql_connections": "80", "mysql_threads_running": "75"}
 
-    def test_returns_empty_for_missing_tenant(self, tmp_path):
+    def test_returns_empty_for_missing_tenant(self):
         configs = {
             "db-a.yaml": {"tenants": {"db-a": {"mysql_connections": "80"}}},
         }
-        d = _make_config_dir(tmp_path, configs)
-        all_configs = ot.load_all_configs(d)
+        all_configs = {name: {"path": name, "data": data} for name, data in configs.items()}
         metrics = ot.get_tenant_metrics("db-x", all_configs)
         assert metrics == {}
 
-    def test_returns_empty_for_no_tenants_key(self, tmp_path):
+    def test_returns_empty_for_no_tenants_key(self):
         configs = {
             "_defaults.yaml": {"some_key": "value"},
         }
-        d = _make_config_dir(tmp_path, configs)
-        all_configs = ot.load_all_configs(d)
+        all_configs = {name: {"path": name, "data": data} for name, data in configs.items()}
         metrics = ot.get_tenant_metrics("db-a", all_configs)
         assert metrics == {}
 
@@ -200,6 +203,36 @@ class TestRunPrecheck:
         assert "mysql_connections" in report_text
         assert "2 個" in report_text
 
+    def test_lists_dependencies(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("DA_DEPENDENCY_INDEX_CACHE", str(tmp_path / "cache"))
+        configs = {
+            "db-a.yaml": {"tenants": {"db-a": {"_routing_profile": "team-sre"}}},
+            "_routing_profiles.yaml": {"routing_profiles": {"team-sre": {}}},
+            "_instance_mapping.yaml": {"instance_tenant_mapping": {
+                "oracle-01": [{"tenant": "db-a"}]}},
+            "db-ab.yaml": {"tenants": {"db-ab": {"note": "db-ab"}}},
+        }
+        d = _make_config_dir(tmp_path, configs)
+        _, report = ot.run_precheck("db-a", d)
+        report_text = "\n".join(report)
+        assert "routing profile: team-sre (_routing_profiles.yaml) [db-a.yaml]" in report_text
+        assert "instance mapping: oracle-01 [_instance_mapping.yaml]" in report_text
+        assert "→ _instance_mapping.yaml" in report_text
+        assert "→ db-ab.yaml" not in report_text      # a name, not a substring
+
+    def test_unchanged_files_are_not_reparsed(self, tmp_path, monkeypatch):
+        import _lib_dependency_index as di
+        monkeypatch.setenv(di.CACHE_ENV, str(tmp_path / "cache"))
+        d = _make_config_dir(tmp_path, {
+            f"db-{i}.yaml": {"tenants": {f"db-{i}": {"m": "1"}}} for i in range(5)})
+        for name in os.listdir(d):
+            os.utime(os.path.join(d, name), (1_600_000_000, 1_600_000_000))
+        ot.run_precheck("db-0", d)
+        di.clear_memo()
+        monkeypatch.setattr(di, "_parse", lambda raw, key: pytest.fail("re-parsed"))
+        can_proceed, _ = ot.run_precheck("db-0", d)
+        assert can_proceed is True
+
 
 # ---------------------------------------------------------------------------
 # execute_offboard
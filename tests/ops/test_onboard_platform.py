@@ -499,6 +499,19 @@ class TestAnalyzeRuleFiles:
         candidates, _, summary = analyze_rule_files([path])
         assert summary["alert_rules"] == 1
 
+    def test_process_pool_matches_serial(self, config_dir):
+        """workers > 1 依檔案順序合併，結果與循序分析相同。"""
+        paths = []
+        for i in range(3):
+            content = yaml.dump({"groups": [{"name": f"g{i}", "rules": [
+                {"alert": f"A{i}", "expr": f"m{i}_total > {i + 1}",
+                 "labels": {"severity": "warning"}},
+                {"record": f"r{i}", "expr": f"sum(m{i}_total)"},
+            ]}]})
+            paths.append(write_yaml(config_dir, f"r{i}.yaml", content))
+        paths.append("/nonexistent/rules.yaml")
+        assert analyze_rule_files(paths, workers=2) == analyze_rule_files(paths)
+
 
 class TestGenerateDefaultsFromCandidates:
     """從候選值產生預設值。"""
@@ -852,6 +865,13 @@ class TestWriteMigrationCsv:
         assert len(rows) == 1
         assert rows[0]["alert_name"] == "HighCPU"
 
+    def test_no_candidates_writes_header_only(self, config_dir):
+        """無候選規則時仍輸出表頭。"""
+        path = os.path.join(config_dir, "plan.csv")
+        write_migration_csv([], path)
+        with open(path, encoding="utf-8") as f:
+            assert f.read().startswith("alert_name,file,group,")
+
 
 # ============================================================
 # Phase 3: Scrape Config Analysis
@@ -10,6 +10,7 @@
   6. run_cmd() — 指令執行
 """
 
+import pathlib
 from unittest import mock
 
 import pytest
@@ -554,3 +555,125 @@ class TestMainCLI:
             pc.main()
         out = capsys.readouterr().out
         assert "Success" in out
+
+
+# ---------------------------------------------------------------------------
+# batch mode
+# ---------------------------------------------------------------------------
+
+_MULTI = {
+    "metadata": {"resourceVersion": "41"},
+    "data": {
+        "_defaults.yaml": "defaults:\n  cpu: 70\n",
+        "db-a.yaml": "tenants:\n  db-a:\n    cpu: '80'\n",
+        "db-b.yaml": "tenants:\n  db-b:\n    mem: '60'\n",
+    },
+}
+_CHANGES = [("db-a", "cpu", "90"), ("db-b", "mem", "default"),
+            ("db-c", "cpu", "disable"), ("db-a", "cpu", "95")]
+
+
+def _changeset(tmp_path, text):
+    path = tmp_path / "changes.yaml"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+class TestBatch:
+    """load_changeset() / apply_changeset() / apply_batch() 測試。"""
+
+    def test_load_changeset_keeps_file_order(self, tmp_path):
+        path = _changeset(tmp_path, "tenants:\n  db-b:\n    x: 1\n  db-a:\n"
+                                    "    'q{db=\"0\"}': disable\n    y: default\n")
+        assert pc.load_changeset(path) == [
+            ("db-b", "x", "1"), ("db-a", 'q{db="0"}', "disable"), ("db-a", "y", "default")]
+
+    @pytest.mark.parametrize("text", [
+        "", "- a\n", "tenants: {}\n", "tenants:\n  db-a: 5\n", "tenants:\n  db-a:\n    x:\n",
+    ])
+    def test_malformed_changeset_is_caller_error(self, tmp_path, text):
+        with pytest.raises(SystemExit) as exc:
+            pc.load_changeset(_changeset(tmp_path, text))
+        assert exc.value.code == 2
+
+    @pytest.mark.parametrize("mode,cm", [
+        ("multi-file", _MULTI),
+        ("legacy", {"data": {"config.yaml": yaml.dump(
+            {"defaults": {"cpu": 70}, "tenants": {"db-a": {"cpu": "80"}, "db-b": {"mem": "60"}}})}}),
+    ])
+    def test_batch_equals_sequential_single_patches(self, mode, cm):
+        seq = {"data": dict(cm["data"])}
+        seq_diffs = []
+        for tenant, key, value in _CHANGES:
+            seq_diffs.append(pc.diff_preview(seq, mode, tenant, key, value))
+            fn = pc.patch_legacy if mode == "legacy" else pc.patch_multifile
+            seq["data"].update(fn(seq, tenant, key, value)["data"])
+
+        diffs, patch_data = pc.apply_changeset(cm, mode, _CHANGES)
+        assert diffs == seq_diffs
+        assert {**cm["data"], **patch_data} == seq["data"]
+        assert all(cm["data"].get(k) != v for k, v in patch_data.items())
+        assert diffs[3]["before"]["state"] == "custom: 90"    # sees edit #1
+
+    def test_noop_edits_are_not_patched(self):
+        _diffs, patch_data = pc.apply_changeset(_MULTI, "multi-file", [("db-a", "cpu", "80")])
+        assert patch_data == {}
+
+    @mock.patch("patch_config.subprocess.run")
+    @mock.patch("patch_config.run_cmd")
+    def test_one_read_one_patch_with_resource_version(self, mock_get, mock_run, capsys):
+        import json
+        mock_get.return_value = json.dumps(_MULTI)
+        sent = []
+        mock_run.side_effect = lambda cmd, **kw: sent.append(
+            json.loads(pathlib.Path(cmd[-1]).read_text(encoding="utf-8"))) or mock.Mock(
+                returncode=0, stderr="")
+        pc.apply_batch(_CHANGES)
+        assert mock_get.call_count == 1 and len(sent) == 1
+        assert sent[0]["metadata"] == {"resourceVersion": "41"}
+        assert sorted(sent[0]["data"]) == ["db-a.yaml", "db-b.yaml", "db-c.yaml"]
+        assert "Success" in capsys.readouterr().out
+
+    @mock.patch("patch_config.subprocess.run")
+    @mock.patch("patch_config.run_cmd")
+    def test_conflict_rereads_and_retries(self, mock_get, mock_run, capsys):
+        import json
+        newer = {"metadata": {"resourceVersion": "42"},
+                 "data": {**_MULTI["data"], "db-a.yaml": "tenants:\n  db-a:\n    mem: '1'\n"}}
+        mock_get.side_effect = [json.dumps(_MULTI), json.dumps(newer)]
+        conflict = mock.Mock(returncode=1, stderr="Error from server (Conflict): "
+                             "the object has been modified")
+        mock_run.side_effect = [conflict, mock.Mock(returncode=0, stderr="")]
+        pc.apply_batch([("db-a", "cpu", "90")])
+        assert mock_get.call_count == 2 and mock_run.call_count == 2
+        assert "re-reading" in capsys.readouterr().err
+
+    @mock.patch("patch_config.subprocess.run")
+    @mock.patch("patch_config.run_cmd")
+    def test_other_patch_errors_fail_without_retry(self, mock_get, mock_run):
+        import json
+        mock_get.return_value = json.dumps(_MULTI)
+        mock_run.return_value = mock.Mock(returncode=1, stderr="forbidden")
+        with pytest.raises(SystemExit) as exc:
+            pc.apply_batch([("db-a", "cpu", "90")])
+        assert exc.value.code == 2 and mock_run.call_count == 1
+
+    @mock.patch("patch_config.run_cmd")
+    def test_batch_diff_json(self, mock_run, tmp_path, capsys):
+        import json
+        mock_run.return_value = json.dumps(_MULTI)
+        path = _changeset(tmp_path, "tenants:\n  db-a:\n    cpu: 90\n    mem: 5\n")
+        with mock.patch("sys.argv", ["patch_config.py", "--batch", path, "--diff", "--json"]):
+            pc.main()
+        out = json.loads(capsys.readouterr().out)
+        assert out["edits"] == 2 and out["patched_keys"] == ["db-a.yaml"]
+        assert mock_run.call_count == 1                  # preview: one read, no patch
+
+    @mock.patch("patch_config.run_cmd")
+    def test_batch_with_positionals_is_rejected(self, mock_run, tmp_path):
+        path = _changeset(tmp_path, "tenants:\n  db-a:\n    cpu: 90\n")
+        with mock.patch("sys.argv", ["patch_config.py", "--batch", path, "db-a", "cpu", "1"]):
+            with pytest.raises(SystemExit) as exc:
+                pc.main()
+        assert exc.value.code == 2
+        mock_run.assert_not_called()
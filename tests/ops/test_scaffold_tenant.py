@@ -11,6 +11,7 @@
 - RULE_PACKS 常數完整性
 - print_catalog: Exporter 目錄輸出
 - run_non_interactive / run_from_onboard / main: CLI 路徑
+- run_bulk (--bulk): manifest 批次產生，與逐一 render_tenant_file 逐位元組相同
 """
 import argparse
 import json
@@ -36,6 +37,7 @@ import yaml
 from scaffold_tenant import (
     annotate_defaults_counterexamples,
     annotate_saturation_criticals,
+    build_bulk_entries,
     build_receiver_from_args,
     counterexample_for_key,
     counterexample_prompt_lines,
@@ -45,18 +47,21 @@ from scaffold_tenant import (
     generate_profile,
     generate_report,
     generate_relabel_snippet,
+    load_bulk_manifest,
     print_catalog,
+    render_tenant_file,
     run_non_interactive,
     run_from_onboard,
     saturation_default_keys,
     write_outputs,
+    YamlTemplates,
     RULE_PACKS,
     SATURATION_CRITICAL_COMMENT,
 )
 from _registry_lib import (  # noqa: E402
     counterexample_observed as registry_counterexample_observed,
 )
-from _lib_exitcodes import EXIT_CALLER_ERROR  # noqa: E402
+from _lib_exitcodes import EXIT_CALLER_ERROR, EXIT_OK, EXIT_VIOLATION  # noqa: E402
 # Imported, never restated: the renderer owns the wording, the gates only
 # reference it (CodeRabbit, #1344 — three files had hand-copied a fragment).
 from _registry_lib import COUNTEREXAMPLE_MARK as _CE_MARK  # noqa: E402
@@ -1177,6 +1182,155 @@ class TestMainCLI:
                 scaffold_tenant.main()
 
 
+# ============================================================
+# --bulk：manifest 批次產生
+#
+# 契約：每個 <tenant>.yaml 與「用同一份 _defaults 逐一呼叫
+# render_tenant_file」逐位元組相同——模板快取只是加速，不改內容；
+# manifest 有任何錯誤 → 一次列出全部、不寫任何檔案。
+# ============================================================
+
+
+def _run_bulk_cli(manifest, out_dir):
+    import scaffold_tenant
+    with mock.patch("sys.argv", ["scaffold_tenant.py", "--bulk", str(manifest),
+                                 "-o", str(out_dir)]):
+        with pytest.raises(SystemExit) as exc_info:
+            scaffold_tenant.main()
+    return exc_info.value.code
+
+
+# 需要引號 / 轉義 / 非 ASCII 的值走 safe_dump 原路徑；一般值走模板。
+_TRICKY_VALUES = ["yes", "null", "123", "1e3", "0x1F", "a b", "x:", "-lead",
+                  "#hash", "多語系", "it's", "~", "2026-01-01", "a" * 200, ""]
+
+
+class TestBulkScaffold:
+    """--bulk：CSV / NDJSON manifest → conf.d 產出。"""
+
+    def test_output_matches_render_tenant_file(self, tmp_path):
+        rows = ["tenant,db,tier,domain,receiver,receiver_type,smarthost,profile"]
+        dbs = ["mariadb", "postgresql;redis", "oracle", "kafka mongodb"]
+        for i, value in enumerate(_TRICKY_VALUES * 2):
+            domain = f'"{value}"' if i % 2 else f"dom{i}"
+            rtype, extra = [("webhook", ""), ("email", "smtp.example.com:25"),
+                            ("slack", ""), ("pagerduty", "")][i % 4]
+            receiver = "" if i % 5 == 0 else (
+                f"ops{i}@example.com" if rtype == "email"
+                else f"https://hooks.example.com/{value.replace(' ', '%20')}")
+            rows.append(f"t-{i},\"{dbs[i % 4]}\",tier-{i % 3},{domain},"
+                        f"\"{receiver}\",{rtype},{extra},"
+                        f"{'std' if i % 3 else ''}")
+        manifest = tmp_path / "tenants.csv"
+        manifest.write_text("\n".join(rows) + "\n", encoding="utf-8")
+        out = tmp_path / "out"
+        assert _run_bulk_cli(manifest, out) == EXIT_OK
+
+        loaded, errors = load_bulk_manifest(str(manifest))
+        entries, row_errors = build_bulk_entries(loaded)
+        assert errors == [] and row_errors == []
+        defaults = yaml.safe_load((out / "_defaults.yaml").read_text(encoding="utf-8"))
+        for tenant, _dbs, config in entries:
+            want = render_tenant_file(tenant, {"tenants": {tenant: config}}, defaults)
+            assert (out / f"{tenant}.yaml").read_text(encoding="utf-8") == want, tenant
+
+    def test_defaults_are_the_union_of_all_packs(self, tmp_path):
+        manifest = tmp_path / "m.ndjson"
+        manifest.write_text(
+            '{"tenant": "a", "db": ["mariadb"]}\n\n'
+            '{"tenant": "b", "db": "redis", "tier": "gold"}\n', encoding="utf-8")
+        out = tmp_path / "out"
+        assert _run_bulk_cli(manifest, out) == EXIT_OK
+        with open(out / "_defaults.yaml", encoding="utf-8") as f:
+            defaults = yaml.safe_load(f)
+        assert defaults == yaml.safe_load(yaml.safe_dump(
+            generate_defaults(["kubernetes", "mariadb", "redis"])))
+        assert sorted(p.name for p in out.iterdir()) == [
+            "_defaults.yaml", "a.yaml", "b.yaml", "scaffold-report.txt"]
+        with open(out / "b.yaml", encoding="utf-8") as f:
+            b = yaml.safe_load(f)
+        assert b == {"tenants": {"b": {"_metadata": {"tier": "gold"}}}}
+
+    def test_manifest_errors_are_all_reported_and_nothing_written(self, tmp_path, capsys):
+        manifest = tmp_path / "bad.csv"
+        manifest.write_text(
+            "tenant,db,colour\n" "ok,mariadb,\n",
+            encoding="utf-8")
+        out = tmp_path / "out"
+        assert _run_bulk_cli(manifest, out) == EXIT_CALLER_ERROR
+        assert "unknown field(s) colour" in capsys.readouterr().err
+
+        manifest.write_text(
+            "tenant,db,receiver_type\n"
+            "ok,mariadb,\n"
+            "ok,redis,\n"
+            "../etc,mariadb,\n"
+            "_meta,mariadb,\n"
+            "nodb,,\n"
+            "wrong,nosuchdb,\n"
+            "rt,mariadb,carrier-pigeon\n",
+            encoding="utf-8")
+        assert _run_bulk_cli(manifest, out) == EXIT_CALLER_ERROR
+        err = capsys.readouterr().err
+        for needle in ("line 3: tenant 'ok' already on line 2",
+                       "invalid tenant name '../etc'", "invalid tenant name '_meta'",
+                       "nodb: db is required", "unsupported DB type(s) nosuchdb",
+                       "unknown receiver_type 'carrier-pigeon'"):
+            assert needle in err
+        assert not out.exists()
+
+    def test_empty_or_unreadable_manifest(self, tmp_path, capsys):
+        manifest = tmp_path / "empty.csv"
+        manifest.write_text("tenant,db\n", encoding="utf-8")
+        assert _run_bulk_cli(manifest, tmp_path / "out") == EXIT_CALLER_ERROR
+        assert _run_bulk_cli(tmp_path / "missing.csv", tmp_path / "out") == EXIT_CALLER_ERROR
+        err = capsys.readouterr().err
+        assert "no tenants in bulk manifest" in err and "cannot read" in err
+
+    def test_invalid_ndjson_line_is_located(self, tmp_path):
+        manifest = tmp_path / "m.jsonl"
+        manifest.write_text('{"tenant": "a", "db": "redis"}\n[1]\n{oops\n',
+                            encoding="utf-8")
+        rows, errors = load_bulk_manifest(str(manifest))
+        assert [r["_line"] for r in rows] == [1]
+        assert errors[0].endswith(":2: expected a JSON object")
+        assert ":3: invalid JSON" in errors[1]
+
+    def test_schema_violation_exits_without_writing(self, tmp_path, capsys):
+        pytest.importorskip("jsonschema")
+        manifest = tmp_path / "m.ndjson"
+        manifest.write_text('{"tenant": "a", "db": "redis", "tier": "x"}\n',
+                            encoding="utf-8")
+        import scaffold_tenant
+        with mock.patch.object(scaffold_tenant, "build_bulk_entries", return_value=(
+                [("a", ["kubernetes", "redis"], {"_metadata": {"tier": ["x"]}})], [])):
+            assert _run_bulk_cli(manifest, tmp_path / "out") == EXIT_VIOLATION
+        assert "schema: a/_metadata/tier" in capsys.readouterr().err
+        assert not (tmp_path / "out").exists()
+
+
+class TestYamlTemplates:
+    """YamlTemplates.render == yaml.safe_dump（可模板化時），否則 None。"""
+
+    @pytest.mark.parametrize("value", _TRICKY_VALUES + [
+        "https://h.example.com/a?b=c&d=e", "ops@example.com", "a.b_c-d", "True",
+        "on", "1_000", ".inf", "...x", "./a", "=", "<<", "x" * 63, "x" * 64, "x" * 127])
+    def test_render_matches_safe_dump_or_declines(self, value):
+        templates = YamlTemplates()
+        kw = {"default_flow_style": False, "allow_unicode": True, "sort_keys": False}
+        for doc in ({"tenants": {"t": {"_metadata": {"tier": "gold"}}}},
+                    {"tenants": {"t": {"_metadata": {"tier": value}}}},
+                    {"tenants": {value: {"k": [value, "x"]}}}):
+            got = templates.render(doc)
+            assert got is None or got == yaml.safe_dump(doc, **kw), (value, got)
+
+    def test_non_string_leaves_decline(self):
+        templates = YamlTemplates()
+        assert templates.render({"a": 1}) is None
+        assert templates.render({"a": {}}) is not None
+        assert templates.render({"a": None}) is None
+
+
 # ============================================================
 # generate_tenant — 互動路徑 characterization（da-tools ROI 第六波）
 #
@@ -7,6 +7,8 @@ import os
 import subprocess
 import sys
 import textwrap
+import threading
+import time
 from unittest import mock
 
 import pytest
@@ -188,6 +190,64 @@ class TestRunSingleComparison:
         assert result is None
 
 
+class TestComparePairs:
+    """Tests for compare_pairs() — the concurrent per-round engine."""
+
+    @staticmethod
+    def _pairs(n):
+        return [{"label": f"p{i}", "old_query": "shared_old", "new_query": f"new_{i}"}
+                for i in range(n)]
+
+    def test_results_keep_pair_order_and_dedupe_queries(self, monkeypatch):
+        calls = []
+        lock = threading.Lock()
+
+        def fake(url, query):
+            with lock:
+                calls.append(query)
+            time.sleep(0.01)
+            return [{"metric": {"tenant": "t"}, "value": [0, "1"]}], None
+
+        monkeypatch.setattr(vm, "query_prometheus", fake)
+        results = vm.compare_pairs("http://p:9090", self._pairs(20), workers=8)
+        assert [r["label"] for r in results] == [f"p{i}" for i in range(20)]
+        assert calls.count("shared_old") == 1          # memoized within the round
+        assert len(calls) == 21
+
+    def test_pairs_run_concurrently(self, monkeypatch):
+        barrier = threading.Barrier(4, timeout=5)
+
+        def fake(url, query):
+            if query.startswith("new_"):
+                barrier.wait()                         # deadlocks unless 4 run at once
+            return [], None
+
+        monkeypatch.setattr(vm, "query_prometheus", fake)
+        assert len(vm.compare_pairs("http://p:9090", self._pairs(4), workers=4)) == 4
+
+    def test_failed_query_only_fails_its_pairs(self, monkeypatch):
+        def fake(url, query):
+            if query == "new_1":
+                raise RuntimeError("boom")
+            return [{"metric": {"tenant": "t"}, "value": [0, "1"]}], None
+
+        monkeypatch.setattr(vm, "query_prometheus", fake)
+        results = vm.compare_pairs("http://p:9090", self._pairs(3), workers=3)
+        assert results[1] is None
+        assert results[0]["diffs"][0]["status"] == "match"
+
+    def test_tolerance_is_applied(self, monkeypatch):
+        def fake(url, query):
+            val = "100" if query == "shared_old" else "104"
+            return [{"metric": {"tenant": "t"}, "value": [0, val]}], None
+
+        monkeypatch.setattr(vm, "query_prometheus", fake)
+        strict = vm.compare_pairs("http://p:9090", self._pairs(1))
+        loose = vm.compare_pairs("http://p:9090", self._pairs(1), tolerance=0.05)
+        assert strict[0]["diffs"][0]["status"] == "mismatch"
+        assert loose[0]["diffs"][0]["status"] == "match"
+
+
 # ---------------------------------------------------------------------------
 # load_mapping_pairs
 # ---------------------------------------------------------------------------
@@ -504,6 +564,23 @@ class TestConvergenceTracker:
         assert report["converged_count"] == 1
         assert "mem" in report["unconverged_pairs"]
 
+    def test_converged_tenants_tracked_across_pairs(self):
+        """tenant 需在所有 pair 都 match 才算收斂；__no_label__ 不列入。"""
+        def result(label, statuses):
+            return {"label": label, "diffs": [{"tenant": t, "status": st}
+                                              for t, st in statuses.items()]}
+        tracker = vm.ConvergenceTracker(stability_window=2)
+        for _ in range(2):
+            tracker.record_round([
+                result("cpu", {"db-a": "match", "db-b": "match", "__no_label__": "match"}),
+                result("mem", {"db-a": "match", "db-b": "mismatch", "db-c": "new_missing"}),
+            ])
+        report = tracker.compute_report()
+        assert report["ready"] is False
+        assert report["converged_tenants"] == ["db-a"]
+        assert report["unconverged_tenants"] == ["db-b", "db-c"]
+        assert list(tracker.tenant_history["db-c"]) == ["mixed", "mixed"]
+
     def test_record_round_mixed_status(self):
         """Result with old_missing goes to 'mixed'."""
         tracker = vm.ConvergenceTracker(stability_window=2)
@@ -515,7 +592,36 @@ class TestConvergenceTracker:
             ],
         }
         tracker.record_round([result])
-        assert tracker.pair_history["disk"] == ["mixed"]
+        assert list(tracker.pair_history["disk"]) == ["mixed"]
+
+    def test_history_is_bounded_by_stability_window(self):
+        """Watch 跑再久，每組歷史也只保留 stability_window 筆（ring buffer）。"""
+        tracker = vm.ConvergenceTracker(stability_window=3)
+        tracker.record_round([self._make_result("cpu", "mismatch")])
+        for _ in range(50):
+            tracker.record_round([self._make_result("cpu", "match")])
+        assert list(tracker.pair_history["cpu"]) == ["match"] * 3
+        assert tracker.is_converged("cpu")
+
+    def test_failed_query_breaks_tenant_and_pair_convergence(self):
+        """某 pair 查詢失敗（None）→ 該 pair 記 error、所有 tenant 記 mixed，不保留舊的 match。"""
+        tracker = vm.ConvergenceTracker(stability_window=3)
+        for _ in range(3):
+            tracker.record_round([self._make_result("cpu", "match"),
+                                  self._make_result("mem", "match")])
+        for _ in range(5):
+            tracker.record_round([self._make_result("cpu", "match"), None])
+        report = tracker.compute_report()
+        assert report["ready"] is False and report["unconverged_pairs"] == ["mem"]
+        assert report["converged_tenants"] == [] and report["unconverged_tenants"] == ["db-a"]
+        assert list(tracker.pair_history["mem"]) == ["error"] * 3
+
+    def test_tenant_absent_from_round_is_not_converged(self):
+        """tenant 本輪沒有任何 diff → 記 mixed。"""
+        tracker = vm.ConvergenceTracker(stability_window=2)
+        tracker.record_round([self._make_result("cpu", "match")])
+        tracker.record_round([{"label": "cpu", "diffs": []}])
+        assert list(tracker.tenant_history["db-a"]) == ["match", "mixed"]
 
     def test_record_round_skips_none(self):
         tracker = vm.ConvergenceTracker()
@@ -113,6 +113,95 @@ class TestRateLimit:
         assert _preview(body, authorizer=ALLOW, now=100.0)[0] == 200  # budget intact
 
 
+# ── POST /preview/batch ──
+FAKE_BATCH = lambda items: [FAKE_EVAL(*it) for it in items]  # noqa: E731
+
+
+def _batch(body, headers=HDR, **kw):
+    kw.setdefault("authorizer", ALLOW)
+    kw.setdefault("evaluator", FAKE_BATCH)
+    return app.handle_preview_batch(body, headers, **kw)
+
+
+class TestBatch:
+    BODY = {"tenant": "shop-a",
+            "items": [{"recipe": RECIPE, "scenario": {"value": v}} for v in (500, 1500)]}
+
+    def test_results_in_item_order(self):
+        seen = []
+
+        def evaluator(items):
+            seen.extend(items)
+            return FAKE_BATCH(items)
+        s, r = _batch(self.BODY, evaluator=evaluator)
+        assert s == 200 and len(r["results"]) == 2
+        assert seen == [(RECIPE, "shop-a", {"value": 500}), (RECIPE, "shop-a", {"value": 1500})]
+
+    def test_validation(self):
+        assert _batch([])[0] == 400
+        assert _batch({"items": self.BODY["items"]})[0] == 400
+        assert _batch({"tenant": "shop-a", "items": []})[0] == 400
+        s, r = _batch({"tenant": "shop-a", "items": [{"recipe": RECIPE}, {"recipe": {}}]})
+        assert s == 400 and "items[1]" in r["error"]
+        s, r = _batch({"tenant": "shop-a", "items": [{"recipe": RECIPE, "scenario": 0}]})
+        assert s == 400 and "scenario" in r["error"]
+
+    def test_item_cap(self, monkeypatch):
+        monkeypatch.setattr(app, "MAX_BATCH_ITEMS", 1)
+        s, r = _batch(self.BODY)
+        assert s == 400 and "limit of 1" in r["error"]
+
+    def test_authz_once_and_fail_closed(self):
+        calls = []
+
+        def auth(headers, tenant):
+            calls.append(tenant)
+            return False
+        assert _batch(self.BODY, authorizer=auth)[0] == 403
+        assert calls == ["shop-a"]
+
+    def test_batch_is_charged_per_item(self, monkeypatch):
+        # A batch of N spends N hits of the tenant budget, so batching cannot
+        # multiply the per-tenant evaluation rate.
+        n = len(self.BODY["items"])
+        monkeypatch.setattr(app, "_rate", app.RateLimiter(n + 1))
+        assert _batch(self.BODY, now=100.0)[0] == 200
+        assert _batch(self.BODY, now=100.0)[0] == 429          # 1 hit left < n
+        body = {"recipe": RECIPE, "tenant": "shop-a", "scenario": {"value": 1500}}
+        assert _preview(body, now=100.0)[0] == 200             # the rejected batch spent nothing
+        assert _preview(body, now=100.0)[0] == 429             # budget exhausted
+
+    def test_http_route(self):
+        import json as _json
+        import threading
+        import urllib.request
+        from http.server import ThreadingHTTPServer
+
+        srv = ThreadingHTTPServer(("127.0.0.1", 0), app._Handler)
+        t = threading.Thread(target=srv.serve_forever, daemon=True)
+        t.start()
+        try:
+            req = urllib.request.Request(
+                f"http://127.0.0.1:{srv.server_address[1]}/preview/batch",
+                data=_json.dumps({"tenant": "shop-a", "items": []}).encode(),
+                method="POST", headers=HDR)
+            with pytest.raises(urllib.error.HTTPError) as exc:
+                urllib.request.urlopen(req, timeout=5)
+            assert exc.value.code == 400      # routed to the batch handler, not 404
+            with urllib.request.urlopen(
+                    f"http://127.0.0.1:{srv.server_address[1]}/metrics", timeout=5) as r:
+                assert r.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                text = r.read().decode()
+            # route + status only — the tenant never becomes a label
+            assert 'recipe_preview_requests_total{route="/preview/batch",code="400"}' in text
+            assert 'recipe_preview_request_duration_seconds_count{route="/preview/batch"}' in text
+            assert "shop-a" not in text
+        finally:
+            srv.shutdown()
+            srv.server_close()
+            t.join(timeout=5)
+
+
 class TestRateLimiterUnit:
     def test_sliding_window(self):
         rl = app.RateLimiter(2)
@@ -120,6 +209,13 @@ class TestRateLimiterUnit:
         assert not rl.allow("k", 2.0)
         assert rl.allow("k", 61.0)        # the 0.0 hit aged out of the 60s window
 
+    def test_cost_is_all_or_nothing(self):
+        rl = app.RateLimiter(3)
+        assert rl.allow("k", 0.0, cost=2)
+        assert not rl.allow("k", 0.0, cost=2)   # 1 left: rejected, nothing spent
+        assert rl.allow("k", 0.0)
+        assert not rl.allow("k", 0.0)
+
     def test_disabled_when_zero(self):
         rl = app.RateLimiter(0)
         assert all(rl.allow("k", float(i)) for i in range(100))
@@ -517,10 +613,11 @@ class TestEndToEnd:
         assert s == 200 and r["states"][0]["state"] == "firing"
 
     def test_unsupported_type_is_supported_false(self):
-        rate = {"recipe": "rate", "metric": "http_requests_total", "op": ">",
-                "window": "5m", "threshold": "1:warning", "name": "r"}
+        slo = {"recipe": "slo_burn_rate", "metric": "checkout_requests_errors_total",
+               "denominator_metric": "checkout_requests_total", "objective": "0.999",
+               "name": "slo"}
         s, r = app.handle_preview(
-            {"recipe": rate, "tenant": "shop-a", "scenario": {"value": 5}},
+            {"recipe": slo, "tenant": "shop-a", "scenario": {"value": 5}},
             HDR, authorizer=ALLOW)
         assert s == 200 and r["supported"] is False
 
@@ -543,7 +640,7 @@ def test_dev_bypass_poison_pill_refuses_to_start_in_k8s(monkeypatch):
 
 # ── HTTP layer: /healthz reports build provenance (no promtool needed) ──
 def test_healthz_reports_promtool_and_git_sha():
-    """GET /healthz → 200 {status, promtool, git_sha}. git_sha echoes the image's
+    """GET /healthz → 200 {status, engine, promtool, git_sha}. git_sha echoes the image's
     GIT_SHA build-arg (drift observability, PR-D2); defaults to "unknown" locally."""
     import json
     import threading
@@ -566,4 +663,5 @@ def test_healthz_reports_promtool_and_git_sha():
 
     assert body["status"] == "ok"
     assert "promtool" in body
+    assert body["engine"] == app.core._ENGINE
     assert body["git_sha"] == app._GIT_SHA   # module reads env GIT_SHA, default "unknown"
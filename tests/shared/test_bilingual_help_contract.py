@@ -154,6 +154,7 @@ ENGLISH_ONLY: dict[str, str] = {
     "add_frontmatter.py": _R_DX,
     "analyze_bench_history.py": _R_DX,
     "analyze_tier1_fp_rate.py": _R_DX,
+    "bench_python_tools.py": _R_DX,
     "axe_lite_static.py": _R_DX,
     "bump_playbook_versions.py": _R_DX,
     "check_aria_references.py": _R_DX,
@@ -437,8 +438,13 @@ def test_allowlists_shrink_only_count_pin():
     # deliberate choice, not a default: scripts/tools/lint/ is 81 English-only
     # to 0 bilingual, so wiring detect_cli_lang() here would have made this the
     # lone exception in its own directory rather than the start of a trend.
-    assert len(ENGLISH_ONLY) <= 141, (
-        f"ENGLISH_ONLY grew to {len(ENGLISH_ONLY)} (pin=141). Adding an "
+    # pin 142: bumped from 141 for bench_python_tools.py, the Python-tooling
+    # fleet-scale bench suite. Same class as analyze_bench_history.py and
+    # pair_bench_ratio.py already here: a dx CLI invoked by `make
+    # bench-python` and bench-record.yaml, never by a customer. Its whole
+    # output is Go bench rows.
+    assert len(ENGLISH_ONLY) <= 142, (
+        f"ENGLISH_ONLY grew to {len(ENGLISH_ONLY)} (pin=142). Adding an "
         "English-only tool is allowed but must be an explicit, reviewed "
         "decision — bump this pin in the same commit and justify it."
     )
@@ -11,8 +11,11 @@ pytest style：使用 plain assert + capsys fixture。
   5. main() subcommand dispatch
   6. help 輸出格式驗證
   7. COMMAND_MAP ↔ help text 一致性
+  8. --profile / DA_TOOLS_PROFILE 剖析介面
+  9. serve / DA_TOOLS_SOCKET 常駐 worker
 """
 
+import io
 import os
 import re
 import sys
@@ -420,6 +423,278 @@ class TestMainRouting:
         assert exc_info.value.code == 0
 
 
+# ── --profile / DA_TOOLS_PROFILE ──────────────────────────────────
+
+
+@pytest.fixture
+def lib_profile(monkeypatch):
+    """Load _lib_profile and restore its switch/spans after the test.
+
+    _run_profiled flips the env AND the already-imported module on — both
+    would leak into every later test without this.
+    """
+    import _lib_profile
+    was = _lib_profile.is_enabled()
+    monkeypatch.setenv(entrypoint.PROFILE_ENV, "")
+    monkeypatch.delenv(entrypoint.PROFILE_PUSHGATEWAY_ENV, raising=False)
+    monkeypatch.delenv(entrypoint.PROFILE_OUT_ENV, raising=False)
+    _lib_profile.reset()
+    yield _lib_profile
+    _lib_profile.enable(was)
+    _lib_profile.reset()
+
+
+class TestProfileFlag:
+    """_split_profile_flag(): 只吃 command 之前的 --profile；env 為後備。"""
+
+    @pytest.mark.parametrize("argv, mode", [
+        (["lint", "x"], None),
+        (["--profile", "lint"], "spans"),
+        (["--profile=cprofile", "lint"], "cprofile"),
+        (["--profile=sample", "lint"], "sample"),
+        (["--profile=0", "lint"], None),
+    ])
+    def test_leading_flag(self, monkeypatch, argv, mode):
+        monkeypatch.delenv(entrypoint.PROFILE_ENV, raising=False)
+        got, rest = entrypoint._split_profile_flag(argv)
+        assert got == mode
+        assert rest == ["lint"] + argv[argv.index("lint") + 1:]
+
+    def test_flag_after_command_belongs_to_tool(self, monkeypatch):
+        monkeypatch.delenv(entrypoint.PROFILE_ENV, raising=False)
+        mode, rest = entrypoint._split_profile_flag(["lint", "--profile"])
+        assert mode is None and rest == ["lint", "--profile"]
+
+    @pytest.mark.parametrize("env, mode", [
+        ("1", "spans"), ("true", "spans"), ("cprofile", "cprofile"),
+        ("off", None), ("", None),
+    ])
+    def test_env_fallback(self, monkeypatch, env, mode):
+        monkeypatch.setenv(entrypoint.PROFILE_ENV, env)
+        assert entrypoint._split_profile_flag(["lint"])[0] == mode
+
+    def test_flag_overrides_env(self, monkeypatch):
+        monkeypatch.setenv(entrypoint.PROFILE_ENV, "cprofile")
+        assert entrypoint._split_profile_flag(["--profile=0", "lint"])[0] is None
+
+    def test_unknown_flag_mode_is_caller_error(self, monkeypatch):
+        monkeypatch.delenv(entrypoint.PROFILE_ENV, raising=False)
+        with pytest.raises(SystemExit) as exc_info:
+            entrypoint._split_profile_flag(["--profile=flame", "lint"])
+        assert exc_info.value.code == 2
+
+    def test_unknown_env_mode_only_warns(self, monkeypatch, capsys):
+        """CronJob env 打錯字不應讓 job 失敗。"""
+        monkeypatch.setenv(entrypoint.PROFILE_ENV, "flame")
+        assert entrypoint._split_profile_flag(["lint"])[0] is None
+        assert entrypoint.PROFILE_ENV in capsys.readouterr().err
+
+    def test_main_threads_mode_and_command(self, monkeypatch, cli_argv):
+        monkeypatch.delenv(entrypoint.PROFILE_ENV, raising=False)
+        seen = {}
+        monkeypatch.setattr(entrypoint, "run_tool",
+                            lambda script, args, **kw: seen.update(kw, args=args))
+        cli_argv("da-tools", "--profile=sample", "validate-config", "--json")
+        entrypoint.main()
+        assert seen == {"profile": "sample", "command": "validate-config",
+                        "args": ["--json"]}
+
+
+class TestRunProfiled:
+    """_run_profiled(): 報告一律寫 stderr，且工具 sys.exit 時仍輸出。"""
+
+    def test_spans_mode_reports_shared_lib_spans(self, lib_profile, capsys):
+        def tool():
+            with lib_profile.span("io.load_yaml"):
+                pass
+
+        entrypoint._run_profiled("spans", "validate-config", tool)
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "[profile] validate-config: mode=spans" in captured.err
+        assert "io.load_yaml" in captured.err
+        assert os.environ[entrypoint.PROFILE_ENV] == ""   # restored
+
+    def test_env_restored_when_previously_unset(self, lib_profile, monkeypatch):
+        monkeypatch.delenv(entrypoint.PROFILE_ENV)
+        entrypoint._run_profiled("spans", "lint", lambda: None)
+        assert entrypoint.PROFILE_ENV not in os.environ
+
+    def test_report_survives_tool_sys_exit(self, lib_profile, capsys):
+        def tool():
+            with lib_profile.span("describe.scan"):
+                sys.exit(1)
+
+        with pytest.raises(SystemExit) as exc_info:
+            entrypoint._run_profiled("spans", "tenant-verify", tool)
+        assert exc_info.value.code == 1
+        assert "describe.scan" in capsys.readouterr().err
+
+    def test_cprofile_mode_dumps_pstats(self, lib_profile, monkeypatch,
+                                       tmp_path, capsys):
+        out = tmp_path / "run.pstats"
+        monkeypatch.setenv(entrypoint.PROFILE_OUT_ENV, str(out))
+        entrypoint._run_profiled("cprofile", "lint", lambda: sorted(range(1000)))
+        err = capsys.readouterr().err
+        assert "cumulative" in err
+        assert out.is_file()
+
+    def test_pushes_when_gateway_set(self, lib_profile, monkeypatch):
+        pushed = []
+        monkeypatch.setenv(entrypoint.PROFILE_PUSHGATEWAY_ENV, "http://pg:9091")
+        monkeypatch.setattr(lib_profile, "push_metrics",
+                            lambda url, command, wall: pushed.append((url, command)))
+        entrypoint._run_profiled("spans", "alert-quality", lambda: None)
+        assert pushed == [("http://pg:9091", "alert-quality")]
+
+    def test_stack_sampler_attributes_current_frame(self):
+        sampler = entrypoint._StackSampler()
+        sampler.sample_once()
+        assert sampler.samples == 1
+        assert any("test_stack_sampler_attributes_current_frame" in key
+                   for key in sampler.inclusive_counts)
+        buf = io.StringIO()
+        sampler.render(buf)
+        assert "1 samples" in buf.getvalue()
+
+
+# ── serve / DA_TOOLS_SOCKET ────────────────────────────────────────
+
+_ENTRYPOINT_PY = os.path.join(DA_TOOLS_DIR, "entrypoint.py")
+_posix_only = pytest.mark.skipif(
+    not hasattr(os, "fork") or sys.platform == "win32",
+    reason="resident worker needs Unix sockets + fork",
+)
+
+
+class TestResidentClient:
+    """_forward_to_resident(): 沒有可用 worker 時一律回 None（本行程執行）。"""
+
+    def test_env_unset(self, monkeypatch):
+        monkeypatch.delenv(entrypoint.RESIDENT_SOCKET_ENV, raising=False)
+        assert entrypoint._forward_to_resident(["lint"]) is None
+
+    def test_socket_missing(self, monkeypatch, tmp_path):
+        monkeypatch.setenv(entrypoint.RESIDENT_SOCKET_ENV, str(tmp_path / "nope.sock"))
+        assert entrypoint._forward_to_resident(["lint"]) is None
+
+    def test_serve_is_never_forwarded(self, monkeypatch, tmp_path):
+        monkeypatch.setenv(entrypoint.RESIDENT_SOCKET_ENV, str(tmp_path / "s.sock"))
+        assert entrypoint._forward_to_resident(["serve"]) is None
+
+    @pytest.mark.parametrize("code, expected", [
+        (None, 0), (0, 0), (3, 3), ("fatal: boom", 1),
+    ])
+    def test_exit_code_of(self, code, expected):
+        assert entrypoint._exit_code_of(SystemExit(code)) == expected
+
+
+class TestYamlPreload:
+    """_install_yaml_preload(): 以內容為 key，命中回 deepcopy，未命中行為不變。"""
+
+    @pytest.fixture
+    def yaml_mod(self, monkeypatch):
+        yaml = pytest.importorskip("yaml")
+        monkeypatch.setattr(yaml, "safe_load", yaml.safe_load)  # undo on exit
+        return yaml
+
+    def test_hit_returns_private_copy(self, yaml_mod, tmp_path):
+        (tmp_path / "a.yaml").write_text("groups:\n  - name: g\n", encoding="utf-8")
+        docs = entrypoint._preload_yaml_trees([str(tmp_path)])
+        entrypoint._install_yaml_preload(docs)
+        cached = next(iter(docs.values()))
+        with open(tmp_path / "a.yaml", encoding="utf-8") as f:
+            first = yaml_mod.safe_load(f)
+        first["groups"].clear()
+        second = yaml_mod.safe_load("groups:\n  - name: g\n")
+        assert second == {"groups": [{"name": "g"}]} == cached
+        assert second is not cached
+
+    def test_miss_rewinds_stream_for_real_parser(self, yaml_mod, tmp_path):
+        entrypoint._install_yaml_preload({"k: 1\n": {"k": 1}})
+        bad = tmp_path / "bad.yaml"
+        bad.write_text("k: [unclosed\n", encoding="utf-8")
+        with open(bad, encoding="utf-8") as f, pytest.raises(yaml_mod.YAMLError) as exc:
+            yaml_mod.safe_load(f)
+        assert "bad.yaml" in str(exc.value)  # error mark still names the file
+        assert yaml_mod.safe_load("k: 2\n") == {"k": 2}
+
+    def test_reinstall_does_not_stack_wrappers(self, yaml_mod):
+        entrypoint._install_yaml_preload({})
+        first = yaml_mod.safe_load.__wrapped__
+        entrypoint._install_yaml_preload({})
+        assert yaml_mod.safe_load.__wrapped__ is first
+
+    def test_preload_skips_unparseable_files(self, yaml_mod, tmp_path):
+        (tmp_path / "ok.yml").write_text("a: 1\n", encoding="utf-8")
+        (tmp_path / "bad.yaml").write_text("a: [\n", encoding="utf-8")
+        (tmp_path / "notes.txt").write_text("a: 2\n", encoding="utf-8")
+        assert list(entrypoint._preload_yaml_trees([str(tmp_path)]).values()) == [{"a": 1}]
+
+
+@_posix_only
+class TestResidentWorker:
+    """serve 端到端：client 經 socket 執行、exit code 轉送、關閉後清 socket。"""
+
+    @pytest.fixture
+    def worker(self, tmp_path):
+        import subprocess
+        import time
+        sock = str(tmp_path / "da.sock")
+        proc = subprocess.Popen(
+            [sys.executable, _ENTRYPOINT_PY, "serve", "--socket", sock],
+            stderr=subprocess.PIPE, text=True)
+        deadline = time.monotonic() + 30
+        while not os.path.exists(sock):
+            assert proc.poll() is None, proc.stderr.read()
+            assert time.monotonic() < deadline, "worker did not start"
+            time.sleep(0.05)
+        yield sock, proc
+        proc.terminate()
+        proc.wait(timeout=30)
+        proc.stderr.close()
+
+    @staticmethod
+    def _client(sock, *argv, cwd=None):
+        import subprocess
+        env = dict(os.environ, **{entrypoint.RESIDENT_SOCKET_ENV: sock})
+        return subprocess.run([sys.executable, _ENTRYPOINT_PY, *argv], env=env,
+                              cwd=cwd, capture_output=True, text=True, timeout=60)
+
+    def test_runs_command_with_client_stdio_and_exit_code(self, worker):
+        sock, _proc = worker
+        ok = self._client(sock, "--version")
+        assert ok.returncode == 0 and ok.stdout.startswith("da-tools")
+        bad = self._client(sock, "nonexistent-xyz")
+        assert bad.returncode == 1
+        assert "nonexistent-xyz" in bad.stderr
+
+    def test_client_env_is_applied(self, worker):
+        sock, _proc = worker
+        res = self._client(sock, "nonexistent-xyz")
+        env_zh = dict(os.environ, DA_LANG="zh",
+                      **{entrypoint.RESIDENT_SOCKET_ENV: sock})
+        import subprocess
+        zh = subprocess.run([sys.executable, _ENTRYPOINT_PY, "nonexistent-xyz"],
+                            env=env_zh, capture_output=True, text=True, timeout=60)
+        assert "未知命令" in zh.stderr and "未知命令" not in res.stderr
+
+    def test_second_worker_on_same_socket_refuses(self, worker):
+        import subprocess
+        sock, _proc = worker
+        dup = subprocess.run([sys.executable, _ENTRYPOINT_PY, "serve", "--socket", sock],
+                             capture_output=True, text=True, timeout=60)
+        assert dup.returncode == 2
+
+    def test_shutdown_removes_socket(self, worker):
+        sock, proc = worker
+        proc.terminate()
+        proc.wait(timeout=30)
+        assert not os.path.exists(sock)
+        # ...and clients fall back to running in-process.
+        assert self._client(sock, "--version").returncode == 0
+
+
 # ── Help text consistency ────────────────────────────────────────
 
 
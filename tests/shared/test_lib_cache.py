@@ -0,0 +1,49 @@
+"""Unit tests for `_lib_cache` — shared disk-cache directory + atomic writes."""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import sys
+
+import pytest
+
+REPO = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO / "scripts" / "tools"))
+
+from _lib_cache import tool_cache_dir, write_text_atomic  # noqa: E402
+
+ENV = "DA_TEST_CACHE"
+
+
+def test_default_dir_is_versioned_under_xdg(tmp_path, monkeypatch):
+    monkeypatch.delenv(ENV, raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert tool_cache_dir(ENV, "demo", "v3") == str(tmp_path / "da-tools" / "demo" / "v3")
+
+
+@pytest.mark.parametrize("value", ["off", "OFF", " none ", "0", "false", "no"])
+def test_off_disables_the_disk_layer(monkeypatch, value):
+    monkeypatch.setenv(ENV, value)
+    assert tool_cache_dir(ENV, "demo", "v1") is None
+
+
+def test_env_override_replaces_the_base(tmp_path, monkeypatch):
+    monkeypatch.setenv(ENV, str(tmp_path / "mine"))
+    assert tool_cache_dir(ENV, "demo", "v1") == str(tmp_path / "mine" / "v1")
+
+
+def test_atomic_write_replaces_and_leaves_no_temp(tmp_path):
+    path = tmp_path / "nested" / "entry.json"
+    assert write_text_atomic(str(path), "one\n")
+    assert write_text_atomic(str(path), "two\n")
+    assert path.read_bytes() == b"two\n"
+    assert os.listdir(path.parent) == ["entry.json"]
+    if os.name == "posix":
+        assert path.stat().st_mode & 0o777 == 0o600
+
+
+def test_atomic_write_failure_is_reported_not_raised(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("", encoding="utf-8")
+    assert write_text_atomic(str(blocker / "entry.json"), "x") is False
@@ -0,0 +1,181 @@
+"""Tests for _lib_dependency_index — the persisted conf.d reverse-dependency index.
+
+Pinned contracts
+----------------
+1. **Incremental** — a refresh parses only files whose bytes changed; a warm
+   index in a fresh process parses nothing, and a same-size rewrite inside
+   the racy window is still seen.
+2. **Never narrower than a scan** — unparseable and opaque files are always
+   lookup candidates, so callers re-read them exactly as a full scan did.
+3. **Never failing** — ``off`` writes nothing; an unwritable cache dir
+   degrades to an in-process index.
+"""
+from __future__ import annotations
+
+import os
+import pathlib
+import sys
+
+import pytest
+import yaml
+
+REPO = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO / "scripts" / "tools"))
+
+import _lib_dependency_index as di  # noqa: E402
+
+_OLD = 1_600_000_000  # an mtime well outside the racy window
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(di.CACHE_ENV, str(tmp_path / "cache"))
+    di.clear_memo()
+    yield
+    di.clear_memo()
+
+
+def _write(conf: pathlib.Path, name: str, doc, *, mtime: int | None = _OLD) -> pathlib.Path:
+    path = conf / name
+    path.write_text(doc if isinstance(doc, str) else yaml.safe_dump(doc),
+                    encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def conf(tmp_path):
+    d = tmp_path / "conf.d"
+    d.mkdir()
+    _write(d, "_defaults.yaml", {"defaults": {"mysql_connections": 80}})
+    _write(d, "db-a.yaml", {"tenants": {"db-a": {
+        "mysql_connections": "70", "mysql_connections_critical": "90",
+        "_profile": "standard", "_routing_profile": "team-sre",
+        "_routing": {"receiver": {"type": "slack"}},
+        "_custom_alerts": [{"recipe": "threshold", "name": "queue_high"}],
+        "_silent_mode": "warning"}}})
+    _write(d, "db-b.yaml", {"tenants": {"db-b": {"redis_memory": "80"}}})
+    _write(d, "_profiles.yaml", {"profiles": {"standard": {"mysql_connections": 75}}})
+    _write(d, "_routing_profiles.yaml", {"routing_profiles": {"team-sre": {}}})
+    _write(d, "_instance_mapping.yaml", {"instance_tenant_mapping": {
+        "oracle-01": [{"tenant": "db-a", "filter": "x"}, {"tenant": "db-b"}]}})
+    _write(d, "_domain_policy.yaml", {"domain_policies": {
+        "finance": {"tenants": ["db-a"]}}})
+    return d
+
+
+def test_refresh_parses_only_changed_files(conf):
+    assert len(di.load_index(conf).parsed) == 7
+    assert di.load_index(conf).parsed == []
+    _write(conf, "db-b.yaml", {"tenants": {"db-b": {"redis_memory": "85"}}},
+           mtime=_OLD + 60)
+    (conf / "db-c.yaml").write_text("tenants:\n  db-c: {}\n", encoding="utf-8")
+    (conf / "_domain_policy.yaml").unlink()
+    index = di.load_index(conf)
+    assert index.parsed == ["db-b.yaml", "db-c.yaml"]
+    assert "_domain_policy.yaml" not in index.files
+
+
+def test_warm_disk_index_in_a_fresh_process_parses_nothing(conf, monkeypatch):
+    di.load_index(conf)
+    di.clear_memo()
+    monkeypatch.setattr(di, "_parse", lambda raw, key: pytest.fail("re-parsed"))
+    assert set(di.load_index(conf).files) == {p.name for p in conf.iterdir()}
+
+
+def test_touch_without_content_change_rehashes_but_does_not_parse(conf):
+    di.load_index(conf)
+    os.utime(conf / "db-b.yaml", (_OLD + 5, _OLD + 5))
+    assert di.load_index(conf).parsed == []
+
+
+def test_same_size_rewrite_inside_racy_window_is_seen(conf):
+    _write(conf, "db-b.yaml", "tenants:\n  db-b: {k1: '1'}\n", mtime=None)
+    assert di.load_index(conf).defining_files("db-b") == ["db-b.yaml"]
+    _write(conf, "db-b.yaml", "tenants:\n  db-x: {k1: '1'}\n", mtime=None)
+    index = di.load_index(conf)
+    assert index.defining_files("db-b") == [] and index.parsed == ["db-b.yaml"]
+
+
+@pytest.mark.parametrize("text,hit", [
+    ("depends on db-a", True),
+    ("see db-a.yaml", True),
+    ("ends with db-a.", True),
+    ("db-ab only", False),
+    ("xdb-a", False),
+])
+def test_mentions_matches_names_not_substrings(conf, text, hit):
+    _write(conf, "notes.yaml", {"note": text})
+    assert ("notes.yaml" in di.load_index(conf).mentions("db-a")) is hit
+
+
+def test_dotted_tenant_name_is_indexed_whole(conf):
+    _write(conf, "notes.yaml", {"ref": "db.prod-1"})
+    assert di.load_index(conf).mentions("db.prod-1") == ["notes.yaml"]
+
+
+def test_tenant_dependencies(conf):
+    deps = di.load_index(conf).tenant_dependencies("db-a")
+    assert deps == [
+        ("_domain_policy.yaml", "domain_policy", "finance"),
+        ("_instance_mapping.yaml", "instance_mapping", "oracle-01"),
+        ("db-a.yaml", "profile", "standard (_profiles.yaml)"),
+        ("db-a.yaml", "routing_profile", "team-sre (_routing_profiles.yaml)"),
+        ("db-a.yaml", "routing", "slack"),
+        ("db-a.yaml", "recipes", "queue_high"),
+        ("db-a.yaml", "silences", "_silent_mode"),
+    ]
+    assert di.load_index(conf).users_of("profile", "standard") == ["db-a"]
+
+
+def test_files_with_key_includes_unknown_shapes(conf):
+    _write(conf, "broken.yaml", "tenants: [unclosed\n")
+    _write(conf, "listdoc.yaml", "- a\n- b\n")
+    index = di.load_index(conf)
+    assert index.files_with_key("mysql_connections") == [
+        "_defaults.yaml", "broken.yaml", "db-a.yaml", "listdoc.yaml"]
+    assert index.files_with_key("redis_memory") == ["broken.yaml", "db-b.yaml", "listdoc.yaml"]
+    assert list(index.errors()) == ["broken.yaml"]
+
+
+def test_disk_index_holds_no_scalar_text(conf, tmp_path):
+    _write(conf, "db-w.yaml", {"tenants": {"db-w": {"_routing": {"receiver": {
+        "type": "webhook", "url": "https://hooks.example/s3cr3t-t0ken"}}}}})
+    _write(conf, "broken.yaml", "tenants: [db-a, {password: hunter2\n")
+    di.load_index(conf)
+    (cache_file,) = (tmp_path / "cache").rglob("*.json")
+    text = cache_file.read_text(encoding="utf-8")
+    assert "s3cr3t" not in text and "hooks.example" not in text
+    assert "hunter2" not in text and "broken.yaml" not in text
+    di.clear_memo()
+    index = di.load_index(conf)
+    assert index.mentions("s3cr3t-t0ken") == ["db-w.yaml"]
+    assert "broken.yaml" in index.errors()
+
+
+def test_hidden_and_non_yaml_files_are_skipped(conf):
+    _write(conf, ".hidden.yaml", {"tenants": {"db-h": {}}})
+    _write(conf, "README.md", "db-a")
+    assert ".hidden.yaml" not in di.load_index(conf).files
+    assert "README.md" not in di.load_index(conf).files
+
+
+def test_off_writes_nothing(conf, tmp_path, monkeypatch):
+    monkeypatch.setenv(di.CACHE_ENV, "off")
+    assert di.cache_dir() is None
+    assert di.load_index(conf).defining_files("db-a") == ["db-a.yaml"]
+    assert not (tmp_path / "cache").exists()
+
+
+def test_unwritable_cache_dir_degrades_to_in_process(conf, tmp_path, monkeypatch):
+    blocker = tmp_path / "file"
+    blocker.write_text("", encoding="utf-8")
+    monkeypatch.setenv(di.CACHE_ENV, str(blocker))
+    assert di.load_index(conf).defining_files("db-b") == ["db-b.yaml"]
+
+
+def test_threshold_key_alerts_from_shipped_pack():
+    alerts = di.threshold_key_alerts([REPO / "rule-packs" / "rule-pack-mariadb.yaml"])
+    assert "MariaDBHighConnections" in alerts["mysql_connections"]
+    assert all(names == sorted(names) for names in alerts.values())
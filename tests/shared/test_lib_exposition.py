@@ -0,0 +1,121 @@
+"""Unit tests for `_lib_exposition` — the streaming Prometheus text-exposition parser."""
+
+from __future__ import annotations
+
+import io
+import math
+import pathlib
+import sys
+
+import pytest
+
+REPO = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO / "scripts" / "tools"))
+
+from _lib_exposition import (  # noqa: E402
+    ExpositionError,
+    ExpositionReader,
+    Sample,
+    iter_samples,
+)
+
+BODY = (
+    '# HELP http_request_seconds Latency with a \\\\ backslash\\nand newline.\n'
+    "# TYPE http_request_seconds histogram\n"
+    'http_request_seconds_bucket{le="0.5",path="/a\\"b\\\\c\\nd{}",} 3 1700000000000\n'
+    'http_request_seconds_bucket{le="+Inf",path="/"} +Inf\n'
+    "http_request_seconds_count 4\n"
+    "# a plain comment\n"
+    "\n"
+    "up NaN\n"
+    'pg_up{datname="prod"} -Inf\n'
+)
+
+
+def test_parses_samples_escapes_and_timestamps():
+    samples = list(iter_samples(BODY))
+    assert samples[0] == Sample(
+        "http_request_seconds_bucket",
+        {"le": "0.5", "path": '/a"b\\c\nd{}'}, 3.0, 1700000000000)
+    assert samples[1].value == math.inf and samples[1].timestamp is None
+    assert samples[2] == Sample("http_request_seconds_count", {}, 4.0, None)
+    assert math.isnan(samples[3].value)
+    assert samples[4].value == -math.inf
+
+
+def test_help_type_and_family():
+    reader = ExpositionReader(BODY)
+    list(reader)
+    assert reader.types == {"http_request_seconds": "histogram"}
+    assert reader.help["http_request_seconds"] == "Latency with a \\ backslash\nand newline."
+    assert reader.family_of("http_request_seconds_bucket") == "http_request_seconds"
+    assert reader.family_of("http_request_seconds_total") == "http_request_seconds_total"
+    assert reader.family_of("up") == "up"
+    assert (reader.lines, reader.samples, reader.malformed) == (9, 5, 0)
+
+
+@pytest.mark.parametrize("source", [
+    BODY,
+    BODY.encode(),
+    io.BufferedReader(io.BytesIO(BODY.encode())),  # an HTTP response, line by line
+    BODY.splitlines(keepends=True),
+])
+def test_source_kinds(source):
+    assert len(list(iter_samples(source))) == 5
+
+
+def test_name_pushdown_skips_other_lines():
+    got = list(iter_samples(BODY + 'broken{ 1\n', names={"up", "pg_up"}))
+    assert [s.name for s in got] == ["up", "pg_up"]
+
+
+def test_label_filter_and_projection():
+    got = list(iter_samples(BODY, label_filter={"le": "+Inf"}, keep_labels={"path"}))
+    assert got == [Sample("http_request_seconds_bucket", {"path": "/"}, math.inf, None)]
+    # A missing label compares as "" (PromQL semantics).
+    assert [s.name for s in iter_samples(BODY, label_filter={"le": ""})] == [
+        "http_request_seconds_count", "up", "pg_up"]
+
+
+def test_intern_labels_shares_strings():
+    body = "".join(f'm{{some_long_label_name="{i}"}} 1\n' for i in range(3))
+    a, b, _ = iter_samples(body, intern_labels=True)
+    assert next(iter(a.labels)) is next(iter(b.labels))
+
+
+def test_openmetrics_exemplar_and_eof():
+    body = 'foo_total{a="x"} 1 # {trace_id="abc"} 1.0\n# EOF\nafter 1\n'
+    assert list(iter_samples(body)) == [Sample("foo_total", {"a": "x"}, 1.0, None)]
+
+
+@pytest.mark.parametrize("line", [
+    'bad{a="1" 3',         # unterminated label set
+    "novalue",
+    "x 1_000",             # float() would take it, the format does not
+    "x 1 2 3",
+    "x 1 notatimestamp",
+    "{} 1",
+    "# TYPE x bogus",
+])
+def test_malformed_lines_skipped_or_strict(line):
+    reader = ExpositionReader(f"{line}\nok 1\n")
+    assert [s.name for s in reader] == ["ok"]
+    assert reader.malformed == 1
+    with pytest.raises(ExpositionError, match="line 1"):
+        list(iter_samples(f"{line}\nok 1\n", strict=True))
+
+
+def test_greedy_fallback_matches_possessive_grammar():
+    """The 3.10 greedy spelling of the sample grammar captures exactly what the
+    possessive one does, well-formed or not."""
+    import re
+
+    import _lib_exposition as ex
+
+    greedy = re.compile(ex._SAMPLE_RE.pattern.replace("*+", "*").replace("?+", "?"))
+    lines = [*BODY.splitlines(), 'bad{a="1" 3', 'x{a="1",b="2",} 1',
+             'x{a="1"b="2"} 1', 'x {a = "\\"" , b="}"} 2', 'x{a="1\\', "{} 1"]
+    for line in lines:
+        want = ex._SAMPLE_RE.match(line)
+        got = greedy.match(line)
+        assert (got and got.groups()) == (want and want.groups()), line
@@ -0,0 +1,155 @@
+"""Unit tests for `_lib_metrics` — the dependency-free metrics registry."""
+
+from __future__ import annotations
+
+import math
+import pathlib
+import sys
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+REPO = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO / "scripts" / "tools"))
+
+from _lib_exposition import ExpositionReader, iter_samples  # noqa: E402
+from _lib_metrics import (  # noqa: E402
+    CONTENT_TYPE,
+    MetricsRegistry,
+    format_value,
+    serve_metrics,
+)
+
+
+def _values(registry):
+    return {(s.name, tuple(sorted(s.labels.items()))): s.value
+            for s in iter_samples(registry.render())}
+
+
+def test_counter_gauge_render_and_round_trip():
+    reg = MetricsRegistry()
+    c = reg.counter("jobs_total", 'Jobs "done".\nSecond line \\ here.', ["result"])
+    g = reg.gauge("queue_depth", "Items queued.")
+    c.labels("ok").inc()
+    c.labels(result='we"ird\n').inc(2)
+    g.set(7)
+    g.dec(2.5)
+    text = reg.render()
+    assert "# TYPE jobs_total counter\n" in text
+    assert 'jobs_total{result="ok"} 1\n' in text
+    assert "queue_depth 4.5\n" in text
+    reader = ExpositionReader(text, strict=True)
+    got = {(s.name, tuple(s.labels.items())): s.value for s in reader}
+    assert got[("jobs_total", (("result", 'we"ird\n'),))] == 2
+    assert reader.help["jobs_total"] == 'Jobs "done".\nSecond line \\ here.'
+
+
+def test_unlabelled_series_exist_before_first_update():
+    reg = MetricsRegistry()
+    reg.gauge("up_ish", "x")
+    reg.counter("c_total", "x", ["kind"])
+    assert reg.render() == ("# HELP up_ish x\n# TYPE up_ish gauge\nup_ish 0\n"
+                            "# HELP c_total x\n# TYPE c_total counter\n")
+
+
+def test_histogram_buckets_are_cumulative():
+    reg = MetricsRegistry()
+    h = reg.histogram("lat_seconds", "Latency.", ["route"], buckets=(0.1, 1, 5))
+    for v in (0.05, 0.1, 0.5, 3, 60):
+        h.labels("/a").observe(v)
+    vals = _values(reg)
+    buckets = [vals[("lat_seconds_bucket", (("le", le), ("route", "/a")))]
+               for le in ("0.1", "1.0", "5.0", "+Inf")]
+    assert buckets == [2, 3, 4, 5]             # le is inclusive
+    assert vals[("lat_seconds_count", (("route", "/a"),))] == 5
+    assert vals[("lat_seconds_sum", (("route", "/a"),))] == pytest.approx(63.65)
+
+
+def test_histogram_timer():
+    h = MetricsRegistry().histogram("t_seconds", "x")
+    with h.time():
+        pass
+    assert h.count == 1 and 0 <= h.sum < 1
+
+
+def test_only_dirty_families_are_reserialized(monkeypatch):
+    reg = MetricsRegistry()
+    a, b = reg.gauge("a", "x"), reg.gauge("b", "x")
+    first = reg.render_bytes()
+    assert reg.render_bytes() is first          # nothing changed → same body
+    calls = []
+    for fam in (a, b):
+        orig = fam._render
+        monkeypatch.setattr(fam, "_render", lambda o=orig, n=fam.name: calls.append(n) or o())
+    a.set(3)
+    assert b"a 3\n" in reg.render_bytes()
+    assert calls == ["a"]
+
+
+def test_concurrent_increments_are_not_lost():
+    reg = MetricsRegistry()
+    c = reg.counter("hits_total", "x")
+    h = reg.histogram("obs", "x")
+
+    def work():
+        for _ in range(5000):
+            c.inc()
+            h.observe(0.01)
+            reg.render_bytes()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert c.value == 20000 and h.count == 20000
+    assert "hits_total 20000\n" in reg.render()
+
+
+@pytest.mark.parametrize("call", [
+    lambda r: r.gauge("bad-name", "x"),
+    lambda r: r.gauge("ok", "x", ["__reserved"]),
+    lambda r: r.histogram("h", "x", ["le"]),
+    lambda r: r.histogram("h", "x", buckets=(1, 1)),
+    lambda r: r.counter("c_total", "x").inc(-1),
+    lambda r: r.counter("c_total", "x", ["a"]).inc(),
+    lambda r: r.counter("c_total", "x", ["a", "b"]).labels("1"),
+    lambda r: r.counter("c_total", "x", ["a"]).labels(b="1"),
+])
+def test_misuse_raises(call):
+    with pytest.raises(ValueError):
+        call(MetricsRegistry())
+
+
+def test_duplicate_registration_raises():
+    reg = MetricsRegistry()
+    reg.gauge("g", "x")
+    with pytest.raises(ValueError, match="already registered"):
+        reg.counter("g", "y")
+
+
+@pytest.mark.parametrize("value,want", [
+    (3, "3"), (3.0, "3"), (True, "1"), (0.25, "0.25"), (1e20, "1e+20"),
+    (math.inf, "+Inf"), (-math.inf, "-Inf"), (math.nan, "NaN"),
+])
+def test_format_value(value, want):
+    assert format_value(value) == want
+
+
+def test_serve_metrics_over_http():
+    reg = MetricsRegistry()
+    reg.counter("served_total", "x").inc(5)
+    srv = serve_metrics(reg, 0, host="127.0.0.1")
+    base = f"http://127.0.0.1:{srv.server_address[1]}"
+    try:
+        with urllib.request.urlopen(base + "/metrics", timeout=5) as resp:
+            assert resp.headers["Content-Type"] == CONTENT_TYPE
+            assert b"served_total 5\n" in resp.read()
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            urllib.request.urlopen(base + "/other", timeout=5)
+        assert exc.value.code == 404
+    finally:
+        srv.shutdown()
+        srv.server_close()
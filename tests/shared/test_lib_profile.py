@@ -0,0 +1,163 @@
+"""Unit tests for `_lib_profile` — per-phase timing spans behind `da-tools --profile`."""
+
+from __future__ import annotations
+
+import io
+import pathlib
+import sys
+import urllib.error
+from unittest import mock
+
+import pytest
+
+REPO = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO / "scripts" / "tools"))
+
+import _lib_profile  # noqa: E402
+from _lib_profile import span  # noqa: E402
+
+
+@pytest.fixture()
+def recording():
+    """Enable span recording for one test; restore the import-time state."""
+    was = _lib_profile.is_enabled()
+    _lib_profile.enable(True)
+    _lib_profile.reset()
+    yield
+    _lib_profile.enable(was)
+    _lib_profile.reset()
+
+
+def test_disabled_span_is_shared_noop_and_records_nothing():
+    was = _lib_profile.is_enabled()
+    _lib_profile.enable(False)
+    _lib_profile.reset()
+    try:
+        # One shared object: the off path must not allocate per call.
+        assert span("a") is span("b")
+        with span("io.load_yaml"):
+            pass
+        assert _lib_profile.snapshot() == {}
+    finally:
+        _lib_profile.enable(was)
+
+
+def test_spans_aggregate_per_name(recording):
+    for _ in range(3):
+        with span("io.load_yaml"):
+            pass
+    with span("prometheus.http_get"):
+        pass
+    snap = _lib_profile.snapshot()
+    assert snap["io.load_yaml"]["calls"] == 3
+    assert snap["prometheus.http_get"]["calls"] == 1
+    assert snap["io.load_yaml"]["total_s"] >= snap["io.load_yaml"]["max_s"] >= 0
+
+
+def test_concurrent_spans_lose_no_calls(recording):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def work(_):
+        for _ in range(500):
+            with span("prometheus.http_get"):
+                pass
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(8)))
+    assert _lib_profile.snapshot()["prometheus.http_get"]["calls"] == 4000
+
+
+def test_span_records_even_when_body_raises(recording):
+    with pytest.raises(ValueError):
+        with span("describe.scan"):
+            raise ValueError("boom")
+    assert _lib_profile.snapshot()["describe.scan"]["calls"] == 1
+
+
+def test_shared_libs_emit_spans(recording, tmp_path: pathlib.Path):
+    """The instrumented helpers are what makes the table useful — pin them."""
+    import _lib_io
+    (tmp_path / "db-a.yaml").write_text(
+        'tenants:\n  db-a:\n    mysql_connections: "70"\n', encoding="utf-8")
+    assert "db-a" in _lib_io.load_tenant_configs(str(tmp_path))
+    snap = _lib_profile.snapshot()
+    assert snap["io.load_tenant_configs"]["calls"] == 1
+    assert snap["io.load_yaml"]["calls"] == 1
+
+
+def test_render_summary_sorted_by_total(recording, monkeypatch):
+    ticks = iter([0.0, 0.001, 0.0, 0.5])
+    monkeypatch.setattr(_lib_profile.time, "perf_counter", lambda: next(ticks))
+    with span("fast"):
+        pass
+    with span("slow"):
+        pass
+    buf = io.StringIO()
+    _lib_profile.render_summary(1.0, stream=buf)
+    rows = [line for line in buf.getvalue().splitlines() if "span" not in line]
+    assert rows[0].split()[1] == "slow" and rows[1].split()[1] == "fast"
+    assert "50.0%" in rows[0]
+
+
+def test_render_summary_without_spans():
+    buf = io.StringIO()
+    was = _lib_profile.is_enabled()
+    _lib_profile.reset()
+    try:
+        _lib_profile.render_summary(1.0, stream=buf)
+    finally:
+        _lib_profile.enable(was)
+    assert "no spans recorded" in buf.getvalue()
+
+
+def test_render_metrics_exposition(recording):
+    with span('weird"name'):
+        pass
+    text = _lib_profile.render_metrics(2.5, now_ts=100.0)
+    assert "# TYPE da_tools_profile_span_seconds gauge" in text
+    assert 'da_tools_profile_span_calls{span="weird\\"name"} 1' in text
+    assert "da_tools_profile_run_duration_seconds 2.500000" in text
+    assert "da_tools_profile_last_run_timestamp_seconds 100.000" in text
+    assert text.endswith("\n")
+
+
+def test_push_metrics_posts_to_command_grouping_key(recording):
+    with span("io.load_yaml"):
+        pass
+    seen = {}
+
+    def fake_urlopen(req, data=None, timeout=None):
+        seen["url"], seen["data"] = req.full_url, data
+        resp = mock.MagicMock()
+        resp.__enter__.return_value = resp
+        return resp
+
+    with mock.patch("urllib.request.urlopen", fake_urlopen):
+        assert _lib_profile.push_metrics("http://pg:9091/", "validate-config", 1.0)
+    assert seen["url"] == ("http://pg:9091/metrics/job/da-tools-profile"
+                           "/command/validate-config")
+    assert b'span="io.load_yaml"' in seen["data"]
+
+
+def test_push_metrics_failure_is_non_fatal(recording, capsys):
+    def boom(*_a, **_k):
+        raise urllib.error.URLError("refused")
+
+    with mock.patch("urllib.request.urlopen", boom):
+        assert not _lib_profile.push_metrics("http://pg:9091", "lint", 1.0)
+    assert "WARN" in capsys.readouterr().err
+
+
+def test_push_metrics_rejects_non_http_scheme(capsys):
+    assert not _lib_profile.push_metrics("file:///etc/passwd", "lint", 1.0)
+    assert "http/https only" in capsys.readouterr().err
+
+
+def test_import_does_not_pull_in_urllib_request():
+    """_lib_io imports this module; keep tool cold-start unaffected."""
+    import subprocess
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); import _lib_profile; "
+            "print('urllib.request' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code, str(REPO / "scripts" / "tools")],
+                         capture_output=True, text=True, timeout=60, check=True)
+    assert out.stdout.strip() == "False"
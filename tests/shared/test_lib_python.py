@@ -13,6 +13,7 @@ pytest style：使用 plain assert + conftest fixtures。
   7. write_text_secure / write_json_secure — SAST-compliant file writes
 """
 
+import io
 import json
 import os
 import pathlib
@@ -485,6 +486,47 @@ class TestHttpGetJson:
         assert "Unsupported URL scheme" in err
 
 
+class _StreamResponse(io.BytesIO):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TestIterJsonArray:
+    """iter_json_array() 測試 — 分塊讀取、逐項解碼。"""
+
+    BODY = ('{"status": "success", "data": {"xs": [1, 22 , {"a": "中"}, [3]], '
+            '"ys": []}}').encode("utf-8")
+
+    @pytest.mark.parametrize("chunk", [1, 3, 7, 65536])
+    def test_items_survive_any_chunk_boundary(self, monkeypatch, chunk):
+        """任意切塊位置（含多位元組字元、數字中間）結果一致。"""
+        import _lib_prometheus
+        monkeypatch.setattr(_lib_prometheus, "_STREAM_CHUNK", chunk)
+        with patch("_lib_prometheus.urllib.request.urlopen",
+                   return_value=_StreamResponse(self.BODY)):
+            assert list(lib.iter_json_array("http://x/api", "xs")) == [
+                1, 22, {"a": "中"}, [3]]
+
+    @pytest.mark.parametrize("body,match", [
+        (b'{"status": "error", "error": "bad query"}', "bad query"),
+        (b'{"status": "success", "data": {}}', "No 'xs' array"),
+        (b'{"xs": {"a": 1}}', "not an array"),
+        (b'{"xs": [1, 2', "Truncated"),
+    ])
+    def test_errors_raise_value_error(self, body, match):
+        with patch("_lib_prometheus.urllib.request.urlopen",
+                   return_value=_StreamResponse(body)):
+            with pytest.raises(ValueError, match=match):
+                list(lib.iter_json_array("http://x/api", "xs"))
+
+    def test_ssrf_blocked(self):
+        with pytest.raises(ValueError, match="Unsupported URL scheme"):
+            list(lib.iter_json_array("file:///etc/passwd", "xs"))
+
+
 class TestHttpPostJson:
     """http_post_json() 測試。"""
 
@@ -731,6 +773,24 @@ class TestWriteTextSecure:
         assert os.stat(path).st_mode & 0o777 == 0o600
 
 
+class TestWriteLinesSecure:
+    """write_lines_secure() 串流寫入測試。"""
+
+    def test_matches_write_text_secure(self, tmp_path):
+        """串流結果與一次寫入逐位元組相同。"""
+        chunks = ["租戶\n", "", "a,b\r\n", "tail"]
+        lib.write_text_secure(str(tmp_path / "a.txt"), "".join(chunks))
+        lib.write_lines_secure(str(tmp_path / "b.txt"), iter(chunks))
+        assert (tmp_path / "a.txt").read_bytes() == (tmp_path / "b.txt").read_bytes()
+
+    @_skipif_unix_modes
+    def test_permissions_0o600(self, tmp_path):
+        """寫入檔案權限為 0o600。"""
+        path = str(tmp_path / "secure.txt")
+        lib.write_lines_secure(path, ["x\n"])
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+
 # ============================================================
 # write_json_secure
 # ============================================================
@@ -789,3 +849,39 @@ class TestWriteJsonSecure:
         lib.write_json_secure(path, [1, "two", {"three": 3}])
         result = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
         assert result == [1, "two", {"three": 3}]
+
+
+# ============================================================
+# Lazy facade (PEP 562)
+# ============================================================
+
+class TestLazyFacade:
+    """_lib_python 只在取用時載入子模組，且 re-export 與子模組同一物件。"""
+
+    def test_every_export_resolves_to_submodule_object(self):
+        import importlib
+        for module, names in lib._EXPORTS.items():
+            sub = importlib.import_module(module)
+            for name in names:
+                assert getattr(lib, name) is getattr(sub, name), name
+
+    def test_all_excludes_private_names(self):
+        assert "_validate_url_scheme" not in lib.__all__
+        assert "load_yaml_file" in lib.__all__
+        assert "http_get_json" in dir(lib)
+
+    def test_unknown_attribute_raises(self):
+        with pytest.raises(AttributeError):
+            lib.no_such_helper  # noqa: B018
+
+    def test_light_import_skips_yaml_and_urllib(self):
+        """`from _lib_python import detect_cli_lang` 不應拉進 PyYAML / urllib。"""
+        import subprocess
+        tools = pathlib.Path(__file__).resolve().parents[2] / "scripts" / "tools"
+        code = ("import sys; sys.path.insert(0, sys.argv[1]); "
+                "from _lib_python import detect_cli_lang; "
+                "print(sorted(m for m in ('yaml', 'urllib.request', '_lib_io', "
+                "'_lib_prometheus') if m in sys.modules))")
+        out = subprocess.run([sys.executable, "-c", code, str(tools)],
+                             capture_output=True, text=True, timeout=60, check=True)
+        assert out.stdout.strip() == "[]"
@@ -0,0 +1,163 @@
+"""Unit tests for `_lib_rulepack_index` — compiled rule-pack index + parse cache."""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import sys
+
+import pytest
+
+REPO = pathlib.Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO / "scripts" / "tools"))
+
+import _lib_rulepack_index as idx  # noqa: E402
+
+yaml = pytest.importorskip("yaml")
+
+PACK = """\
+groups:
+  - name: mysql-alerts
+    rules:
+      - alert: MySQLHighConnections
+        expr: |
+          tenant:mysql_threads_connected:max
+            > on(tenant) group_left tenant:alert_threshold:connections
+        labels:
+          severity: warning
+          tier: 2
+      - alert: MySQLLowBuffer
+        expr: tenant:mysql_buffer:ratio * 100 <= tenant:alert_threshold:buffer
+  - name: mysql-recording
+    rules:
+      - record: tenant:mysql_threads_connected:max
+        expr: max by(tenant) (mysql_global_status_threads_connected)
+      - not_a_rule: true
+# tenant:alert_threshold:comment_only
+"""
+
+
+@pytest.fixture()
+def cache(tmp_path, monkeypatch):
+    """Isolated on-disk cache + empty in-process memo."""
+    d = tmp_path / "cache"
+    monkeypatch.setenv(idx.CACHE_ENV, str(d))
+    idx.clear_memo()
+    yield d / f"v{idx.INDEX_VERSION}"
+    idx.clear_memo()
+
+
+def _write(tmp_path, text, name="rule-pack-mysql.yaml"):
+    p = tmp_path / name
+    p.write_text(text, encoding="utf-8")
+    return p
+
+
+def test_compiles_rules_labels_keys_and_directions(cache, tmp_path):
+    pack = idx.compile_pack(_write(tmp_path, PACK))
+    assert [(r.group, r.kind, r.name) for r in pack.rules] == [
+        ("mysql-alerts", "alert", "MySQLHighConnections"),
+        ("mysql-alerts", "alert", "MySQLLowBuffer"),
+        ("mysql-recording", "record", "tenant:mysql_threads_connected:max"),
+    ]
+    high, low = pack.alerts()
+    assert high.labels == {"severity": "warning", "tier": "2"}
+    assert high.threshold_keys == ("connections",)
+    assert high.observed == ("tenant:mysql_threads_connected:max",)
+    assert high.directions == {"connections": ">"} and not high.scaled
+    assert low.directions == {"buffer": "<"} and low.scaled
+    assert len(high.fingerprint) == 16 and high.fingerprint != low.fingerprint
+    assert pack.text_threshold_keys == {"connections", "buffer", "comment_only"}
+    assert pack.doc["groups"][0]["name"] == "mysql-alerts"
+
+
+def test_warm_hit_skips_yaml_and_matches_cold(cache, tmp_path, monkeypatch):
+    path = _write(tmp_path, PACK)
+    cold = idx.compile_pack(path)
+    assert (cache / f"{cold.sha256}.json").is_file()
+    idx.clear_memo()
+
+    def no_parse(*_a, **_k):
+        raise AssertionError("warm load must not parse YAML")
+
+    monkeypatch.setattr(idx.yaml, "safe_load", no_parse)
+    warm = idx.compile_pack(path)
+    assert warm == cold
+
+
+def test_each_call_gets_an_independent_doc(cache, tmp_path):
+    path = _write(tmp_path, PACK)
+    first = idx.compile_pack(path)
+    first.doc["groups"].clear()
+    assert idx.compile_pack(path).doc["groups"]
+
+
+def test_edited_pack_is_a_cache_miss(cache, tmp_path):
+    path = _write(tmp_path, PACK)
+    before = idx.compile_pack(path)
+    path.write_text(PACK.replace("connections", "conns"), encoding="utf-8")
+    after = idx.compile_pack(path)
+    assert after.sha256 != before.sha256
+    assert after.alerts()[0].threshold_keys == ("conns",)
+
+
+def test_parse_errors_propagate_and_are_not_cached(cache, tmp_path):
+    path = _write(tmp_path, "groups: [\n")
+    with pytest.raises(yaml.YAMLError):
+        idx.compile_pack(path)
+    assert not cache.exists() or not list(cache.iterdir())
+    with pytest.raises(OSError):
+        idx.compile_pack(tmp_path / "missing.yaml")
+
+
+def test_non_json_document_is_served_but_not_cached(cache, tmp_path):
+    # Int keys and dates would come back changed from JSON; never cache lossily.
+    path = _write(tmp_path, "groups: []\n1: one\nwhen: 2024-01-01\n")
+    pack = idx.compile_pack(path)
+    assert pack.doc[1] == "one"
+    assert not cache.exists() or not list(cache.iterdir())
+
+
+def test_corrupt_or_foreign_cache_entry_falls_back_to_parse(cache, tmp_path):
+    path = _write(tmp_path, PACK)
+    sha = idx.compile_pack(path).sha256
+    idx.clear_memo()
+    (cache / f"{sha}.json").write_text("{torn", encoding="utf-8")
+    assert idx.compile_pack(path).alerts()[0].name == "MySQLHighConnections"
+    idx.clear_memo()
+    (cache / f"{sha}.json").write_text(json.dumps({"version": -1}), encoding="utf-8")
+    assert len(idx.compile_pack(path).rules) == 3
+
+
+def test_cache_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv(idx.CACHE_ENV, "off")
+    idx.clear_memo()
+    assert idx.cache_dir() is None
+    assert len(idx.compile_pack(_write(tmp_path, PACK)).rules) == 3
+
+
+def test_unwritable_cache_dir_is_non_fatal(tmp_path, monkeypatch):
+    blocker = tmp_path / "file"
+    blocker.write_text("x", encoding="utf-8")
+    monkeypatch.setenv(idx.CACHE_ENV, str(blocker / "sub"))
+    idx.clear_memo()
+    assert len(idx.compile_pack(_write(tmp_path, PACK)).rules) == 3
+
+
+def test_malformed_groups_compile_to_no_rules(cache, tmp_path):
+    pack = idx.compile_pack(_write(tmp_path, 'groups: "nope"\n'))
+    assert pack.rules == () and pack.doc == {"groups": "nope"}
+    pack = idx.compile_pack(_write(tmp_path, "groups:\n  - name: g\n    rules: 5\n",
+                                   name="b.yaml"))
+    assert pack.rules == ()
+
+
+def test_shipped_packs_match_observed_map_extraction(cache):
+    """The index and the #719 extractor agree on every shipped pack."""
+    sys.path.insert(0, str(REPO / "scripts" / "tools" / "ops"))
+    import _observed_map_lib as L
+
+    for p in L.default_pack_paths():
+        pack = idx.compile_pack(p)
+        refs = {k for r in pack.alerts() for k in r.threshold_keys}
+        assert refs == set(L.extract_pack(p))